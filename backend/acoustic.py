@@ -0,0 +1,308 @@
+"""
+RailGuard 5000 — Acoustic Emission
+Streaming AE hit detection and source location for the three axle sensors
+read by A3 (Acoustic Emission), sampled at AE_FS (1 MHz) per channel.
+
+  * Hits — a hit starts at the first threshold crossing and ends once no
+    crossing follows for the hit definition time (HDT); the channel then
+    ignores crossings for the hit lockout time (HLT). Thresholds, HDT and
+    HLT follow the usual AE-system settings for steel.
+  * Features per hit — arrival time, peak amplitude (dB_AE, re 1 µV),
+    duration, counts (threshold crossings), energy (MARSE-style, from the
+    squared signal), rise time (first crossing to peak) and peak
+    frequency (batched FFT of the first FFT_N samples of every hit).
+  * Location — hits on different sensors within the travel time across
+    the axle form one event; its source position along the axle is the
+    point whose predicted arrival-time differences best fit the measured
+    ones (TDOA, least squares over a 1 mm grid).
+
+Everything per sample is NumPy over whole blocks: threshold masks,
+crossing indices, gaps, cumulative energy. Python only loops per hit and
+per event. A hit still open at the end of a block is finished on the
+next one, from the SampleRing (ingest.py) the samples are kept in.
+
+AESimulator stands in for the AE front end: windows of a shared,
+pre-generated noise bank plus bursts from rubbing (low frequency, slow
+rise) and, during crack episodes, crack growth (high frequency, fast rise,
+one location), each arriving at every sensor with its travel delay and
+attenuation.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+AE_FS = 1_000_000.0            # Hz per channel
+THRESHOLD_DB = 45.0            # dB_AE (re 1 µV at the sensor)
+HDT_S = 400e-6                 # hit definition time
+HLT_S = 1000e-6                # hit lockout time
+MAX_HIT_S = 0.01               # a hit is closed after this long regardless
+FFT_N = 256                    # samples per hit for its peak frequency
+WAVE_SPEED = 5100.0            # m/s, extensional wave in axle steel
+GRID_M = 0.001                 # location grid step
+# Crack growth: short-rise, high-frequency hits, repeatedly from one place
+CRACK_MIN_FREQ_KHZ = 100.0
+CRACK_MAX_RISE_US = 50.0
+CRACK_MIN_EVENTS = 5
+CRACK_CLUSTER_M = 0.05
+CRACK_WINDOW_S = 2.0           # crack-like events are pooled over this long
+
+HIT_FIELDS = ("channel", "arrival_s", "amplitude_db", "duration_us", "counts",
+              "energy_aj", "rise_time_us", "peak_frequency_khz")
+
+
+def db_ae(volts):
+    """Amplitude in dB_AE (re 1 µV at the sensor)."""
+    return 20 * np.log10(np.maximum(volts, 1e-7) / 1e-6)
+
+
+class HitDetector:
+    """Threshold / HDT / HLT hit detection with per-hit features, over a SampleRing."""
+
+    def __init__(self, channels: int, fs: float = AE_FS, threshold_db: float = THRESHOLD_DB,
+                 hdt: float = HDT_S, hlt: float = HLT_S, max_hit: float = MAX_HIT_S):
+        self.channels = channels
+        self.fs = fs
+        self.threshold = 1e-6 * 10 ** (threshold_db / 20)
+        self.hdt = int(hdt * fs)
+        self.hlt = int(hlt * fs)
+        self.max_hit = int(max_hit * fs)
+        # Absolute sample index per channel from which hits are still undecided
+        self._next = np.zeros(channels, dtype=np.int64)
+        self._fft_window = np.hanning(FFT_N)
+        self._fft_freqs = np.fft.rfftfreq(FFT_N, 1 / fs)
+        self._fft_offsets = np.arange(FFT_N)
+
+    # Work arrays, grown to the largest window seen and then reused. Only
+    # touched inside process(), which never yields: all detectors share them.
+    _abs = np.empty(0, dtype=np.float32)
+    _above = np.empty(0, dtype=bool)
+    _energy = np.zeros(1)
+
+    @classmethod
+    def _work(cls, n: int):
+        if len(cls._abs) < n:
+            cls._abs = np.empty(n, dtype=np.float32)
+            cls._above = np.empty(n, dtype=bool)
+            cls._energy = np.zeros(n + 1)
+        return cls._abs[:n], cls._above[:n], cls._energy[:n + 1]
+
+    def process(self, ring) -> Dict[str, np.ndarray]:
+        """
+        Hits completed since the last call, as columns (HIT_FIELDS), sorted
+        by arrival. Hits within HDT of the newest sample wait for more data.
+        """
+        end = ring.total
+        columns: Dict[str, list] = {name: [] for name in HIT_FIELDS}
+        for channel in range(self.channels):
+            start = max(int(self._next[channel]), end - len(ring))
+            if end - start <= self.hdt:
+                continue
+            x = ring.latest(end - start)[channel]
+            self._channel_hits(channel, x, start, end, columns)
+        hits = {name: np.asarray(values, dtype=np.int64 if name in ("channel", "counts") else float)
+                for name, values in columns.items()}
+        order = np.argsort(hits["arrival_s"], kind="stable")
+        return {name: values[order] for name, values in hits.items()}
+
+    def _channel_hits(self, channel: int, x: np.ndarray, start: int, end: int, columns: dict):
+        n = len(x)
+        absx, above, energy = self._work(n)
+        np.abs(x, out=absx)
+        np.greater_equal(absx, self.threshold, out=above)
+        crossings = np.flatnonzero(above)
+        if not len(crossings):
+            self._next[channel] = end - self.hdt
+            return
+        # Hits: runs of crossings separated by less than HDT
+        breaks = np.flatnonzero(np.diff(crossings) > self.hdt)
+        firsts = crossings[np.concatenate(([0], breaks + 1))]
+        lasts = crossings[np.concatenate((breaks, [len(crossings) - 1]))]
+
+        # Lockout and completeness need the previous accepted hit: one pass per hit
+        decided = n - self.hdt          # a hit whose last crossing is before this is over
+        starts, stops = [], []
+        pending = None
+        lockout = 0
+        for first, last in zip(firsts.tolist(), lasts.tolist()):
+            if first < lockout:
+                # Crossings inside the lockout are ignored; a run outliving it starts a hit
+                i = int(np.searchsorted(crossings, lockout))
+                if i >= len(crossings) or crossings[i] > last:
+                    continue
+                first = int(crossings[i])
+            if last - first > self.max_hit:
+                last = first + self.max_hit
+            elif last >= decided:
+                pending = first         # may still grow: decide it next time
+                break
+            starts.append(first)
+            stops.append(last)
+            lockout = last + self.hdt + self.hlt
+        self._next[channel] = start + (pending if pending is not None else max(lockout, decided))
+        if not starts:
+            return
+        s = np.array(starts)
+        e = np.array(stops)
+
+        # Counts: rising threshold crossings within each hit
+        rising = np.flatnonzero(above[1:] & ~above[:-1]) + 1
+        counts = np.searchsorted(rising, e, side="right") - np.searchsorted(rising, s, side="left")
+        counts += above[s] & (s == 0)
+        # Energy: integral of the squared signal (into 10 kΩ, in aJ)
+        np.square(x, out=absx)
+        np.cumsum(absx, out=energy[1:])
+        hit_energy = (energy[e + 1] - energy[s]) / self.fs / 1e4 * 1e18
+        # Peak and rise time
+        peaks = np.empty(len(s))
+        rise = np.empty(len(s))
+        np.abs(x, out=absx)
+        for i, (a, b) in enumerate(zip(starts, stops)):
+            k = int(np.argmax(absx[a:b + 1]))
+            peaks[i] = absx[a + k]
+            rise[i] = k
+        # Peak frequency: one batched FFT over the start of every hit
+        frames = x[np.minimum(s[:, None] + self._fft_offsets, n - 1)] * self._fft_window
+        spectra = np.abs(np.fft.rfft(frames, axis=1))
+        spectra[:, 0] = 0.0
+
+        columns["channel"].extend([channel] * len(s))
+        columns["arrival_s"].extend(((start + s) / self.fs).tolist())
+        columns["amplitude_db"].extend(db_ae(peaks).tolist())
+        columns["duration_us"].extend(((e - s) / self.fs * 1e6).tolist())
+        columns["counts"].extend(counts.tolist())
+        columns["energy_aj"].extend(hit_energy.tolist())
+        columns["rise_time_us"].extend((rise / self.fs * 1e6).tolist())
+        columns["peak_frequency_khz"].extend((self._fft_freqs[np.argmax(spectra, axis=1)] / 1000).tolist())
+
+
+class Locator:
+    """Linear (along-axle) TDOA source location from hits on several sensors."""
+
+    def __init__(self, sensor_m: List[float], wave_speed: float = WAVE_SPEED, step: float = GRID_M):
+        self.sensor_m = np.asarray(sensor_m, dtype=float)
+        self.wave_speed = wave_speed
+        self.window = (self.sensor_m.max() - self.sensor_m.min()) / wave_speed * 1.2
+        self.grid = np.arange(self.sensor_m.min(), self.sensor_m.max() + step / 2, step)
+        # Travel time from every grid point to every sensor: (sensors, grid)
+        self._travel = np.abs(self.grid[None, :] - self.sensor_m[:, None]) / wave_speed
+
+    def events(self, hits: Dict[str, np.ndarray]) -> List[Tuple[np.ndarray, float]]:
+        """
+        Group hits (sorted by arrival) into events and locate those seen by
+        two or more sensors. Returns (indices of the event's hits, source m).
+        """
+        arrival = hits["arrival_s"]
+        if not len(arrival):
+            return []
+        breaks = np.flatnonzero(np.diff(arrival) > self.window) + 1
+        located = []
+        for group in np.split(np.arange(len(arrival)), breaks):
+            channels = hits["channel"][group]
+            # First arrival per sensor
+            _, first = np.unique(channels, return_index=True)
+            if len(first) < 2:
+                continue
+            members = group[first]
+            sensors = hits["channel"][members]
+            times = arrival[members]
+            measured = times - times[0]
+            predicted = self._travel[sensors] - self._travel[sensors[0]]
+            residual = np.square(predicted - measured[:, None]).sum(axis=0)
+            located.append((members, float(self.grid[int(np.argmin(residual))])))
+        return located
+
+
+class AESimulator:
+    """Synthetic AE sensor blocks: noise bank plus propagated bursts."""
+
+    NOISE_V = 20e-6            # RMS at the sensor
+    NOISE_BANK = 1 << 20       # pre-generated noise samples per channel, shared
+    ATTENUATION_DB_M = 6.0     # along the axle
+    RUB_RATE = 30.0            # rubbing / fretting bursts per second
+    CRACK_RATE = 40.0          # crack-growth bursts per second during an episode
+    MAX_BURST_S = 0.0025       # longest burst plus travel time across the axle
+
+    def __init__(self, sensor_m: List[float], block: int, fs: float = AE_FS,
+                 rng: Optional[np.random.Generator] = None, wave_speed: float = WAVE_SPEED):
+        self.sensor_m = np.asarray(sensor_m, dtype=float)
+        self.channels = len(sensor_m)
+        self.block = block
+        self.fs = fs
+        self.wave_speed = wave_speed
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self._noise = self._noise_bank(self.channels)
+        self._tail = int(self.MAX_BURST_S * fs)
+        self._bursts = np.zeros((self.channels, block + self._tail), dtype=np.float32)
+        self._out = np.empty((self.channels, block), dtype=np.float32)
+        self._t = np.arange(int(0.002 * fs)) / fs
+
+    _banks: Dict[int, np.ndarray] = {}
+
+    @classmethod
+    def _noise_bank(cls, channels: int) -> np.ndarray:
+        """Sensor noise every simulator draws windows from (fixed seed: same on every run)."""
+        bank = cls._banks.get(channels)
+        if bank is None:
+            bank = np.random.default_rng(0).standard_normal((channels, cls.NOISE_BANK), dtype=np.float32)
+            bank *= cls.NOISE_V
+            cls._banks[channels] = bank
+        return bank
+
+    def _burst(self, at: float, x: float, amplitude_db: float, freq: float, rise: float, decay: float):
+        """Add one source burst at block time `at` (s) and axle position `x` (m) to every sensor."""
+        length = min(len(self._t), int((rise + 5 * decay) * self.fs))
+        t = self._t[:length]
+        envelope = np.where(t < rise, t / rise, np.exp(-(t - rise) / decay))
+        wave = envelope * np.sin(2 * np.pi * freq * t + self.rng.uniform(0, 2 * np.pi))
+        distance = np.abs(self.sensor_m - x)
+        volts = 1e-6 * 10 ** ((amplitude_db - self.ATTENUATION_DB_M * distance) / 20)
+        offsets = ((at + distance / self.wave_speed) * self.fs).astype(int)
+        for channel in range(self.channels):
+            o = offsets[channel]
+            self._bursts[channel, o:o + length] += volts[channel] * wave
+
+    def next_block(self, crack_at: Optional[float] = None) -> np.ndarray:
+        """One (channels, block) block of sensor volts; reused by the next call."""
+        rng, seconds = self.rng, self.block / self.fs
+        lo, hi = self.sensor_m.min(), self.sensor_m.max()
+        for at in rng.uniform(0, seconds, rng.poisson(self.RUB_RATE * seconds)):
+            self._burst(at, rng.uniform(lo, hi), rng.uniform(50, 70), rng.uniform(30e3, 60e3),
+                        rng.uniform(100e-6, 300e-6), rng.uniform(200e-6, 300e-6))
+        if crack_at is not None:
+            for at in rng.uniform(0, seconds, rng.poisson(self.CRACK_RATE * seconds)):
+                self._burst(at, crack_at, rng.uniform(60, 85), rng.uniform(150e3, 300e3),
+                            rng.uniform(5e-6, 30e-6), rng.uniform(60e-6, 120e-6))
+        start = int(rng.integers(0, self.NOISE_BANK - self.block))
+        np.add(self._noise[:, start:start + self.block], self._bursts[:, :self.block], out=self._out)
+        # Bursts running past this block carry over into the next
+        self._bursts[:, :self._tail] = self._bursts[:, self.block:self.block + self._tail]
+        self._bursts[:, self._tail:] = 0.0
+        return self._out
+
+    @staticmethod
+    def sensor_layout(length_m: float = 2.0) -> Dict[str, float]:
+        """Sensor positions along the axle: both bearing seats and the middle."""
+        return {"bearing_left": 0.0, "axle_center": length_m / 2, "bearing_right": length_m}
+
+
+def crack_locations(hits: Dict[str, np.ndarray], events: List[Tuple[np.ndarray, float]]) -> List[float]:
+    """Source positions of the crack-like events (fast rise, high frequency)."""
+    located = []
+    for members, x in events:
+        first = members[0]
+        if (hits["peak_frequency_khz"][first] >= CRACK_MIN_FREQ_KHZ
+                and hits["rise_time_us"][first] <= CRACK_MAX_RISE_US):
+            located.append(x)
+    return located
+
+
+def crack_cluster(locations: List[float]) -> Optional[float]:
+    """
+    Median of crack-like event locations if at least CRACK_MIN_EVENTS of
+    them lie within CRACK_CLUSTER_M of it: growth at one place, not noise.
+    """
+    if len(locations) < CRACK_MIN_EVENTS:
+        return None
+    centre = float(np.median(locations))
+    near = sum(1 for x in locations if abs(x - centre) <= CRACK_CLUSTER_M)
+    return centre if near >= CRACK_MIN_EVENTS else None
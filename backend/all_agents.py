@@ -2,672 +2,1108 @@
 RailGuard 5000 — All 50 Agents (Self-Contained)
 Each agent has: agent_id, name, status, and async run(blackboard).
 All data written to blackboard is plain Python dicts with only JSON-safe values.
+
+Agents are SimAgents: `sample()` produces one payload for `layer`, and
+`step()` writes it. `run()` keeps the old free-running loop (one sample
+every `interval` seconds). Agents that declare `inputs` are also stepped by
+the Orchestrator as soon as one of those entries changes (see
+orchestrator.py), so the README chain A19/A21 → A32 → A35 → A39 propagates
+in milliseconds instead of waiting out every agent's sleep.
+The diagnostic and predictive agents (A19–A38) run with `executor =
+"process"`: when the Orchestrator has worker processes, their `sample()`
+runs there instead of on the event loop.
+
+Every agent draws from `self.rng`: the shared `random` module until
+`seed()` gives it its own generator, seeded from the run's seed and the
+agent id, so a seeded fleet replays the same telemetry (see clock.py).
+
+Fleet mode builds one roster per trainset with `build_fleet()`: every
+agent id (and every declared input) is namespaced as "<train>/<agent>",
+e.g. "T001/A19", and all trains share one Orchestrator and one loop.
+
+A2, A3 and A4 analyse raw camera and sensor streams (thermal.py,
+acoustic.py, vibration.py) once a driver attach()es them. Without one,
+they only synthesize those streams when `signals` is on
+(RAILGUARD_SIGNALS=1). That costs milliseconds of CPU and megabytes per
+trainset, so it is meant for demos and for testing the signal path.
+Otherwise they report the same fields with values drawn in their usual
+ranges, as cheaply as every other agent.
 """
 import asyncio
+import os
 import random
+from collections import deque
 import time
 import math
 from datetime import datetime
+from typing import Dict, List, Optional, Iterable, Tuple
+
+import numpy as np
+
+try:
+    from acoustic import (AE_FS, CRACK_WINDOW_S, HIT_FIELDS, AESimulator, HitDetector, Locator,
+                          crack_cluster, crack_locations)
+    from ingest import FrameRing, SampleRing
+    from thermal import (BOGIE_REGIONS, FRAME_RATE, FRAME_SHAPE, HotspotTracker, ThermalAnalyzer,
+                         ThermalSimulator, warming_rate)
+    from vibration import (AXLE_BOX_BEARING, DEFAULT_FS, DEFECT_SNR_DB, DEFECTS, ENVELOPE_N,
+                           MIN_SHAFT_HZ, SpectrumAnalyzer, VibrationSimulator, shaft_hz)
+except ImportError:
+    from backend.acoustic import (AE_FS, CRACK_WINDOW_S, HIT_FIELDS, AESimulator, HitDetector, Locator,
+                                  crack_cluster, crack_locations)
+    from backend.ingest import FrameRing, SampleRing
+    from backend.thermal import (BOGIE_REGIONS, FRAME_RATE, FRAME_SHAPE, HotspotTracker, ThermalAnalyzer,
+                                 ThermalSimulator, warming_rate)
+    from backend.vibration import (AXLE_BOX_BEARING, DEFAULT_FS, DEFECT_SNR_DB, DEFECTS, ENVELOPE_N,
+                                   MIN_SHAFT_HZ, SpectrumAnalyzer, VibrationSimulator, shaft_hz)
+
+# Separates the trainset from the agent in fleet-mode agent ids
+TRAIN_SEP = "/"
+# RAILGUARD_SIGNALS=1: A2–A4 synthesize and analyse their streams when no driver is attached
+SIGNALS = os.environ.get("RAILGUARD_SIGNALS", "0").strip().lower() in ("1", "true", "yes", "on")
 
 
 def ts():
     return datetime.utcnow().isoformat() + "Z"
 
 
-# ─────────────────────────────────────────────────────────────
-# CATEGORY 1: SENSORY PERCEPTION  (A1 – A10)
-# ─────────────────────────────────────────────────────────────
+class SimAgent:
+    agent_id = ""; name = ""; status = "idle"
+    layer = 1          # blackboard layer written
+    interval = 1.0     # seconds between samples when nothing triggers the agent
+    inputs = ()        # (layer, agent_id) entries whose changes trigger a step
+    debounce = 0.02    # seconds to let a burst of input changes settle
+    priority = "normal"   # critical | high | normal | low (see orchestrator.py)
+    deadline = None    # seconds from release to written; defaults to interval
+    executor = "loop"  # "process": sample() runs in the agent process pool, if one is configured
+    phase = 0.0        # offset of the agent's ticks, as a fraction of its interval
+    rng = random       # source of randomness; seed() gives the agent its own
+    signals = False    # A2–A4: synthesize raw streams to analyse when no driver is attached
+
+    def seed(self, seed):
+        """Draw from a private generator seeded by `seed` and this agent's id."""
+        self.rng = random.Random(f"{seed}:{self.agent_id}")
+
+    def sibling(self, local_id: str) -> str:
+        """Id of another roster agent on the same trainset, e.g. "T001/A7" for "T001/A4"."""
+        train_id, sep, _ = self.agent_id.rpartition(TRAIN_SEP)
+        return f"{train_id}{sep}{local_id}"
+
+    def sample(self) -> dict:
+        raise NotImplementedError
+
+    async def step(self, bb):
+        await bb.write(self.layer, self.agent_id, self.sample())
+    # Only sample() and write: the Orchestrator may sample and batch the writes itself
+    step.batchable = True
 
-class VisualAcquisitionAgent:
-    agent_id = "A1"; name = "Visual Acquisition"; status = "idle"
     async def run(self, bb):
         while True:
-            await bb.write(1, self.agent_id, {
-                "frame_rate": 200,
-                "cameras": ["front", "side_left", "side_right", "underbody"],
-                "exposure_ms": round(random.uniform(0.5, 5.0), 2),
-                "light_level_lux": round(random.uniform(50, 5000), 1),
-                "motion_blur": random.choice([True, False]),
-            })
-            await asyncio.sleep(0.1)
+            await self.step(bb)
+            await asyncio.sleep(self.interval)
 
-class ThermalImagingAgent:
-    agent_id = "A2"; name = "Thermal Imaging"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(1, self.agent_id, {
-                "temperatures": {
-                    "wheel_bogie_1": round(random.uniform(25, 90), 1),
-                    "wheel_bogie_2": round(random.uniform(25, 90), 1),
-                    "bearing_assembly": round(random.uniform(30, 110), 1),
-                    "brake_disc": round(random.uniform(20, 150), 1),
-                },
-                "hotspot_detected": random.random() > 0.9,
-                "ambient_temp_c": round(random.uniform(10, 35), 1),
-            })
-            await asyncio.sleep(0.5)
-
-class AcousticEmissionAgent:
-    agent_id = "A3"; name = "Acoustic Emission"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(1, self.agent_id, {
-                "positions": {
-                    "bearing_left": round(random.uniform(0, 10), 3),
-                    "bearing_right": round(random.uniform(0, 10), 3),
-                    "axle_center": round(random.uniform(0, 5), 3),
-                },
-                "crack_signature_detected": random.random() > 0.95,
-                "peak_frequency_khz": round(random.uniform(20, 100), 1),
-            })
-            await asyncio.sleep(0.2)
 
-class VibrationSpectrumAgent:
-    agent_id = "A4"; name = "Vibration Spectrum"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(1, self.agent_id, {
-                "dominant_freq_hz": round(random.uniform(100, 5000), 1),
-                "amplitude_g": round(random.uniform(0.1, 10.0), 3),
-                "bpfi_alert": random.random() > 0.92,
-                "bpfo_alert": random.random() > 0.94,
-                "positions": ["bearing_left", "bearing_right", "axle_box"],
-            })
-            await asyncio.sleep(0.1)
-
-class LoadDistributionAgent:
-    agent_id = "A5"; name = "Load Distribution"; status = "idle"
-    async def run(self, bb):
-        while True:
-            loads = {f"axle_{i}": round(random.uniform(5000, 25000), 0) for i in range(1, 5)}
-            await bb.write(1, self.agent_id, {
-                "axle_loads_kg": loads,
-                "total_weight_kg": round(sum(loads.values()), 0),
-                "overload": any(v > 23000 for v in loads.values()),
-                "balance_ok": random.random() > 0.1,
-            })
-            await asyncio.sleep(0.5)
-
-class EnvironmentalContextAgent:
-    agent_id = "A6"; name = "Environmental Context"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(1, self.agent_id, {
-                "temperature_c": round(random.uniform(-10, 45), 1),
-                "humidity_pct": round(random.uniform(20, 95), 1),
-                "pressure_hpa": round(random.uniform(960, 1040), 1),
-                "precipitation_mm": round(random.uniform(0, 15), 2),
-                "wind_speed_kmh": round(random.uniform(0, 80), 1),
-            })
-            await asyncio.sleep(5)
-
-class GPSSpeedSyncAgent:
-    agent_id = "A7"; name = "GPS/Speed Sync"; status = "idle"
-    async def run(self, bb):
-        while True:
-            spd = round(random.uniform(60, 130), 1)
-            await bb.write(1, self.agent_id, {
-                "latitude": round(59.9139 + random.uniform(-0.05, 0.05), 5),
-                "longitude": round(10.7522 + random.uniform(-0.05, 0.05), 5),
-                "speed_kmh": spd,
-                "encoder_speed_kmh": round(spd + random.uniform(-1, 1), 1),
-                "gps_accuracy_m": round(random.uniform(0.5, 3.0), 2),
-            })
-            await asyncio.sleep(0.05)
-
-class PowerManagementAgent:
-    agent_id = "A8"; name = "Power Management"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(1, self.agent_id, {
-                "battery_pct": round(random.uniform(55, 100), 1),
-                "power_draw_w": {"jetson": round(random.uniform(15, 45), 1),
-                                 "cameras": round(random.uniform(5, 15), 1),
-                                 "sensors": round(random.uniform(2, 10), 1)},
-                "charging": random.random() > 0.7,
-                "estimated_remaining_h": round(random.uniform(2, 20), 1),
-            })
-            await asyncio.sleep(10)
+# ─────────────────────────────────────────────────────────────
+# CATEGORY 1: SENSORY PERCEPTION  (A1 – A10)
+# ─────────────────────────────────────────────────────────────
 
-class DataIntegrityAgent:
-    agent_id = "A9"; name = "Data Integrity"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(2, self.agent_id, {
-                "sources_checked": ["visual", "thermal", "acoustic", "vibration"],
-                "all_valid": random.random() > 0.05,
-                "corruption_rate_pct": round(random.uniform(0, 2), 2),
-                "quality_score": round(random.uniform(0.85, 1.0), 3),
+class VisualAcquisitionAgent(SimAgent):
+    agent_id = "A1"; name = "Visual Acquisition"; layer = 1; interval = 0.1
+    def sample(self):
+        return {
+            "frame_rate": 200,
+            "cameras": ["front", "side_left", "side_right", "underbody"],
+            "exposure_ms": round(self.rng.uniform(0.5, 5.0), 2),
+            "light_level_lux": round(self.rng.uniform(50, 5000), 1),
+            "motion_blur": self.rng.choice([True, False]),
+        }
+
+class ThermalImagingAgent(SimAgent):
+    """
+    Region maxima and tracked hotspots from the bogie IR cameras (see
+    thermal.py), against ambient from A6. Frames come from `ring`; a
+    driver feeds it through attach(), otherwise each step synthesizes the
+    interval's frames if `signals` is on.
+    """
+    agent_id = "A2"; name = "Thermal Imaging"; layer = 1; interval = 0.5
+    signals = SIGNALS
+    cameras = ("bogie_left", "bogie_right")
+    fps = FRAME_RATE
+    ambient_c = 20.0        # until A6 has reported
+    # Simulated heat over ambient at each region's centre (°C), and overheating episodes:
+    # start chance per step, length (s), warming rate (°C/s)
+    REGION_HEAT = {"wheel_bogie_1": 20.0, "wheel_bogie_2": 20.0, "bearing_assembly": 25.0, "brake_disc": 50.0}
+    HOTSPOT_ONSET = 0.002
+    HOTSPOT_SECONDS = (20.0, 90.0)
+    HOTSPOT_RATE = (0.5, 3.0)
+    MAX_REPORTED = 8        # hotspots listed per step
+    # Work arrays are only touched inside sample(), which never yields, so
+    # every A2 on a loop shares one analyzer
+    _analyzer: Optional[ThermalAnalyzer] = None
+
+    def __init__(self):
+        self.ring: Optional[FrameRing] = None
+        self._external = False
+        self._simulator: Optional[ThermalSimulator] = None
+        self._tracker = HotspotTracker()
+        self._seen = 0          # frames of `ring` already analysed
+        self._heat: Optional[np.ndarray] = None
+        self._episodes: List[list] = []     # [camera, row, col, °C, °C/s, frames left]
+
+    def seed(self, seed):
+        super().seed(seed)
+        self._simulator = None
+
+    def attach(self, ring: FrameRing):
+        """Analyse (cameras, rows, cols) frames a driver writes into `ring` instead of simulating."""
+        self.ring = ring
+        self._external = True
+        self._seen = ring.total
+
+    async def step(self, bb):
+        env = bb.read_nowait(1, self.sibling("A6"))
+        if env is not None:
+            self.ambient_c = env["data"].get("temperature_c", self.ambient_c)
+        await bb.write(self.layer, self.agent_id, self.sample())
+
+    def _summary(self) -> dict:
+        """
+        A2's fields in their usual ranges, without rendering frames. Marked
+        "source": "summary"; hotspots carry no geometry or growth, which
+        only frame analysis can measure.
+        """
+        ambient = self.ambient_c
+        hot = self.rng.random() > 0.98
+        heat = {"wheel_bogie_1": (15, 35), "wheel_bogie_2": (15, 35),
+                "bearing_assembly": (20, 45), "brake_disc": (35, 80)}
+        hotspots = []
+        if hot:
+            hotspots.append({
+                "id": 1,
+                "camera": self.rng.choice(self.cameras),
+                "region": self.rng.choice([region.name for region in BOGIE_REGIONS]),
+                "max_c": round(ambient + self.rng.uniform(60, 130), 1),
             })
-            await asyncio.sleep(1)
-
-class MultiSpectralFusionAgent:
-    agent_id = "A10"; name = "Multi-Spectral Fusion"; status = "idle"
-    async def run(self, bb):
+        return {
+            "source": "summary",
+            "temperatures": {name: round(ambient + self.rng.uniform(lo, hi), 1)
+                             for name, (lo, hi) in heat.items()},
+            "hotspot_detected": hot,
+            "ambient_temp_c": round(ambient, 1),
+            "hotspot_count": len(hotspots),
+            "hotspots": hotspots,
+            "frames_analyzed": int(round(self.fps * self.interval)),
+            "cameras": list(self.cameras),
+        }
+
+    def _simulate(self, analyze):
+        """Synthesize one interval's frames, starting and ending overheating episodes."""
+        if self.ring is None:
+            self.ring = FrameRing((len(self.cameras),) + FRAME_SHAPE, 2)
+        if self._simulator is None:
+            self._simulator = ThermalSimulator(len(self.cameras), rng=np.random.default_rng(self.rng.getrandbits(64)))
+            self._heat = np.array([[self.REGION_HEAT[region.name] for region in BOGIE_REGIONS]] * len(self.cameras))
+        base = np.array([self.REGION_HEAT[region.name] for region in BOGIE_REGIONS])
+        self._heat += self._simulator.rng.normal(0.0, 0.5, self._heat.shape)
+        np.clip(self._heat, 0.5 * base, 1.5 * base, out=self._heat)
+        self._episodes = [episode for episode in self._episodes if episode[5] > 0]
+        if self.rng.random() < self.HOTSPOT_ONSET:
+            region = BOGIE_REGIONS[self.rng.randrange(len(BOGIE_REGIONS))]
+            self._episodes.append([self.rng.randrange(len(self.cameras)),
+                                   self.rng.uniform(*region.rows), self.rng.uniform(*region.cols), 5.0,
+                                   self.rng.uniform(*self.HOTSPOT_RATE),
+                                   int(self.rng.uniform(*self.HOTSPOT_SECONDS) * self.fps)])
+        for _ in range(int(round(self.fps * self.interval))):
+            spots = [(camera, row, col, excess) for camera, row, col, excess, _, _ in self._episodes]
+            self.ring.write(self._simulator.next_frame(self.ambient_c, self._heat, spots))
+            for episode in self._episodes:
+                episode[3] += episode[4] / self.fps
+                episode[5] -= 1
+            analyze()
+
+    def sample(self):
+        if not (self._external or self.signals):
+            return self._summary()
+        analyzer = ThermalImagingAgent._analyzer
+        if analyzer is None or analyzer.cameras != len(self.cameras):
+            analyzer = ThermalImagingAgent._analyzer = ThermalAnalyzer(len(self.cameras))
+        hottest = np.full(len(BOGIE_REGIONS), -np.inf)
+        frames = 0
+
+        def analyze():
+            nonlocal frames
+            for frame in self.ring.since(self._seen):
+                np.maximum(hottest, analyzer.region_max(frame).max(axis=0), out=hottest)
+                self._tracker.update(analyzer.hotspots(frame, self.ambient_c), self._seen / self.fps)
+                self._seen += 1
+                frames += 1
+
+        if self._external:
+            analyze()
+        else:
+            self._simulate(analyze)
+        hotspots = self._tracker.confirmed()
+        return {
+            "source": "frames",
+            "temperatures": {region.name: (round(float(hottest[k]), 1) if frames else None)
+                             for k, region in enumerate(BOGIE_REGIONS)},
+            "hotspot_detected": bool(hotspots),
+            "ambient_temp_c": round(self.ambient_c, 1),
+            "hotspot_count": len(hotspots),
+            "hotspots": [{
+                "id": track_id,
+                "camera": self.cameras[track["camera"]],
+                "region": BOGIE_REGIONS[track["region"]].name,
+                "row": round(track["row"], 1),
+                "col": round(track["col"], 1),
+                "area_px": track["area_px"],
+                "max_c": round(track["max_c"], 1),
+                "warming_c_per_min": round(warming_rate(track), 1),
+                "frames": track["frames"],
+            } for track_id, track in hotspots[:self.MAX_REPORTED]],
+            "frames_analyzed": frames,
+            "cameras": list(self.cameras),
+        }
+
+class AcousticEmissionAgent(SimAgent):
+    """
+    AE hit detection, features and TDOA source location on the axle
+    sensors (see acoustic.py). Crack-like events from the last
+    CRACK_WINDOW_S that cluster at one place raise the crack signature.
+    Samples come from `ring`; a driver feeds it through attach(),
+    otherwise, if `signals` is on, each step synthesizes the interval's
+    samples chunk by chunk.
+    """
+    agent_id = "A3"; name = "Acoustic Emission"; layer = 1; interval = 0.2
+    priority = "high"
+    signals = SIGNALS
+    fs = AE_FS
+    axle_m = 2.0
+    CHUNK = 50_000          # samples per channel simulated and detected at a time
+    RING = 65_536           # a chunk plus the longest hit still open at its end
+    # Simulated crack episodes: start chance per step, and length (s)
+    CRACK_ONSET = 0.0005
+    CRACK_SECONDS = (5.0, 20.0)
+    MAX_LOCATIONS = 8       # source positions reported per step
+
+    def __init__(self):
+        layout = AESimulator.sensor_layout(self.axle_m)
+        self.positions = tuple(layout)
+        self.sensor_m = [layout[position] for position in self.positions]
+        self.ring: Optional[SampleRing] = None
+        self._external = False
+        self._simulator: Optional[AESimulator] = None
+        self._detector: Optional[HitDetector] = None
+        self._locator: Optional[Locator] = None
+        self._crack: Optional[list] = None      # [location m, steps left]
+        self._recent = deque(maxlen=max(1, int(CRACK_WINDOW_S / self.interval)))
+
+    def seed(self, seed):
+        super().seed(seed)
+        self._simulator = None
+
+    def attach(self, ring: SampleRing):
+        """Analyse samples a driver writes into `ring` (channels = positions) instead of simulating."""
+        self.ring = ring
+        self._external = True
+
+    def _summary(self) -> dict:
+        """A3's fields in their usual ranges, without synthesizing samples."""
+        counts = {position: self.rng.randint(0, 15) for position in self.positions}
+        hits = sum(counts.values())
+        events = min(self.rng.randint(0, 8), hits // 2)
+        crack = self.rng.random() > 0.995
+        return {
+            "positions": counts,
+            "hits": hits,
+            "max_amplitude_db": round(self.rng.uniform(50, 85), 1) if hits else 0.0,
+            "energy_aj": round(self.rng.uniform(1e4, 2e6), 1) if hits else 0.0,
+            "rise_time_us": round(self.rng.uniform(5, 250), 1) if hits else 0.0,
+            "events_located": events,
+            "source_locations_m": [round(self.rng.uniform(0, self.axle_m), 3) for _ in range(events)],
+            "crack_signature_detected": crack,
+            "crack_location_m": round(self.rng.uniform(0.05, self.axle_m - 0.05), 3) if crack else None,
+            "peak_frequency_khz": round(self.rng.uniform(30, 300), 1) if hits else 0.0,
+        }
+
+    def _simulate(self) -> List[Dict[str, np.ndarray]]:
+        """Synthesize one interval chunk by chunk, detecting hits as it goes."""
+        if self.ring is None:
+            self.ring = SampleRing(len(self.positions), self.RING, dtype=np.float32)
+        if self._simulator is None:
+            self._simulator = AESimulator(self.sensor_m, self.CHUNK, self.fs,
+                                          np.random.default_rng(self.rng.getrandbits(64)))
+        if self._crack is not None and self._crack[1] <= 0:
+            self._crack = None
+        if self._crack is None and self.rng.random() < self.CRACK_ONSET:
+            self._crack = [self.rng.uniform(0.05, self.axle_m - 0.05),
+                           int(self.rng.uniform(*self.CRACK_SECONDS) / self.interval)]
+        crack_at = self._crack[0] if self._crack is not None else None
+        if self._crack is not None:
+            self._crack[1] -= 1
+        found = []
+        for _ in range(max(1, int(round(self.fs * self.interval / self.CHUNK)))):
+            self.ring.write(self._simulator.next_block(crack_at))
+            found.append(self._detector.process(self.ring))
+        return found
+
+    def sample(self):
+        if not (self._external or self.signals):
+            return self._summary()
+        if self._detector is None:
+            self._detector = HitDetector(len(self.positions), self.fs)
+            self._locator = Locator(self.sensor_m)
+        found = self._simulate() if not self._external else [self._detector.process(self.ring)]
+        hits = {name: np.concatenate([h[name] for h in found]) for name in HIT_FIELDS}
+        order = np.argsort(hits["arrival_s"], kind="stable")
+        hits = {name: values[order] for name, values in hits.items()}
+        events = self._locator.events(hits)
+        self._recent.append(crack_locations(hits, events))
+        crack_at = crack_cluster([x for step in self._recent for x in step])
+        per_channel = np.bincount(hits["channel"], minlength=len(self.positions))
+        strongest = int(np.argmax(hits["amplitude_db"])) if len(order) else None
+        return {
+            "positions": {position: int(count) for position, count in zip(self.positions, per_channel)},
+            "hits": int(len(order)),
+            "max_amplitude_db": round(float(hits["amplitude_db"][strongest]), 1) if strongest is not None else 0.0,
+            "energy_aj": round(float(hits["energy_aj"].sum()), 1),
+            "rise_time_us": round(float(hits["rise_time_us"][strongest]), 1) if strongest is not None else 0.0,
+            "events_located": len(events),
+            "source_locations_m": [round(x, 3) for _, x in events[-self.MAX_LOCATIONS:]],
+            "crack_signature_detected": crack_at is not None,
+            "crack_location_m": round(crack_at, 3) if crack_at is not None else None,
+            "peak_frequency_khz": (round(float(hits["peak_frequency_khz"][strongest]), 1)
+                                   if strongest is not None else 0.0),
+        }
+
+class VibrationSpectrumAgent(SimAgent):
+    """
+    Welch PSD and envelope analysis of the axle-box accelerometers (see
+    vibration.py), checked against the bearing defect frequencies at the
+    current shaft speed from A7. Samples come from `ring`; a driver feeds
+    it through attach(), otherwise, if `signals` is on, each step
+    synthesizes the samples that arrived since the last one.
+    """
+    agent_id = "A4"; name = "Vibration Spectrum"; layer = 1; interval = 0.1
+    priority = "high"
+    signals = SIGNALS
+    positions = ("bearing_left", "bearing_right", "axle_box")
+    fs = DEFAULT_FS
+    speed_kmh = 90.0        # until A7 has reported
+    # Simulated defect episodes: start chance per step and channel, and length (s)
+    DEFECT_ONSET = 0.0003
+    DEFECT_SECONDS = (3.0, 12.0)
+    # Work arrays are only touched inside sample(), which never yields, so
+    # every A4 on a loop (or in a worker process) shares one analyzer
+    _analyzer: Optional[SpectrumAnalyzer] = None
+
+    def __init__(self):
+        self.ring: Optional[SampleRing] = None
+        self._external = False
+        self._simulator: Optional[VibrationSimulator] = None
+        self._defects: Dict[Tuple[int, str], list] = {}   # -> [severity, steps left]
+
+    def seed(self, seed):
+        super().seed(seed)
+        self._simulator = None
+
+    def attach(self, ring: SampleRing):
+        """Analyse samples a driver writes into `ring` (channels = positions) instead of simulating."""
+        self.ring = ring
+        self._external = True
+
+    async def step(self, bb):
+        gps = bb.read_nowait(1, self.sibling("A7"))
+        if gps is not None:
+            self.speed_kmh = gps["data"].get("encoder_speed_kmh", self.speed_kmh)
+        await bb.write(self.layer, self.agent_id, self.sample())
+
+    def _summary(self, shaft: float) -> dict:
+        """
+        A4's fields in their usual ranges, without synthesizing samples.
+        Marked "source": "summary". Defect episodes start and end as when
+        simulating; each position's SNR stands above DEFECT_SNR_DB while
+        an episode runs on it, and alerts follow from the SNR as they do
+        from the analysed spectrum.
+        """
+        freqs = AXLE_BOX_BEARING.frequencies(shaft)
+        severities = self._advance_defects()
+        snr = {defect: [DEFECT_SNR_DB + 15.0 * severities[(channel, defect)]
+                        if (channel, defect) in severities else self.rng.uniform(3, 12)
+                        for channel in range(len(self.positions))] for defect in DEFECTS}
+        alerts = {defect: [value >= DEFECT_SNR_DB for value in snr[defect]] for defect in DEFECTS}
+        return {
+            "source": "summary",
+            "dominant_freq_hz": round(round(87 * shaft / 25) * 25, 1),
+            "amplitude_g": round(self.rng.uniform(1.2, 2.6), 3),
+            "rms_g": round(self.rng.uniform(0.40, 0.45), 3),
+            "shaft_hz": round(shaft, 2),
+            "defect_freqs_hz": {defect: round(freqs[defect], 1) for defect in DEFECTS},
+            "defect_snr_db": {defect: round(max(snr[defect]), 1) for defect in DEFECTS},
+            "bpfi_alert": any(alerts["bpfi"]),
+            "bpfo_alert": any(alerts["bpfo"]),
+            "bsf_alert": any(alerts["bsf"]),
+            "alert_positions": [position for i, position in enumerate(self.positions)
+                                if any(alerts[defect][i] for defect in DEFECTS)],
+            "positions": list(self.positions),
+        }
+
+    def _advance_defects(self) -> Dict[Tuple[int, str], float]:
+        """End finished defect episodes, maybe start new ones; returns (channel, defect) -> severity."""
+        for key in [key for key, episode in self._defects.items() if episode[1] <= 0]:
+            del self._defects[key]
+        for channel in range(len(self.positions)):
+            for defect in DEFECTS:
+                if (channel, defect) not in self._defects and self.rng.random() < self.DEFECT_ONSET:
+                    steps = int(self.rng.uniform(*self.DEFECT_SECONDS) / self.interval)
+                    self._defects[(channel, defect)] = [self.rng.uniform(0.3, 1.0), steps]
+        severities = {key: episode[0] for key, episode in self._defects.items()}
+        for episode in self._defects.values():
+            episode[1] -= 1
+        return severities
+
+    def _simulate(self, shaft: float):
+        """Write the samples of one interval, starting and ending defect episodes."""
+        channels = len(self.positions)
+        if self.ring is None:
+            self.ring = SampleRing(channels, ENVELOPE_N, dtype=np.float32)
+        if self._simulator is None:
+            block = int(round(self.fs * self.interval))
+            self._simulator = VibrationSimulator(
+                channels, block, self.fs, np.random.default_rng(self.rng.getrandbits(64)))
+        severities = self._advance_defects()
+        # Fill the analysis window on the first step
         while True:
-            await bb.write(2, self.agent_id, {
-                "fusion_confidence": round(random.uniform(0.75, 0.99), 3),
-                "components_fused": ["bearing_1", "bearing_2", "wheel_1", "axle"],
-                "fusion_latency_ms": round(random.uniform(5, 30), 2),
-            })
-            await asyncio.sleep(0.5)
+            self.ring.write(self._simulator.next_block(shaft, severities))
+            if len(self.ring) >= ENVELOPE_N:
+                break
+
+    def sample(self):
+        shaft = shaft_hz(self.speed_kmh)
+        if not self._external:
+            if not self.signals:
+                return self._summary(shaft)
+            self._simulate(shaft)
+        if len(self.ring) < ENVELOPE_N:
+            return {"shaft_hz": round(shaft, 2), "warming_up": True, "positions": list(self.positions)}
+        analyzer = VibrationSpectrumAgent._analyzer
+        if analyzer is None or analyzer.channels != self.ring.channels or analyzer.fs != self.fs:
+            analyzer = VibrationSpectrumAgent._analyzer = SpectrumAnalyzer(self.ring.channels, self.fs)
+        x = self.ring.latest(ENVELOPE_N)
+        psd = analyzer.welch(x).mean(axis=0)
+        analyzer.envelope(x)
+        freqs = AXLE_BOX_BEARING.frequencies(shaft)
+        freqs = {defect: freqs[defect] for defect in DEFECTS}
+        if shaft >= MIN_SHAFT_HZ:
+            snr = analyzer.defect_snr_db(freqs)
+        else:
+            snr = {defect: np.zeros(self.ring.channels) for defect in DEFECTS}
+        newest = x[:, -int(self.fs * self.interval):]
+        alerts = {defect: snr[defect] >= DEFECT_SNR_DB for defect in DEFECTS}
+        return {
+            "source": "spectrum",
+            "dominant_freq_hz": round(float(analyzer.freqs[1 + int(np.argmax(psd[1:]))]), 1),
+            "amplitude_g": round(float(np.abs(newest).max()), 3),
+            "rms_g": round(float(np.sqrt(np.mean(np.square(newest)))), 3),
+            "shaft_hz": round(shaft, 2),
+            "defect_freqs_hz": {defect: round(f, 1) for defect, f in freqs.items()},
+            "defect_snr_db": {defect: round(float(snr[defect].max()), 1) for defect in DEFECTS},
+            "bpfi_alert": bool(alerts["bpfi"].any()),
+            "bpfo_alert": bool(alerts["bpfo"].any()),
+            "bsf_alert": bool(alerts["bsf"].any()),
+            "alert_positions": [position for i, position in enumerate(self.positions)
+                                if any(alerts[defect][i] for defect in DEFECTS)],
+            "positions": list(self.positions),
+        }
+
+class LoadDistributionAgent(SimAgent):
+    agent_id = "A5"; name = "Load Distribution"; layer = 1; interval = 0.5
+    def sample(self):
+        loads = {f"axle_{i}": round(self.rng.uniform(5000, 25000), 0) for i in range(1, 5)}
+        return {
+            "axle_loads_kg": loads,
+            "total_weight_kg": round(sum(loads.values()), 0),
+            "overload": any(v > 23000 for v in loads.values()),
+            "balance_ok": self.rng.random() > 0.1,
+        }
+
+class EnvironmentalContextAgent(SimAgent):
+    agent_id = "A6"; name = "Environmental Context"; layer = 1; interval = 5
+    def sample(self):
+        return {
+            "temperature_c": round(self.rng.uniform(-10, 45), 1),
+            "humidity_pct": round(self.rng.uniform(20, 95), 1),
+            "pressure_hpa": round(self.rng.uniform(960, 1040), 1),
+            "precipitation_mm": round(self.rng.uniform(0, 15), 2),
+            "wind_speed_kmh": round(self.rng.uniform(0, 80), 1),
+        }
+
+class GPSSpeedSyncAgent(SimAgent):
+    agent_id = "A7"; name = "GPS/Speed Sync"; layer = 1; interval = 0.05
+    priority = "high"
+    def sample(self):
+        spd = round(self.rng.uniform(60, 130), 1)
+        return {
+            "latitude": round(59.9139 + self.rng.uniform(-0.05, 0.05), 5),
+            "longitude": round(10.7522 + self.rng.uniform(-0.05, 0.05), 5),
+            "speed_kmh": spd,
+            "encoder_speed_kmh": round(spd + self.rng.uniform(-1, 1), 1),
+            "gps_accuracy_m": round(self.rng.uniform(0.5, 3.0), 2),
+        }
+
+class PowerManagementAgent(SimAgent):
+    agent_id = "A8"; name = "Power Management"; layer = 1; interval = 10
+    def sample(self):
+        return {
+            "battery_pct": round(self.rng.uniform(55, 100), 1),
+            "power_draw_w": {"jetson": round(self.rng.uniform(15, 45), 1),
+                             "cameras": round(self.rng.uniform(5, 15), 1),
+                             "sensors": round(self.rng.uniform(2, 10), 1)},
+            "charging": self.rng.random() > 0.7,
+            "estimated_remaining_h": round(self.rng.uniform(2, 20), 1),
+        }
+
+class DataIntegrityAgent(SimAgent):
+    agent_id = "A9"; name = "Data Integrity"; layer = 2; interval = 1
+    def sample(self):
+        return {
+            "sources_checked": ["visual", "thermal", "acoustic", "vibration"],
+            "all_valid": self.rng.random() > 0.05,
+            "corruption_rate_pct": round(self.rng.uniform(0, 2), 2),
+            "quality_score": round(self.rng.uniform(0.85, 1.0), 3),
+        }
+
+class MultiSpectralFusionAgent(SimAgent):
+    agent_id = "A10"; name = "Multi-Spectral Fusion"; layer = 2; interval = 0.5
+    def sample(self):
+        return {
+            "fusion_confidence": round(self.rng.uniform(0.75, 0.99), 3),
+            "components_fused": ["bearing_1", "bearing_2", "wheel_1", "axle"],
+            "fusion_latency_ms": round(self.rng.uniform(5, 30), 2),
+        }
 
 
 # ─────────────────────────────────────────────────────────────
 # CATEGORY 2: DATA PROCESSING  (A11 – A18)
 # ─────────────────────────────────────────────────────────────
 
-class MotionDeblurringAgent:
-    agent_id = "A11"; name = "Motion Deblurring"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(2, self.agent_id, {
-                "psnr_improvement_db": round(random.uniform(4, 16), 2),
-                "frames_processed": random.randint(1, 10),
-                "processing_ms": round(random.uniform(8, 60), 1),
-            })
-            await asyncio.sleep(0.05)
-
-class LowLightEnhancementAgent:
-    agent_id = "A12"; name = "Low-Light Enhancement"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(2, self.agent_id, {
-                "light_level_lux": round(random.uniform(5, 500), 1),
-                "enhancement_factor": round(random.uniform(1.2, 5.0), 2),
-                "quality_after": round(random.uniform(0.75, 0.98), 3),
-            })
-            await asyncio.sleep(0.1)
-
-class CompressedSensingAgent:
-    agent_id = "A13"; name = "Compressed Sensing"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(2, self.agent_id, {
-                "data_loss_pct": round(random.uniform(0, 30), 1),
-                "reconstruction_confidence": round(random.uniform(0.75, 0.99), 3),
-            })
-            await asyncio.sleep(0.2)
-
-class NoiseReductionAgent:
-    agent_id = "A14"; name = "Noise Reduction"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(2, self.agent_id, {
-                "emi_level": round(random.uniform(0, 1), 3),
-                "snr_improvement_db": round(random.uniform(5, 25), 1),
-                "signal_quality": round(random.uniform(0.75, 0.99), 3),
-            })
-            await asyncio.sleep(0.1)
-
-class SuperResolutionAgent:
-    agent_id = "A15"; name = "Super-Resolution"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(2, self.agent_id, {
-                "upscale_factor": 4,
-                "psnr": round(random.uniform(28, 38), 2),
-                "ssim": round(random.uniform(0.85, 0.97), 3),
-            })
-            await asyncio.sleep(0.2)
-
-class TemporalInterpolationAgent:
-    agent_id = "A16"; name = "Temporal Interpolation"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(2, self.agent_id, {
-                "frames_interpolated": random.randint(2, 20),
-                "motion_smoothness": round(random.uniform(0.85, 0.99), 3),
-            })
-            await asyncio.sleep(0.1)
-
-class DataCompressionAgent:
-    agent_id = "A17"; name = "Data Compression"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(2, self.agent_id, {
-                "compression_ratio": round(random.uniform(15, 80), 1),
-                "data_saved_mb": round(random.uniform(10, 200), 1),
-                "quality_preserved_pct": round(random.uniform(88, 99), 1),
-            })
-            await asyncio.sleep(2)
-
-class AnomalyHighlightingAgent:
-    agent_id = "A18"; name = "Anomaly Highlighting"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(2, self.agent_id, {
-                "anomalies_detected": random.randint(0, 4),
-                "roi_count": random.randint(0, 8),
-                "confidence": round(random.uniform(0.65, 0.97), 3),
-            })
-            await asyncio.sleep(1)
+class MotionDeblurringAgent(SimAgent):
+    agent_id = "A11"; name = "Motion Deblurring"; layer = 2; interval = 0.05
+    def sample(self):
+        return {
+            "psnr_improvement_db": round(self.rng.uniform(4, 16), 2),
+            "frames_processed": self.rng.randint(1, 10),
+            "processing_ms": round(self.rng.uniform(8, 60), 1),
+        }
+
+class LowLightEnhancementAgent(SimAgent):
+    agent_id = "A12"; name = "Low-Light Enhancement"; layer = 2; interval = 0.1
+    def sample(self):
+        return {
+            "light_level_lux": round(self.rng.uniform(5, 500), 1),
+            "enhancement_factor": round(self.rng.uniform(1.2, 5.0), 2),
+            "quality_after": round(self.rng.uniform(0.75, 0.98), 3),
+        }
+
+class CompressedSensingAgent(SimAgent):
+    agent_id = "A13"; name = "Compressed Sensing"; layer = 2; interval = 0.2
+    def sample(self):
+        return {
+            "data_loss_pct": round(self.rng.uniform(0, 30), 1),
+            "reconstruction_confidence": round(self.rng.uniform(0.75, 0.99), 3),
+        }
+
+class NoiseReductionAgent(SimAgent):
+    agent_id = "A14"; name = "Noise Reduction"; layer = 2; interval = 0.1
+    def sample(self):
+        return {
+            "emi_level": round(self.rng.uniform(0, 1), 3),
+            "snr_improvement_db": round(self.rng.uniform(5, 25), 1),
+            "signal_quality": round(self.rng.uniform(0.75, 0.99), 3),
+        }
+
+class SuperResolutionAgent(SimAgent):
+    agent_id = "A15"; name = "Super-Resolution"; layer = 2; interval = 0.2
+    priority = "low"
+    def sample(self):
+        return {
+            "upscale_factor": 4,
+            "psnr": round(self.rng.uniform(28, 38), 2),
+            "ssim": round(self.rng.uniform(0.85, 0.97), 3),
+        }
+
+class TemporalInterpolationAgent(SimAgent):
+    agent_id = "A16"; name = "Temporal Interpolation"; layer = 2; interval = 0.1
+    priority = "low"
+    def sample(self):
+        return {
+            "frames_interpolated": self.rng.randint(2, 20),
+            "motion_smoothness": round(self.rng.uniform(0.85, 0.99), 3),
+        }
+
+class DataCompressionAgent(SimAgent):
+    agent_id = "A17"; name = "Data Compression"; layer = 2; interval = 2
+    priority = "low"
+    def sample(self):
+        return {
+            "compression_ratio": round(self.rng.uniform(15, 80), 1),
+            "data_saved_mb": round(self.rng.uniform(10, 200), 1),
+            "quality_preserved_pct": round(self.rng.uniform(88, 99), 1),
+        }
+
+class AnomalyHighlightingAgent(SimAgent):
+    agent_id = "A18"; name = "Anomaly Highlighting"; layer = 2; interval = 1
+    def sample(self):
+        return {
+            "anomalies_detected": self.rng.randint(0, 4),
+            "roi_count": self.rng.randint(0, 8),
+            "confidence": round(self.rng.uniform(0.65, 0.97), 3),
+        }
 
 
 # ─────────────────────────────────────────────────────────────
 # CATEGORY 3: COMPONENT INSPECTION  (A19 – A30)
 # ─────────────────────────────────────────────────────────────
 
-class BearingWearPredictorAgent:
-    agent_id = "A19"; name = "Bearing Wear Predictor"; status = "idle"
-    async def run(self, bb):
-        while True:
-            health = round(random.uniform(62, 97), 1)
-            await bb.write(3, self.agent_id, {
-                "bearing_id": "BRG-A34",
-                "health_pct": health,
-                "wear_stage": "early" if health > 75 else "moderate" if health > 50 else "critical",
-                "temperature_c": round(random.uniform(40, 95), 1),
-                "vibration_g": round(random.uniform(0.5, 8.0), 2),
-                "rul_km": round(random.uniform(20000, 80000), 0),
-            })
-            await asyncio.sleep(2)
-
-class WheelFlatSpotDetectorAgent:
-    agent_id = "A20"; name = "Wheel Flat Spot Detector"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(3, self.agent_id, {
-                "flat_detected": random.random() > 0.85,
-                "flat_depth_mm": round(random.uniform(0, 3.5), 2),
-                "impact_force_kn": round(random.uniform(0, 40), 1),
-                "wheel_id": random.choice(["W1", "W2", "W3", "W4"]),
-            })
-            await asyncio.sleep(1)
-
-class AxleCrackTrackerAgent:
-    agent_id = "A21"; name = "Axle Crack Propagation"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(3, self.agent_id, {
-                "crack_length_mm": round(random.uniform(0, 3.5), 2),
-                "crack_depth_mm": round(random.uniform(0, 1.2), 2),
-                "growth_rate_mm_per_1000km": round(random.uniform(0.01, 0.08), 3),
-                "critical_length_mm": 4.5,
-                "axle_id": "AX-01",
-            })
-            await asyncio.sleep(3)
-
-class BrakePadEstimatorAgent:
-    agent_id = "A22"; name = "Brake Pad Thickness"; status = "idle"
-    async def run(self, bb):
-        while True:
-            thickness = round(random.uniform(5, 28), 1)
-            await bb.write(3, self.agent_id, {
-                "thickness_mm": thickness,
-                "wear_pct": round(100 - (thickness / 30) * 100, 1),
-                "replace_at_mm": 6.0,
-                "needs_replacement": thickness < 8,
-            })
-            await asyncio.sleep(5)
-
-class SuspensionHealthAgent:
-    agent_id = "A23"; name = "Suspension Health Monitor"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(3, self.agent_id, {
-                "damper_efficiency_pct": round(random.uniform(72, 98), 1),
-                "spring_deflection_mm": round(random.uniform(5, 25), 1),
-                "ride_quality_index": round(random.uniform(0.6, 1.0), 2),
-            })
-            await asyncio.sleep(2)
-
-class CouplerIntegrityAgent:
-    agent_id = "A24"; name = "Coupler Integrity"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(3, self.agent_id, {
-                "draft_force_kn": round(random.uniform(10, 250), 1),
-                "buff_force_kn": round(random.uniform(5, 150), 1),
-                "slack_mm": round(random.uniform(0, 15), 1),
-                "status": random.choice(["OK", "OK", "OK", "WARNING"]),
-            })
-            await asyncio.sleep(1)
-
-class RailWheelContactAgent:
-    agent_id = "A25"; name = "Rail-Wheel Contact"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(3, self.agent_id, {
-                "contact_patch_mm2": round(random.uniform(120, 250), 1),
-                "flange_thickness_mm": round(random.uniform(22, 32), 1),
-                "derailment_coefficient": round(random.uniform(0.05, 0.55), 3),
-                "derailment_risk": "low" if random.random() > 0.1 else "medium",
-            })
-            await asyncio.sleep(1)
-
-class LubricationDeficiencyAgent:
-    agent_id = "A26"; name = "Lubrication Deficiency"; status = "idle"
-    async def run(self, bb):
-        while True:
-            oil_level = round(random.uniform(20, 100), 1)
-            await bb.write(3, self.agent_id, {
-                "oil_level_pct": oil_level,
-                "viscosity_cst": round(random.uniform(40, 100), 1),
-                "contamination_level": round(random.uniform(0, 0.4), 3),
-                "relubrication_needed": oil_level < 35,
-            })
-            await asyncio.sleep(3)
-
-class FastenerLoosenessAgent:
-    agent_id = "A27"; name = "Fastener Looseness"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(3, self.agent_id, {
-                "loose_fasteners_detected": random.randint(0, 3),
-                "torque_deficit_nm": round(random.uniform(0, 50), 1),
-                "locations": random.sample(["bogie_bolt_L1", "axle_cap_R2", "body_mount_3"], k=random.randint(0, 2)),
-            })
-            await asyncio.sleep(3)
-
-class CorrosionSeverityAgent:
-    agent_id = "A28"; name = "Corrosion Severity"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(3, self.agent_id, {
-                "affected_area_pct": round(random.uniform(0, 15), 1),
-                "max_depth_mm": round(random.uniform(0, 2.5), 2),
-                "severity": random.choice(["none", "mild", "mild", "moderate"]),
-                "locations": random.sample(["bogie_frame", "body_underside", "axle_journal"], k=1),
-            })
-            await asyncio.sleep(5)
-
-class FatigueLifeEstimatorAgent:
-    agent_id = "A29"; name = "Fatigue Life Estimator"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(3, self.agent_id, {
-                "rul_pct": round(random.uniform(40, 95), 1),
-                "cycles_completed": random.randint(500000, 2000000),
-                "design_life_cycles": 5000000,
-                "crack_initiation_risk": round(random.uniform(0.01, 0.2), 3),
-            })
-            await asyncio.sleep(5)
-
-class GeometricDistortionAgent:
-    agent_id = "A30"; name = "Geometric Distortion"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(3, self.agent_id, {
-                "wheel_diameter_mm": round(random.uniform(856, 920), 1),
-                "out_of_round_mm": round(random.uniform(0, 1.5), 3),
-                "axle_parallelism_deviation_mm": round(random.uniform(0, 0.8), 3),
-            })
-            await asyncio.sleep(5)
+class BearingWearPredictorAgent(SimAgent):
+    agent_id = "A19"; name = "Bearing Wear Predictor"; layer = 3; interval = 2
+    priority = "critical"
+    executor = "process"
+    def sample(self):
+        health = round(self.rng.uniform(62, 97), 1)
+        return {
+            "bearing_id": "BRG-A34",
+            "health_pct": health,
+            "wear_stage": "early" if health > 75 else "moderate" if health > 50 else "critical",
+            "temperature_c": round(self.rng.uniform(40, 95), 1),
+            "vibration_g": round(self.rng.uniform(0.5, 8.0), 2),
+            "rul_km": round(self.rng.uniform(20000, 80000), 0),
+        }
+
+class WheelFlatSpotDetectorAgent(SimAgent):
+    agent_id = "A20"; name = "Wheel Flat Spot Detector"; layer = 3; interval = 1
+    priority = "critical"
+    executor = "process"
+    def sample(self):
+        return {
+            "flat_detected": self.rng.random() > 0.85,
+            "flat_depth_mm": round(self.rng.uniform(0, 3.5), 2),
+            "impact_force_kn": round(self.rng.uniform(0, 40), 1),
+            "wheel_id": self.rng.choice(["W1", "W2", "W3", "W4"]),
+        }
+
+class AxleCrackTrackerAgent(SimAgent):
+    agent_id = "A21"; name = "Axle Crack Propagation"; layer = 3; interval = 3
+    priority = "critical"
+    executor = "process"
+    def sample(self):
+        return {
+            "crack_length_mm": round(self.rng.uniform(0, 3.5), 2),
+            "crack_depth_mm": round(self.rng.uniform(0, 1.2), 2),
+            "growth_rate_mm_per_1000km": round(self.rng.uniform(0.01, 0.08), 3),
+            "critical_length_mm": 4.5,
+            "axle_id": "AX-01",
+        }
+
+class BrakePadEstimatorAgent(SimAgent):
+    agent_id = "A22"; name = "Brake Pad Thickness"; layer = 3; interval = 5
+    priority = "high"
+    executor = "process"
+    def sample(self):
+        thickness = round(self.rng.uniform(5, 28), 1)
+        return {
+            "thickness_mm": thickness,
+            "wear_pct": round(100 - (thickness / 30) * 100, 1),
+            "replace_at_mm": 6.0,
+            "needs_replacement": thickness < 8,
+        }
+
+class SuspensionHealthAgent(SimAgent):
+    agent_id = "A23"; name = "Suspension Health Monitor"; layer = 3; interval = 2
+    priority = "high"
+    executor = "process"
+    def sample(self):
+        return {
+            "damper_efficiency_pct": round(self.rng.uniform(72, 98), 1),
+            "spring_deflection_mm": round(self.rng.uniform(5, 25), 1),
+            "ride_quality_index": round(self.rng.uniform(0.6, 1.0), 2),
+        }
+
+class CouplerIntegrityAgent(SimAgent):
+    agent_id = "A24"; name = "Coupler Integrity"; layer = 3; interval = 1
+    priority = "high"
+    executor = "process"
+    def sample(self):
+        return {
+            "draft_force_kn": round(self.rng.uniform(10, 250), 1),
+            "buff_force_kn": round(self.rng.uniform(5, 150), 1),
+            "slack_mm": round(self.rng.uniform(0, 15), 1),
+            "status": self.rng.choice(["OK", "OK", "OK", "WARNING"]),
+        }
+
+class RailWheelContactAgent(SimAgent):
+    agent_id = "A25"; name = "Rail-Wheel Contact"; layer = 3; interval = 1
+    priority = "critical"
+    executor = "process"
+    def sample(self):
+        return {
+            "contact_patch_mm2": round(self.rng.uniform(120, 250), 1),
+            "flange_thickness_mm": round(self.rng.uniform(22, 32), 1),
+            "derailment_coefficient": round(self.rng.uniform(0.05, 0.55), 3),
+            "derailment_risk": "low" if self.rng.random() > 0.1 else "medium",
+        }
+
+class LubricationDeficiencyAgent(SimAgent):
+    agent_id = "A26"; name = "Lubrication Deficiency"; layer = 3; interval = 3
+    executor = "process"
+    def sample(self):
+        oil_level = round(self.rng.uniform(20, 100), 1)
+        return {
+            "oil_level_pct": oil_level,
+            "viscosity_cst": round(self.rng.uniform(40, 100), 1),
+            "contamination_level": round(self.rng.uniform(0, 0.4), 3),
+            "relubrication_needed": oil_level < 35,
+        }
+
+class FastenerLoosenessAgent(SimAgent):
+    agent_id = "A27"; name = "Fastener Looseness"; layer = 3; interval = 3
+    executor = "process"
+    def sample(self):
+        return {
+            "loose_fasteners_detected": self.rng.randint(0, 3),
+            "torque_deficit_nm": round(self.rng.uniform(0, 50), 1),
+            "locations": self.rng.sample(["bogie_bolt_L1", "axle_cap_R2", "body_mount_3"], k=self.rng.randint(0, 2)),
+        }
+
+class CorrosionSeverityAgent(SimAgent):
+    agent_id = "A28"; name = "Corrosion Severity"; layer = 3; interval = 5
+    executor = "process"
+    def sample(self):
+        return {
+            "affected_area_pct": round(self.rng.uniform(0, 15), 1),
+            "max_depth_mm": round(self.rng.uniform(0, 2.5), 2),
+            "severity": self.rng.choice(["none", "mild", "mild", "moderate"]),
+            "locations": self.rng.sample(["bogie_frame", "body_underside", "axle_journal"], k=1),
+        }
+
+class FatigueLifeEstimatorAgent(SimAgent):
+    agent_id = "A29"; name = "Fatigue Life Estimator"; layer = 3; interval = 5
+    executor = "process"
+    def sample(self):
+        return {
+            "rul_pct": round(self.rng.uniform(40, 95), 1),
+            "cycles_completed": self.rng.randint(500000, 2000000),
+            "design_life_cycles": 5000000,
+            "crack_initiation_risk": round(self.rng.uniform(0.01, 0.2), 3),
+        }
+
+class GeometricDistortionAgent(SimAgent):
+    agent_id = "A30"; name = "Geometric Distortion"; layer = 3; interval = 5
+    executor = "process"
+    def sample(self):
+        return {
+            "wheel_diameter_mm": round(self.rng.uniform(856, 920), 1),
+            "out_of_round_mm": round(self.rng.uniform(0, 1.5), 3),
+            "axle_parallelism_deviation_mm": round(self.rng.uniform(0, 0.8), 3),
+        }
 
 
 # ─────────────────────────────────────────────────────────────
 # CATEGORY 4: PREDICTIVE MODELING  (A31 – A38)
 # ─────────────────────────────────────────────────────────────
 
-class TemporalFailurePredictorAgent:
-    agent_id = "A31"; name = "Temporal Failure Predictor"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(4, self.agent_id, {
-                "predictions": {
-                    "bearing_1": {"ttf_hours": round(random.uniform(10, 200), 1), "confidence": round(random.uniform(0.7, 0.97), 3)},
-                    "wheel_1":   {"ttf_hours": round(random.uniform(50, 500), 1), "confidence": round(random.uniform(0.7, 0.97), 3)},
-                },
-                "model": "LSTM-v3",
-            })
-            await asyncio.sleep(10)
-
-class EnsembleVotingAgent:
-    agent_id = "A32"; name = "Ensemble Voting"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(4, self.agent_id, {
-                "models_voting": random.randint(5, 10),
-                "consensus_score": round(random.uniform(0.7, 0.99), 3),
-                "final_prediction": random.choice(["healthy", "healthy", "warning", "critical"]),
-            })
-            await asyncio.sleep(5)
-
-class UncertaintyQuantificationAgent:
-    agent_id = "A33"; name = "Uncertainty Quantification"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(4, self.agent_id, {
-                "aleatoric": round(random.uniform(0.05, 0.25), 3),
-                "epistemic": round(random.uniform(0.02, 0.15), 3),
-                "confidence_interval_low": round(random.uniform(10, 30), 1),
-                "confidence_interval_high": round(random.uniform(70, 95), 1),
-            })
-            await asyncio.sleep(5)
-
-class RareEventDetectorAgent:
-    agent_id = "A34"; name = "Rare Event Detector"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(4, self.agent_id, {
-                "novelty_score": round(random.uniform(0, 1), 3),
-                "rare_event_detected": random.random() > 0.85,
-                "similar_to_known": random.choice([True, False]),
-                "needs_expert_review": random.random() > 0.9,
-            })
-            await asyncio.sleep(10)
-
-class DigitalTwinSyncAgent:
-    agent_id = "A35"; name = "Digital Twin Synchronizer"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(4, self.agent_id, {
-                "sync_status": random.choice(["synced", "synced", "syncing", "drift"]),
-                "model_accuracy_pct": round(random.uniform(88, 99), 1),
-                "discrepancy_mm": round(random.uniform(0, 1.5), 2),
-            })
-            await asyncio.sleep(2)
-
-class WhatIfSimulatorAgent:
-    agent_id = "A36"; name = "What-If Simulator"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(4, self.agent_id, {
-                "scenarios": {
-                    "high_speed": {"failure_risk": round(random.uniform(0, 0.8), 2), "ttf_hours": round(random.uniform(1, 50), 1)},
-                    "heavy_load": {"failure_risk": round(random.uniform(0, 0.6), 2), "ttf_hours": round(random.uniform(5, 100), 1)},
-                    "extreme_cold": {"failure_risk": round(random.uniform(0, 0.4), 2), "ttf_hours": round(random.uniform(10, 200), 1)},
-                }
-            })
-            await asyncio.sleep(15)
-
-class HistoricalPatternMatcherAgent:
-    agent_id = "A37"; name = "Historical Pattern Matcher"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(4, self.agent_id, {
-                "similar_cases_found": random.randint(0, 25),
-                "best_match_score": round(random.uniform(0.6, 0.99), 3),
-                "historical_outcome": random.choice(["replaced", "repaired", "monitored", "no_action"]),
-            })
-            await asyncio.sleep(10)
-
-class TransferLearningAgent:
-    agent_id = "A38"; name = "Transfer Learning"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(4, self.agent_id, {
-                "source_fleet": random.choice(["fleet_A", "fleet_B", "fleet_C"]),
-                "domain_similarity_pct": round(random.uniform(60, 95), 1),
-                "adaptation_progress_pct": round(random.uniform(0, 100), 1),
-                "performance_gain_pct": round(random.uniform(0, 20), 1),
-            })
-            await asyncio.sleep(30)
+class TemporalFailurePredictorAgent(SimAgent):
+    agent_id = "A31"; name = "Temporal Failure Predictor"; layer = 4; interval = 10
+    executor = "process"
+    def sample(self):
+        return {
+            "predictions": {
+                "bearing_1": {"ttf_hours": round(self.rng.uniform(10, 200), 1), "confidence": round(self.rng.uniform(0.7, 0.97), 3)},
+                "wheel_1":   {"ttf_hours": round(self.rng.uniform(50, 500), 1), "confidence": round(self.rng.uniform(0.7, 0.97), 3)},
+            },
+            "model": "LSTM-v3",
+        }
+
+class EnsembleVotingAgent(SimAgent):
+    agent_id = "A32"; name = "Ensemble Voting"; layer = 4; interval = 5
+    inputs = ((3, "A19"), (3, "A21"))
+    priority = "critical"; deadline = 0.25
+    executor = "process"
+    def sample(self):
+        return {
+            "models_voting": self.rng.randint(5, 10),
+            "consensus_score": round(self.rng.uniform(0.7, 0.99), 3),
+            "final_prediction": self.rng.choice(["healthy", "healthy", "warning", "critical"]),
+        }
+
+class UncertaintyQuantificationAgent(SimAgent):
+    agent_id = "A33"; name = "Uncertainty Quantification"; layer = 4; interval = 5
+    priority = "high"
+    executor = "process"
+    def sample(self):
+        return {
+            "aleatoric": round(self.rng.uniform(0.05, 0.25), 3),
+            "epistemic": round(self.rng.uniform(0.02, 0.15), 3),
+            "confidence_interval_low": round(self.rng.uniform(10, 30), 1),
+            "confidence_interval_high": round(self.rng.uniform(70, 95), 1),
+        }
+
+class RareEventDetectorAgent(SimAgent):
+    agent_id = "A34"; name = "Rare Event Detector"; layer = 4; interval = 10
+    executor = "process"
+    def sample(self):
+        return {
+            "novelty_score": round(self.rng.uniform(0, 1), 3),
+            "rare_event_detected": self.rng.random() > 0.85,
+            "similar_to_known": self.rng.choice([True, False]),
+            "needs_expert_review": self.rng.random() > 0.9,
+        }
+
+class DigitalTwinSyncAgent(SimAgent):
+    agent_id = "A35"; name = "Digital Twin Synchronizer"; layer = 4; interval = 2
+    inputs = ((4, "A32"),)
+    priority = "critical"; deadline = 0.25
+    executor = "process"
+    def sample(self):
+        return {
+            "sync_status": self.rng.choice(["synced", "synced", "syncing", "drift"]),
+            "model_accuracy_pct": round(self.rng.uniform(88, 99), 1),
+            "discrepancy_mm": round(self.rng.uniform(0, 1.5), 2),
+        }
+
+class WhatIfSimulatorAgent(SimAgent):
+    agent_id = "A36"; name = "What-If Simulator"; layer = 4; interval = 15
+    priority = "low"
+    executor = "process"
+    def sample(self):
+        return {
+            "scenarios": {
+                "high_speed": {"failure_risk": round(self.rng.uniform(0, 0.8), 2), "ttf_hours": round(self.rng.uniform(1, 50), 1)},
+                "heavy_load": {"failure_risk": round(self.rng.uniform(0, 0.6), 2), "ttf_hours": round(self.rng.uniform(5, 100), 1)},
+                "extreme_cold": {"failure_risk": round(self.rng.uniform(0, 0.4), 2), "ttf_hours": round(self.rng.uniform(10, 200), 1)},
+            }
+        }
+
+class HistoricalPatternMatcherAgent(SimAgent):
+    agent_id = "A37"; name = "Historical Pattern Matcher"; layer = 4; interval = 10
+    priority = "high"
+    executor = "process"
+    def sample(self):
+        return {
+            "similar_cases_found": self.rng.randint(0, 25),
+            "best_match_score": round(self.rng.uniform(0.6, 0.99), 3),
+            "historical_outcome": self.rng.choice(["replaced", "repaired", "monitored", "no_action"]),
+        }
+
+class TransferLearningAgent(SimAgent):
+    agent_id = "A38"; name = "Transfer Learning"; layer = 4; interval = 30
+    priority = "low"
+    executor = "process"
+    def sample(self):
+        return {
+            "source_fleet": self.rng.choice(["fleet_A", "fleet_B", "fleet_C"]),
+            "domain_similarity_pct": round(self.rng.uniform(60, 95), 1),
+            "adaptation_progress_pct": round(self.rng.uniform(0, 100), 1),
+            "performance_gain_pct": round(self.rng.uniform(0, 20), 1),
+        }
 
 
 # ─────────────────────────────────────────────────────────────
 # CATEGORY 5: DECISION & ALERTING  (A39 – A44)
 # ─────────────────────────────────────────────────────────────
 
-class CriticalityAssessorAgent:
-    agent_id = "A39"; name = "Criticality Assessor"; status = "idle"
-    async def run(self, bb):
-        while True:
-            score = random.randint(1, 100)
-            await bb.write(5, self.agent_id, {
-                "criticality_score": score,
-                # NOTE: store as list, NOT tuple — tuples break JSON
-                "risk_matrix": [round(random.uniform(0, 1), 2), round(random.uniform(0, 1), 2)],
-                "urgency": "critical" if score > 80 else "soon" if score > 50 else "routine",
-            })
-            await asyncio.sleep(3)
-
-class UrgencySchedulerAgent:
-    agent_id = "A40"; name = "Urgency Scheduler"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(5, self.agent_id, {
-                "next_maintenance_location": random.choice(["station_A", "depot_B", "next_available"]),
-                "hours_until_maintenance": round(random.uniform(0.5, 48), 1),
-                "parts_available": random.choice([True, False]),
-                "crew_available": random.choice([True, False]),
-            })
-            await asyncio.sleep(10)
-
-class MaintenanceRecommenderAgent:
-    agent_id = "A41"; name = "Maintenance Recommender"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(5, self.agent_id, {
-                "action": random.choice(["replace", "repair", "monitor", "adjust", "lubricate"]),
-                "parts_count": random.randint(1, 5),
-                "estimated_time_min": random.randint(15, 180),
-                "complexity": random.choice(["simple", "moderate", "complex"]),
-            })
-            await asyncio.sleep(10)
-
-class AlertPrioritizerAgent:
-    agent_id = "A42"; name = "Alert Prioritizer"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(5, self.agent_id, {
-                "alerts_total": random.randint(0, 40),
-                "alerts_critical": random.randint(0, 4),
-                "alerts_warning": random.randint(0, 12),
-                "alerts_info": random.randint(0, 25),
-                "suppressed": random.randint(0, 8),
-            })
-            await asyncio.sleep(2)
-
-class HMIAgent:
-    agent_id = "A43"; name = "HMI Agent"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(5, self.agent_id, {
-                "explanations_generated": random.randint(0, 10),
-                "user_satisfaction": round(random.uniform(0.7, 1.0), 2),
-                "active_panels": random.randint(1, 6),
-            })
-            await asyncio.sleep(5)
-
-class VoiceAlertSynthesizerAgent:
-    agent_id = "A44"; name = "Voice Alert Synthesizer"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(5, self.agent_id, {
-                "alerts_voiced": random.randint(0, 5),
-                "acknowledged_pct": round(random.uniform(0.8, 1.0), 2),
-                "last_alert": random.choice(["Bearing temperature elevated", "Wheel flat detected", "System nominal", ""]),
-            })
-            await asyncio.sleep(8)
+class CriticalityAssessorAgent(SimAgent):
+    agent_id = "A39"; name = "Criticality Assessor"; layer = 5; interval = 3
+    inputs = ((4, "A35"),)
+    priority = "critical"; deadline = 0.25
+    def sample(self):
+        score = self.rng.randint(1, 100)
+        return {
+            "criticality_score": score,
+            # NOTE: store as list, NOT tuple — tuples break JSON
+            "risk_matrix": [round(self.rng.uniform(0, 1), 2), round(self.rng.uniform(0, 1), 2)],
+            "urgency": "critical" if score > 80 else "soon" if score > 50 else "routine",
+        }
+
+class UrgencySchedulerAgent(SimAgent):
+    agent_id = "A40"; name = "Urgency Scheduler"; layer = 5; interval = 10
+    inputs = ((5, "A39"),)
+    priority = "high"
+    def sample(self):
+        return {
+            "next_maintenance_location": self.rng.choice(["station_A", "depot_B", "next_available"]),
+            "hours_until_maintenance": round(self.rng.uniform(0.5, 48), 1),
+            "parts_available": self.rng.choice([True, False]),
+            "crew_available": self.rng.choice([True, False]),
+        }
+
+class MaintenanceRecommenderAgent(SimAgent):
+    agent_id = "A41"; name = "Maintenance Recommender"; layer = 5; interval = 10
+    def sample(self):
+        return {
+            "action": self.rng.choice(["replace", "repair", "monitor", "adjust", "lubricate"]),
+            "parts_count": self.rng.randint(1, 5),
+            "estimated_time_min": self.rng.randint(15, 180),
+            "complexity": self.rng.choice(["simple", "moderate", "complex"]),
+        }
+
+class AlertPrioritizerAgent(SimAgent):
+    agent_id = "A42"; name = "Alert Prioritizer"; layer = 5; interval = 2
+    inputs = ((5, "A39"),)
+    priority = "critical"; deadline = 0.5
+    def sample(self):
+        return {
+            "alerts_total": self.rng.randint(0, 40),
+            "alerts_critical": self.rng.randint(0, 4),
+            "alerts_warning": self.rng.randint(0, 12),
+            "alerts_info": self.rng.randint(0, 25),
+            "suppressed": self.rng.randint(0, 8),
+        }
+
+class HMIAgent(SimAgent):
+    agent_id = "A43"; name = "HMI Agent"; layer = 5; interval = 5
+    priority = "low"
+    def sample(self):
+        return {
+            "explanations_generated": self.rng.randint(0, 10),
+            "user_satisfaction": round(self.rng.uniform(0.7, 1.0), 2),
+            "active_panels": self.rng.randint(1, 6),
+        }
+
+class VoiceAlertSynthesizerAgent(SimAgent):
+    agent_id = "A44"; name = "Voice Alert Synthesizer"; layer = 5; interval = 8
+    priority = "low"
+    def sample(self):
+        return {
+            "alerts_voiced": self.rng.randint(0, 5),
+            "acknowledged_pct": round(self.rng.uniform(0.8, 1.0), 2),
+            "last_alert": self.rng.choice(["Bearing temperature elevated", "Wheel flat detected", "System nominal", ""]),
+        }
 
 
 # ─────────────────────────────────────────────────────────────
 # CATEGORY 6: COMMUNICATION & RESILIENCE  (A45 – A50)
 # ─────────────────────────────────────────────────────────────
 
-class MeshCoordinatorAgent:
-    agent_id = "A45"; name = "Mesh Network Coordinator"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(6, self.agent_id, {
-                "nodes_connected": random.randint(5, 10),
-                "total_nodes": 10,
-                "avg_signal_dbm": round(random.uniform(-65, -35), 1),
-                "paths_optimized": random.randint(0, 5),
-            })
-            await asyncio.sleep(2)
-
-class StoreAndForwardAgent:
-    agent_id = "A46"; name = "Store-and-Forward"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(6, self.agent_id, {
-                "pending_packets": random.randint(0, 500),
-                "storage_used_mb": round(random.uniform(0, 250), 1),
-                "priority_queued": random.randint(0, 50),
-            })
-            await asyncio.sleep(5)
-
-class BandwidthAllocatorAgent:
-    agent_id = "A47"; name = "Bandwidth Allocator"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(6, self.agent_id, {
-                "available_mbps": round(random.uniform(10, 100), 1),
-                "allocated_mbps": round(random.uniform(5, 50), 1),
-                "congestion_level": round(random.uniform(0, 1), 2),
-            })
-            await asyncio.sleep(3)
-
-class DataSyncAgent:
-    agent_id = "A48"; name = "Data Synchronization"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(6, self.agent_id, {
-                "conflicts_detected": random.randint(0, 4),
-                "conflicts_resolved": random.randint(0, 4),
-                "consistency_score": round(random.uniform(0.92, 1.0), 3),
-            })
-            await asyncio.sleep(10)
-
-class EdgeCloudOrchestratorAgent:
-    agent_id = "A49"; name = "Edge-Cloud Orchestrator"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(6, self.agent_id, {
-                "tasks_on_edge": random.randint(10, 50),
-                "tasks_on_cloud": random.randint(0, 20),
-                "latency_ms": round(random.uniform(10, 120), 1),
-                "cost_usd_per_hour": round(random.uniform(0.05, 2.5), 3),
-            })
-            await asyncio.sleep(5)
-
-class SelfHealingMonitorAgent:
-    agent_id = "A50"; name = "Self-Healing Monitor"; status = "idle"
-    async def run(self, bb):
-        while True:
-            await bb.write(6, self.agent_id, {
-                "agents_healthy": random.randint(47, 50),
-                "agents_total": 50,
-                "healing_actions_taken": random.randint(0, 3),
-                "system_integrity_pct": round(random.uniform(94, 100), 1),
-            })
-            await asyncio.sleep(1)
+class MeshCoordinatorAgent(SimAgent):
+    agent_id = "A45"; name = "Mesh Network Coordinator"; layer = 6; interval = 2
+    def sample(self):
+        return {
+            "nodes_connected": self.rng.randint(5, 10),
+            "total_nodes": 10,
+            "avg_signal_dbm": round(self.rng.uniform(-65, -35), 1),
+            "paths_optimized": self.rng.randint(0, 5),
+        }
+
+class StoreAndForwardAgent(SimAgent):
+    agent_id = "A46"; name = "Store-and-Forward"; layer = 6; interval = 5
+    def sample(self):
+        return {
+            "pending_packets": self.rng.randint(0, 500),
+            "storage_used_mb": round(self.rng.uniform(0, 250), 1),
+            "priority_queued": self.rng.randint(0, 50),
+        }
+
+class BandwidthAllocatorAgent(SimAgent):
+    agent_id = "A47"; name = "Bandwidth Allocator"; layer = 6; interval = 3
+    def sample(self):
+        return {
+            "available_mbps": round(self.rng.uniform(10, 100), 1),
+            "allocated_mbps": round(self.rng.uniform(5, 50), 1),
+            "congestion_level": round(self.rng.uniform(0, 1), 2),
+        }
+
+class DataSyncAgent(SimAgent):
+    agent_id = "A48"; name = "Data Synchronization"; layer = 6; interval = 10
+    priority = "low"
+    def sample(self):
+        return {
+            "conflicts_detected": self.rng.randint(0, 4),
+            "conflicts_resolved": self.rng.randint(0, 4),
+            "consistency_score": round(self.rng.uniform(0.92, 1.0), 3),
+        }
+
+class EdgeCloudOrchestratorAgent(SimAgent):
+    agent_id = "A49"; name = "Edge-Cloud Orchestrator"; layer = 6; interval = 5
+    def sample(self):
+        return {
+            "tasks_on_edge": self.rng.randint(10, 50),
+            "tasks_on_cloud": self.rng.randint(0, 20),
+            "latency_ms": round(self.rng.uniform(10, 120), 1),
+            "cost_usd_per_hour": round(self.rng.uniform(0.05, 2.5), 3),
+        }
+
+class SelfHealingMonitorAgent(SimAgent):
+    agent_id = "A50"; name = "Self-Healing Monitor"; layer = 6; interval = 1
+    priority = "high"
+    def sample(self):
+        return {
+            "agents_healthy": self.rng.randint(47, 50),
+            "agents_total": 50,
+            "healing_actions_taken": self.rng.randint(0, 3),
+            "system_integrity_pct": round(self.rng.uniform(94, 100), 1),
+        }
 
 
 # ─────────────────────────────────────────────────────────────
 # Registry — all 50 agents in order
 # ─────────────────────────────────────────────────────────────
 
-ALL_AGENTS = [
-    VisualAcquisitionAgent(), ThermalImagingAgent(), AcousticEmissionAgent(),
-    VibrationSpectrumAgent(), LoadDistributionAgent(), EnvironmentalContextAgent(),
-    GPSSpeedSyncAgent(), PowerManagementAgent(), DataIntegrityAgent(),
-    MultiSpectralFusionAgent(),
-    MotionDeblurringAgent(), LowLightEnhancementAgent(), CompressedSensingAgent(),
-    NoiseReductionAgent(), SuperResolutionAgent(), TemporalInterpolationAgent(),
-    DataCompressionAgent(), AnomalyHighlightingAgent(),
-    BearingWearPredictorAgent(), WheelFlatSpotDetectorAgent(), AxleCrackTrackerAgent(),
-    BrakePadEstimatorAgent(), SuspensionHealthAgent(), CouplerIntegrityAgent(),
-    RailWheelContactAgent(), LubricationDeficiencyAgent(), FastenerLoosenessAgent(),
-    CorrosionSeverityAgent(), FatigueLifeEstimatorAgent(), GeometricDistortionAgent(),
-    TemporalFailurePredictorAgent(), EnsembleVotingAgent(), UncertaintyQuantificationAgent(),
-    RareEventDetectorAgent(), DigitalTwinSyncAgent(), WhatIfSimulatorAgent(),
-    HistoricalPatternMatcherAgent(), TransferLearningAgent(),
-    CriticalityAssessorAgent(), UrgencySchedulerAgent(), MaintenanceRecommenderAgent(),
-    AlertPrioritizerAgent(), HMIAgent(), VoiceAlertSynthesizerAgent(),
-    MeshCoordinatorAgent(), StoreAndForwardAgent(), BandwidthAllocatorAgent(),
-    DataSyncAgent(), EdgeCloudOrchestratorAgent(), SelfHealingMonitorAgent(),
+ROSTER = [
+    VisualAcquisitionAgent, ThermalImagingAgent, AcousticEmissionAgent,
+    VibrationSpectrumAgent, LoadDistributionAgent, EnvironmentalContextAgent,
+    GPSSpeedSyncAgent, PowerManagementAgent, DataIntegrityAgent,
+    MultiSpectralFusionAgent,
+    MotionDeblurringAgent, LowLightEnhancementAgent, CompressedSensingAgent,
+    NoiseReductionAgent, SuperResolutionAgent, TemporalInterpolationAgent,
+    DataCompressionAgent, AnomalyHighlightingAgent,
+    BearingWearPredictorAgent, WheelFlatSpotDetectorAgent, AxleCrackTrackerAgent,
+    BrakePadEstimatorAgent, SuspensionHealthAgent, CouplerIntegrityAgent,
+    RailWheelContactAgent, LubricationDeficiencyAgent, FastenerLoosenessAgent,
+    CorrosionSeverityAgent, FatigueLifeEstimatorAgent, GeometricDistortionAgent,
+    TemporalFailurePredictorAgent, EnsembleVotingAgent, UncertaintyQuantificationAgent,
+    RareEventDetectorAgent, DigitalTwinSyncAgent, WhatIfSimulatorAgent,
+    HistoricalPatternMatcherAgent, TransferLearningAgent,
+    CriticalityAssessorAgent, UrgencySchedulerAgent, MaintenanceRecommenderAgent,
+    AlertPrioritizerAgent, HMIAgent, VoiceAlertSynthesizerAgent,
+    MeshCoordinatorAgent, StoreAndForwardAgent, BandwidthAllocatorAgent,
+    DataSyncAgent, EdgeCloudOrchestratorAgent, SelfHealingMonitorAgent,
 ]
+
+
+def build_roster(train_id: Optional[str] = None, phase: float = 0.0,
+                 seed=None) -> List[SimAgent]:
+    """
+    Fresh instances of all 50 agents, namespaced under `train_id` if given,
+    each with its own RNG if `seed` is given.
+    """
+    agents = [cls() for cls in ROSTER]
+    if train_id:
+        prefix = train_id + TRAIN_SEP
+        for agent in agents:
+            agent.agent_id = prefix + agent.agent_id
+            agent.inputs = tuple((layer, prefix + source) for layer, source in agent.inputs)
+            agent.phase = phase
+    if seed is not None:
+        for agent in agents:
+            agent.seed(seed)
+    return agents
+
+
+def build_fleet(train_ids: Iterable[str], seed=None) -> List[SimAgent]:
+    """
+    One roster per trainset, all in one list for a shared Orchestrator.
+    Agents of one train tick together; trains are spread evenly over each
+    interval (golden-ratio phases) so the fleet doesn't step in one burst.
+    """
+    return [agent for i, train_id in enumerate(train_ids)
+            for agent in build_roster(train_id, phase=(i * 0.6180339887) % 1.0, seed=seed)]
+
+
+def split_agent_id(agent_id: str):
+    """("T001", "A19") for a fleet id, (None, "A19") for a single-train one."""
+    train_id, sep, local_id = agent_id.rpartition(TRAIN_SEP)
+    return (train_id if sep else None), local_id
+
+
+ALL_AGENTS = build_roster()
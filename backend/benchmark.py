@@ -0,0 +1,897 @@
+"""
+RailGuard 5000 — Microbenchmarks
+Reproducible timings for the blackboard hot paths.
+
+    cd backend
+    python benchmark.py sanitize
+    python benchmark.py write_many
+    python benchmark.py reads
+    python benchmark.py journal
+    python benchmark.py timeseries
+    python benchmark.py indexes
+    python benchmark.py dag
+    python benchmark.py overload
+    python benchmark.py ticks
+    python benchmark.py processes
+    python benchmark.py fleet
+    python benchmark.py cluster
+    python benchmark.py loop
+    python benchmark.py simulate
+    python benchmark.py virtual
+    python benchmark.py vibration
+    python benchmark.py acoustic
+    python benchmark.py thermal
+    python benchmark.py all
+
+Each scenario prints one line per variant with the per-operation cost.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import shutil
+import subprocess
+import sys
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import List, Tuple
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from blackboard import Blackboard
+from journal import Journal
+from timeseries import ColumnarStore
+from serializers import PayloadSanitizer, sanitize
+from orchestrator import Orchestrator, PRIORITIES
+from all_agents import ALL_AGENTS, SimAgent, build_fleet
+from cluster import Coordinator
+from event_loop import available_loops, run as run_loop
+from fleet_sim import FleetSimulator
+from scenario import run_scenario
+from ingest import SampleRing
+from ingest import FrameRing
+from thermal import BOGIE_REGIONS, FRAME_SHAPE, HotspotTracker, Region, ThermalAnalyzer, ThermalSimulator
+from acoustic import AE_FS, AESimulator, HitDetector, Locator, crack_cluster, crack_locations
+from vibration import (AXLE_BOX_BEARING, DEFECTS, ENVELOPE_N, SpectrumAnalyzer,
+                       VibrationSimulator, shaft_hz)
+
+
+def capture_payloads(samples_per_agent: int = 20, seed: int = 5000) -> List[Tuple[int, str, dict]]:
+    """One tick's worth of real agent payloads, `samples_per_agent` times over."""
+    random.seed(seed)
+    return [(agent.layer, agent.agent_id, agent.sample())
+            for _ in range(samples_per_agent) for agent in ALL_AGENTS]
+
+
+def _report(label: str, seconds: float, ops: int, baseline: float = None):
+    per_op_us = seconds / ops * 1e6
+    extra = f"  ({baseline / seconds:.2f}x)" if baseline else ""
+    print(f"  {label:<34} {per_op_us:8.2f} us/op{extra}")
+
+
+# ── Scenarios ───────────────────────────────────────────────
+
+def bench_sanitize(rounds: int = 50):
+    """Generic recursive _sanitize vs the compiled per-agent fast path."""
+    writes = capture_payloads()
+    ops = rounds * len(writes)
+    print(f"sanitize: {len(writes)} payloads x {rounds} rounds")
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for layer, agent_id, data in writes:
+            sanitize(data)
+    generic = time.perf_counter() - start
+    _report("generic walk", generic, ops)
+
+    fast = PayloadSanitizer()
+    for layer, agent_id, data in writes:
+        assert fast.sanitize((layer, agent_id), data) == sanitize(data)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for layer, agent_id, data in writes:
+            fast.sanitize((layer, agent_id), data)
+    compiled = time.perf_counter() - start
+    _report("compiled per-agent", compiled, ops, generic)
+    print(f"  {fast.stats()}")
+
+
+def bench_write_many(trains: int = 20, ticks: int = 50):
+    """Per-record cost of one write() per record vs one write_many() per tick."""
+    payloads = capture_payloads(samples_per_agent=1)
+    # A bulk tick: every agent of `trains` trainsets, like a fleet ingest
+    tick = [(layer, f"T{t:03d}/{agent_id}", data)
+            for t in range(trains) for layer, agent_id, data in payloads]
+    ops = ticks * len(tick)
+    print(f"write_many: {len(tick)} records/tick x {ticks} ticks")
+
+    async def single():
+        bb = Blackboard()
+        for layer, agent_id, data in tick:       # warm sanitizers
+            await bb.write(layer, agent_id, data)
+        start = time.perf_counter()
+        for _ in range(ticks):
+            for layer, agent_id, data in tick:
+                await bb.write(layer, agent_id, data)
+        return time.perf_counter() - start
+
+    async def batched():
+        bb = Blackboard()
+        await bb.write_many(tick)
+        start = time.perf_counter()
+        for _ in range(ticks):
+            await bb.write_many(tick)
+        return time.perf_counter() - start
+
+    baseline = asyncio.run(single())
+    _report("write() per record", baseline, ops)
+    _report("write_many() per tick", asyncio.run(batched()), ops, baseline)
+
+
+def bench_reads(reads: int = 20000):
+    """Whole-layer read latency, idle vs. under a saturating writer, by layer size."""
+    payloads = [(layer, agent_id, data) for layer, agent_id, data in capture_payloads(1) if layer == 1]
+    print(f"reads: {reads} layer-1 reads per variant")
+
+    async def measure(trains: int, writers: bool):
+        bb = Blackboard()
+        await bb.write_many([(1, f"T{t:03d}/{a}", d) for t in range(trains) for _, a, d in payloads])
+        keys = [f"T{t:03d}/{a}" for t in range(trains) for _, a, _ in payloads]
+        stop = False
+
+        async def writer():
+            i = 0
+            while not stop:
+                for _ in range(50):
+                    await bb.write(1, keys[i % len(keys)], {"speed_kmh": float(i)})
+                    i += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(writer()) if writers else None
+        samples = []
+        for n in range(reads):
+            start = time.perf_counter()
+            layer = await bb.read(1)
+            samples.append(time.perf_counter() - start)
+            if n % 10 == 0:
+                await asyncio.sleep(0)   # let the writer in between reads
+        stop = True
+        if task:
+            await task
+        samples.sort()
+        return samples[len(samples) // 2], samples[int(len(samples) * 0.99)], len(layer)
+
+    for trains in (1, 100, 1000):
+        for writers in (False, True):
+            p50, p99, size = asyncio.run(measure(trains, writers))
+            label = f"{size} entries, {'under writes' if writers else 'idle'}"
+            print(f"  {label:<34} p50 {p50 * 1e6:6.2f} us  p99 {p99 * 1e6:6.2f} us")
+
+
+def bench_journal(hours: float = 2.0, writes_per_s: int = 150):
+    """Boot-time replay of a journal holding `hours` of writes at the fleet's rate."""
+    payloads = capture_payloads(samples_per_agent=5)
+    total = int(hours * 3600 * writes_per_s)
+    directory = tempfile.mkdtemp(prefix="railguard-journal-")
+    try:
+        journal = Journal(directory)
+        start = time.perf_counter()
+        chunk = []
+        for i in range(total):
+            layer, agent_id, data = payloads[i % len(payloads)]
+            chunk.append((layer, agent_id, i / writes_per_s, data))
+            if len(chunk) == 10000:
+                journal._write_batch(chunk)
+                chunk = []
+        if chunk:
+            journal._write_batch(chunk)
+        journal._close_file()
+        journal._executor.shutdown()
+        write_s = time.perf_counter() - start
+        on_disk = sum(os.path.getsize(p) for p in journal.segments())
+        print(f"journal: {total} records ({hours:g} h at {writes_per_s}/s), "
+              f"{len(journal.segments())} segments kept, {on_disk / 1e6:.1f} MB on disk")
+        _report("append + encode (writer thread)", write_s, total)
+
+        start = time.perf_counter()
+        bb = Blackboard()
+        restored = bb.attach_journal(Journal(directory))
+        replay_s = time.perf_counter() - start
+        print(f"  replay newest segment              {replay_s * 1e3:8.1f} ms total, {restored} entries restored")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def bench_timeseries(minutes: int = 60, rate_hz: float = 20.0):
+    """A7 GPS stream: list-of-dicts history vs the columnar store (memory, 10-min scan)."""
+    a7 = next(data for layer, agent_id, data in capture_payloads(1) if agent_id == "A7")
+    rng = random.Random(7)
+    n = int(minutes * 60 * rate_hz)
+    rows = []
+    for i in range(n):
+        row = dict(a7)
+        row["speed_kmh"] = round(rng.uniform(60, 130), 1)
+        row["latitude"] = round(59.9139 + rng.uniform(-0.05, 0.05), 5)
+        rows.append((1_800_000_000 + i / rate_hz, row))
+    print(f"timeseries: {n} A7 samples ({minutes} min at {rate_hz:g} Hz)")
+
+    tracemalloc.start()
+    history = [{"agent_id": "A7", "timestamp": t, "data": dict(d)} for t, d in rows]
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    store = ColumnarStore(retention_seconds=minutes * 120)
+    start = time.perf_counter()
+    for t, d in rows:
+        store.append("A7", t, d)
+    _report("columnar append", time.perf_counter() - start, n)
+    print(f"  {'memory, list of dicts':<34} {dict_bytes / n:8.1f} B/sample")
+    print(f"  {'memory, columnar':<34} {store.nbytes() / n:8.1f} B/sample  "
+          f"({dict_bytes / store.nbytes():.1f}x smaller)")
+
+    since = rows[-1][0] - 600
+    reps = 50
+    start = time.perf_counter()
+    for _ in range(reps):
+        scan = [(p["timestamp"], p["data"]["speed_kmh"]) for p in history if p["timestamp"] >= since]
+    dict_scan = (time.perf_counter() - start) / reps
+    start = time.perf_counter()
+    for _ in range(reps):
+        ts, values = store.scan("A7", "speed_kmh", start=since)
+    col_scan = (time.perf_counter() - start) / reps
+    assert len(scan) == len(values)
+    print(f"  {'last 10 min, dict traversal':<34} {dict_scan * 1e3:8.3f} ms")
+    print(f"  {'last 10 min, columnar scan':<34} {col_scan * 1e3:8.3f} ms  ({dict_scan / col_scan:.0f}x)")
+
+
+def bench_indexes(trains: int = 1000, reps: int = 200):
+    """
+    Fleet-sized board: indexed find()/find_range() vs scanning every
+    payload. Every trainset's agents sample their own (seeded) values, so
+    both queries match a realistic share of the fleet.
+    """
+    agents = build_fleet([f"T{t:04d}" for t in range(trains)], seed=5000)
+    bb = Blackboard()
+    asyncio.run(bb.write_many([(agent.layer, agent.agent_id, agent.sample()) for agent in agents]))
+    print(f"indexes: {trains} trainsets, {sum(len(bb.read_nowait(l)) for l in bb.LAYER_NAMES)} entries")
+
+    def scan_eq():
+        return [p for l in bb.LAYER_NAMES for p in bb.read_nowait(l).values()
+                if p["data"].get("status") == "WARNING"]
+
+    def scan_range():
+        return [p for l in bb.LAYER_NAMES for p in bb.read_nowait(l).values()
+                if isinstance(p["data"].get("health_pct"), float) and p["data"]["health_pct"] <= 70]
+
+    for label, scan, indexed in (
+        ("status == WARNING", scan_eq, lambda: bb.find("status", "WARNING")),
+        ("health_pct <= 70", scan_range, lambda: bb.find_range("health_pct", high=70)),
+    ):
+        hits = len(indexed())
+        assert hits and len(scan()) == hits
+        start = time.perf_counter()
+        for _ in range(reps):
+            scan()
+        scanned = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(reps):
+            indexed()
+        _report(f"{label}, full scan", scanned, reps)
+        _report(f"{label}, index ({hits} hits)", time.perf_counter() - start, reps, scanned)
+
+
+def bench_dag(samples: int = 4):
+    """Latency from an A19 change to the A39 decision it causes: A19 → A32 → A35 → A39."""
+    chain = [a for a in ALL_AGENTS if a.agent_id in ("A32", "A35", "A39")]
+    logging.getLogger("Orchestrator").setLevel(logging.ERROR)
+
+    async def measure(triggered: bool) -> List[float]:
+        bb = Blackboard()
+        tasks = []
+        if triggered:
+            orchestrator = Orchestrator(bb)
+            for agent in chain:
+                orchestrator.register_agent(agent)
+            await orchestrator.start_all()
+        else:
+            tasks = [asyncio.create_task(agent.run(bb)) for agent in chain]
+        await asyncio.sleep(0.1)
+        latencies = []
+        for i in range(samples):
+            await asyncio.sleep(random.uniform(0, 1))
+            start = time.perf_counter()
+            await bb.write(3, "A19", {"health_pct": 50.0 + i})
+            # Follow the causal chain: each hop must change after the previous one
+            version = await bb.wait_for_change(4, "A32", since_version=bb.get_version())
+            version = await bb.wait_for_change(4, "A35", since_version=version)
+            await bb.wait_for_change(5, "A39", since_version=version)
+            latencies.append(time.perf_counter() - start)
+        for task in tasks:
+            task.cancel()
+        return latencies
+
+    print(f"dag: {samples} A19 changes, end-to-end to A39")
+    polled = asyncio.run(measure(False))
+    _report("free-running sleep loops (mean)", sum(polled), len(polled))
+    triggered = asyncio.run(measure(True))
+    _report("input-triggered DAG (mean)", sum(triggered), len(triggered), sum(polled))
+
+
+def bench_overload(seconds: float = 10.0, hog_ms: float = 40.0, step_ms: float = 2.0):
+    """
+    All 50 agents under a loop that is blocked for `hog_ms` out of every
+    50 ms, each step costing `step_ms` of CPU (by default more than the
+    loop has left): per-class deadline misses with one flat priority vs.
+    the declared classes.
+    """
+    logging.getLogger("Orchestrator").setLevel(logging.ERROR)
+
+    async def measure(flat: bool) -> dict:
+        bb = Blackboard()
+        orchestrator = Orchestrator(bb)
+        for agent in ALL_AGENTS:
+            orchestrator.register_agent(agent)
+            if flat:
+                agent.priority = "normal"
+
+        async def hog():
+            while True:
+                time.sleep(hog_ms / 1000)
+                await asyncio.sleep(0.05 - hog_ms / 1000)
+
+        write, write_many = bb.write, bb.write_many
+
+        async def slow_write(layer, agent_id, data):
+            end = time.perf_counter() + step_ms / 1000
+            while time.perf_counter() < end:
+                pass
+            await write(layer, agent_id, data)
+
+        async def slow_write_many(records):
+            # Batched steps cost the same per record as single writes
+            end = time.perf_counter() + len(records) * step_ms / 1000
+            while time.perf_counter() < end:
+                pass
+            await write_many(records)
+
+        bb.write, bb.write_many = slow_write, slow_write_many
+        hog_task = asyncio.create_task(hog())
+        await orchestrator.start_all()
+        await asyncio.sleep(seconds)
+        hog_task.cancel()
+        for agent in ALL_AGENTS:
+            agent.__dict__.pop("priority", None)
+        return orchestrator.schedule_stats()["agents"]
+
+    print(f"overload: {seconds:.0f} s, loop blocked {hog_ms:.0f}/50 ms, {step_ms:.1f} ms per step")
+    for flat in (True, False):
+        stats = asyncio.run(measure(flat))
+        print("  " + ("one priority for all" if flat else "priority classes"))
+        for cls in PRIORITIES:
+            rows = [row for aid, row in stats.items()
+                    if getattr(next(a for a in ALL_AGENTS if a.agent_id == aid), "priority") == cls]
+            runs = sum(r["runs"] for r in rows)
+            misses = sum(r["misses"] for r in rows)
+            shed = sum(r["shed"] for r in rows)
+            worst = max((r["max_latency_ms"] for r in rows), default=0.0)
+            print(f"    {cls:<9} runs {runs:5d}  missed {misses / max(runs + shed, 1):6.1%}"
+                  f"  shed {shed:5d}  worst {worst:8.1f} ms")
+
+
+def bench_ticks(trains: int = 10, seconds: float = 5.0):
+    """
+    `trains` copies of every agent: one sleep loop per agent vs. the
+    Orchestrator's timing wheel. Reports CPU time and achieved vs. nominal rate.
+    """
+    logging.getLogger("Orchestrator").setLevel(logging.ERROR)
+
+    def fleet():
+        agents = []
+        for t in range(trains):
+            for template in ALL_AGENTS:
+                agent = type(template)()
+                agent.agent_id = f"T{t:03d}/{template.agent_id}"
+                agent.inputs = ()
+                agents.append(agent)
+        return agents
+
+    async def measure(wheel: bool):
+        agents = fleet()
+        bb = Blackboard()
+        counts = dict.fromkeys((a.agent_id for a in agents), 0)
+        write, write_many = bb.write, bb.write_many
+
+        async def counting_write(layer, agent_id, data):
+            counts[agent_id] += 1
+            await write(layer, agent_id, data)
+
+        async def counting_write_many(records):
+            # The dispatcher writes plain SimAgent steps in batches
+            for _, agent_id, _ in records:
+                counts[agent_id] += 1
+            await write_many(records)
+
+        bb.write, bb.write_many = counting_write, counting_write_many
+        cpu = time.process_time()
+        if wheel:
+            orchestrator = Orchestrator(bb)
+            for agent in agents:
+                orchestrator.register_agent(agent)
+            await orchestrator.start_all()
+        else:
+            tasks = [asyncio.create_task(agent.run(bb)) for agent in agents]
+        await asyncio.sleep(1.0)   # settle start-up phases
+        start = dict(counts)
+        await asyncio.sleep(seconds)
+        cpu = time.process_time() - cpu
+        if not wheel:
+            for task in tasks:
+                task.cancel()
+        # Fast agents only: slow ones fire too few times in the window to measure
+        ratios = [(counts[a.agent_id] - start[a.agent_id]) * a.interval / seconds
+                  for a in agents if a.interval <= 0.5]
+        return cpu, sum(ratios) / len(ratios)
+
+    print(f"ticks: {trains * len(ALL_AGENTS)} agents for {seconds:.0f} s")
+    loops_cpu, loops_rate = asyncio.run(measure(False))
+    wheel_cpu, wheel_rate = asyncio.run(measure(True))
+    print(f"  {'one sleep loop per agent':<34} cpu {loops_cpu:6.2f} s  rate {loops_rate:6.1%} of nominal")
+    print(f"  {'timing wheel':<34} cpu {wheel_cpu:6.2f} s  rate {wheel_rate:6.1%} of nominal")
+
+
+class _HeavyAgent(SimAgent):
+    """Wraps a roster agent, adding `cost_ms` of pure-Python work to each sample."""
+
+    def __init__(self, template, cost_ms: float):
+        self.template = template
+        self.cost_ms = cost_ms
+        for attr in ("agent_id", "name", "layer", "interval", "priority", "deadline", "executor"):
+            setattr(self, attr, getattr(template, attr))
+
+    def sample(self) -> dict:
+        end = time.perf_counter() + self.cost_ms / 1000
+        while time.perf_counter() < end:
+            pass
+        return self.template.sample()
+
+
+def bench_processes(seconds: float = 5.0, cost_ms: float = 20.0, workers: int = 3):
+    """
+    A19–A38 doing `cost_ms` of CPU per step: event-loop responsiveness
+    (lateness of a 5 ms timer) with those agents on the loop vs. in workers.
+    """
+    logging.getLogger("Orchestrator").setLevel(logging.ERROR)
+
+    async def measure(processes: int):
+        bb = Blackboard()
+        orchestrator = Orchestrator(bb, processes=processes)
+        for template in ALL_AGENTS:
+            heavy = template.executor == "process"
+            orchestrator.register_agent(_HeavyAgent(template, cost_ms) if heavy else template)
+        await orchestrator.start_all()
+        await asyncio.sleep(1.0)   # let the workers spawn
+        loop = asyncio.get_running_loop()
+        lateness = []
+        end = loop.time() + seconds
+        while loop.time() < end:
+            start = loop.time()
+            await asyncio.sleep(0.005)
+            lateness.append(loop.time() - start - 0.005)
+        runs = sum(orchestrator.schedule_stats()["agents"].get(a.agent_id, {}).get("runs", 0)
+                   for a in ALL_AGENTS if a.executor == "process")
+        await orchestrator.close()
+        lateness.sort()
+        return lateness[int(len(lateness) * 0.99)] * 1000, lateness[-1] * 1000, runs
+
+    print(f"processes: A19–A38 at {cost_ms:.0f} ms CPU per step, {seconds:.0f} s")
+    for processes in (0, workers):
+        p99, worst, runs = asyncio.run(measure(processes))
+        label = "on the event loop" if not processes else f"{processes} worker processes"
+        print(f"  {label:<34} timer lateness p99 {p99:6.1f} ms  max {worst:6.1f} ms  "
+              f"heavy steps {runs}")
+
+
+def bench_fleet(seconds: float = 3.0, sizes=(1, 5, 10, 20, 40, 80, 160)):
+    """
+    Whole trainsets (50 agents each) on one Orchestrator and one loop:
+    memory per train, CPU per step, and the largest fleet one core keeps
+    at full sample rate.
+    """
+    logging.getLogger("Orchestrator").setLevel(logging.ERROR)
+
+    # Memory: every agent of 10 trains written `samples` times
+    trains, samples = 10, 5
+    tracemalloc.start()
+    base = tracemalloc.take_snapshot()
+    agents = build_fleet(f"T{t:03d}" for t in range(trains))
+    bb = Blackboard()
+
+    async def fill():
+        for _ in range(samples):
+            await bb.write_many((a.layer, a.agent_id, a.sample()) for a in agents)
+
+    asyncio.run(fill())
+    used = sum(s.size_diff for s in tracemalloc.take_snapshot().compare_to(base, "filename"))
+    tracemalloc.stop()
+    print(f"fleet: {used / trains / 1024:.0f} KiB per trainset (agents + board + history)")
+
+    async def measure(n: int):
+        agents = build_fleet(f"T{t:03d}" for t in range(n))
+        bb = Blackboard()
+        orchestrator = Orchestrator(bb)
+        for agent in agents:
+            orchestrator.register_agent(agent)
+        await orchestrator.start_all()
+        await asyncio.sleep(1.0)   # settle start-up phases
+        # Periodic agents fast enough to count within the window
+        periodic = [a for a in agents if not a.inputs and a.interval <= 1]
+        stats = orchestrator.schedule_stats()["agents"]
+        before = {a.agent_id: stats.get(a.agent_id, {}).get("runs", 0) for a in periodic}
+        steps = sum(r["runs"] for r in stats.values())
+        wall, cpu = time.perf_counter(), time.process_time()
+        await asyncio.sleep(seconds)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        stats = orchestrator.schedule_stats()["agents"]
+        steps = sum(r["runs"] for r in stats.values()) - steps
+        nominal = sum(seconds / a.interval for a in periodic)
+        done = sum(stats[a.agent_id]["runs"] - before[a.agent_id] for a in periodic)
+        return cpu / wall, done / nominal, cpu / max(steps, 1)
+
+    sustained = 0
+    for n in sizes:
+        load, rate, per_step = asyncio.run(measure(n))
+        print(f"  {n:4d} trainsets ({n * len(ALL_AGENTS):5d} agents)  core {load:6.1%}  "
+              f"rate {rate:6.1%} of nominal  {per_step * 1e6:6.1f} us CPU/step")
+        if rate < 0.98 or load > 0.9:
+            break
+        sustained = n
+    if sustained:
+        print(f"  one core sustains at least {sustained} trainsets at full rate")
+
+
+def bench_cluster(trains: int = 240, seconds: float = 5.0, sizes=(1, 2, 4)):
+    """
+    A fleet too big for one process, spread over k local cluster workers:
+    records/s reaching the coordinator's board, and the coordinator's own
+    CPU (share of one core, per record). Throughput grows with k while
+    there are free cores; with fewer cores than workers the processes
+    only take turns on them. The coordinator applies every record, so its
+    core bounds the cluster.
+    """
+    logging.getLogger("Cluster").setLevel(logging.ERROR)
+
+    async def measure(workers: int):
+        bb = Blackboard(history_capacity=16)
+        coordinator = Coordinator(bb, [f"T{t:03d}" for t in range(trains)], port=0, workers=workers)
+        await coordinator.start_all()
+        # Wait for every worker to join and take its share, then settle
+        while len(coordinator.schedule_stats()["nodes"]) < workers or None in coordinator.placement.values():
+            await asyncio.sleep(0.2)
+        await asyncio.sleep(3.0)
+        records = coordinator.records
+        # Workers are separate processes: this is the coordinator's CPU alone
+        cpu = time.process_time()
+        await asyncio.sleep(seconds)
+        cpu = time.process_time() - cpu
+        records = coordinator.records - records
+        await coordinator.close()
+        return records / seconds, cpu / seconds, cpu / max(records, 1)
+
+    print(f"cluster: {trains} trainsets ({trains * len(ALL_AGENTS)} agents) on {os.cpu_count()} cores")
+    if max(sizes) >= (os.cpu_count() or 1):
+        print("  (fewer cores than processes: expect no scaling past that point)")
+    base = None
+    for workers in sizes:
+        rate, core, per_record = asyncio.run(measure(workers))
+        base = base or rate
+        print(f"  {workers} workers  {rate:10,.0f} records/s  x{rate / base:4.2f}"
+              f"  coordinator {core:6.1%} of a core, {per_record * 1e6:5.1f} us/record")
+
+
+def _cpu_seconds(pid: int) -> float:
+    """User + system CPU time of a process (Linux /proc)."""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def bench_loop(seconds: float = 5.0, trains: int = 20, clients: int = 200,
+               chats: int = 200, port: int = 8765):
+    """
+    Each installed event loop (RAILGUARD_LOOP, see event_loop.py):
+      * agent ticks — a `trains`-trainset fleet on one Orchestrator;
+      * the real app under uvicorn — /ws/updates fan-out to `clients`
+        sockets, and /chat round trips while they are connected.
+    Server CPU is read from /proc, so the HTTP half needs Linux.
+    """
+    import aiohttp
+
+    logging.getLogger("Orchestrator").setLevel(logging.ERROR)
+
+    async def ticks():
+        agents = build_fleet(f"T{t:03d}" for t in range(trains))
+        orchestrator = Orchestrator(Blackboard(history_capacity=64))
+        for agent in agents:
+            orchestrator.register_agent(agent)
+        await orchestrator.start_all()
+        await asyncio.sleep(1.0)
+        runs = sum(r["runs"] for r in orchestrator.schedule_stats()["agents"].values())
+        wall, cpu = time.perf_counter(), time.process_time()
+        await asyncio.sleep(seconds)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        stats = orchestrator.schedule_stats()
+        runs = sum(r["runs"] for r in stats["agents"].values()) - runs
+        await orchestrator.close()
+        return runs / wall, cpu / max(runs, 1), stats["lag_ms"]
+
+    async def serve(name: str):
+        base = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+             "--loop", name, "--log-level", "warning"],
+            cwd=BASE_DIR, env=dict(os.environ, RAILGUARD_LOOP=name))
+        try:
+            # One connection per socket; the default pool stops at 100
+            async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as session:
+                for _ in range(100):
+                    if server.poll() is not None:
+                        return None, f"server exited ({server.returncode}); is port {port} free?"
+                    try:
+                        async with session.get(base + "/") as resp:
+                            root = await resp.json()
+                        break
+                    except aiohttp.ClientError:
+                        await asyncio.sleep(0.2)
+                else:
+                    return None, "server did not start"
+                if root.get("boot_status") != "SUCCESS":
+                    return None, f"engine did not boot: {(root.get('boot_error') or '').splitlines()[:1]}"
+                sockets = [await session.ws_connect(base.replace("http", "ws") + "/ws/updates")
+                           for _ in range(clients)]
+                received = [0]
+
+                async def drain(ws):
+                    async for _ in ws:
+                        received[0] += 1
+
+                readers = [asyncio.create_task(drain(ws)) for ws in sockets]
+                await asyncio.sleep(2.5)   # every client has had its first frame
+                received[0] = 0
+                cpu = _cpu_seconds(server.pid)
+                latencies = []
+                end = time.perf_counter() + seconds
+                for i in range(chats):
+                    start = time.perf_counter()
+                    async with session.post(base + "/chat", json={"query": "bearing health"}) as resp:
+                        await resp.read()
+                    latencies.append(time.perf_counter() - start)
+                wait = end - time.perf_counter()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                window = seconds + max(0.0, -wait)
+                cpu = _cpu_seconds(server.pid) - cpu
+                frames = received[0]
+                # Readers end once their socket's close handshake completes
+                await asyncio.gather(*(ws.close() for ws in sockets))
+                await asyncio.gather(*readers)
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+        latencies.sort()
+        return (frames / window, cpu / window, latencies[len(latencies) // 2] * 1000,
+                latencies[int(len(latencies) * 0.99)] * 1000), None
+
+    loops = available_loops()
+    print(f"loop: installed {', '.join(loops)}")
+    for name in loops:
+        rate, per_step, lag = run_loop(ticks(), name)
+        print(f"  {name:<8} ticks  {trains * len(ALL_AGENTS)} agents  {rate:8,.0f} steps/s  "
+              f"{per_step * 1e6:6.1f} us CPU/step  lag {lag:5.1f} ms")
+    for name in loops:
+        result, error = asyncio.run(serve(name))
+        if error:
+            print(f"  {name:<8} server skipped: {error}")
+            continue
+        frames, load, p50, p99 = result
+        print(f"  {name:<8} server  /ws/updates {clients} clients {frames:6.1f} frames/s  "
+              f"core {load:6.1%}   /chat p50 {p50:6.2f} ms  p99 {p99:6.2f} ms")
+
+
+def bench_simulate(sizes=(100, 1000), seconds: float = 2.0):
+    """
+    One simulated second of fleet telemetry: per-agent scalar sample() vs
+    the vectorized FleetSimulator, and the board's write_many on top.
+    """
+    for n in sizes:
+        trains = [f"T{t:04d}" for t in range(n)]
+        sim = FleetSimulator(Blackboard(), trains, seed=1)
+        ticks = [k * sim.tick_interval for k in range(int(seconds / sim.tick_interval))]
+        sim.tick(0.0)   # start-up phases
+
+        cpu = time.process_time()
+        batches = [sim.tick(now) for now in ticks[1:]]
+        vectorized = (time.process_time() - cpu) / seconds
+        records = sum(len(b) for b in batches) / seconds
+
+        # Same record mix through each agent's own sample()
+        by_id = {a.agent_id: a for a in build_fleet(trains)}
+        cpu = time.process_time()
+        for batch in batches:
+            for _, agent_id, _ in batch:
+                by_id[agent_id].sample()
+        scalar = (time.process_time() - cpu) / seconds
+
+        bb = Blackboard()
+
+        async def apply():
+            for batch in batches:
+                await bb.write_many(batch)
+
+        cpu = time.process_time()
+        asyncio.run(apply())
+        board = (time.process_time() - cpu) / seconds
+        print(f"  {n:5d} trainsets {records:8.0f} rec/s   generate: sample() {scalar:5.2f} s  "
+              f"vectorized {vectorized:5.2f} s   write_many {board:5.2f} s  (CPU per simulated s)")
+
+
+def bench_virtual(hours: float = 0.5, trainsets: int = 1, seed: int = 7):
+    """
+    Virtual time: `hours` of a seeded fleet on a VirtualTimeLoop, twice,
+    under different hash seeds — speed-up over real time, and whether the
+    two runs' change digests match.
+    """
+    for simulator in ("agents", "vectorized"):
+        digests = []
+        for hash_seed in ("1", "2"):
+            # Separate interpreters, so nothing carries over between runs
+            code = (f"import json, scenario; print(json.dumps(scenario.run_scenario("
+                    f"{hours}, {trainsets}, {seed}, {simulator!r})))")
+            out = subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR, check=True,
+                                 capture_output=True, text=True,
+                                 env=dict(os.environ, PYTHONHASHSEED=hash_seed)).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            digests.append(result["digest"])
+        print(f"  {simulator:<10} {hours:g} h x {trainsets} trainset(s)  {result['changes']:8d} changes  "
+              f"{result['wall_s']:6.1f} s  {result['speedup']:6.1f}x real time  "
+              f"(24 h ~ {24 * 3600 / result['speedup'] / 60:.0f} min)  "
+              f"digests {'identical' if digests[0] == digests[1] else 'DIFFER'}")
+
+
+def bench_vibration(seconds: float = 5.0, frame: float = 0.1,
+                    configs=((3, 25600.0), (8, 25600.0), (8, 51200.0))):
+    """
+    A4's pipeline per `frame` of signal (simulate a block, ring write,
+    Welch PSD, envelope spectrum, defect check): share of one core it
+    takes to keep up in real time.
+    """
+    shaft = shaft_hz(100)
+    freqs = {name: AXLE_BOX_BEARING.frequencies(shaft)[name] for name in DEFECTS}
+    for channels, fs in configs:
+        block = int(fs * frame)
+        simulator = VibrationSimulator(channels, block, fs, np.random.default_rng(1))
+        ring = SampleRing(channels, ENVELOPE_N, dtype=np.float32)
+        analyzer = SpectrumAnalyzer(channels, fs)
+        defects = {(0, "bpfi"): 0.5}
+        while len(ring) < ENVELOPE_N:
+            ring.write(simulator.next_block(shaft, defects))
+        frames = int(seconds / frame)
+        cpu = time.process_time()
+        for _ in range(frames):
+            ring.write(simulator.next_block(shaft, defects))
+            x = ring.latest(ENVELOPE_N)
+            analyzer.welch(x)
+            analyzer.envelope(x)
+            analyzer.defect_snr_db(freqs)
+        cpu = time.process_time() - cpu
+        print(f"  {channels} ch x {fs / 1000:4.1f} kHz  {cpu / frames * 1000:6.2f} ms/frame  "
+              f"core {cpu / seconds:6.1%} in real time")
+
+
+def bench_acoustic(seconds: float = 2.0, chunk: int = 50_000,
+                   configs=((3, AE_FS, None), (3, AE_FS, 0.6), (8, 2 * AE_FS, 0.6))):
+    """
+    A3's pipeline per chunk of signal (ring write, hit detection and
+    features, TDOA location, crack clustering), with and without a crack
+    episode: share of one core it takes to keep up in real time. The
+    simulator's own cost is excluded.
+    """
+    for channels, fs, crack_at in configs:
+        sensor_m = np.linspace(0.0, 2.0, channels).tolist()
+        simulator = AESimulator(sensor_m, chunk, fs, np.random.default_rng(1))
+        ring = SampleRing(channels, 2 * chunk, dtype=np.float32)
+        detector = HitDetector(channels, fs)
+        locator = Locator(sensor_m)
+        chunks = int(seconds * fs / chunk)
+        hits = located = 0
+        cracks = []
+        cpu = 0.0
+        for _ in range(chunks):
+            block = simulator.next_block(crack_at)
+            start = time.process_time()
+            ring.write(block)
+            found = detector.process(ring)
+            events = locator.events(found)
+            cracks.extend(crack_locations(found, events))
+            crack_cluster(cracks)
+            cpu += time.process_time() - start
+            hits += len(found["arrival_s"])
+            located += len(events)
+        label = "crack" if crack_at is not None else "no crack"
+        print(f"  {channels} ch x {fs / 1e6:.0f} MHz  {label:8s}  {hits / seconds:6.0f} hits/s  "
+              f"{located / seconds:5.0f} events/s  {cpu / chunks * 1000:6.2f} ms/chunk  "
+              f"core {cpu / seconds:6.1%} in real time")
+
+
+def bench_thermal(seconds: float = 5.0, configs=((2, 1, 30.0), (4, 1, 30.0), (4, 2, 30.0), (8, 2, 60.0))):
+    """
+    A2's pipeline per frame time (ring write, region maxima, hotspot
+    labelling, tracking) for `cameras` cameras at `scale` x 160x120, with
+    two growing hotspots: share of one core it takes to keep up in real
+    time. The simulator's own cost is excluded.
+    """
+    for cameras, scale, fps in configs:
+        shape = (FRAME_SHAPE[0] * scale, FRAME_SHAPE[1] * scale)
+        regions = tuple(Region(r.name, (r.rows[0] * scale, r.rows[1] * scale),
+                               (r.cols[0] * scale, r.cols[1] * scale), r.limit_c) for r in BOGIE_REGIONS)
+        simulator = ThermalSimulator(cameras, shape, regions, np.random.default_rng(1))
+        analyzer = ThermalAnalyzer(cameras, shape, regions)
+        tracker = HotspotTracker()
+        ring = FrameRing((cameras,) + shape, 2)
+        heat = np.array([[20.0, 20.0, 25.0, 50.0]] * cameras)
+        frames = int(seconds * fps)
+        cpu = 0.0
+        for i in range(frames):
+            excess = 20.0 + 80.0 * i / frames
+            spots = [(0, 20 * scale, 25 * scale, excess), (cameras - 1, 80 * scale, 80 * scale, excess)]
+            stack = simulator.next_frame(20.0, heat, spots)
+            start = time.process_time()
+            ring.write(stack)
+            frame = ring.since(ring.total - 1)[0]
+            analyzer.region_max(frame)
+            tracker.update(analyzer.hotspots(frame, 20.0), i / fps)
+            cpu += time.process_time() - start
+        print(f"  {cameras} cams x {shape[1]}x{shape[0]} @ {fps:2.0f} fps  "
+              f"{len(tracker.confirmed())} tracked  {cpu / frames * 1000:6.3f} ms/frame  "
+              f"core {cpu / seconds:6.1%} in real time")
+
+
+SCENARIOS = {
+    "sanitize": bench_sanitize,
+    "write_many": bench_write_many,
+    "reads": bench_reads,
+    "journal": bench_journal,
+    "timeseries": bench_timeseries,
+    "indexes": bench_indexes,
+    "dag": bench_dag,
+    "overload": bench_overload,
+    "ticks": bench_ticks,
+    "processes": bench_processes,
+    "fleet": bench_fleet,
+    "cluster": bench_cluster,
+    "loop": bench_loop,
+    "simulate": bench_simulate,
+    "virtual": bench_virtual,
+    "vibration": bench_vibration,
+    "acoustic": bench_acoustic,
+    "thermal": bench_thermal,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RailGuard blackboard microbenchmarks")
+    parser.add_argument("scenario", choices=sorted(SCENARIOS) + ["all"])
+    args = parser.parse_args()
+    names = sorted(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    for name in names:
+        SCENARIOS[name]()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,31 +2,89 @@
 RailGuard 5000 — Blackboard (Shared Memory)
 A simple, bulletproof shared store. All data stored here is guaranteed 
 to be JSON-serializable at write time, so the WS endpoint never crashes.
+
+Every write that actually changes data is stamped with a version taken from
+one global, monotonically increasing counter. Layers and (layer, agent_id)
+entries remember the version of their last change, so consumers can await
+`wait_for_change()` / iterate `subscribe()` instead of polling on a sleep.
+
+Numeric fields of every write are also appended to a bounded NumPy ring
+history per entry (see history.py), queried through `history()`. Layer 1
+(RAW_SENSOR) carries the high-rate streams and is kept in a chunked
+columnar store instead (see timeseries.py, `series`).
+
+`get_status()` / `get_all_health()` are materialized snapshots: rebuilt at
+most once per change and shared (with their JSON text) by every reader.
+
+Reads never lock and never copy. Each layer is a mapping that is frozen once
+a reader has been handed it; the next write to that layer copies it and
+publishes the copy (copy-on-write), so writers never wait for readers and
+readers always see a complete layer. Payload dicts are replaced, never
+mutated, so entries handed out by `read()` are stable as well. All mutation
+happens synchronously on the event-loop thread.
+
+With a Journal attached (journal.py), every data-changing write and every
+eviction is also queued to an append-only on-disk log, and
+`attach_journal()` restores the last journaled state at boot.
+
+Each change also records a field-level delta against the entry's previous
+payload (see deltas.py); `changes_since(version)` replays them in order.
+
+Secondary indexes (see indexes.py) declared in DEFAULT_INDEXES or with
+`create_index()` are maintained on every change and answer `find()` /
+`find_range()` without scanning payloads.
+
+Entries can carry a TTL, per layer (DEFAULT_TTLS) or per agent
+(`set_ttl()`). An entry not rewritten within its TTL is marked stale (its
+payload gets `"stale": True`, and `get_status()` counts it) or, if so
+configured, evicted from the board. One timing wheel (timing_wheel.py),
+advanced by `expire()`, tracks every deadline, so expiry costs
+O(entries due) rather than a scan of the board.
+
+Timestamps and expiry read `clock` (clock.py): the wall clock by default,
+a VirtualClock for faster-than-real-time simulation.
 """
 import asyncio
-import time
+import json
 import logging
-from typing import Optional, Dict, Any
+from types import MappingProxyType
+from typing import Optional, Dict, Any, List, Tuple, Iterable, Iterator, AsyncIterator
+
+import numpy as np
+
+try:
+    from history import RingHistory, DEFAULT_CAPACITY
+    from serializers import PayloadSanitizer, sanitize
+    from journal import Journal
+    from timeseries import ColumnarStore
+    from deltas import ChangeLog
+    from indexes import INDEX_KINDS
+    from timing_wheel import TimingWheel
+    from clock import Clock, WALL
+except ImportError:
+    from backend.history import RingHistory, DEFAULT_CAPACITY
+    from backend.serializers import PayloadSanitizer, sanitize
+    from backend.journal import Journal
+    from backend.timeseries import ColumnarStore
+    from backend.deltas import ChangeLog
+    from backend.indexes import INDEX_KINDS
+    from backend.timing_wheel import TimingWheel
+    from backend.clock import Clock, WALL
 
 logger = logging.getLogger("Blackboard")
 
+EXPIRY_TICK = 0.25
 
-def _sanitize(obj):
-    """Recursively convert any value into a JSON-safe primitive."""
-    if obj is None or isinstance(obj, (bool, int, float, str)):
-        return obj
-    if isinstance(obj, (list, tuple)):
-        return [_sanitize(i) for i in obj]
-    if isinstance(obj, dict):
-        return {str(k): _sanitize(v) for k, v in obj.items()}
-    # Fallback: convert to string
-    return str(obj)
+
+# Generic recursive walk; kept under its old name for existing callers
+_sanitize = sanitize
 
 
 class Blackboard:
     """
     6-layer shared memory space for 50 agents.
     All writes are sanitized, so reads are always JSON-safe.
+    Sanitizing goes through a per-writer compiled fast path (serializers.py).
     """
 
     LAYER_NAMES = {
@@ -38,47 +96,579 @@ class Blackboard:
         6: "NETWORK_STATE",
     }
 
-    def __init__(self):
+    # Secondary indexes every board maintains: (field, kind)
+    DEFAULT_INDEXES = [
+        ("urgency", "equality"),            # A39 Criticality Assessor
+        ("status", "equality"),             # A24 Coupler Integrity
+        ("needs_replacement", "equality"),  # A22 Brake Pad Thickness
+        ("severity", "equality"),           # A28 Corrosion Severity
+        ("health_pct", "sorted"),           # A19 Bearing Wear
+        ("criticality_score", "sorted"),    # A39 Criticality Assessor
+    ]
+
+    # Seconds without a write before a layer's entries are marked stale.
+    # Generous next to the slowest writers (A43 rewrites every 30 s);
+    # tighten per agent with set_ttl().
+    DEFAULT_TTLS = {
+        1: 60.0,
+        2: 60.0,
+        3: 90.0,
+        4: 90.0,
+        5: 90.0,
+        6: 60.0,
+    }
+
+    def __init__(self, history_capacity: int = DEFAULT_CAPACITY,
+                 series: Optional[ColumnarStore] = None, clock: Clock = WALL):
+        # Epoch seconds for timestamps and TTLs
+        self.clock = clock
+        self._now = clock.time
         # Each layer: { agent_id: payload_dict }
         self._store: Dict[int, Dict[str, Any]] = {i: {} for i in range(1, 7)}
-        self._locks = {i: asyncio.Lock() for i in range(1, 7)}
+        # True once a reader holds the current layer mapping (it is then frozen)
+        self._published: Dict[int, bool] = {i: False for i in range(1, 7)}
+        # Change tracking — versions come from one global counter
+        self._version = 0
+        self._layer_versions: Dict[int, int] = {i: 0 for i in range(1, 7)}
+        self._entry_versions: Dict[int, Dict[str, int]] = {i: {} for i in range(1, 7)}
+        # Evicted entries: layer -> { agent_id: (version, timestamp) }, until rewritten
+        self._tombstones: Dict[int, Dict[str, Tuple[int, float]]] = {i: {} for i in range(1, 7)}
+        # Bumped only when an agent_id appears in (or leaves) a layer
+        self._membership_version = 0
+        # Field-level deltas of recent changes, in version order
+        self._changes = ChangeLog()
+        # Pending waiters: (layer or None, agent_id or None) -> [futures]
+        self._waiters: Dict[Tuple[int, Optional[str]], List[asyncio.Future]] = {}
+        # Per-entry numeric history: layer -> { agent_id: RingHistory }
+        self._history_capacity = history_capacity
+        self._history: Dict[int, Dict[str, RingHistory]] = {i: {} for i in range(1, 7)}
+        # RAW_SENSOR history lives in the columnar store
+        self._series = series if series is not None else ColumnarStore()
+        # Shape-specialized sanitizers, learned per (layer, agent_id)
+        self._sanitizer = PayloadSanitizer()
+        # Materialized summaries: name -> [source_version, data, json_text]
+        self._snapshots: Dict[str, list] = {}
+        # Optional write-ahead journal (see attach_journal)
+        self._journal: Optional[Journal] = None
+        # Secondary indexes: (field, kind) -> index, plus the ones each layer feeds
+        self._indexes: Dict[Tuple[str, str], Any] = {}
+        self._layer_indexes: Dict[int, List[Any]] = {i: [] for i in range(1, 7)}
+        for field, kind in self.DEFAULT_INDEXES:
+            self.create_index(field, kind)
+        # TTLs: (layer, agent_id or None) -> (seconds, evict)
+        # An agent's own entry overrides its layer's; None there means "never expires"
+        self._ttls: Dict[Tuple[int, Optional[str]], Optional[Tuple[float, bool]]] = {
+            (layer, None): (ttl, False) for layer, ttl in self.DEFAULT_TTLS.items()}
+        # Expiry deadline per entry. The wheel holds each entry at most once;
+        # a rewrite only moves its deadline here, and the wheel re-files the
+        # entry when its old timer fires.
+        self._deadlines: Dict[Tuple[int, str], Tuple[float, bool]] = {}
+        self._expiry = TimingWheel(tick=EXPIRY_TICK, start=self._now())
+        self._expiry_task: Optional[asyncio.Task] = None
+        # Stale entries per layer; bumped with any staleness transition
+        self._stale: Dict[int, set] = {i: set() for i in range(1, 7)}
+        self._stale_version = 0
 
     async def write(self, layer: int, agent_id: str, data: dict):
         """Write JSON-safe data. Sanitizes on the way in."""
         if layer not in self._store:
             return
-        safe_data = _sanitize(data)
-        payload = {
+        safe_data = self._sanitizer.sanitize((layer, agent_id), data)
+        self._apply(layer, agent_id, safe_data, self._now())
+
+    async def write_many(self, records: Iterable[Tuple[int, str, dict]]):
+        """
+        Write several (layer, agent_id, data) records as one batch.
+        Records are sanitized up front, share one timestamp and are applied
+        without yielding to the loop, so readers never observe half a batch;
+        each layer involved is copied (if published) at most once per batch.
+        Records for unknown layers are skipped, as with `write`.
+        """
+        by_layer: Dict[int, List[Tuple[str, Any]]] = {}
+        sanitizer = self._sanitizer
+        for layer, agent_id, data in records:
+            if layer not in self._store:
+                continue
+            by_layer.setdefault(layer, []).append(
+                (agent_id, sanitizer.sanitize((layer, agent_id), data)))
+        self._apply_many(by_layer)
+
+    async def ingest_many(self, records: Iterable[Tuple[int, str, Any]]):
+        """
+        `write_many` for payloads that are JSON-safe already: written by
+        another Blackboard and decoded from JSON (a cluster worker's
+        forwarded changes). Skips the sanitizer; everything else, down to
+        history, indexes and the journal, is as for `write_many`.
+        """
+        by_layer: Dict[int, List[Tuple[str, Any]]] = {}
+        store = self._store
+        for layer, agent_id, data in records:
+            if layer in store:
+                by_layer.setdefault(layer, []).append((agent_id, data))
+        self._apply_many(by_layer)
+
+    def _apply_many(self, by_layer: Dict[int, List[Tuple[str, Any]]]):
+        """Apply a batch of sanitized payloads under one timestamp, layer by layer."""
+        if not by_layer:
+            return
+        now = self._now()
+        for layer in sorted(by_layer):
+            for agent_id, safe_data in by_layer[layer]:
+                self._apply(layer, agent_id, safe_data, now)
+
+    def _apply(self, layer: int, agent_id: str, safe_data: Any, now: float):
+        """Store one sanitized payload."""
+        entries = self._writable(layer)
+        # History first: if it rejects the payload, the live entry is untouched
+        if layer == 1:
+            self._series.append(agent_id, now, safe_data)
+        else:
+            ring = self._history[layer].get(agent_id)
+            if ring is None:
+                ring = self._history[layer][agent_id] = RingHistory(self._history_capacity)
+            ring.append(now, safe_data)
+        previous = entries.get(agent_id)
+        if previous is None:
+            self._membership_version += 1
+        was_stale = previous is not None and previous["stale"]
+        if previous is not None and not was_stale and previous["data"] == safe_data:
+            # Same data: refresh the timestamp, but nobody needs waking
+            version = previous["version"]
+            changed = False
+        else:
+            self._version += 1
+            version = self._version
+            changed = True
+        entries[agent_id] = {
             "agent_id": agent_id,
-            "timestamp": time.time(),
+            "timestamp": now,
+            "version": version,
+            "stale": False,
             "data": safe_data,
         }
-        async with self._locks[layer]:
-            self._store[layer][agent_id] = payload
+        ttl = self.get_ttl(layer, agent_id)
+        if ttl is not None:
+            key = (layer, agent_id)
+            self._deadlines[key] = (now + ttl[0], ttl[1])
+            if key not in self._expiry:
+                self._expiry.schedule(key, now + ttl[0])
+        elif self._deadlines:
+            # TTL switched off since the last write; the wheel timer finds no deadline
+            self._deadlines.pop((layer, agent_id), None)
+        if was_stale:
+            self._stale[layer].discard(agent_id)
+            self._stale_version += 1
+        if changed:
+            self._layer_versions[layer] = version
+            self._entry_versions[layer][agent_id] = version
+            if previous is None:
+                self._tombstones[layer].pop(agent_id, None)
+            for index in self._layer_indexes[layer]:
+                index.update((layer, agent_id), safe_data)
+            self._changes.record(version, layer, agent_id, now,
+                                 previous["data"] if previous is not None else None, safe_data,
+                                 stale=False if was_stale else None)
+            self._notify(layer, agent_id, version)
+            if self._journal is not None:
+                self._journal.append(layer, agent_id, now, safe_data)
+
+    @property
+    def series(self) -> ColumnarStore:
+        """Columnar RAW_SENSOR store, for range scans over layer 1."""
+        return self._series
+
+    @property
+    def journal(self) -> Optional[Journal]:
+        return self._journal
+
+    def attach_journal(self, journal: Journal) -> int:
+        """
+        Restore the latest journaled state, then journal every later change.
+        Call once at boot, before agents start. Returns the entries restored.
+        """
+        records = journal.replay()
+        for layer, agent_id, timestamp, data in records:
+            if layer in self._store:
+                self._apply(layer, agent_id, data, timestamp)
+        self._journal = journal
+        logger.info(f"Restored {len(records)} entries from journal {journal.directory}")
+        return len(records)
+
+    def _writable(self, layer: int) -> Dict[str, Any]:
+        """The layer mapping a writer may mutate, copying it first if a reader holds it."""
+        if self._published[layer]:
+            self._store[layer] = dict(self._store[layer])
+            self._published[layer] = False
+        return self._store[layer]
 
     async def read(self, layer: int, agent_id: Optional[str] = None):
         """Read from a layer. Returns dict or None."""
+        return self.read_nowait(layer, agent_id)
+
+    def read_nowait(self, layer: int, agent_id: Optional[str] = None):
+        """
+        Synchronous `read`. A whole layer comes back as a read-only view of
+        an immutable snapshot: no lock, no copy, and later writes don't
+        change it.
+        """
         if layer not in self._store:
             return {}
-        async with self._locks[layer]:
-            if agent_id:
-                return self._store[layer].get(agent_id)
-            # Return a shallow copy so callers can't mutate the store
-            return dict(self._store[layer])
+        if agent_id:
+            return self._store[layer].get(agent_id)
+        self._published[layer] = True
+        return MappingProxyType(self._store[layer])
 
-    def get_status(self) -> dict:
-        """Returns JSON-safe status summary."""
+    def history(self, layer: int, agent_id: str, field: str,
+                window: Optional[int] = None,
+                since: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Recent (timestamps, values) of one numeric field, oldest first, as
+        zero-copy read-only NumPy views. Nested fields use dotted paths,
+        e.g. history(1, "A2", "temperatures.brake_disc", window=100).
+        Layer 1 is served by the columnar store, where a window spanning
+        several time chunks comes back as a copy.
+        """
+        if layer == 1:
+            if window is not None and since is None:
+                return self._series.last(agent_id, field, window)
+            ts, values = self._series.scan(agent_id, field, start=since)
+            if window is not None:
+                ts, values = ts[-window:], values[-window:]
+            return ts, values
+        ring = self._history.get(layer, {}).get(agent_id)
+        if ring is None:
+            empty = np.empty(0)
+            empty.flags.writeable = False
+            return empty, empty
+        return ring.window(field, window=window, since=since)
+
+    def history_fields(self, layer: int, agent_id: str) -> List[str]:
+        """Numeric fields with recorded history for one entry."""
+        if layer == 1:
+            return self._series.fields(agent_id)
+        ring = self._history.get(layer, {}).get(agent_id)
+        return ring.fields if ring is not None else []
+
+    # ── Change notification ─────────────────────────────────────
+
+    def get_version(self, layer: Optional[int] = None, agent_id: Optional[str] = None) -> int:
+        """
+        Version of the last change to the whole board, a layer, or one entry.
+        0 means nothing has been written there yet.
+        """
+        if layer is None:
+            return self._version
+        if agent_id:
+            version = self._entry_versions.get(layer, {}).get(agent_id)
+            if version is None:
+                version = self._tombstones.get(layer, {}).get(agent_id, (0, 0.0))[0]
+            return version
+        return self._layer_versions.get(layer, 0)
+
+    async def wait_for_change(self, layer: Optional[int], agent_id: Optional[str] = None,
+                              since_version: Optional[int] = None,
+                              timeout: Optional[float] = None) -> int:
+        """
+        Wait until `layer` (or one agent's entry in it) changes after
+        `since_version` and return its new version. Without `since_version`
+        the current version is used, i.e. wait for the next change.
+        `layer=None` waits for a change anywhere on the board.
+        On timeout the current (unchanged) version is returned.
+        """
+        if layer is not None and layer not in self._store:
+            raise ValueError(f"Unknown blackboard layer: {layer}")
+        current = self.get_version(layer, agent_id)
+        if since_version is not None and current > since_version:
+            return current
+
+        key = (layer, agent_id or None) if layer is not None else (None, None)
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, []).append(fut)
+        try:
+            await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            waiters = self._waiters.get(key)
+            if waiters and fut in waiters:
+                waiters.remove(fut)
+                if not waiters:
+                    del self._waiters[key]
+        # Not the version that woke us: writes that landed before we ran
+        # again are part of the same wakeup
+        return self.get_version(layer, agent_id)
+
+    async def subscribe(self, layer: Optional[int], agent_id: Optional[str] = None,
+                        since_version: Optional[int] = None) -> AsyncIterator[int]:
+        """
+        Yield the new version every time `layer` / `agent_id` changes.
+        Bursts of writes between two iterations are coalesced into one wakeup.
+        """
+        version = self.get_version(layer, agent_id) if since_version is None else since_version
+        while True:
+            version = await self.wait_for_change(layer, agent_id, since_version=version)
+            yield version
+
+    def _notify(self, layer: int, agent_id: str, version: int):
+        """Wake everyone waiting on this entry, its layer, or the whole board."""
+        for key in ((layer, agent_id), (layer, None), (None, None)):
+            waiters = self._waiters.pop(key, None)
+            if not waiters:
+                continue
+            for fut in waiters:
+                if not fut.done():
+                    fut.set_result(version)
+
+    # ── Secondary indexes ────────────────────────────────────────
+
+    def create_index(self, field: str, kind: str = "equality",
+                     layers: Optional[Iterable[int]] = None):
+        """
+        Declare an index on `field` (dotted for nested fields), optionally
+        limited to some layers, and backfill it from the current board.
+        """
+        if kind not in INDEX_KINDS:
+            raise ValueError(f"Unknown index kind '{kind}' (expected one of {sorted(INDEX_KINDS)})")
+        if (field, kind) in self._indexes:
+            return self._indexes[(field, kind)]
+        index = INDEX_KINDS[kind](field, layers)
+        self._indexes[(field, kind)] = index
+        for layer, entries in self._store.items():
+            if index.covers(layer):
+                self._layer_indexes[layer].append(index)
+                for agent_id, payload in entries.items():
+                    index.update((layer, agent_id), payload["data"])
+        return index
+
+    def _index(self, field: str, kind: str):
+        index = self._indexes.get((field, kind))
+        if index is None:
+            raise ValueError(f"No {kind} index on '{field}'; declare one with create_index()")
+        return index
+
+    def find(self, field: str, value) -> List[dict]:
+        """Payloads whose `field` equals `value` (needs an equality index)."""
+        keys = sorted(self._index(field, "equality").lookup(value))
+        return [self._store[layer][agent_id] for layer, agent_id in keys]
+
+    def find_range(self, field: str, low: Optional[float] = None, high: Optional[float] = None,
+                   limit: Optional[int] = None, descending: bool = False) -> List[dict]:
+        """Payloads with low <= `field` <= high, ordered by value (needs a sorted index)."""
+        pairs = self._index(field, "sorted").range(low, high, limit=limit, descending=descending)
+        return [self._store[layer][agent_id] for _, (layer, agent_id) in pairs]
+
+    def changes_since(self, version: int) -> Iterator[dict]:
+        """
+        Field-level deltas of every change after `version`, oldest first
+        (format in deltas.py). If `version` is older than the retained log,
+        yields one full-payload delta per entry changed since, instead, and
+        one `"evicted": true` delta per entry evicted since.
+        """
+        changes = self._changes.since(version)
+        if changes is not None:
+            yield from changes
+            return
+        resync = []
+        for layer, versions in self._entry_versions.items():
+            for agent_id, v in versions.items():
+                if v > version:
+                    payload = self._store[layer][agent_id]
+                    resync.append({
+                        "version": v, "layer": layer, "agent_id": agent_id,
+                        "timestamp": payload["timestamp"],
+                        "set": payload["data"], "unset": [], "full": True,
+                        "stale": payload["stale"],
+                    })
+        for layer, tombstones in self._tombstones.items():
+            for agent_id, (v, timestamp) in tombstones.items():
+                if v > version:
+                    resync.append({
+                        "version": v, "layer": layer, "agent_id": agent_id,
+                        "timestamp": timestamp, "set": {}, "unset": [], "full": False,
+                        "evicted": True,
+                    })
+        resync.sort(key=lambda c: c["version"])
+        yield from resync
+
+    # ── Staleness & TTL expiry ───────────────────────────────────
+
+    def set_ttl(self, layer: int, seconds: Optional[float], agent_id: Optional[str] = None,
+                evict: bool = False):
+        """
+        Expire entries of `layer` (or only `agent_id`'s entry in it) after
+        `seconds` without a write: mark them stale, or remove them if
+        `evict`. `seconds=None` removes the layer's TTL, or switches expiry
+        off for `agent_id` whatever the layer's TTL (`clear_ttl()` makes it
+        follow the layer again). Applies from the next write.
+        """
+        if layer not in self._store:
+            raise ValueError(f"Unknown blackboard layer: {layer}")
+        key = (layer, agent_id or None)
+        if seconds is None and agent_id is None:
+            self._ttls.pop(key, None)
+        else:
+            self._ttls[key] = None if seconds is None else (float(seconds), evict)
+
+    def clear_ttl(self, layer: int, agent_id: str):
+        """Drop `agent_id`'s own TTL setting (or opt-out) so the layer's applies."""
+        self._ttls.pop((layer, agent_id), None)
+
+    def get_ttl(self, layer: int, agent_id: Optional[str] = None) -> Optional[Tuple[float, bool]]:
+        """(seconds, evict) in force for an entry or layer, or None."""
+        key = (layer, agent_id)
+        if agent_id is not None and key in self._ttls:
+            return self._ttls[key]
+        return self._ttls.get((layer, None))
+
+    def is_stale(self, layer: int, agent_id: str) -> bool:
+        return agent_id in self._stale.get(layer, ())
+
+    def stale_entries(self, layer: Optional[int] = None) -> List[Tuple[int, str]]:
+        """(layer, agent_id) of every entry currently marked stale."""
+        layers = [layer] if layer is not None else sorted(self._stale)
+        return [(l, agent_id) for l in layers for agent_id in sorted(self._stale.get(l, ()))]
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """
+        Mark stale / evict every entry whose TTL ran out by `now`.
+        Only entries whose wheel timer fired are looked at: those that were
+        rewritten meanwhile are re-filed at their new deadline. Returns the
+        number of entries that went stale or were evicted.
+        """
+        now = self._now() if now is None else now
+        expired = 0
+        for key in self._expiry.advance(now):
+            deadline = self._deadlines.get(key)
+            if deadline is None:
+                continue
+            when, evict = deadline
+            if when > now:
+                self._expiry.schedule(key, when)
+                continue
+            del self._deadlines[key]
+            layer, agent_id = key
+            if evict:
+                self.evict(layer, agent_id, now)
+            else:
+                self.mark_stale(layer, agent_id, now)
+            expired += 1
+        return expired
+
+    def mark_stale(self, layer: int, agent_id: Optional[str] = None, now: Optional[float] = None) -> bool:
+        """
+        Flag an entry as stale right away (e.g. its agent crashed);
+        `layer=None` flags `agent_id` in every layer. The flag clears on
+        the entry's next write.
+        """
+        if layer is None:
+            return any([self.mark_stale(l, agent_id, now) for l in self._store])
+        payload = self._store.get(layer, {}).get(agent_id)
+        if payload is None or payload["stale"]:
+            return False
+        now = self._now() if now is None else now
+        self._version += 1
+        version = self._version
+        self._writable(layer)[agent_id] = dict(payload, version=version, stale=True)
+        self._stale[layer].add(agent_id)
+        self._stale_version += 1
+        self._layer_versions[layer] = version
+        self._entry_versions[layer][agent_id] = version
+        self._changes.record_state(version, layer, agent_id, now, stale=True)
+        self._notify(layer, agent_id, version)
+        return True
+
+    def evict(self, layer: int, agent_id: str, now: Optional[float] = None) -> bool:
+        """Remove an entry from the board (its history is kept)."""
+        if agent_id not in self._store.get(layer, {}):
+            return False
+        now = self._now() if now is None else now
+        del self._writable(layer)[agent_id]
+        self._deadlines.pop((layer, agent_id), None)
+        self._expiry.cancel((layer, agent_id))
+        if agent_id in self._stale[layer]:
+            self._stale[layer].discard(agent_id)
+            self._stale_version += 1
+        for index in self._layer_indexes[layer]:
+            index.remove((layer, agent_id))
+        self._membership_version += 1
+        self._version += 1
+        version = self._version
+        self._layer_versions[layer] = version
+        del self._entry_versions[layer][agent_id]
+        self._tombstones[layer][agent_id] = (version, now)
+        self._changes.record_state(version, layer, agent_id, now, evicted=True)
+        self._notify(layer, agent_id, version)
+        if self._journal is not None:
+            self._journal.evict(layer, agent_id, now)
+        return True
+
+    async def start_expiry(self, interval: float = EXPIRY_TICK):
+        """Run `expire()` every `interval` seconds on the running loop."""
+        if self._expiry_task is None:
+            self._expiry_task = asyncio.create_task(self._expire_forever(interval))
+
+    async def _expire_forever(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.expire()
+            except Exception as e:
+                logger.error(f"TTL expiry failed: {e}")
+
+    def stop_expiry(self):
+        if self._expiry_task is not None:
+            self._expiry_task.cancel()
+            self._expiry_task = None
+
+    # ── Summaries ────────────────────────────────────────────────
+    # Built lazily and cached against the version of the data they cover,
+    # so N dashboard clients share one build and one JSON encoding.
+    # The returned dicts are shared: treat them as read-only.
+
+    def _snapshot(self, name: str, version: int, build) -> list:
+        snap = self._snapshots.get(name)
+        if snap is None or snap[0] != version:
+            snap = [version, build(), None]
+            self._snapshots[name] = snap
+        return snap
+
+    def _snapshot_json(self, snap: list) -> str:
+        if snap[2] is None:
+            snap[2] = json.dumps(snap[1])
+        return snap[2]
+
+    def _build_status(self) -> dict:
         return {
             str(l_id): {
                 "name": self.LAYER_NAMES.get(l_id, "UNKNOWN"),
                 "agents_reporting": len(self._store[l_id]),
+                "agents_stale": len(self._stale[l_id]),
             }
             for l_id in range(1, 7)
         }
 
-    def get_all_health(self) -> dict:
-        """Returns a flat, JSON-safe snapshot of layer 3 (component health)."""
+    def _build_health(self) -> dict:
         result = {}
         for agent_id, payload in self._store[3].items():
             result[agent_id] = payload.get("data", {})
         return result
+
+    def get_status(self) -> dict:
+        """Returns JSON-safe status summary."""
+        return self._snapshot("status", (self._membership_version, self._stale_version),
+                              self._build_status)[1]
+
+    def get_status_json(self) -> str:
+        """`get_status()` pre-encoded as JSON text."""
+        return self._snapshot_json(
+            self._snapshot("status", (self._membership_version, self._stale_version),
+                           self._build_status))
+
+    def get_all_health(self) -> dict:
+        """Returns a flat, JSON-safe snapshot of layer 3 (component health)."""
+        return self._snapshot("health", self._layer_versions[3], self._build_health)[1]
+
+    def get_all_health_json(self) -> str:
+        """`get_all_health()` pre-encoded as JSON text."""
+        return self._snapshot_json(
+            self._snapshot("health", self._layer_versions[3], self._build_health))
@@ -72,8 +72,10 @@ OWNER_INFO = {
 }
 
 class ChatbotEngine:
-    def __init__(self, blackboard):
+    def __init__(self, blackboard, train_id=None):
         self.blackboard = blackboard
+        # Fleet mode: the trainset whose "T001/A19"-style entries we read
+        self.train_id = train_id
 
     def classify_intent(self, q: str) -> str:
         # Clean query for better tokenization
@@ -530,7 +532,7 @@ class ChatbotEngine:
     async def _read_blackboard_for_agent(self, aid: str) -> dict:
         n = int(aid[1:]); l = 1 if n<=10 else 2 if n<=18 else 3 if n<=30 else 4 if n<=38 else 5 if n<=44 else 6
         try:
-            e = await self.blackboard.read(l, aid)
+            e = await self.blackboard.read(l, f"{self.train_id}/{aid}" if self.train_id else aid)
             return e.get("data", {}) if isinstance(e, dict) else {}
         except: return {}
 
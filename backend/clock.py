@@ -0,0 +1,102 @@
+"""
+RailGuard 5000 — Clocks & Virtual Time
+Everything time-driven in the engine reads one of two clocks:
+
+  * the blackboard stamps writes and runs TTL expiry on `clock.time()`
+    (epoch seconds), and
+  * the Orchestrator's timing wheel, triggers and every agent's
+    `asyncio.sleep` run on the event loop's clock (`loop.time()`).
+
+WALL is the real clock. A VirtualClock only moves when told to, and
+VirtualTimeLoop is an asyncio loop whose `time()` is that clock: whenever
+it has nothing ready to run it jumps straight to its next timer instead
+of sleeping. Hours of agent activity then take as long as the CPU needs
+to run the steps, and with seeded agents (SimAgent.seed) every run
+produces the same writes in the same order.
+
+    clock = VirtualClock()
+    run_virtual(scenario(clock), clock)     # see scenario.py
+
+Virtual time only covers work done on the loop: keep agents there
+(no process pool) and don't wait on real I/O while simulating.
+"""
+import asyncio
+import selectors
+import time
+from typing import Optional
+
+# 2026-01-01T00:00:00Z: where virtual epoch time starts by default
+DEFAULT_EPOCH = 1767225600.0
+
+
+class Clock:
+    """The real clock."""
+
+    def time(self) -> float:
+        """Epoch seconds, for timestamps."""
+        return time.time()
+
+    def monotonic(self) -> float:
+        """Seconds from an arbitrary origin, for intervals and deadlines."""
+        return time.monotonic()
+
+
+WALL = Clock()
+
+
+class VirtualClock(Clock):
+    """A clock that stands still until advanced."""
+
+    def __init__(self, epoch: float = DEFAULT_EPOCH):
+        self.epoch = epoch
+        self._elapsed = 0.0
+
+    def time(self) -> float:
+        return self.epoch + self._elapsed
+
+    def monotonic(self) -> float:
+        return self._elapsed
+
+    def advance(self, seconds: float):
+        if seconds < 0:
+            raise ValueError("A clock can't go backwards")
+        self._elapsed += seconds
+
+    def advance_to(self, monotonic: float):
+        if monotonic > self._elapsed:
+            self._elapsed = monotonic
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    """Polls real I/O without blocking; a timed wait advances the clock instead."""
+
+    def __init__(self, clock: VirtualClock):
+        super().__init__()
+        self._clock = clock
+
+    def select(self, timeout: Optional[float] = None):
+        if timeout is None or timeout <= 0:
+            # Nothing scheduled: only real I/O (or another thread) can wake us
+            return super().select(timeout)
+        events = super().select(0)
+        if not events:
+            self._clock.advance(timeout)
+        return events
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """An event loop running on a VirtualClock, as fast as its callbacks allow."""
+
+    def __init__(self, clock: Optional[VirtualClock] = None):
+        self.clock = clock if clock is not None else VirtualClock()
+        super().__init__(_VirtualSelector(self.clock))
+
+    def time(self) -> float:
+        return self.clock.monotonic()
+
+
+def run_virtual(coro, clock: Optional[VirtualClock] = None):
+    """`asyncio.run(coro)` in virtual time on `clock`."""
+    clock = clock if clock is not None else VirtualClock()
+    with asyncio.Runner(loop_factory=lambda: VirtualTimeLoop(clock)) as runner:
+        return runner.run(coro)
@@ -0,0 +1,498 @@
+"""
+RailGuard 5000 — Cluster Mode
+Spreads a fleet over several worker processes (or hosts) when one Python
+process can no longer step it.
+
+A Coordinator owns the real Blackboard — everything the API serves — and
+places trainsets on workers with a consistent-hash ring. Each ClusterWorker
+runs an ordinary Orchestrator and a private Blackboard for the trainsets it
+is given, and forwards every changed entry to the coordinator in batches.
+
+Protocol: TCP, one frame per message, a u32 little-endian length followed
+by a JSON object.
+
+    worker → coordinator  {"type": "hello", "node": id}
+    coordinator → worker  {"type": "assign", "trains": [[train_id, phase], ...]}
+    worker → coordinator  {"type": "updates", "records": [[layer, agent_id, data], ...],
+                           "stale": [[layer, agent_id], ...]}
+    worker → coordinator  {"type": "heartbeat", "agents": [[agent_id, status], ...],
+                           "lag_ms", "queued"}
+    coordinator → worker  {"type": "stop"}
+
+A worker that disconnects or misses heartbeats is dropped from the ring:
+only its trainsets move (to the surviving workers), and their entries are
+marked stale until the new owner writes them. Writes for a trainset from a
+worker that no longer owns it are ignored, so a hand-over never mixes two
+owners' data.
+
+    python cluster.py worker --connect 127.0.0.1:7400 --node rack-2
+"""
+import argparse
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import math
+import multiprocessing
+import os
+from struct import Struct
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from blackboard import Blackboard
+    from orchestrator import Orchestrator
+    from all_agents import build_roster, split_agent_id
+    from event_loop import run as run_loop
+except ImportError:
+    from backend.blackboard import Blackboard
+    from backend.orchestrator import Orchestrator
+    from backend.all_agents import build_roster, split_agent_id
+    from backend.event_loop import run as run_loop
+
+logger = logging.getLogger("Cluster")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7400
+DEFAULT_VNODES = 64
+# No node takes more than this times its fair share of trainsets
+LOAD_FACTOR = 1.25
+# Workers report every HEARTBEAT seconds; MISSED_HEARTBEATS silent periods drop them
+HEARTBEAT = 1.0
+MISSED_HEARTBEATS = 3
+# Worker-side batching of forwarded writes (s)
+FLUSH_INTERVAL = 0.05
+# The coordinator keeps history; a worker's board only needs the latest payloads
+WORKER_HISTORY = 16
+
+_FRAME = Struct("<I")
+
+
+# ── Consistent hashing ───────────────────────────────────────
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent-hash ring with `vnodes` points per node, so adding or
+    removing one of n nodes moves only about 1/n of the keys.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = DEFAULT_VNODES):
+        self.vnodes = vnodes
+        self._points: List[int] = []
+        self._owners: Dict[int, str] = {}
+        self._nodes: set = set()
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> List[str]:
+        return sorted(self._nodes)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def add(self, node: str):
+        if node in self._nodes:
+            return
+        self._nodes.add(node)
+        for i in range(self.vnodes):
+            point = _hash(f"{node}#{i}")
+            if point not in self._owners:
+                bisect.insort(self._points, point)
+                self._owners[point] = node
+
+    def remove(self, node: str):
+        if node not in self._nodes:
+            return
+        self._nodes.discard(node)
+        self._points = [p for p in self._points if self._owners[p] != node]
+        self._owners = {p: self._owners[p] for p in self._points}
+
+    def node_for(self, key: str) -> Optional[str]:
+        """The node owning `key` (None on an empty ring)."""
+        if not self._points:
+            return None
+        i = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[self._points[i]]
+
+    def place(self, keys: Iterable[str], load_factor: float = LOAD_FACTOR) -> Dict[str, Optional[str]]:
+        """
+        Consistent hashing with bounded loads: each key goes to the first
+        node clockwise from it that still has room under
+        ceil(load_factor * keys / nodes). A few keys hash unevenly; this
+        keeps a small fleet from piling onto one node while still moving
+        few keys when nodes come and go.
+        """
+        keys = list(keys)
+        if not self._points:
+            return {key: None for key in keys}
+        capacity = math.ceil(load_factor * len(keys) / len(self._nodes))
+        load = {node: 0 for node in self._nodes}
+        points = self._points
+        placement = {}
+        for h, key in sorted((_hash(key), key) for key in keys):
+            i = bisect.bisect(points, h)
+            while True:
+                node = self._owners[points[i % len(points)]]
+                if load[node] < capacity:
+                    break
+                i += 1
+            load[node] += 1
+            placement[key] = node
+        return placement
+
+
+# ── Framing ──────────────────────────────────────────────────
+
+async def _send(writer: asyncio.StreamWriter, message: dict):
+    data = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    # One write per frame: concurrent senders on one loop never interleave
+    writer.write(_FRAME.pack(len(data)) + data)
+    await writer.drain()
+
+
+async def _recv(reader: asyncio.StreamReader) -> dict:
+    """Next message; raises asyncio.IncompleteReadError once the peer hangs up."""
+    (length,) = _FRAME.unpack(await reader.readexactly(_FRAME.size))
+    return json.loads(await reader.readexactly(length))
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    return host or DEFAULT_HOST, int(port)
+
+
+def _train_key(train_id: Optional[str]) -> str:
+    return train_id or ""
+
+
+# ── Coordinator ──────────────────────────────────────────────
+
+class _Node:
+    def __init__(self, node_id: str, writer: asyncio.StreamWriter):
+        self.node_id = node_id
+        self.writer = writer
+        self.trains: set = set()
+        self.agents: List[List[str]] = []
+        self.lag_ms = 0.0
+        self.queued = 0
+        self.records = 0
+
+
+class Coordinator:
+    """
+    Engine side of cluster mode. Stands in for the Orchestrator in main.py
+    (`start_all`, `close`, `agents`, `schedule_stats`), but its agents run
+    on the workers connected to it. With `workers > 0` it spawns that many
+    local worker processes itself; more may connect from other hosts.
+    """
+
+    def __init__(self, blackboard, trains: Iterable[Optional[str]], host: str = DEFAULT_HOST,
+                 port: int = DEFAULT_PORT, workers: int = 0, processes: int = 0,
+                 vnodes: int = DEFAULT_VNODES, heartbeat: float = HEARTBEAT):
+        self.blackboard = blackboard
+        # An empty fleet is one unnamed trainset (the single-train roster)
+        self.trains: List[Optional[str]] = list(trains) or [None]
+        # Same spread of start-up phases as build_fleet()
+        self._phases = {t: (i * 0.6180339887) % 1.0 for i, t in enumerate(self.trains)}
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.processes = processes
+        self.heartbeat = heartbeat
+        self._ring = HashRing(vnodes=vnodes)
+        self._nodes: Dict[str, _Node] = {}
+        self.placement: Dict[Optional[str], Optional[str]] = {t: None for t in self.trains}
+        self.records = 0
+        self.rebalances = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._closing = False
+        self._handlers: set = set()
+        self._procs: List[multiprocessing.Process] = []
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    @property
+    def agents(self) -> List[SimpleNamespace]:
+        """Agent statuses as last reported by each worker."""
+        return [SimpleNamespace(agent_id=agent_id, status=status)
+                for node in self._nodes.values() for agent_id, status in node.agents]
+
+    async def start_all(self):
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        # port=0 picks a free port; report the real one to workers
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Coordinator listening on {self.address} for {len(self.trains)} trainsets")
+        for i in range(self.workers):
+            self._procs.append(spawn_worker(self.address, f"local-{i + 1}", self.processes))
+
+    async def close(self):
+        self._closing = True
+        for node in list(self._nodes.values()):
+            try:
+                await _send(node.writer, {"type": "stop"})
+            except (ConnectionError, RuntimeError):
+                pass
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if self._handlers:
+            # Workers hang up once they have stopped their agents
+            _, late = await asyncio.wait(self._handlers, timeout=self.heartbeat * MISSED_HEARTBEATS)
+            for task in late:
+                task.cancel()
+            await asyncio.gather(*late, return_exceptions=True)
+        for proc in self._procs:
+            await asyncio.get_running_loop().run_in_executor(None, proc.join, 5)
+            if proc.is_alive():
+                proc.terminate()
+        self._procs = []
+
+    def schedule_stats(self) -> dict:
+        """JSON-safe placement and per-worker load."""
+        return {
+            "coordinator": self.address,
+            "records": self.records,
+            "rebalances": self.rebalances,
+            "unplaced": [t for t, node in self.placement.items() if node is None],
+            "nodes": {
+                node.node_id: {
+                    "trains": sorted(_train_key(t) for t in node.trains),
+                    "agents": len(node.agents),
+                    "records": node.records,
+                    "lag_ms": node.lag_ms,
+                    "queued": node.queued,
+                }
+                for node in self._nodes.values()
+            },
+        }
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            await self._serve_node(reader, writer)
+        finally:
+            self._handlers.discard(task)
+
+    async def _serve_node(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        timeout = self.heartbeat * MISSED_HEARTBEATS
+        try:
+            hello = await asyncio.wait_for(_recv(reader), timeout)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError, ValueError):
+            writer.close()
+            return
+        node_id = str(hello.get("node", ""))
+        if hello.get("type") != "hello" or not node_id or node_id in self._nodes:
+            logger.warning(f"Refused cluster worker {node_id!r}")
+            writer.close()
+            return
+        node = self._nodes[node_id] = _Node(node_id, writer)
+        self._ring.add(node_id)
+        logger.info(f"Worker {node_id} joined ({len(self._nodes)} connected)")
+        await self._rebalance()
+        try:
+            while True:
+                message = await asyncio.wait_for(_recv(reader), timeout)
+                kind = message.get("type")
+                if kind == "updates":
+                    await self._apply(node, message)
+                elif kind == "heartbeat":
+                    node.agents = message.get("agents", [])
+                    node.lag_ms = message.get("lag_ms", 0.0)
+                    node.queued = message.get("queued", 0)
+        except asyncio.TimeoutError:
+            logger.error(f"Worker {node_id} missed {MISSED_HEARTBEATS} heartbeats")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            if not self._closing:
+                logger.error(f"Worker {node_id} disconnected")
+        finally:
+            lost = set(node.trains)
+            del self._nodes[node_id]
+            self._ring.remove(node_id)
+            writer.close()
+        if self._closing:
+            return
+        # Until the new owner writes, the lost trainsets show their last known state
+        self._mark_stale(lost)
+        await self._rebalance()
+
+    async def _apply(self, node: _Node, message: dict):
+        owned = node.trains
+        records = [(layer, agent_id, data) for layer, agent_id, data in message.get("records", ())
+                   if split_agent_id(agent_id)[0] in owned]
+        if records:
+            # Sanitized by the worker's board and decoded from JSON: JSON-safe already
+            await self.blackboard.ingest_many(records)
+            node.records += len(records)
+            self.records += len(records)
+        for layer, agent_id in message.get("stale", ()):
+            if split_agent_id(agent_id)[0] in owned:
+                self.blackboard.mark_stale(layer, agent_id)
+
+    def _mark_stale(self, trains: set):
+        if not trains:
+            return
+        bb = self.blackboard
+        for layer in bb.LAYER_NAMES:
+            for agent_id in list(bb.read_nowait(layer)):
+                if split_agent_id(agent_id)[0] in trains:
+                    bb.mark_stale(layer, agent_id)
+
+    async def _rebalance(self):
+        """Re-place every trainset on the ring and tell workers whose share changed."""
+        owners = self._ring.place(_train_key(t) for t in self.trains)
+        placement = {t: owners[_train_key(t)] for t in self.trains}
+        moved = sum(1 for t in self.trains if placement[t] != self.placement[t])
+        self.placement = placement
+        if not moved:
+            return
+        self.rebalances += 1
+        logger.info(f"Rebalanced: {moved} of {len(self.trains)} trainsets moved "
+                    f"across {len(self._nodes)} workers")
+        for node in list(self._nodes.values()):
+            trains = {t for t, owner in placement.items() if owner == node.node_id}
+            if trains == node.trains:
+                continue
+            node.trains = trains
+            try:
+                await _send(node.writer, {
+                    "type": "assign",
+                    "trains": [[t, self._phases[t]] for t in self.trains if t in trains],
+                })
+            except (ConnectionError, RuntimeError):
+                pass   # its reader notices the hang-up and rebalances again
+
+
+# ── Worker ───────────────────────────────────────────────────
+
+class ClusterWorker:
+    """Runs the trainsets the coordinator assigns and forwards their writes."""
+
+    def __init__(self, address: str, node_id: str, processes: int = 0,
+                 flush_interval: float = FLUSH_INTERVAL, heartbeat: float = HEARTBEAT):
+        self.address = address
+        self.node_id = node_id
+        self.flush_interval = flush_interval
+        self.heartbeat = heartbeat
+        self.blackboard = Blackboard(history_capacity=WORKER_HISTORY)
+        self.orchestrator = Orchestrator(self.blackboard, processes=processes)
+        self.trains: set = set()
+
+    async def run(self):
+        """Serve until the coordinator says stop or goes away."""
+        host, port = parse_address(self.address)
+        reader, writer = await asyncio.open_connection(host, port)
+        await self.orchestrator.start_all()
+        await _send(writer, {"type": "hello", "node": self.node_id})
+        tasks = [asyncio.create_task(self._flush_forever(writer)),
+                 asyncio.create_task(self._heartbeat_forever(writer))]
+        try:
+            while True:
+                message = await _recv(reader)
+                if message.get("type") == "assign":
+                    self._assign(message["trains"])
+                elif message.get("type") == "stop":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            logger.error(f"Worker {self.node_id}: coordinator went away")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await self.orchestrator.close()
+            writer.close()
+
+    def _assign(self, trains: List[list]):
+        phases = {train_id: phase for train_id, phase in trains}
+        gone = self.trains - set(phases)
+        if gone:
+            removed = self.orchestrator.remove_agents(
+                [a.agent_id for a in self.orchestrator.agents
+                 if split_agent_id(a.agent_id)[0] in gone])
+            # Evicted here so nothing of theirs is forwarded again
+            for agent in removed:
+                for layer in self.blackboard.LAYER_NAMES:
+                    self.blackboard.evict(layer, agent.agent_id)
+        added = [train_id for train_id in phases if train_id not in self.trains]
+        if added:
+            # One call: the dependency graph is rebuilt once, not per trainset
+            self.orchestrator.add_agents([agent for train_id in added
+                                          for agent in build_roster(train_id, phase=phases[train_id])])
+        self.trains = set(phases)
+        logger.info(f"Worker {self.node_id}: {len(self.trains)} trainsets "
+                    f"(+{len(added)} -{len(gone)})")
+
+    async def _flush_forever(self, writer: asyncio.StreamWriter):
+        bb = self.blackboard
+        version = bb.get_version()
+        while True:
+            await bb.wait_for_change(None, since_version=version)
+            # Let the rest of the tick land, then forward it as one frame
+            await asyncio.sleep(self.flush_interval)
+            touched = {}
+            for change in bb.changes_since(version):
+                touched[(change["layer"], change["agent_id"])] = None
+                version = change["version"]
+            records, stale = [], []
+            for layer, agent_id in touched:
+                payload = bb.read_nowait(layer, agent_id)
+                if payload is None:
+                    continue   # evicted since
+                if payload["stale"]:
+                    stale.append([layer, agent_id])
+                else:
+                    records.append([layer, agent_id, payload["data"]])
+            if records or stale:
+                await _send(writer, {"type": "updates", "records": records, "stale": stale})
+
+    async def _heartbeat_forever(self, writer: asyncio.StreamWriter):
+        orchestrator = self.orchestrator
+        while True:
+            stats = orchestrator.schedule_stats()
+            await _send(writer, {
+                "type": "heartbeat",
+                "agents": [[a.agent_id, a.status] for a in orchestrator.agents],
+                "lag_ms": stats["lag_ms"],
+                "queued": stats["queued"],
+            })
+            await asyncio.sleep(self.heartbeat)
+
+
+def run_worker(address: str, node_id: str, processes: int = 0):
+    """Process entry point for one worker."""
+    logging.basicConfig(level=logging.INFO)
+    # RAILGUARD_LOOP is inherited from the coordinator's environment
+    run_loop(ClusterWorker(address, node_id, processes=processes).run())
+
+
+def spawn_worker(address: str, node_id: str, processes: int = 0) -> multiprocessing.Process:
+    """Start a worker in a fresh (spawned) local process."""
+    proc = multiprocessing.get_context("spawn").Process(
+        target=run_worker, args=(address, node_id, processes),
+        name=f"railguard-{node_id}", daemon=False)
+    proc.start()
+    return proc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RailGuard cluster worker")
+    parser.add_argument("role", choices=["worker"])
+    parser.add_argument("--connect", default=f"{DEFAULT_HOST}:{DEFAULT_PORT}",
+                        help="coordinator address, host:port")
+    parser.add_argument("--node", default=f"{os.uname().nodename}-{os.getpid()}",
+                        help="unique worker name")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="agent worker processes inside this worker")
+    args = parser.parse_args()
+    run_worker(args.connect, args.node, args.processes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+RailGuard 5000 — Field-Level Deltas
+Structural diffs between successive payloads of one (layer, agent_id), and a
+bounded log of them keyed by blackboard version.
+
+A delta is JSON-safe:
+
+    {"version", "layer", "agent_id", "timestamp",
+     "set":   {nested dict of changed/added keys with their new values},
+     "unset": [[key, subkey, ...], ...],      # removed key paths
+     "full":  bool}                           # True: "set" is the whole payload
+
+Dicts are diffed recursively; any other changed value (lists included) is
+sent whole. Consumers apply "set" as a recursive merge and drop "unset" paths.
+
+Staleness transitions (TTL expiry) add `"stale": true/false` to a delta,
+usually with an empty "set"; `"evicted": true` means the entry was removed.
+"""
+from collections import deque
+from typing import Dict, Any, List, Tuple, Iterator, Optional
+
+DEFAULT_MAX_CHANGES = 10000
+
+
+def diff(old: dict, new: dict, path: Tuple[str, ...] = (),
+         unset: Optional[List[List[str]]] = None) -> Tuple[dict, List[List[str]]]:
+    """Return (set, unset) turning `old` into `new`."""
+    if unset is None:
+        unset = []
+    changed = {}
+    added = 0
+    for key, value in new.items():
+        if key not in old:
+            changed[key] = value
+            added += 1
+            continue
+        before = old[key]
+        if before is value or before == value:
+            continue
+        if type(before) is dict and type(value) is dict:
+            sub, _ = diff(before, value, path + (key,), unset)
+            if sub:
+                changed[key] = sub
+        else:
+            changed[key] = value
+    if len(new) - added < len(old):
+        unset.extend(list(path + (k,)) for k in old if k not in new)
+    return changed, unset
+
+
+def apply_delta(payload: Optional[dict], delta: dict) -> Optional[dict]:
+    """Apply one delta to a consumer-side copy of a payload and return it (None once evicted)."""
+    if delta.get("evicted"):
+        return None
+    if delta.get("full") or payload is None:
+        return _merge({}, delta["set"])
+    result = _merge(payload, delta["set"])
+    for keys in delta.get("unset", ()):
+        node = result
+        for key in keys[:-1]:
+            node = node.get(key, {})
+        node.pop(keys[-1], None)
+    return result
+
+
+def _merge(base: dict, patch: dict) -> dict:
+    out = dict(base)
+    for key, value in patch.items():
+        if type(value) is dict and type(out.get(key)) is dict:
+            out[key] = _merge(out[key], value)
+        else:
+            out[key] = value
+    return out
+
+
+class ChangeLog:
+    """Bounded, version-ordered log of payload deltas."""
+
+    def __init__(self, max_changes: int = DEFAULT_MAX_CHANGES):
+        self._log: deque = deque(maxlen=max_changes)
+
+    def record(self, version: int, layer: int, agent_id: str, timestamp: float,
+               previous: Optional[dict], data: dict, stale: Optional[bool] = None):
+        if previous is None:
+            changed, unset, full = data, [], True
+        else:
+            changed, unset = diff(previous, data)
+            full = False
+        change = {
+            "version": version,
+            "layer": layer,
+            "agent_id": agent_id,
+            "timestamp": timestamp,
+            "set": changed,
+            "unset": unset,
+            "full": full,
+        }
+        if stale is not None:
+            change["stale"] = stale
+        self._log.append(change)
+
+    def record_state(self, version: int, layer: int, agent_id: str, timestamp: float,
+                     stale: Optional[bool] = None, evicted: bool = False):
+        """A change to an entry's state rather than its data (stale flag, eviction)."""
+        change = {
+            "version": version,
+            "layer": layer,
+            "agent_id": agent_id,
+            "timestamp": timestamp,
+            "set": {},
+            "unset": [],
+            "full": False,
+        }
+        if stale is not None:
+            change["stale"] = stale
+        if evicted:
+            change["evicted"] = True
+        self._log.append(change)
+
+    def oldest_version(self) -> int:
+        return self._log[0]["version"] if self._log else 0
+
+    def since(self, version: int) -> Optional[List[dict]]:
+        """
+        Deltas with a version newer than `version`, oldest first, or None if
+        the log no longer reaches back that far. Costs O(returned deltas).
+        """
+        log = self._log
+        if log and len(log) == log.maxlen and version + 1 < log[0]["version"]:
+            return None
+        out = []
+        for change in reversed(log):
+            if change["version"] <= version:
+                break
+            out.append(change)
+        out.reverse()
+        return out
@@ -0,0 +1,73 @@
+"""
+RailGuard 5000 — Event Loop Selection
+Agents, the WebSocket feeds and HTTP chat all share one event loop, so its
+per-callback overhead is paid on every tick. RAILGUARD_LOOP picks the
+implementation:
+
+    auto     uvloop if it is installed, else asyncio (default)
+    uvloop   uvloop; falls back to asyncio with a warning if missing
+    asyncio  the standard library loop
+
+uvloop is optional (`pip install uvloop`, Linux/macOS only). `python main.py`
+passes the choice to uvicorn; under the uvicorn CLI use `--loop` instead,
+since the loop exists before main.py is imported.
+"""
+import asyncio
+import logging
+import os
+from typing import Callable, List, Optional
+
+logger = logging.getLogger("EventLoop")
+
+LOOPS = ("auto", "uvloop", "asyncio")
+DEFAULT_LOOP = "auto"
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+def available_loops() -> List[str]:
+    """Concrete loop implementations importable here."""
+    return ["asyncio"] + (["uvloop"] if uvloop is not None else [])
+
+
+def resolve_loop(name: Optional[str] = None) -> str:
+    """
+    The loop to actually use for setting `name` (default: RAILGUARD_LOOP):
+    "uvloop" or "asyncio". Unknown or unavailable choices fall back to
+    asyncio with a warning rather than failing the boot.
+    """
+    if name is None:
+        name = os.environ.get("RAILGUARD_LOOP", DEFAULT_LOOP)
+    name = name.strip().lower() or DEFAULT_LOOP
+    if name not in LOOPS:
+        logger.warning(f"Unknown RAILGUARD_LOOP {name!r} (expected one of {', '.join(LOOPS)}); using asyncio")
+        return "asyncio"
+    if name == "asyncio":
+        return "asyncio"
+    if uvloop is None:
+        if name == "uvloop":
+            logger.warning("RAILGUARD_LOOP=uvloop but uvloop is not installed; using asyncio")
+        return "asyncio"
+    return "uvloop"
+
+
+def loop_factory(name: Optional[str] = None) -> Callable[[], asyncio.AbstractEventLoop]:
+    """A callable creating a fresh loop of the resolved kind."""
+    if resolve_loop(name) == "uvloop":
+        return uvloop.new_event_loop
+    return asyncio.new_event_loop
+
+
+def run(coro, name: Optional[str] = None):
+    """`asyncio.run(coro)` on the selected loop."""
+    with asyncio.Runner(loop_factory=loop_factory(name)) as runner:
+        return runner.run(coro)
+
+
+def loop_name(loop: Optional[asyncio.AbstractEventLoop] = None) -> str:
+    """Which implementation a running loop is, for status reports."""
+    loop = loop or asyncio.get_running_loop()
+    return "uvloop" if type(loop).__module__.startswith("uvloop") else "asyncio"
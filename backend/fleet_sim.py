@@ -0,0 +1,616 @@
+"""
+RailGuard 5000 — Vectorized Fleet Simulator
+Load-tests the engine with large fleets. Instead of 50 agent objects per
+trainset, each drawing its fields with scalar `random.uniform`, one tick
+draws every field once across all the trainsets due for that agent (one
+NumPy call per field) and hands the payloads to `Blackboard.write_many`.
+
+Payloads have the same field names, ranges, rounding and types as the
+agents' `sample()` in all_agents.py (SPECS mirrors them field by field),
+so dashboards, indexes and the chatbot can't tell the difference. Each
+trainset keeps the roster's intervals and its own start-up phase, as
+build_fleet() would give it, and an agent with declared inputs also
+steps on the same tick as any of its inputs.
+
+    sim = FleetSimulator(bb, [f"T{i:04d}" for i in range(1000)])
+    await sim.start_all()
+
+FleetSimulator stands in for the Orchestrator in main.py
+(RAILGUARD_SIMULATOR=vectorized).
+"""
+import asyncio
+import logging
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from all_agents import ROSTER, TRAIN_SEP
+    from vibration import AXLE_BOX_BEARING, DEFECT_SNR_DB, DEFECTS, shaft_hz
+except ImportError:
+    from backend.all_agents import ROSTER, TRAIN_SEP
+    from backend.vibration import AXLE_BOX_BEARING, DEFECT_SNR_DB, DEFECTS, shaft_hz
+
+logger = logging.getLogger("FleetSim")
+
+DEFAULT_TICK = 0.05     # the fastest agents (A7, A11) run every 50 ms
+GOLDEN = 0.6180339887   # same per-train phase spread as build_fleet()
+
+
+# ── Vectorized draws (n rows each) ───────────────────────────
+
+class _Const:
+    """A value repeated in every row (lists are copied per row)."""
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+def _u(r, n, lo, hi, nd):
+    """round(random.uniform(lo, hi), nd)"""
+    return np.round(r.uniform(lo, hi, n), nd)
+
+
+def _i(r, n, lo, hi):
+    """random.randint(lo, hi), inclusive"""
+    return r.integers(lo, hi + 1, n)
+
+
+def _p(r, n, p):
+    """random.random() > p"""
+    return r.random(n) > p
+
+
+def _c(r, n, options):
+    """random.choice(options)"""
+    return np.array(options, dtype=object)[r.integers(0, len(options), n)]
+
+
+def _sample(r, n, options, k_low, k_high):
+    """random.sample(options, k=random.randint(k_low, k_high))"""
+    order = np.argsort(r.random((n, len(options))), axis=1).tolist()
+    ks = _i(r, n, k_low, k_high).tolist()
+    return [[options[j] for j in row[:k]] for row, k in zip(order, ks)]
+
+
+def _a2(r, n):
+    # Frames aren't rendered here: the fields of A2's summary (see _summary there)
+    cameras = ["bogie_left", "bogie_right"]
+    regions = ["wheel_bogie_1", "wheel_bogie_2", "bearing_assembly", "brake_disc"]
+    ambient = _u(r, n, 10, 35, 1)
+    hot = r.random(n) > 0.98
+    camera = r.integers(0, len(cameras), n).tolist()
+    region = r.integers(0, len(regions), n).tolist()
+    peak = np.round(ambient + r.uniform(60, 130, n), 1).tolist()
+    return {
+        "source": _Const("summary"),
+        "temperatures": {
+            "wheel_bogie_1": np.round(ambient + r.uniform(15, 35, n), 1),
+            "wheel_bogie_2": np.round(ambient + r.uniform(15, 35, n), 1),
+            "bearing_assembly": np.round(ambient + r.uniform(20, 45, n), 1),
+            "brake_disc": np.round(ambient + r.uniform(35, 80, n), 1),
+        },
+        "hotspot_detected": hot,
+        "ambient_temp_c": ambient,
+        "hotspot_count": hot.astype(int),
+        # As A2's summary: no geometry or growth without frame analysis
+        "hotspots": [[{"id": 1, "camera": cameras[c], "region": regions[k], "max_c": p}] if h else []
+                     for h, c, k, p in zip(hot.tolist(), camera, region, peak)],
+        "frames_analyzed": _Const(15),
+        "cameras": _Const(cameras),
+    }
+
+
+def _a3(r, n):
+    # Hit streams aren't synthesized here: same fields, values in the ranges A3 reports
+    positions = ["bearing_left", "axle_center", "bearing_right"]
+    counts = {position: _i(r, n, 0, 15) for position in positions}
+    hits = np.sum(list(counts.values()), axis=0)
+    events = np.minimum(_i(r, n, 0, 8), hits // 2)
+    crack = r.random(n) > 0.995
+    where = np.round(r.uniform(0.05, 1.95, n), 3)
+    return {
+        "positions": counts,
+        "hits": hits,
+        "max_amplitude_db": np.where(hits > 0, _u(r, n, 50, 85, 1), 0.0),
+        "energy_aj": np.where(hits > 0, _u(r, n, 1e4, 2e6, 1), 0.0),
+        "rise_time_us": np.where(hits > 0, _u(r, n, 5, 250, 1), 0.0),
+        "events_located": events,
+        "source_locations_m": [np.round(r.uniform(0, 2, k), 3).tolist() for k in events.tolist()],
+        "crack_signature_detected": crack,
+        "crack_location_m": [x if c else None for x, c in zip(where.tolist(), crack.tolist())],
+        "peak_frequency_khz": np.where(hits > 0, _u(r, n, 30, 300, 1), 0.0),
+    }
+
+
+def _a4(r, n):
+    # Analysed spectra aren't re-derived here: the fields of A4's summary (see _summary there)
+    # Both are linear (positive speeds): scale the whole column at once
+    shaft = r.uniform(60, 130, n) * shaft_hz(1.0)
+    per_hz = AXLE_BOX_BEARING.frequencies(1.0)
+    freqs = {name: shaft * per_hz[name] for name in DEFECTS}
+    # No episode state per row: a defect line shows in ~2% of rows, and
+    # alerts follow from its SNR as they do from an analysed spectrum
+    snr = {name: np.round(np.where(r.random(n) > 0.98, r.uniform(15, 30, n), r.uniform(3, 12, n)), 1)
+           for name in DEFECTS}
+    alerts = {name: snr[name] >= DEFECT_SNR_DB for name in DEFECTS}
+    positions = ["bearing_left", "bearing_right", "axle_box"]
+    where = r.integers(0, len(positions), n).tolist()
+    any_alert = np.logical_or.reduce(list(alerts.values())).tolist()
+    return {
+        "source": _Const("summary"),
+        "dominant_freq_hz": np.round(np.round(87 * shaft / 25) * 25, 1),
+        "amplitude_g": _u(r, n, 1.2, 2.6, 3),
+        "rms_g": _u(r, n, 0.40, 0.45, 3),
+        "shaft_hz": np.round(shaft, 2),
+        "defect_freqs_hz": {name: np.round(f, 1) for name, f in freqs.items()},
+        "defect_snr_db": snr,
+        "bpfi_alert": alerts["bpfi"],
+        "bpfo_alert": alerts["bpfo"],
+        "bsf_alert": alerts["bsf"],
+        "alert_positions": [[positions[w]] if a else [] for w, a in zip(where, any_alert)],
+        "positions": _Const(positions),
+    }
+
+
+def _a5(r, n):
+    loads = {f"axle_{i}": _u(r, n, 5000, 25000, 0) for i in range(1, 5)}
+    stacked = np.stack(list(loads.values()))
+    return {
+        "axle_loads_kg": loads,
+        "total_weight_kg": np.round(stacked.sum(axis=0), 0),
+        "overload": (stacked > 23000).any(axis=0),
+        "balance_ok": _p(r, n, 0.1),
+    }
+
+
+def _a7(r, n):
+    spd = _u(r, n, 60, 130, 1)
+    return {
+        "latitude": np.round(59.9139 + r.uniform(-0.05, 0.05, n), 5),
+        "longitude": np.round(10.7522 + r.uniform(-0.05, 0.05, n), 5),
+        "speed_kmh": spd,
+        "encoder_speed_kmh": np.round(spd + r.uniform(-1, 1, n), 1),
+        "gps_accuracy_m": _u(r, n, 0.5, 3.0, 2),
+    }
+
+
+def _a19(r, n):
+    health = _u(r, n, 62, 97, 1)
+    return {
+        "bearing_id": _Const("BRG-A34"),
+        "health_pct": health,
+        "wear_stage": np.where(health > 75, "early", np.where(health > 50, "moderate", "critical")),
+        "temperature_c": _u(r, n, 40, 95, 1),
+        "vibration_g": _u(r, n, 0.5, 8.0, 2),
+        "rul_km": _u(r, n, 20000, 80000, 0),
+    }
+
+
+def _a22(r, n):
+    thickness = _u(r, n, 5, 28, 1)
+    return {
+        "thickness_mm": thickness,
+        "wear_pct": np.round(100 - (thickness / 30) * 100, 1),
+        "replace_at_mm": _Const(6.0),
+        "needs_replacement": thickness < 8,
+    }
+
+
+def _a26(r, n):
+    oil_level = _u(r, n, 20, 100, 1)
+    return {
+        "oil_level_pct": oil_level,
+        "viscosity_cst": _u(r, n, 40, 100, 1),
+        "contamination_level": _u(r, n, 0, 0.4, 3),
+        "relubrication_needed": oil_level < 35,
+    }
+
+
+def _a39(r, n):
+    score = _i(r, n, 1, 100)
+    return {
+        "criticality_score": score,
+        "risk_matrix": np.round(r.uniform(0, 1, (n, 2)), 2),
+        "urgency": np.where(score > 80, "critical", np.where(score > 50, "soon", "routine")),
+    }
+
+
+# Local agent id -> fields for n rows, mirroring each agent's sample()
+SPECS: Dict[str, Callable] = {
+    "A1": lambda r, n: {
+        "frame_rate": _Const(200),
+        "cameras": _Const(["front", "side_left", "side_right", "underbody"]),
+        "exposure_ms": _u(r, n, 0.5, 5.0, 2),
+        "light_level_lux": _u(r, n, 50, 5000, 1),
+        "motion_blur": _p(r, n, 0.5),
+    },
+    "A2": _a2,
+    "A3": _a3,
+    "A4": _a4,
+    "A5": _a5,
+    "A6": lambda r, n: {
+        "temperature_c": _u(r, n, -10, 45, 1),
+        "humidity_pct": _u(r, n, 20, 95, 1),
+        "pressure_hpa": _u(r, n, 960, 1040, 1),
+        "precipitation_mm": _u(r, n, 0, 15, 2),
+        "wind_speed_kmh": _u(r, n, 0, 80, 1),
+    },
+    "A7": _a7,
+    "A8": lambda r, n: {
+        "battery_pct": _u(r, n, 55, 100, 1),
+        "power_draw_w": {"jetson": _u(r, n, 15, 45, 1),
+                         "cameras": _u(r, n, 5, 15, 1),
+                         "sensors": _u(r, n, 2, 10, 1)},
+        "charging": _p(r, n, 0.7),
+        "estimated_remaining_h": _u(r, n, 2, 20, 1),
+    },
+    "A9": lambda r, n: {
+        "sources_checked": _Const(["visual", "thermal", "acoustic", "vibration"]),
+        "all_valid": _p(r, n, 0.05),
+        "corruption_rate_pct": _u(r, n, 0, 2, 2),
+        "quality_score": _u(r, n, 0.85, 1.0, 3),
+    },
+    "A10": lambda r, n: {
+        "fusion_confidence": _u(r, n, 0.75, 0.99, 3),
+        "components_fused": _Const(["bearing_1", "bearing_2", "wheel_1", "axle"]),
+        "fusion_latency_ms": _u(r, n, 5, 30, 2),
+    },
+    "A11": lambda r, n: {
+        "psnr_improvement_db": _u(r, n, 4, 16, 2),
+        "frames_processed": _i(r, n, 1, 10),
+        "processing_ms": _u(r, n, 8, 60, 1),
+    },
+    "A12": lambda r, n: {
+        "light_level_lux": _u(r, n, 5, 500, 1),
+        "enhancement_factor": _u(r, n, 1.2, 5.0, 2),
+        "quality_after": _u(r, n, 0.75, 0.98, 3),
+    },
+    "A13": lambda r, n: {
+        "data_loss_pct": _u(r, n, 0, 30, 1),
+        "reconstruction_confidence": _u(r, n, 0.75, 0.99, 3),
+    },
+    "A14": lambda r, n: {
+        "emi_level": _u(r, n, 0, 1, 3),
+        "snr_improvement_db": _u(r, n, 5, 25, 1),
+        "signal_quality": _u(r, n, 0.75, 0.99, 3),
+    },
+    "A15": lambda r, n: {
+        "upscale_factor": _Const(4),
+        "psnr": _u(r, n, 28, 38, 2),
+        "ssim": _u(r, n, 0.85, 0.97, 3),
+    },
+    "A16": lambda r, n: {
+        "frames_interpolated": _i(r, n, 2, 20),
+        "motion_smoothness": _u(r, n, 0.85, 0.99, 3),
+    },
+    "A17": lambda r, n: {
+        "compression_ratio": _u(r, n, 15, 80, 1),
+        "data_saved_mb": _u(r, n, 10, 200, 1),
+        "quality_preserved_pct": _u(r, n, 88, 99, 1),
+    },
+    "A18": lambda r, n: {
+        "anomalies_detected": _i(r, n, 0, 4),
+        "roi_count": _i(r, n, 0, 8),
+        "confidence": _u(r, n, 0.65, 0.97, 3),
+    },
+    "A19": _a19,
+    "A20": lambda r, n: {
+        "flat_detected": _p(r, n, 0.85),
+        "flat_depth_mm": _u(r, n, 0, 3.5, 2),
+        "impact_force_kn": _u(r, n, 0, 40, 1),
+        "wheel_id": _c(r, n, ["W1", "W2", "W3", "W4"]),
+    },
+    "A21": lambda r, n: {
+        "crack_length_mm": _u(r, n, 0, 3.5, 2),
+        "crack_depth_mm": _u(r, n, 0, 1.2, 2),
+        "growth_rate_mm_per_1000km": _u(r, n, 0.01, 0.08, 3),
+        "critical_length_mm": _Const(4.5),
+        "axle_id": _Const("AX-01"),
+    },
+    "A22": _a22,
+    "A23": lambda r, n: {
+        "damper_efficiency_pct": _u(r, n, 72, 98, 1),
+        "spring_deflection_mm": _u(r, n, 5, 25, 1),
+        "ride_quality_index": _u(r, n, 0.6, 1.0, 2),
+    },
+    "A24": lambda r, n: {
+        "draft_force_kn": _u(r, n, 10, 250, 1),
+        "buff_force_kn": _u(r, n, 5, 150, 1),
+        "slack_mm": _u(r, n, 0, 15, 1),
+        "status": _c(r, n, ["OK", "OK", "OK", "WARNING"]),
+    },
+    "A25": lambda r, n: {
+        "contact_patch_mm2": _u(r, n, 120, 250, 1),
+        "flange_thickness_mm": _u(r, n, 22, 32, 1),
+        "derailment_coefficient": _u(r, n, 0.05, 0.55, 3),
+        "derailment_risk": np.where(_p(r, n, 0.1), "low", "medium"),
+    },
+    "A26": _a26,
+    "A27": lambda r, n: {
+        "loose_fasteners_detected": _i(r, n, 0, 3),
+        "torque_deficit_nm": _u(r, n, 0, 50, 1),
+        "locations": _sample(r, n, ["bogie_bolt_L1", "axle_cap_R2", "body_mount_3"], 0, 2),
+    },
+    "A28": lambda r, n: {
+        "affected_area_pct": _u(r, n, 0, 15, 1),
+        "max_depth_mm": _u(r, n, 0, 2.5, 2),
+        "severity": _c(r, n, ["none", "mild", "mild", "moderate"]),
+        "locations": _sample(r, n, ["bogie_frame", "body_underside", "axle_journal"], 1, 1),
+    },
+    "A29": lambda r, n: {
+        "rul_pct": _u(r, n, 40, 95, 1),
+        "cycles_completed": _i(r, n, 500000, 2000000),
+        "design_life_cycles": _Const(5000000),
+        "crack_initiation_risk": _u(r, n, 0.01, 0.2, 3),
+    },
+    "A30": lambda r, n: {
+        "wheel_diameter_mm": _u(r, n, 856, 920, 1),
+        "out_of_round_mm": _u(r, n, 0, 1.5, 3),
+        "axle_parallelism_deviation_mm": _u(r, n, 0, 0.8, 3),
+    },
+    "A31": lambda r, n: {
+        "predictions": {
+            "bearing_1": {"ttf_hours": _u(r, n, 10, 200, 1), "confidence": _u(r, n, 0.7, 0.97, 3)},
+            "wheel_1": {"ttf_hours": _u(r, n, 50, 500, 1), "confidence": _u(r, n, 0.7, 0.97, 3)},
+        },
+        "model": _Const("LSTM-v3"),
+    },
+    "A32": lambda r, n: {
+        "models_voting": _i(r, n, 5, 10),
+        "consensus_score": _u(r, n, 0.7, 0.99, 3),
+        "final_prediction": _c(r, n, ["healthy", "healthy", "warning", "critical"]),
+    },
+    "A33": lambda r, n: {
+        "aleatoric": _u(r, n, 0.05, 0.25, 3),
+        "epistemic": _u(r, n, 0.02, 0.15, 3),
+        "confidence_interval_low": _u(r, n, 10, 30, 1),
+        "confidence_interval_high": _u(r, n, 70, 95, 1),
+    },
+    "A34": lambda r, n: {
+        "novelty_score": _u(r, n, 0, 1, 3),
+        "rare_event_detected": _p(r, n, 0.85),
+        "similar_to_known": _p(r, n, 0.5),
+        "needs_expert_review": _p(r, n, 0.9),
+    },
+    "A35": lambda r, n: {
+        "sync_status": _c(r, n, ["synced", "synced", "syncing", "drift"]),
+        "model_accuracy_pct": _u(r, n, 88, 99, 1),
+        "discrepancy_mm": _u(r, n, 0, 1.5, 2),
+    },
+    "A36": lambda r, n: {
+        "scenarios": {
+            "high_speed": {"failure_risk": _u(r, n, 0, 0.8, 2), "ttf_hours": _u(r, n, 1, 50, 1)},
+            "heavy_load": {"failure_risk": _u(r, n, 0, 0.6, 2), "ttf_hours": _u(r, n, 5, 100, 1)},
+            "extreme_cold": {"failure_risk": _u(r, n, 0, 0.4, 2), "ttf_hours": _u(r, n, 10, 200, 1)},
+        }
+    },
+    "A37": lambda r, n: {
+        "similar_cases_found": _i(r, n, 0, 25),
+        "best_match_score": _u(r, n, 0.6, 0.99, 3),
+        "historical_outcome": _c(r, n, ["replaced", "repaired", "monitored", "no_action"]),
+    },
+    "A38": lambda r, n: {
+        "source_fleet": _c(r, n, ["fleet_A", "fleet_B", "fleet_C"]),
+        "domain_similarity_pct": _u(r, n, 60, 95, 1),
+        "adaptation_progress_pct": _u(r, n, 0, 100, 1),
+        "performance_gain_pct": _u(r, n, 0, 20, 1),
+    },
+    "A39": _a39,
+    "A40": lambda r, n: {
+        "next_maintenance_location": _c(r, n, ["station_A", "depot_B", "next_available"]),
+        "hours_until_maintenance": _u(r, n, 0.5, 48, 1),
+        "parts_available": _p(r, n, 0.5),
+        "crew_available": _p(r, n, 0.5),
+    },
+    "A41": lambda r, n: {
+        "action": _c(r, n, ["replace", "repair", "monitor", "adjust", "lubricate"]),
+        "parts_count": _i(r, n, 1, 5),
+        "estimated_time_min": _i(r, n, 15, 180),
+        "complexity": _c(r, n, ["simple", "moderate", "complex"]),
+    },
+    "A42": lambda r, n: {
+        "alerts_total": _i(r, n, 0, 40),
+        "alerts_critical": _i(r, n, 0, 4),
+        "alerts_warning": _i(r, n, 0, 12),
+        "alerts_info": _i(r, n, 0, 25),
+        "suppressed": _i(r, n, 0, 8),
+    },
+    "A43": lambda r, n: {
+        "explanations_generated": _i(r, n, 0, 10),
+        "user_satisfaction": _u(r, n, 0.7, 1.0, 2),
+        "active_panels": _i(r, n, 1, 6),
+    },
+    "A44": lambda r, n: {
+        "alerts_voiced": _i(r, n, 0, 5),
+        "acknowledged_pct": _u(r, n, 0.8, 1.0, 2),
+        "last_alert": _c(r, n, ["Bearing temperature elevated", "Wheel flat detected", "System nominal", ""]),
+    },
+    "A45": lambda r, n: {
+        "nodes_connected": _i(r, n, 5, 10),
+        "total_nodes": _Const(10),
+        "avg_signal_dbm": _u(r, n, -65, -35, 1),
+        "paths_optimized": _i(r, n, 0, 5),
+    },
+    "A46": lambda r, n: {
+        "pending_packets": _i(r, n, 0, 500),
+        "storage_used_mb": _u(r, n, 0, 250, 1),
+        "priority_queued": _i(r, n, 0, 50),
+    },
+    "A47": lambda r, n: {
+        "available_mbps": _u(r, n, 10, 100, 1),
+        "allocated_mbps": _u(r, n, 5, 50, 1),
+        "congestion_level": _u(r, n, 0, 1, 2),
+    },
+    "A48": lambda r, n: {
+        "conflicts_detected": _i(r, n, 0, 4),
+        "conflicts_resolved": _i(r, n, 0, 4),
+        "consistency_score": _u(r, n, 0.92, 1.0, 3),
+    },
+    "A49": lambda r, n: {
+        "tasks_on_edge": _i(r, n, 10, 50),
+        "tasks_on_cloud": _i(r, n, 0, 20),
+        "latency_ms": _u(r, n, 10, 120, 1),
+        "cost_usd_per_hour": _u(r, n, 0.05, 2.5, 3),
+    },
+    "A50": lambda r, n: {
+        "agents_healthy": _i(r, n, 47, 50),
+        "agents_total": _Const(50),
+        "healing_actions_taken": _i(r, n, 0, 3),
+        "system_integrity_pct": _u(r, n, 94, 100, 1),
+    },
+}
+
+
+def rows(columns: dict, n: int) -> List[dict]:
+    """Turn {field: column} (nested dicts allowed) into n payload dicts."""
+    keys, cols = [], []
+    for key, column in columns.items():
+        keys.append(key)
+        if type(column) is dict:
+            cols.append(rows(column, n))
+        elif type(column) is _Const:
+            value = column.value
+            cols.append([list(value) for _ in range(n)] if type(value) is list else [value] * n)
+        elif isinstance(column, np.ndarray):
+            # tolist() gives plain Python floats/ints/bools/strs (JSON-safe)
+            cols.append(column.tolist())
+        else:
+            cols.append(column)
+    return [dict(zip(keys, row)) for row in zip(*cols)]
+
+
+# ── Simulator ────────────────────────────────────────────────
+
+class _AgentTrack:
+    """One roster agent across the whole fleet."""
+
+    def __init__(self, template, train_ids: List[Optional[str]], start: float):
+        self.local_id = template.agent_id
+        self.name = template.name
+        self.layer = template.layer
+        self.interval = template.interval
+        self.inputs = tuple(source for _, source in template.inputs)
+        self.spec = SPECS[self.local_id]
+        self.agent_ids = [f"{t}{TRAIN_SEP}{self.local_id}" if t else self.local_id for t in train_ids]
+        phases = np.array([(i * GOLDEN) % 1.0 for i in range(len(train_ids))])
+        # First due time: next aligned tick (multiple of interval, plus phase), as the Orchestrator does
+        self.next_due = (np.ceil(start / self.interval - phases) + phases) * self.interval
+        self.runs = 0
+        self.skipped = 0
+
+
+class FleetSimulator:
+    """
+    Generates the whole fleet's telemetry tick by tick, vectorized per
+    agent across trainsets. Stands in for the Orchestrator (`start_all`,
+    `close`, `agents`, `schedule_stats`).
+    """
+
+    def __init__(self, blackboard, train_ids: Iterable[Optional[str]], tick: float = DEFAULT_TICK,
+                 seed: Optional[int] = None):
+        self.blackboard = blackboard
+        self.train_ids: List[Optional[str]] = list(train_ids) or [None]
+        self.tick_interval = tick
+        self.rng = np.random.default_rng(seed)
+        self._templates = [cls() for cls in ROSTER]
+        self._tracks: List[_AgentTrack] = []
+        self._task: Optional[asyncio.Task] = None
+        self._ticks = 0
+        self._records = 0
+        self._busy = 0.0
+
+    @property
+    def agents(self) -> List[SimpleNamespace]:
+        # One status per roster agent: the fleet runs (or stops) as a whole
+        status = "running" if self._task is not None else "idle"
+        return [SimpleNamespace(agent_id=t.agent_id, name=t.name, status=status) for t in self._templates]
+
+    def _ensure_tracks(self, now: float):
+        if not self._tracks:
+            by_id = {t.agent_id: _AgentTrack(t, self.train_ids, now) for t in self._templates}
+            # Producers before their consumers, so a cascade lands in one tick
+            order: List[_AgentTrack] = []
+            placed: set = set()
+            while len(order) < len(by_id):
+                for track in by_id.values():
+                    if track.local_id not in placed and all(s in placed or s not in by_id for s in track.inputs):
+                        order.append(track)
+                        placed.add(track.local_id)
+            self._tracks = order
+
+    def tick(self, now: float) -> List[Tuple[int, str, dict]]:
+        """Payloads of every (agent, trainset) due at `now`, as write_many records."""
+        self._ensure_tracks(now)
+        rng = self.rng
+        records: List[Tuple[int, str, dict]] = []
+        stepped: Dict[str, np.ndarray] = {}
+        for track in self._tracks:
+            due = track.next_due <= now
+            for source in track.inputs:
+                fired = stepped.get(source)
+                if fired is not None:
+                    due |= fired
+            stepped[track.local_id] = due
+            idx = np.flatnonzero(due)
+            if not len(idx):
+                continue
+            payloads = rows(track.spec(rng, len(idx)), len(idx))
+            layer, agent_ids = track.layer, track.agent_ids
+            records.extend((layer, agent_ids[i], payload) for i, payload in zip(idx.tolist(), payloads))
+            # Next due after now, counting periods skipped by a late tick
+            interval = track.interval
+            late = track.next_due[idx] + interval
+            behind = late <= now
+            if behind.any():
+                skips = np.floor((now - late[behind]) / interval) + 1
+                track.skipped += int(skips.sum())
+                late[behind] += skips * interval
+            track.next_due[idx] = late
+            track.runs += len(idx)
+        return records
+
+    async def start_all(self):
+        logger.info(f"Simulating {len(self.train_ids)} trainsets "
+                    f"({len(self.train_ids) * len(self._templates)} agents), vectorized")
+        self._task = asyncio.create_task(self._run_forever())
+
+    async def _run_forever(self):
+        loop = asyncio.get_running_loop()
+        bb = self.blackboard
+        due = loop.time()
+        while True:
+            start = time.perf_counter()
+            records = self.tick(loop.time())
+            await bb.write_many(records)
+            self._busy += time.perf_counter() - start
+            self._ticks += 1
+            self._records += len(records)
+            due += self.tick_interval
+            delay = due - loop.time()
+            if delay < 0:
+                due = loop.time()   # can't keep up; don't try to catch up in a burst
+                delay = 0
+            await asyncio.sleep(delay)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            # Wait it out, so no tick writes after close() returns
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def schedule_stats(self) -> dict:
+        """JSON-safe tick and per-agent counters."""
+        return {
+            "mode": "vectorized",
+            "trainsets": len(self.train_ids),
+            "ticks": self._ticks,
+            "records": self._records,
+            "busy_ms_per_tick": round(self._busy * 1000 / max(self._ticks, 1), 2),
+            "agents": {t.local_id: {"runs": t.runs, "skipped": t.skipped, "interval": t.interval}
+                       for t in self._tracks},
+        }
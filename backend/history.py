@@ -0,0 +1,117 @@
+"""
+RailGuard 5000 — Blackboard History
+Bounded, columnar history for every (layer, agent_id) on the blackboard.
+
+Numeric leaf fields of each payload (nested dicts are flattened to dotted
+paths, e.g. "temperatures.brake_disc") are kept in preallocated NumPy ring
+buffers next to a shared timestamp column. Memory per entry is fixed at
+creation, so a 20 Hz writer costs the same after a day as after a minute.
+
+Each ring is stored twice back-to-back ("mirrored"): every sample is written
+to slot i and slot i + capacity. The newest N samples are therefore always one
+contiguous slice, and `window()` can hand out views without copying.
+
+That costs 16 bytes per sample per column: ~2.5 MiB per trainset at the
+default capacity, so a fleet gets a smaller capacity from
+`fleet_capacity()` that keeps all its rings within FLEET_HISTORY_BUDGET.
+"""
+from typing import Dict, Any, Iterator, Tuple, Optional, List
+
+import numpy as np
+
+DEFAULT_CAPACITY = 1024
+MIN_CAPACITY = 16
+# Ring memory a whole fleet may use, across all trainsets
+FLEET_HISTORY_BUDGET = 256 * 1024 * 1024
+# Ring columns one trainset writes: 42 entries' timestamps plus ~120 numeric fields
+_TRAINSET_COLUMNS = 163
+
+
+def _numeric_leaves(data: dict, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    """Yield (dotted_path, value) for every int/float leaf. Bools are flags, not numbers."""
+    for key, value in data.items():
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, (int, float)):
+            yield prefix + key, value
+        elif isinstance(value, dict):
+            yield from _numeric_leaves(value, prefix + key + ".")
+
+
+def fleet_capacity(trainsets: int, budget: int = FLEET_HISTORY_BUDGET) -> int:
+    """
+    Largest power-of-two capacity (MIN_CAPACITY..DEFAULT_CAPACITY) whose
+    mirrored rings for `trainsets` trainsets fit in `budget` bytes.
+    """
+    per_sample = max(trainsets, 1) * _TRAINSET_COLUMNS * 2 * 8
+    capacity = DEFAULT_CAPACITY
+    while capacity > MIN_CAPACITY and capacity * per_sample > budget:
+        capacity //= 2
+    return capacity
+
+
+def _readonly(arr: np.ndarray) -> np.ndarray:
+    arr.flags.writeable = False
+    return arr
+
+
+class RingHistory:
+    """Fixed-size timestamped history of the numeric fields of one entry."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._ts = np.zeros(2 * capacity)
+        self._cols: Dict[str, np.ndarray] = {}
+        self._head = 0    # next slot to write, in [0, capacity)
+        self._count = 0   # samples held, saturates at capacity
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self._cols)
+
+    def append(self, timestamp: float, data: dict):
+        cap = self.capacity
+        i = self._head
+        j = i + cap
+        self._ts[i] = self._ts[j] = timestamp
+
+        cols = self._cols
+        seen = set()
+        for field, value in _numeric_leaves(data):
+            col = cols.get(field)
+            if col is None:
+                # Field appeared mid-stream: older samples read as NaN
+                col = cols[field] = np.full(2 * cap, np.nan)
+            col[i] = col[j] = value
+            seen.add(field)
+        if len(seen) < len(cols):
+            for field, col in cols.items():
+                if field not in seen:
+                    col[i] = col[j] = np.nan
+
+        self._head = (i + 1) % cap
+        if self._count < cap:
+            self._count += 1
+
+    def window(self, field: str, window: Optional[int] = None,
+               since: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return read-only (timestamps, values) views over the newest samples,
+        oldest first. `window` limits the sample count, `since` drops samples
+        stamped before that time. The views alias the ring: copy them if you
+        need them to outlive the next `capacity` writes.
+        """
+        col = self._cols.get(field)
+        if col is None or self._count == 0:
+            return _readonly(np.empty(0)), _readonly(np.empty(0))
+        n = self._count if window is None else max(0, min(window, self._count))
+        end = self._head + self.capacity
+        start = end - n
+        ts = self._ts[start:end]
+        if since is not None:
+            start += int(np.searchsorted(ts, since, side="left"))
+            ts = self._ts[start:end]
+        return _readonly(ts), _readonly(col[start:end])
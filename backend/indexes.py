@@ -0,0 +1,137 @@
+"""
+RailGuard 5000 — Blackboard Secondary Indexes
+Incrementally maintained indexes over payload fields, so "every agent
+reporting status == WARNING" or "health_pct below 70" does not scan every
+payload of every layer.
+
+  * EqualityIndex — value -> set of entries; O(1) lookups.
+  * SortedIndex   — sorted (value, entry) list; O(log n + k) range queries.
+
+An entry is a (layer, agent_id) key. Fields may be nested with dotted paths
+("temperatures.brake_disc"). Indexes are updated on every changed write and
+on eviction; payloads without the field simply aren't indexed.
+"""
+import bisect
+from typing import Dict, Any, List, Optional, Set, Tuple, Iterable
+
+Key = Tuple[int, str]
+
+_MISSING = object()
+
+
+def _getter(field: str):
+    parts = field.split(".")
+    if len(parts) == 1:
+        return lambda data: data.get(field, _MISSING) if type(data) is dict else _MISSING
+
+    def get(data):
+        for part in parts:
+            if type(data) is not dict:
+                return _MISSING
+            data = data.get(part, _MISSING)
+            if data is _MISSING:
+                return _MISSING
+        return data
+    return get
+
+
+class _Index:
+    kind = ""
+
+    def __init__(self, field: str, layers: Optional[Iterable[int]] = None):
+        self.field = field
+        self.layers = frozenset(layers) if layers else None
+        self._get = _getter(field)
+        self._values: Dict[Key, Any] = {}   # entry -> currently indexed value
+
+    def covers(self, layer: int) -> bool:
+        return self.layers is None or layer in self.layers
+
+    def update(self, key: Key, data: Any):
+        value = self._get(data)
+        if value is not _MISSING and not self.accepts(value):
+            value = _MISSING
+        old = self._values.get(key, _MISSING)
+        if old is value or (old is not _MISSING and value is not _MISSING
+                             and type(old) is type(value) and old == value):
+            return
+        if old is not _MISSING:
+            self._remove(key, old)
+            del self._values[key]
+        if value is not _MISSING:
+            self._add(key, value)
+            self._values[key] = value
+
+    def remove(self, key: Key):
+        old = self._values.pop(key, _MISSING)
+        if old is not _MISSING:
+            self._remove(key, old)
+
+    def accepts(self, value) -> bool:
+        return True
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class EqualityIndex(_Index):
+    kind = "equality"
+
+    def __init__(self, field: str, layers: Optional[Iterable[int]] = None):
+        super().__init__(field, layers)
+        self._buckets: Dict[Any, Set[Key]] = {}
+
+    def accepts(self, value) -> bool:
+        return isinstance(value, (str, int, float, bool)) or value is None
+
+    def _add(self, key: Key, value):
+        self._buckets.setdefault((type(value) is bool, value), set()).add(key)
+
+    def _remove(self, key: Key, value):
+        bucket_key = (type(value) is bool, value)
+        bucket = self._buckets.get(bucket_key)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._buckets[bucket_key]
+
+    def lookup(self, value) -> Set[Key]:
+        # True == 1 in Python; keep flags and counts apart
+        return set(self._buckets.get((type(value) is bool, value), ()))
+
+    def values(self) -> Dict[Any, int]:
+        return {value: len(keys) for (_, value), keys in self._buckets.items()}
+
+
+class SortedIndex(_Index):
+    kind = "sorted"
+
+    def __init__(self, field: str, layers: Optional[Iterable[int]] = None):
+        super().__init__(field, layers)
+        self._sorted: List[Tuple[float, Key]] = []
+
+    def accepts(self, value) -> bool:
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and value == value
+
+    def _add(self, key: Key, value):
+        bisect.insort(self._sorted, (value, key))
+
+    def _remove(self, key: Key, value):
+        i = bisect.bisect_left(self._sorted, (value, key))
+        if i < len(self._sorted) and self._sorted[i] == (value, key):
+            del self._sorted[i]
+
+    def range(self, low: Optional[float] = None, high: Optional[float] = None,
+              limit: Optional[int] = None, descending: bool = False) -> List[Tuple[float, Key]]:
+        """(value, entry) pairs with low <= value <= high, ascending unless `descending`."""
+        data = self._sorted
+        a = 0 if low is None else bisect.bisect_left(data, (low,))
+        b = len(data) if high is None else bisect.bisect_right(data, (high, (float("inf"),)))
+        if descending:
+            stop = a if limit is None else max(a, b - limit)
+            return data[stop:b][::-1]
+        stop = b if limit is None else min(b, a + limit)
+        return data[a:stop]
+
+
+INDEX_KINDS = {"equality": EqualityIndex, "sorted": SortedIndex}
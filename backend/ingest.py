@@ -0,0 +1,112 @@
+"""
+RailGuard 5000 — Sensor Ingest Buffers
+Fixed-size ring buffers between a high-rate sensor feed (accelerometers,
+acoustic-emission channels, IR cameras) and the agents that analyse it.
+
+A SampleRing holds the last `capacity` samples of every channel. Storage
+is allocated once and every sample is stored twice, `capacity` apart, so
+the newest n samples are always one contiguous slice: `latest(n)` is a
+zero-copy view that FFTs and vectorized detectors can consume directly,
+with no wrap-around to stitch and nothing allocated per block.
+
+    ring = SampleRing(channels=3, capacity=32768)
+    ring.write(block)            # (channels, n) from the driver / simulator
+    x = ring.latest(16384)       # (channels, 16384) view, oldest first
+
+A FrameRing does the same for image frames: `capacity` preallocated
+slots, frames copied in as they arrive, and `since(count)` hands back
+views of everything newer than what a reader has already seen.
+
+    frames = FrameRing((2, 120, 160), capacity=32)   # two cameras per frame time
+    frames.write(stack)
+    for frame in frames.since(seen): ...
+"""
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class SampleRing:
+    """Multi-channel sample ring whose newest samples are always contiguous."""
+
+    def __init__(self, channels: int, capacity: int, dtype=np.float64):
+        if channels < 1 or capacity < 1:
+            raise ValueError("SampleRing needs channels >= 1 and capacity >= 1")
+        self.channels = channels
+        self.capacity = capacity
+        self._buf = np.zeros((channels, 2 * capacity), dtype=dtype)
+        self._pos = 0       # next write position, in [0, capacity)
+        self.total = 0      # samples written per channel since creation
+
+    def __len__(self) -> int:
+        """Samples currently held per channel."""
+        return min(self.total, self.capacity)
+
+    def write(self, block: np.ndarray):
+        """Append a (channels, n) block; beyond `capacity`, only its newest samples are kept."""
+        if block.ndim != 2 or block.shape[0] != self.channels:
+            raise ValueError(f"Expected a ({self.channels}, n) block, got {block.shape}")
+        n = block.shape[1]
+        self.total += n
+        cap = self.capacity
+        if n > cap:
+            block = block[:, n - cap:]
+            n = cap
+        pos, buf = self._pos, self._buf
+        first = min(n, cap - pos)
+        buf[:, pos:pos + first] = block[:, :first]
+        buf[:, pos + cap:pos + cap + first] = block[:, :first]
+        rest = n - first
+        if rest:
+            buf[:, :rest] = block[:, first:]
+            buf[:, cap:cap + rest] = block[:, first:]
+        self._pos = (pos + n) % cap
+
+    def latest(self, n: Optional[int] = None) -> np.ndarray:
+        """
+        Read-only (channels, n) view of the newest `n` samples (default: all
+        held), oldest first. Valid until the next write.
+        """
+        n = len(self) if n is None else n
+        if n > self.capacity:
+            raise ValueError(f"Only the last {self.capacity} samples are kept")
+        end = self._pos + self.capacity
+        view = self._buf[:, end - n:end]
+        view.flags.writeable = False
+        return view
+
+
+class FrameRing:
+    """The newest `capacity` frames of a fixed shape, in preallocated slots."""
+
+    def __init__(self, shape: Tuple[int, ...], capacity: int, dtype=np.float32):
+        if capacity < 1:
+            raise ValueError("FrameRing needs capacity >= 1")
+        self.shape = tuple(shape)
+        self.capacity = capacity
+        self._buf = np.zeros((capacity,) + self.shape, dtype=dtype)
+        self.total = 0      # frames written since creation
+
+    def __len__(self) -> int:
+        """Frames currently held."""
+        return min(self.total, self.capacity)
+
+    def write(self, frame: np.ndarray):
+        """Copy one frame into the next slot, overwriting the oldest when full."""
+        if frame.shape != self.shape:
+            raise ValueError(f"Expected a {self.shape} frame, got {frame.shape}")
+        self._buf[self.total % self.capacity] = frame
+        self.total += 1
+
+    def since(self, count: int) -> List[np.ndarray]:
+        """
+        Read-only views of the frames written after the first `count`
+        (those already overwritten are skipped), oldest first. Valid until
+        their slots are written again.
+        """
+        views = []
+        for index in range(max(count, self.total - self.capacity), self.total):
+            view = self._buf[index % self.capacity]
+            view.flags.writeable = False
+            views.append(view)
+        return views
@@ -0,0 +1,252 @@
+"""
+RailGuard 5000 — Blackboard Journal (Write-Ahead Log)
+Optional append-only journal of blackboard writes, so a restart comes back
+with the latest state instead of an empty board.
+
+On-disk layout: a directory of segments `journal-<seq>.log`. Each segment
+starts with a 4-byte magic followed by length-prefixed records:
+
+    <u32 body_len> <u32 crc32(body)> body
+    body = <f64 timestamp> <u8 layer> <u16 id_len> agent_id  json_data
+
+An eviction is a tombstone: the layer byte with TOMBSTONE set and no data.
+Replay drops tombstoned entries, and checkpoints leave them out.
+
+Every new segment begins with a checkpoint (the latest record of every
+entry), so the newest segment alone restores the whole board and older
+segments can be deleted (compaction). Replay memory-maps that one segment,
+indexes the last record per entry, and JSON-decodes only those.
+
+The event loop only appends (layer, agent_id, timestamp, data) tuples to a
+list. A flusher task hands the list to a single writer thread, which does
+the encoding, the file writes, rotation and compaction.
+"""
+import asyncio
+import glob
+import json
+import logging
+import mmap
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Any, Optional
+
+logger = logging.getLogger("Journal")
+
+MAGIC = b"RGJ1"
+_PREFIX = struct.Struct("<II")      # body_len, crc32(body)
+_BODY_HEAD = struct.Struct("<dBH")  # timestamp, layer, agent_id length
+
+DEFAULT_SEGMENT_BYTES = 16 * 1024 * 1024
+DEFAULT_KEEP_SEGMENTS = 2
+DEFAULT_FLUSH_INTERVAL = 0.5
+TOMBSTONE = 0x80                    # layer-byte flag: the entry was evicted
+EVICTED = object()                  # queued in place of data for a tombstone
+
+Record = Tuple[int, str, float, Any]   # layer, agent_id, timestamp, data
+
+
+def encode_record(layer: int, agent_id: str, timestamp: float, data: Any) -> bytes:
+    """One framed record; `data` EVICTED encodes a tombstone."""
+    aid = agent_id.encode("utf-8")
+    if data is EVICTED:
+        body = _BODY_HEAD.pack(timestamp, layer | TOMBSTONE, len(aid)) + aid
+    else:
+        body = (_BODY_HEAD.pack(timestamp, layer, len(aid)) + aid +
+                json.dumps(data, separators=(",", ":")).encode("utf-8"))
+    return _PREFIX.pack(len(body), zlib.crc32(body)) + body
+
+
+def read_segment(path: str) -> Dict[Tuple[int, str], Tuple[float, Any]]:
+    """
+    Latest (timestamp, data) per (layer, agent_id) in one segment, leaving
+    out entries whose latest record is a tombstone. Stops quietly at a torn
+    or corrupt tail (e.g. a crash mid-write).
+    """
+    return _scan_segment(path) or {}
+
+
+def _scan_segment(path: str) -> Optional[Dict[Tuple[int, str], Tuple[float, Any]]]:
+    """read_segment(), but None if the segment holds no valid record at all."""
+    latest: Dict[Tuple[int, str], Tuple[int, int, float]] = {}
+    records = 0
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= len(MAGIC):
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:len(MAGIC)] != MAGIC:
+                logger.warning(f"Skipping {path}: bad magic")
+                return None
+            view = memoryview(mm)
+            try:
+                # Pass 1: index the newest record of every entry
+                pos = len(MAGIC)
+                head_size = _PREFIX.size + _BODY_HEAD.size
+                while pos + head_size <= size:
+                    body_len, crc = _PREFIX.unpack_from(mm, pos)
+                    start = pos + _PREFIX.size
+                    end = start + body_len
+                    if end > size or zlib.crc32(view[start:end]) != crc:
+                        logger.warning(f"{path}: torn record at offset {pos}, replay stops there")
+                        break
+                    ts, layer, id_len = _BODY_HEAD.unpack_from(mm, start)
+                    id_start = start + _BODY_HEAD.size
+                    agent_id = str(view[id_start:id_start + id_len], "utf-8")
+                    if layer & TOMBSTONE:
+                        latest.pop((layer & ~TOMBSTONE, agent_id), None)
+                    else:
+                        latest[(layer, agent_id)] = (id_start + id_len, end, ts)
+                    records += 1
+                    pos = end
+                if not records:
+                    return None
+                # Pass 2: decode only the winners
+                return {
+                    key: (ts, json.loads(view[a:b].tobytes()))
+                    for key, (a, b, ts) in latest.items()
+                }
+            finally:
+                view.release()
+
+
+class Journal:
+    """Segmented, buffered write-ahead journal for one Blackboard."""
+
+    def __init__(self, directory: str,
+                 segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+                 keep_segments: int = DEFAULT_KEEP_SEGMENTS,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 fsync: bool = False):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.keep_segments = max(1, keep_segments)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+
+        self._pending: List[Record] = []
+        # Writer-thread state: open segment and the latest record per entry
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal")
+        self._file = None
+        self._seq = 0
+        self._latest: Dict[Tuple[int, str], Tuple[float, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.records_written = 0
+
+    # ── Boot ─────────────────────────────────────────────────────
+
+    def segments(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.directory, "journal-*.log")))
+
+    def replay(self) -> List[Record]:
+        """
+        Latest state recorded in the journal, read from the newest segment
+        that holds any valid records (tombstones included: a segment whose
+        entries were all evicted restores an empty board, not an older one).
+        Also seeds the checkpoint that opens the next segment.
+        """
+        latest: Dict[Tuple[int, str], Tuple[float, Any]] = {}
+        for path in reversed(self.segments()):
+            found = _scan_segment(path)
+            if found is not None:
+                latest = found
+                break
+        self._latest = dict(latest)
+        return [(layer, agent_id, ts, data) for (layer, agent_id), (ts, data) in latest.items()]
+
+    # ── Hot path (event loop) ────────────────────────────────────
+
+    def append(self, layer: int, agent_id: str, timestamp: float, data: Any):
+        """Queue one write. `data` must not be mutated afterwards (blackboard payloads never are)."""
+        self._pending.append((layer, agent_id, timestamp, data))
+
+    def evict(self, layer: int, agent_id: str, timestamp: float):
+        """Queue a tombstone: the entry is gone from the board."""
+        self._pending.append((layer, agent_id, timestamp, EVICTED))
+
+    # ── Flushing ─────────────────────────────────────────────────
+
+    async def start(self):
+        """Start the background flusher on the running loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_forever())
+
+    async def _flush_forever(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Journal flush failed: {e}")
+
+    async def flush(self):
+        """Hand everything queued so far to the writer thread and wait for it."""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._write_batch, batch)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._close_file)
+        self._executor.shutdown(wait=True)
+
+    # ── Writer thread ────────────────────────────────────────────
+
+    def _write_batch(self, batch: List[Record]):
+        if self._file is None:
+            self._open_segment()
+        buf = bytearray()
+        latest = self._latest
+        for layer, agent_id, ts, data in batch:
+            buf += encode_record(layer, agent_id, ts, data)
+            if data is EVICTED:
+                latest.pop((layer, agent_id), None)
+            else:
+                latest[(layer, agent_id)] = (ts, data)
+        self._file.write(buf)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.records_written += len(batch)
+        if self._file.tell() >= self.segment_bytes:
+            self._open_segment()
+
+    def _open_segment(self):
+        """Rotate: start a new segment with a checkpoint, then drop old segments."""
+        existing = self.segments()
+        if existing and self._seq == 0:
+            self._seq = int(os.path.basename(existing[-1])[8:-4])
+        self._close_file()
+        self._seq += 1
+        path = os.path.join(self.directory, f"journal-{self._seq:08d}.log")
+        # The checkpoint is written aside and renamed into place, so the
+        # newest segment always starts with a complete checkpoint
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            buf = bytearray(MAGIC)
+            for (layer, agent_id), (ts, data) in self._latest.items():
+                buf += encode_record(layer, agent_id, ts, data)
+            f.write(buf)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        self._file = open(path, "ab")
+        self._compact()
+
+    def _compact(self):
+        for path in self.segments()[:-self.keep_segments]:
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not remove old segment {path}: {e}")
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -30,35 +30,118 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
+# ── Event Loop ──────────────────────────────────────────────
+# RAILGUARD_LOOP=auto|uvloop|asyncio (see event_loop.py)
+try:
+    from event_loop import resolve_loop, loop_name
+except ImportError:
+    from backend.event_loop import resolve_loop, loop_name
+EVENT_LOOP = resolve_loop()
+
 # ── Global System Containers ────────────────────────────────
 # Using names that don't conflict with filenames
 CORE_BLACKBOARD = None
 CORE_ORCHESTRATOR = None
 CORE_CHATBOT = None
+CORE_PUBLISHER = None
+CORE_WATCHDOG = None
 INIT_STATUS = "PENDING"
 INIT_ERROR = None
 
+# local  — one process runs the agents and serves (default)
+# engine — as local, and mirrors the blackboard into shared memory
+# reader — serve only, from the engine's shared memory (uvicorn --workers N)
+# coordinator — serve the board; the agents run on cluster workers (cluster.py)
+ENGINE_MODE = os.environ.get("RAILGUARD_ENGINE_MODE", "local")
+SHM_NAME = os.environ.get("RAILGUARD_SHM_NAME", "railguard_blackboard")
+SHM_SIZE = int(os.environ.get("RAILGUARD_SHM_SIZE", 4 * 1024 * 1024))
+# Fleet mode: RAILGUARD_TRAINSETS=12 (trainsets T001..T012) or a list "T001,T042"
+TRAINSETS = os.environ.get("RAILGUARD_TRAINSETS", "").strip()
+if TRAINSETS.isdigit():
+    FLEET_IDS = [f"T{i:03d}" for i in range(1, int(TRAINSETS) + 1)]
+else:
+    FLEET_IDS = [t.strip() for t in TRAINSETS.split(",") if t.strip()]
+# Worker processes for CPU-heavy agents (executor = "process"); 0 keeps them on the loop
+AGENT_PROCESSES = int(os.environ.get("RAILGUARD_AGENT_PROCESSES", 0))
+# Cluster mode: where workers connect, and how many to spawn locally
+CLUSTER_ADDR = os.environ.get("RAILGUARD_CLUSTER_ADDR", "127.0.0.1:7400")
+CLUSTER_WORKERS = int(os.environ.get("RAILGUARD_CLUSTER_WORKERS", 0))
+# RAILGUARD_SIMULATOR=vectorized: one FleetSimulator generates every trainset's
+# telemetry with NumPy instead of 50 agent objects per trainset (load testing)
+SIMULATOR = os.environ.get("RAILGUARD_SIMULATOR", "agents").strip().lower()
+# Event-loop watchdog: flag agent steps holding the loop longer than this (0 disables)
+WATCHDOG_MS = float(os.environ.get("RAILGUARD_WATCHDOG_MS", 100))
+
 def boot_engine():
-    global CORE_BLACKBOARD, CORE_ORCHESTRATOR, CORE_CHATBOT, INIT_STATUS, INIT_ERROR
+    global CORE_BLACKBOARD, CORE_ORCHESTRATOR, CORE_CHATBOT, CORE_PUBLISHER, CORE_WATCHDOG, INIT_STATUS, INIT_ERROR
     try:
         # Import inside function to avoid top-level path issues
         try:
             from blackboard import Blackboard
             from orchestrator import Orchestrator
-            from all_agents import ALL_AGENTS
+            from all_agents import ALL_AGENTS, build_fleet
             from chatbot import ChatbotEngine
+            from journal import Journal
+            from timeseries import ColumnarStore
+            from history import DEFAULT_CAPACITY, fleet_capacity
+            from shared_blackboard import (SharedBlackboardPublisher, SharedBlackboardReader,
+                                           SharedOrchestratorView)
+            from cluster import Coordinator, parse_address
+            from watchdog import LoopWatchdog
+            from fleet_sim import FleetSimulator
         except ImportError:
             from backend.blackboard import Blackboard
             from backend.orchestrator import Orchestrator
-            from backend.all_agents import ALL_AGENTS
+            from backend.all_agents import ALL_AGENTS, build_fleet
             from backend.chatbot import ChatbotEngine
+            from backend.journal import Journal
+            from backend.timeseries import ColumnarStore
+            from backend.history import DEFAULT_CAPACITY, fleet_capacity
+            from backend.shared_blackboard import (SharedBlackboardPublisher, SharedBlackboardReader,
+                                                   SharedOrchestratorView)
+            from backend.cluster import Coordinator, parse_address
+            from backend.watchdog import LoopWatchdog
+            from backend.fleet_sim import FleetSimulator
+
+        if ENGINE_MODE == "reader":
+            CORE_BLACKBOARD = SharedBlackboardReader(SHM_NAME)
+            CORE_ORCHESTRATOR = SharedOrchestratorView(CORE_BLACKBOARD)
+            CORE_CHATBOT = ChatbotEngine(CORE_BLACKBOARD)
+            INIT_STATUS = "SUCCESS"
+            logger.info(f"READER WORKER ATTACHED TO SHARED BLACKBOARD '{SHM_NAME}'")
+            return
+
+        # Optional on-disk columnar store for layer 1 (memory-mapped on boot)
+        series_dir = os.environ.get("RAILGUARD_SERIES_DIR")
+        # Samples of numeric history kept per entry; fleets default to what fits the budget
+        history_capacity = int(os.environ.get("RAILGUARD_HISTORY_CAPACITY") or
+                               (fleet_capacity(len(FLEET_IDS)) if FLEET_IDS else DEFAULT_CAPACITY))
+        CORE_BLACKBOARD = Blackboard(history_capacity=history_capacity,
+                                     series=ColumnarStore(series_dir) if series_dir else None)
+        # Optional write-ahead journal: restores the last state after a restart
+        journal_dir = os.environ.get("RAILGUARD_JOURNAL_DIR")
+        if journal_dir:
+            CORE_BLACKBOARD.attach_journal(Journal(journal_dir))
+        if WATCHDOG_MS > 0:
+            CORE_WATCHDOG = LoopWatchdog(threshold=WATCHDOG_MS / 1000)
+        # The chatbot answers for the first trainset of a fleet
+        CORE_CHATBOT = ChatbotEngine(CORE_BLACKBOARD, train_id=FLEET_IDS[0] if FLEET_IDS else None)
 
-        CORE_BLACKBOARD = Blackboard()
-        CORE_ORCHESTRATOR = Orchestrator(CORE_BLACKBOARD)
-        CORE_CHATBOT = ChatbotEngine(CORE_BLACKBOARD)
+        if ENGINE_MODE == "coordinator":
+            host, port = parse_address(CLUSTER_ADDR)
+            CORE_ORCHESTRATOR = Coordinator(CORE_BLACKBOARD, FLEET_IDS, host=host, port=port,
+                                            workers=CLUSTER_WORKERS, processes=AGENT_PROCESSES)
+        elif SIMULATOR == "vectorized":
+            CORE_ORCHESTRATOR = FleetSimulator(CORE_BLACKBOARD, FLEET_IDS)
+        else:
+            CORE_ORCHESTRATOR = Orchestrator(CORE_BLACKBOARD, processes=AGENT_PROCESSES,
+                                             watchdog=CORE_WATCHDOG)
+            for agent in (build_fleet(FLEET_IDS) if FLEET_IDS else ALL_AGENTS):
+                CORE_ORCHESTRATOR.register_agent(agent)
 
-        for agent in ALL_AGENTS:
-            CORE_ORCHESTRATOR.register_agent(agent)
+        if ENGINE_MODE == "engine":
+            CORE_PUBLISHER = SharedBlackboardPublisher(
+                CORE_BLACKBOARD, CORE_ORCHESTRATOR, name=SHM_NAME, size=SHM_SIZE)
             
         INIT_STATUS = "SUCCESS"
         logger.info("SYSTEM BOOT SEQUENCE COMPLETE")
@@ -87,6 +170,7 @@ async def root():
         "boot_error": INIT_ERROR,
         "telemetry": {
             "time": current_time,
+            "event_loop": loop_name(),
             "agents": len(CORE_ORCHESTRATOR.agents) if CORE_ORCHESTRATOR else 0
         }
     }
@@ -104,6 +188,74 @@ async def chat_http(request: Request):
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e), "trace": traceback.format_exc()})
 
+@app.get("/history/{layer}/{agent_id}/{field}")
+async def field_history(layer: int, agent_id: str, field: str, window: int = 200):
+    if INIT_STATUS != "SUCCESS":
+        return JSONResponse(status_code=500, content={"error": "Engine Not Booted", "detail": INIT_ERROR})
+    timestamps, values = CORE_BLACKBOARD.history(layer, agent_id, field, window=window)
+    return {
+        "layer": layer,
+        "agent_id": agent_id,
+        "field": field,
+        "timestamps": timestamps.tolist(),
+        # NaN marks samples where the field was missing; JSON has no NaN
+        "values": [None if v != v else v for v in values.tolist()],
+    }
+
+@app.get("/query/{field}")
+async def query_index(field: str, value: str = None, min: float = None, max: float = None, limit: int = 100):
+    """Indexed lookups: ?value=WARNING for equality, ?min=&max= for numeric ranges."""
+    if INIT_STATUS != "SUCCESS" or ENGINE_MODE == "reader":
+        return JSONResponse(status_code=500, content={"error": "Indexes are served by the engine process"})
+    try:
+        if value is not None:
+            try:
+                parsed = json.loads(value)
+            except ValueError:
+                parsed = value
+            matches = CORE_BLACKBOARD.find(field, parsed)[:limit]
+        else:
+            matches = CORE_BLACKBOARD.find_range(field, min, max, limit=limit)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    return {"field": field, "count": len(matches), "matches": matches}
+
+@app.get("/fleet")
+async def fleet():
+    return {"trainsets": FLEET_IDS, "agents": len(CORE_ORCHESTRATOR.agents) if CORE_ORCHESTRATOR else 0}
+
+@app.get("/fleet/{train_id}")
+async def fleet_train(train_id: str):
+    """Latest payloads of one trainset, per layer, keyed by local agent id."""
+    if INIT_STATUS != "SUCCESS":
+        return JSONResponse(status_code=500, content={"error": "Engine Not Booted", "detail": INIT_ERROR})
+    if train_id not in FLEET_IDS:
+        return JSONResponse(status_code=404, content={"error": f"Unknown trainset {train_id}"})
+    prefix = train_id + "/"
+    return {
+        "trainset": train_id,
+        "layers": {
+            str(layer): {aid[len(prefix):]: payload
+                         for aid, payload in CORE_BLACKBOARD.read_nowait(layer).items()
+                         if aid.startswith(prefix)}
+            for layer in CORE_BLACKBOARD.LAYER_NAMES
+        },
+    }
+
+@app.get("/scheduler")
+async def scheduler_stats():
+    """Per-agent priority, deadline, latency and deadline-miss counters."""
+    if INIT_STATUS != "SUCCESS" or ENGINE_MODE == "reader":
+        return JSONResponse(status_code=500, content={"error": "The scheduler runs in the engine process"})
+    return CORE_ORCHESTRATOR.schedule_stats()
+
+@app.get("/watchdog")
+async def watchdog_report():
+    """Event-loop lag, wall/CPU time per agent step, and captured stacks of blocking steps."""
+    if CORE_WATCHDOG is None:
+        return JSONResponse(status_code=500, content={"error": "The watchdog runs in the engine process (RAILGUARD_WATCHDOG_MS > 0)"})
+    return CORE_WATCHDOG.report()
+
 @app.websocket("/ws/chat")
 async def ws_chat(websocket: WebSocket):
     await websocket.accept()
@@ -142,30 +294,97 @@ async def ws_chat(websocket: WebSocket):
     except Exception as e:
         logger.error(f"WS CHAT ERROR: {e}")
 
+# One encoded /ws/updates frame, shared by every connected client until
+# the blackboard summaries or an agent status change.
+_UPDATES_FRAME = {"key": None, "text": ""}
+
+def updates_frame() -> str:
+    status_json = CORE_BLACKBOARD.get_status_json()
+    health_json = CORE_BLACKBOARD.get_all_health_json()
+    statuses = tuple(a.status for a in CORE_ORCHESTRATOR.agents)
+    key = (status_json, health_json, statuses)
+    if _UPDATES_FRAME["key"] != key:
+        agents_json = json.dumps([
+            {"id": a.agent_id, "status": a.status} for a in CORE_ORCHESTRATOR.agents
+        ])
+        _UPDATES_FRAME["key"] = key
+        _UPDATES_FRAME["text"] = (
+            '{"blackboard": ' + status_json +
+            ', "health": ' + health_json +
+            ', "agents": ' + agents_json + '}'
+        )
+    return _UPDATES_FRAME["text"]
+
 @app.websocket("/ws/updates")
 async def ws_updates(websocket: WebSocket):
     await websocket.accept()
     try:
         while True:
             if INIT_STATUS == "SUCCESS":
-                payload = {
-                    "blackboard": CORE_BLACKBOARD.get_status(),
-                    "health": CORE_BLACKBOARD.get_all_health(),
-                    "agents": [{"id": a.agent_id, "status": a.status} for a in CORE_ORCHESTRATOR.agents]
-                }
-                await websocket.send_text(json.dumps(payload))
+                await websocket.send_text(updates_frame())
             await asyncio.sleep(2)
     except Exception:
         pass
 
+@app.websocket("/ws/changes")
+async def ws_changes(websocket: WebSocket):
+    """Field-level deltas: one full snapshot on connect, then only what changed."""
+    await websocket.accept()
+    if INIT_STATUS != "SUCCESS" or ENGINE_MODE == "reader":
+        await websocket.send_text(json.dumps({"type": "error", "message": "Deltas are served by the engine process"}))
+        await websocket.close()
+        return
+    try:
+        version = CORE_BLACKBOARD.get_version()
+        await websocket.send_text(json.dumps({
+            "type": "snapshot",
+            "version": version,
+            "layers": {str(l): dict(CORE_BLACKBOARD.read_nowait(l)) for l in CORE_BLACKBOARD.LAYER_NAMES},
+        }))
+        while True:
+            await CORE_BLACKBOARD.wait_for_change(None, since_version=version)
+            # Coalesce bursts of writes into one frame
+            await asyncio.sleep(0.1)
+            changes = list(CORE_BLACKBOARD.changes_since(version))
+            if changes:
+                version = changes[-1]["version"]
+                await websocket.send_text(json.dumps({"type": "changes", "version": version, "changes": changes}))
+    except Exception:
+        pass
+
 @app.on_event("startup")
 async def startup_event():
     if INIT_STATUS == "SUCCESS":
         logger.info("Sparking all 50 agents into life...")
+        if CORE_BLACKBOARD.journal is not None:
+            await CORE_BLACKBOARD.journal.start()
+        if CORE_WATCHDOG is not None:
+            await CORE_WATCHDOG.start()
         await CORE_ORCHESTRATOR.start_all()
+        if ENGINE_MODE != "reader":
+            await CORE_BLACKBOARD.start_expiry()
+        if CORE_PUBLISHER is not None:
+            await CORE_PUBLISHER.start()
         logger.info("All agents are now running in background.")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Stop every writer (agents, then TTL evictions) before the journal's last flush
+    if CORE_ORCHESTRATOR is not None and ENGINE_MODE != "reader":
+        await CORE_ORCHESTRATOR.close()
+    if CORE_BLACKBOARD is not None and ENGINE_MODE != "reader":
+        CORE_BLACKBOARD.stop_expiry()
+    if CORE_BLACKBOARD is not None and CORE_BLACKBOARD.journal is not None:
+        await CORE_BLACKBOARD.journal.close()
+    if CORE_BLACKBOARD is not None and ENGINE_MODE != "reader":
+        CORE_BLACKBOARD.series.close()
+    if CORE_PUBLISHER is not None:
+        CORE_PUBLISHER.close()
+    if CORE_WATCHDOG is not None:
+        CORE_WATCHDOG.stop()
+
 # ── Entry point ──────────────────────────────────────────────
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+    logger.info(f"Serving on the {EVENT_LOOP} event loop")
+    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info", loop=EVENT_LOOP)
@@ -1,28 +1,251 @@
 """
 RailGuard 5000 — Orchestrator
 Starts all 50 agents and keeps them running forever with auto-restart.
+
+Agents that declare `inputs` (see SimAgent in all_agents.py) form a
+dependency graph: producer entry (layer, agent_id) → consuming agents.
+One watcher per input entry waits on the blackboard's change
+notification and triggers its consumers, which step right away (after a
+short debounce that coalesces bursts) instead of on their next sleep.
+Triggered agents still step every `interval` when their inputs stay
+quiet. Only agents with a `step()` may declare inputs.
+
+There are no per-agent loops. One ticker task drives a hierarchical
+timing wheel (timing_wheel.py) holding every agent's next due time;
+agents due on the same tick are released together in one loop iteration.
+Due times are phase-aligned to multiples of the agent's interval and
+advance by exactly one interval per period, so rates don't drift with
+step cost or loop lag (periods the loop slept through entirely are
+skipped and counted).
+
+Released steps go to one dispatcher. Critical steps always go first;
+all other ready steps run earliest deadline first, their class only
+breaking ties (a strict class order kept short-deadline normal steps
+waiting behind long-deadline high ones, and missed more deadlines in
+both classes). An agent has at most one step queued: releases that find it
+still waiting are coalesced. "low" work is shed while the loop lags
+behind, or once it has already missed its deadline. The ticker samples
+the lag on every wake-up: how late the loop let it run or, while steps
+are queued, how long the last dispatched one had waited, whichever is
+larger. The lag holds its peak and decays with a short half-life, so it
+falls back once the loop catches up even if nothing is dispatched.
+Steps run back to back for up to DISPATCH_SLICE before the dispatcher
+yields to the loop.
+Agents whose step is the plain SimAgent sample-and-write
+(`step.batchable`) are only sampled during the slice; their payloads are
+written together with one `write_many()` at its end.
+
+With `processes` > 0, agents declaring `executor = "process"` don't step
+on the loop: at the end of each slice their `sample()` calls are sent to
+worker processes (process_pool.py), one message per worker, and each
+worker's results come back and are written with one `write_many()`.
+
+Every step's release-to-finish latency is checked against the agent's
+deadline and counted per agent (`schedule_stats()`).
 """
 import asyncio
+import heapq
+import itertools
 import logging
+import math
+from typing import Dict, List, Tuple, Optional
+
+try:
+    from timing_wheel import TimingWheel
+    from process_pool import AgentProcessPool
+except ImportError:
+    from backend.timing_wheel import TimingWheel
+    from backend.process_pool import AgentProcessPool
 
 logger = logging.getLogger("Orchestrator")
 
+Entry = Tuple[int, str]
+
+# Priority classes, most urgent first
+PRIORITIES = {"critical": 0, "high": 1, "normal": 2, "low": 3}
+# Classes at or below this rank may be shed under load
+SHED_RANK = PRIORITIES["low"]
+# Loop lag (s) above which the loop counts as overloaded
+OVERLOAD_LAG = 0.05
+# Half-life (s) of the lag's peak hold
+_LAG_HALF_LIFE = 0.25
+# Timing-wheel resolution (s): release times are rounded up to a tick
+TICK = 0.01
+# Longest run of steps (s) the dispatcher does before yielding to the loop
+DISPATCH_SLICE = 0.005
+
 
 class Orchestrator:
-    def __init__(self, blackboard):
+    def __init__(self, blackboard, processes: int = 0, watchdog=None):
         self.blackboard = blackboard
         self.agents = []
+        # Optional LoopWatchdog: per-step wall/CPU time and blocking stacks
+        self.watchdog = watchdog
+        # Worker processes for agents with executor = "process" (0: run them on the loop)
+        self.processes = processes
+        self._pool: Optional[AgentProcessPool] = None
+        # Input entry -> agents triggered by its changes
+        self.graph: Dict[Entry, List] = {}
+        self._pending_triggers: set = set()   # triggered, waiting out the debounce
+        # Ticker: agent_id -> agent / next due time (loop clock)
+        self._by_id: Dict[str, object] = {}
+        self._next_due: Dict[str, float] = {}
+        self._wheel: Optional[TimingWheel] = None
+        self._tick_wakeup: Optional[asyncio.Event] = None
+        self._tick_target: Optional[float] = None
+        # Dispatcher: heap of (not critical, deadline, rank, seq, released, agent)
+        self._ready: List[tuple] = []
+        self._queued: set = set()
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._held: Dict[str, float] = {}    # agent_id -> no releases before (crash back-off)
+        self._lag = 0.0
+        self._lag_at = 0.0      # loop time of the last lag sample
+        self._behind = 0.0      # release-to-start wait of the last dispatched step
+        self._stats: Dict[str, Dict[str, float]] = {}
+        # Once started: one watcher per input entry, one task per run()-only agent
+        self._started = False
+        self._watchers: Dict[Entry, asyncio.Task] = {}
+        self._runners: Dict[str, asyncio.Task] = {}
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._ticker: Optional[asyncio.Task] = None
 
     def register_agent(self, agent):
         self.agents.append(agent)
 
+    def add_agents(self, agents: List):
+        """
+        Register more agents; once started, they begin ticking right away.
+        Raises ValueError (adding none of them) if their inputs close a cycle.
+        """
+        before = self.agents
+        self.agents = before + list(agents)
+        try:
+            self.build_graph()
+        except ValueError:
+            self.agents = before
+            self.build_graph()
+            raise
+        if self._started:
+            for agent in agents:
+                self._start_agent(agent)
+            self._sync_watchers()
+
+    def remove_agents(self, agent_ids) -> List:
+        """Stop and unregister agents by id; returns the agents removed."""
+        agent_ids = set(agent_ids)
+        removed = [agent for agent in self.agents if agent.agent_id in agent_ids]
+        self.agents = [agent for agent in self.agents if agent.agent_id not in agent_ids]
+        for agent in removed:
+            agent_id = agent.agent_id
+            agent.status = "stopped"
+            if self._wheel is not None:
+                self._wheel.cancel(agent_id)
+            self._by_id.pop(agent_id, None)
+            self._next_due.pop(agent_id, None)
+            self._pending_triggers.discard(agent_id)
+            self._held.pop(agent_id, None)
+            self._stats.pop(agent_id, None)
+            runner = self._runners.pop(agent_id, None)
+            if runner is not None:
+                runner.cancel()
+        if self._pool is not None:
+            self._pool.unpin([agent.agent_id for agent in removed])
+        self.build_graph()
+        if self._started:
+            self._sync_watchers()
+        return removed
+
+    def build_graph(self) -> List:
+        """
+        Wire declared inputs to their consumers and return the agents in
+        dependency order. Raises ValueError on a cycle, which would keep
+        re-triggering itself, or on inputs declared by a run()-only agent,
+        which loops by itself and has no step to trigger.
+        """
+        producers: Dict[Entry, object] = {}
+        for agent in self.agents:
+            if hasattr(agent, "layer"):
+                producers[(agent.layer, agent.agent_id)] = agent
+        graph: Dict[Entry, List] = {}
+        upstream: Dict[str, set] = {agent.agent_id: set() for agent in self.agents}
+        for agent in self.agents:
+            if getattr(agent, "inputs", ()) and not hasattr(agent, "step"):
+                raise ValueError(f"Agent {agent.agent_id} declares inputs but has no step() to trigger")
+            for key in getattr(agent, "inputs", ()):
+                key = tuple(key)
+                graph.setdefault(key, []).append(agent)
+                producer = producers.get(key)
+                if producer is None:
+                    logger.warning(f"Agent {agent.agent_id} waits on {key}, which no registered agent writes")
+                else:
+                    upstream[agent.agent_id].add(producer.agent_id)
+
+        # Kahn's algorithm over agent ids
+        by_id = {agent.agent_id: agent for agent in self.agents}
+        downstream: Dict[str, List[str]] = {aid: [] for aid in upstream}
+        for aid, sources in upstream.items():
+            for source in sources:
+                downstream[source].append(aid)
+        pending = {aid: len(sources) for aid, sources in upstream.items()}
+        ready = [agent.agent_id for agent in self.agents if not pending[agent.agent_id]]
+        order = []
+        while ready:
+            aid = ready.pop(0)
+            order.append(by_id[aid])
+            for consumer in downstream[aid]:
+                pending[consumer] -= 1
+                if not pending[consumer]:
+                    ready.append(consumer)
+        if len(order) < len(self.agents):
+            cycle = sorted(aid for aid, n in pending.items() if n)
+            raise ValueError(f"Agent inputs form a cycle through {', '.join(cycle)}")
+
+        self.graph = graph
+        return order
+
+    def describe_graph(self) -> dict:
+        """JSON-safe view of the dependency graph."""
+        return {
+            f"{layer}:{agent_id}": [agent.agent_id for agent in consumers]
+            for (layer, agent_id), consumers in sorted(self.graph.items())
+        }
+
     async def start_all(self):
         logger.info(f"Starting {len(self.agents)} agents...")
+        self.build_graph()
+        loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tick_wakeup = asyncio.Event()
+        self._wheel = TimingWheel(tick=TICK, start=loop.time())
+        if self.processes and self._pool is None:
+            self._pool = AgentProcessPool(self.processes)
+            self._pool.start()
+        self._dispatcher = asyncio.create_task(self._dispatch_forever())
         for agent in self.agents:
-            asyncio.create_task(self._run_forever(agent))
+            self._start_agent(agent)
+        self._ticker = asyncio.create_task(self._tick_forever())
+        self._sync_watchers()
+        self._started = True
+        if self.graph:
+            logger.info(f"Event-driven triggers: {self.describe_graph()}")
+
+    def _start_agent(self, agent):
+        if hasattr(agent, "step"):
+            self._start_ticking(agent)
+        else:
+            self._runners[agent.agent_id] = asyncio.create_task(self._run_forever(agent))
+
+    def _sync_watchers(self):
+        """One watcher task per input entry in the current graph."""
+        for key in [key for key in self._watchers if key not in self.graph]:
+            self._watchers.pop(key).cancel()
+        for key in self.graph:
+            if key not in self._watchers:
+                self._watchers[key] = asyncio.create_task(self._watch(key))
 
     async def _run_forever(self, agent):
-        """Run an agent, restarting it automatically if it ever crashes."""
+        """Run a self-looping agent (`run()` only), restarting it if it crashes."""
         agent.status = "running"
         while True:
             try:
@@ -30,7 +253,320 @@ class Orchestrator:
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.warning(f"Agent {agent.agent_id} crashed: {e}. Restarting in 2s.")
-                agent.status = "restarting"
+                self._crashed(agent, e)
                 await asyncio.sleep(2)
                 agent.status = "running"
+
+    # ── Ticks ────────────────────────────────────────────────────
+
+    def _start_ticking(self, agent):
+        """Put an agent on the wheel, first due on its next aligned tick (multiple of its interval, plus phase)."""
+        agent.status = "running"
+        now = asyncio.get_running_loop().time()
+        interval = agent.interval
+        phase = getattr(agent, "phase", 0.0)
+        self._by_id[agent.agent_id] = agent
+        self._schedule(agent.agent_id, (math.ceil(now / interval - phase) + phase) * interval)
+
+    def _schedule(self, agent_id: str, due: float):
+        self._next_due[agent_id] = due
+        self._wheel.schedule(agent_id, due)
+        if self._tick_target is None or due < self._tick_target:
+            self._tick_wakeup.set()
+
+    async def _tick_forever(self):
+        loop = asyncio.get_running_loop()
+        wheel = self._wheel
+        while True:
+            now = loop.time()
+            for agent_id in wheel.advance(now):
+                agent = self._by_id.get(agent_id)
+                if agent is None:
+                    continue   # removed after it was scheduled
+                due = self._next_due[agent_id]
+                # Released at the intended time, so a lagging loop shows up as latency
+                self.release(agent, due)
+                interval = agent.interval
+                due += interval
+                if due <= now:
+                    skipped = int((now - due) // interval) + 1
+                    self._agent_stats(agent)["skipped"] += skipped
+                    due += skipped * interval
+                self._next_due[agent_id] = due
+                wheel.schedule(agent_id, due)
+            target = wheel.next_deadline()
+            self._tick_target = target
+            self._tick_wakeup.clear()
+            timeout = None if target is None else max(0.0, target - loop.time())
+            try:
+                await asyncio.wait_for(self._tick_wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            now = loop.time()
+            self._sample_lag(now, 0.0 if target is None else now - target)
+
+    def _sample_lag(self, now: float, late: float):
+        """Fold one ticker wake-up (`late` s behind its target) and the dispatch backlog into the lag."""
+        sample = max(late, self._behind if self._ready else 0.0)
+        decayed = self._lag * 0.5 ** ((now - self._lag_at) / _LAG_HALF_LIFE)
+        self._lag = max(sample, decayed)
+        self._lag_at = now
+
+    # ── Triggers ─────────────────────────────────────────────────
+
+    async def _watch(self, key: Entry):
+        """Trigger every consumer of one input entry on each change to it."""
+        layer, agent_id = key
+        async for _ in self.blackboard.subscribe(layer, agent_id):
+            # Looked up per change: agents may come and go while running
+            for agent in self.graph.get(key, ()):
+                self._trigger(agent)
+
+    def _trigger(self, agent):
+        if agent.agent_id in self._pending_triggers:
+            return
+        self._pending_triggers.add(agent.agent_id)
+        # Let the rest of a burst land, then answer it with one step
+        asyncio.get_running_loop().call_later(agent.debounce, self._fire_trigger, agent)
+
+    def _fire_trigger(self, agent):
+        if agent.agent_id not in self._pending_triggers:
+            return   # removed while waiting out the debounce
+        self._pending_triggers.discard(agent.agent_id)
+        if self._by_id.get(agent.agent_id) is not agent:
+            return   # not on the wheel (removed, or replaced under the same id)
+        loop = asyncio.get_running_loop()
+        self.release(agent)
+        # The periodic step becomes a heartbeat one interval after this one
+        self._schedule(agent.agent_id, loop.time() + agent.interval)
+
+    def _crashed(self, agent, error: Exception):
+        logger.warning(f"Agent {agent.agent_id} crashed: {error}. Restarting in 2s.")
+        agent.status = "restarting"
+        # Its last payload no longer reflects a live agent
+        self.blackboard.mark_stale(None, agent.agent_id)
+
+    # ── Priority dispatch ────────────────────────────────────────
+
+    def _agent_stats(self, agent) -> Dict[str, float]:
+        stats = self._stats.get(agent.agent_id)
+        if stats is None:
+            stats = self._stats[agent.agent_id] = {
+                "runs": 0, "misses": 0, "shed": 0, "coalesced": 0, "skipped": 0,
+                "last_latency_ms": 0.0, "max_latency_ms": 0.0,
+            }
+        return stats
+
+    @staticmethod
+    def deadline_of(agent) -> float:
+        """Seconds a step may take from release to finish."""
+        return getattr(agent, "deadline", None) or getattr(agent, "interval", 1.0)
+
+    @property
+    def overloaded(self) -> bool:
+        return self._lag > OVERLOAD_LAG
+
+    def release(self, agent, released: Optional[float] = None):
+        """Queue one step of `agent`, released at loop time `released` (default: now)."""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        released = now if released is None else released
+        stats = self._agent_stats(agent)
+        if agent.agent_id in self._queued:
+            stats["coalesced"] += 1
+            return
+        if self._held.get(agent.agent_id, 0.0) > now:
+            return
+        rank = PRIORITIES.get(getattr(agent, "priority", "normal"), PRIORITIES["normal"])
+        if rank >= SHED_RANK and self.overloaded:
+            stats["shed"] += 1
+            return
+        heapq.heappush(self._ready, (rank > 0, released + self.deadline_of(agent), rank,
+                                     next(self._seq), released, agent))
+        self._queued.add(agent.agent_id)
+        self._wakeup.set()
+
+    async def _dispatch_forever(self):
+        loop = asyncio.get_running_loop()
+        bb = self.blackboard
+        pool = self._pool
+        watchdog = self.watchdog
+        offload: List[tuple] = []
+        written: List[tuple] = []   # (agent, released, deadline, payload) awaiting this slice's write_many
+        slice_start = loop.time()
+        while True:
+            if not self._ready:
+                if written:
+                    await self._write_batch(written)
+                    written = []
+                if offload:
+                    self._offload(offload)
+                    offload = []
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                slice_start = loop.time()
+                continue
+            _, deadline, rank, _, released, agent = heapq.heappop(self._ready)
+            if self._by_id.get(agent.agent_id) is not agent:
+                # Removed after it was queued
+                self._queued.discard(agent.agent_id)
+                continue
+            stats = self._agent_stats(agent)
+            start = loop.time()
+            self._behind = start - released
+            if rank >= SHED_RANK and (start > deadline or self.overloaded):
+                # Already too late to matter, or queued before the loop fell
+                # behind; don't spend the loop on it
+                self._queued.discard(agent.agent_id)
+                stats["shed"] += 1
+                stats["misses"] += 1
+                continue
+            if pool is not None and getattr(agent, "executor", "loop") == "process":
+                # Stays queued (so releases coalesce) until its result is written
+                offload.append((agent, released, deadline))
+            else:
+                self._queued.discard(agent.agent_id)
+                token = watchdog.begin(agent.agent_id) if watchdog is not None else None
+                if getattr(type(agent).step, "batchable", False):
+                    # Plain sample-and-write: sample now, write with the rest of the slice
+                    try:
+                        written.append((agent, released, deadline, agent.sample()))
+                    except Exception as e:
+                        self._fail(agent, e)
+                    if token is not None:
+                        watchdog.end(token)
+                else:
+                    try:
+                        await agent.step(bb)
+                    except Exception as e:
+                        self._fail(agent, e)
+                    if token is not None:
+                        watchdog.end(token)
+                    self._record(agent, released, deadline, loop.time())
+            # A tick's batch runs in one loop iteration; yield to I/O (and
+            # to newly released, possibly more urgent, work) per time slice
+            if loop.time() - slice_start >= DISPATCH_SLICE or not self._ready:
+                if written:
+                    await self._write_batch(written)
+                    written = []
+                if offload:
+                    self._offload(offload)
+                    offload = []
+                await asyncio.sleep(0)
+                slice_start = loop.time()
+
+    async def _write_batch(self, written: List[tuple]):
+        """Write one slice's sampled payloads with one write_many()."""
+        bb = self.blackboard
+        try:
+            await bb.write_many([(agent.layer, agent.agent_id, payload)
+                                 for agent, _, _, payload in written])
+        except Exception:
+            # One bad payload fails only its own agent
+            for agent, _, _, payload in written:
+                try:
+                    await bb.write(agent.layer, agent.agent_id, payload)
+                except Exception as e:
+                    self._fail(agent, e)
+        end = asyncio.get_running_loop().time()
+        for agent, released, deadline, _ in written:
+            self._record(agent, released, deadline, end)
+
+    def _record(self, agent, released: float, deadline: float, end: float):
+        stats = self._agent_stats(agent)
+        latency_ms = (end - released) * 1000
+        stats["runs"] += 1
+        stats["last_latency_ms"] = latency_ms
+        if latency_ms > stats["max_latency_ms"]:
+            stats["max_latency_ms"] = latency_ms
+        if end > deadline:
+            stats["misses"] += 1
+
+    def _fail(self, agent, error: Exception):
+        """A step raised: flag the agent and hold its releases for the restart delay."""
+        loop = asyncio.get_running_loop()
+        self._crashed(agent, error)
+        self._held[agent.agent_id] = loop.time() + 2
+        loop.call_later(2, self._restarted, agent)
+
+    # ── Process pool ─────────────────────────────────────────────
+
+    def _offload(self, batch: List[tuple]):
+        """Send one slice's process-pinned steps to the pool, one message per worker."""
+        try:
+            futures = self._pool.submit([agent for agent, _, _ in batch])
+        except Exception as e:
+            for agent, _, _ in batch:
+                self._queued.discard(agent.agent_id)
+                self._fail(agent, e)
+            return
+        items = {item[0].agent_id: item for item in batch}
+        for fut, agent_ids in futures:
+            asyncio.create_task(self._deliver(fut, {aid: items[aid] for aid in agent_ids}))
+
+    async def _deliver(self, fut: asyncio.Future, pending: Dict[str, tuple]):
+        """Write one worker's results as one batch, as soon as they arrive."""
+        loop = asyncio.get_running_loop()
+        try:
+            results = await fut
+        except Exception as e:
+            # The worker died: fail what it owed us
+            for agent_id, (agent, _, _) in pending.items():
+                self._queued.discard(agent_id)
+                self._fail(agent, e)
+            return
+        records = []
+        done = []
+        for agent_id, payload, error in results:
+            agent, released, deadline = pending.pop(agent_id)
+            self._queued.discard(agent_id)
+            if self._by_id.get(agent_id) is not agent:
+                continue   # removed while its step was in flight
+            if error is not None:
+                self._fail(agent, RuntimeError(error))
+                continue
+            records.append((agent.layer, agent_id, payload))
+            done.append((agent, released, deadline))
+        await self.blackboard.write_many(records)
+        end = loop.time()
+        for agent, released, deadline in done:
+            self._record(agent, released, deadline, end)
+
+    async def close(self):
+        """Stop the ticker, dispatcher, watchers and run()-only agents, then the pool."""
+        tasks = [task for task in (self._ticker, self._dispatcher) if task is not None]
+        tasks += list(self._watchers.values()) + list(self._runners.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._ticker = self._dispatcher = None
+        self._watchers.clear()
+        self._runners.clear()
+        self._started = False
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def _restarted(self, agent):
+        self._held.pop(agent.agent_id, None)
+        agent.status = "running"
+
+    def schedule_stats(self) -> dict:
+        """JSON-safe per-agent scheduling counters and the loop's current lag."""
+        by_id = {agent.agent_id: agent for agent in self.agents}
+        agents = {}
+        for agent_id, stats in self._stats.items():
+            agent = by_id.get(agent_id)
+            agents[agent_id] = dict(
+                stats,
+                priority=getattr(agent, "priority", "normal"),
+                deadline_ms=round(self.deadline_of(agent) * 1000, 1),
+                last_latency_ms=round(stats["last_latency_ms"], 2),
+                max_latency_ms=round(stats["max_latency_ms"], 2),
+            )
+        return {
+            "lag_ms": round(self._lag * 1000, 2),
+            "overloaded": self.overloaded,
+            "queued": len(self._ready),
+            "agents": agents,
+        }
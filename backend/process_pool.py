@@ -0,0 +1,171 @@
+"""
+RailGuard 5000 — Agent Process Pool
+Runs CPU-heavy agents' `sample()` in worker processes, so a slow
+diagnostic model never stalls the event loop that serves FastAPI.
+
+Each agent is pinned to one worker, which keeps the live agent object
+between steps (so any state an agent accumulates stays put) — after the
+first send, only agent ids cross the process boundary. The loop talks to
+every worker over one duplex pipe:
+
+    loop   → worker   ("add", agent)                 once per agent
+    loop   → worker   ("run", batch_id, [agent_id])  one message per tick
+    loop   → worker   ("drop", [agent_id])           agents removed
+    worker → loop     (batch_id, [(agent_id, payload, error)])
+
+Replies are read with `loop.add_reader` on the pipe, so no thread sits
+between the workers and the loop. Workers are spawned (not forked), so
+they never inherit the engine's threads or open files.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from typing import Dict, List, Tuple, Any, Optional
+
+logger = logging.getLogger("ProcessPool")
+
+Result = Tuple[str, Any, Optional[str]]   # agent_id, payload, error
+
+
+def _worker_main(conn):
+    """Worker process: hold pinned agents, sample them batch by batch."""
+    agents: Dict[str, Any] = {}
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if message[0] == "add":
+            agent = message[1]
+            agents[agent.agent_id] = agent
+        elif message[0] == "drop":
+            for agent_id in message[1]:
+                agents.pop(agent_id, None)
+        elif message[0] == "run":
+            _, batch_id, agent_ids = message
+            results: List[Result] = []
+            for agent_id in agent_ids:
+                try:
+                    results.append((agent_id, agents[agent_id].sample(), None))
+                except Exception as e:
+                    results.append((agent_id, None, f"{e.__class__.__name__}: {e}"))
+            conn.send((batch_id, results))
+        elif message[0] == "stop":
+            break
+    conn.close()
+
+
+class AgentProcessPool:
+    """A fixed set of worker processes with agents pinned to them."""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self._ctx = multiprocessing.get_context("spawn")
+        self._procs: List[Any] = []
+        self._conns: List[Any] = []
+        self._pinned: Dict[str, int] = {}
+        self._load: List[int] = []
+        self._dead: set = set()
+        self._pending: Dict[int, Tuple[int, asyncio.Future]] = {}
+        self._batch_ids = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self):
+        """Spawn the workers; call from the running loop."""
+        self._loop = asyncio.get_running_loop()
+        for i in range(self.workers):
+            parent, child = self._ctx.Pipe(duplex=True)
+            proc = self._ctx.Process(target=_worker_main, args=(child,),
+                                     name=f"railguard-agents-{i}", daemon=True)
+            proc.start()
+            child.close()
+            self._procs.append(proc)
+            self._conns.append(parent)
+            self._load.append(0)
+            self._loop.add_reader(parent.fileno(), self._on_reply, i)
+        logger.info(f"Started {self.workers} agent worker processes")
+
+    def pin(self, agent) -> int:
+        """Hand an agent to the least-loaded worker; returns the worker index."""
+        worker = self._pinned.get(agent.agent_id)
+        if worker is None:
+            live = [i for i in range(self.workers) if i not in self._dead]
+            if not live:
+                raise RuntimeError("no agent worker processes left")
+            worker = min(live, key=self._load.__getitem__)
+            self._conns[worker].send(("add", agent))
+            self._pinned[agent.agent_id] = worker
+            self._load[worker] += 1
+        return worker
+
+    def unpin(self, agent_ids: List[str]):
+        """Release removed agents from their workers."""
+        by_worker: Dict[int, List[str]] = {}
+        for agent_id in agent_ids:
+            worker = self._pinned.pop(agent_id, None)
+            if worker is not None:
+                self._load[worker] -= 1
+                by_worker.setdefault(worker, []).append(agent_id)
+        for worker, ids in by_worker.items():
+            if worker not in self._dead:
+                self._conns[worker].send(("drop", ids))
+
+    def is_pinned(self, agent_id: str) -> bool:
+        return agent_id in self._pinned
+
+    def submit(self, agents: List[Any]) -> List[Tuple[asyncio.Future, List[str]]]:
+        """
+        Sample `agents` in their workers, one message per worker. Returns a
+        (future, agent_ids) pair per worker; the future resolves to that
+        worker's [(agent_id, payload, error)].
+        """
+        by_worker: Dict[int, List[str]] = {}
+        for agent in agents:
+            by_worker.setdefault(self.pin(agent), []).append(agent.agent_id)
+        futures = []
+        for worker, agent_ids in by_worker.items():
+            self._batch_ids += 1
+            fut = self._loop.create_future()
+            self._pending[self._batch_ids] = (worker, fut)
+            self._conns[worker].send(("run", self._batch_ids, agent_ids))
+            futures.append((fut, agent_ids))
+        return futures
+
+    def _on_reply(self, worker: int):
+        conn = self._conns[worker]
+        try:
+            batch_id, results = conn.recv()
+        except (EOFError, OSError):
+            # Its agents are re-pinned to the other workers on their next step
+            self._loop.remove_reader(conn.fileno())
+            self._dead.add(worker)
+            logger.error(f"Agent worker {worker} exited")
+            for agent_id in [a for a, w in self._pinned.items() if w == worker]:
+                del self._pinned[agent_id]
+            for batch_id, (w, fut) in list(self._pending.items()):
+                if w == worker:
+                    del self._pending[batch_id]
+                    if not fut.done():
+                        fut.set_exception(RuntimeError(f"agent worker {worker} exited"))
+            return
+        _, fut = self._pending.pop(batch_id, (None, None))
+        if fut is not None and not fut.done():
+            fut.set_result(results)
+
+    def close(self):
+        for i, conn in enumerate(self._conns):
+            if i in self._dead:
+                continue
+            try:
+                self._loop.remove_reader(conn.fileno())
+                conn.send(("stop",))
+            except (OSError, ValueError):
+                pass
+        for proc in self._procs:
+            proc.join(timeout=2)
+            if proc.is_alive():
+                proc.terminate()
+        for conn in self._conns:
+            conn.close()
+        self._procs, self._conns = [], []
@@ -0,0 +1,185 @@
+"""
+RailGuard 5000 — Compiled Payload Sanitizers
+Schema-learning fast path for `Blackboard.write`.
+
+Agents write the same payload shape on every tick, so walking each payload
+with `isinstance` checks (see `blackboard._sanitize`) repeats the same work
+150+ times a second. The first write from an agent is sanitized generically
+and its shape is compiled into a straight-line Python function: exact-type
+guards on every leaf, then a literal rebuild of the dict. Later writes with
+the same shape run only that function; a guard failure falls back to the
+generic walk and compiles the new shape.
+"""
+import logging
+from typing import Dict, Any, Callable, List, Optional, Hashable
+
+logger = logging.getLogger("Serializers")
+
+_PRIMITIVES = (bool, int, float, str)
+# Shapes kept per writer before the oldest is dropped (writers that flip
+# between a few payload variants still stay on the fast path)
+MAX_SHAPES_PER_KEY = 4
+# Compiled sanitizers shared between writers with the same shape (a fleet's
+# "T001/A19" and "T002/A19"), so each shape is compiled once, not per writer
+MAX_SHARED_SHAPES = 4096
+
+
+class ShapeMiss(Exception):
+    """Raised by a compiled sanitizer when the payload does not match its shape."""
+
+
+def sanitize(obj):
+    """Recursively convert any value into a JSON-safe primitive."""
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, (list, tuple)):
+        return [sanitize(i) for i in obj]
+    if isinstance(obj, dict):
+        return {str(k): sanitize(v) for k, v in obj.items()}
+    # Fallback: convert to string
+    return str(obj)
+
+
+class _Emitter:
+    """Generates the source of one compiled sanitizer."""
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.helpers: List[str] = []
+        self._n = 0
+
+    def var(self) -> str:
+        self._n += 1
+        return f"v{self._n}"
+
+    def node(self, value, src: str, indent: str) -> str:
+        """Emit guards for `src` (which holds `value` today); return the output expression."""
+        t = type(value)
+        if value is None:
+            self.lines.append(f"{indent}if {src} is not None: raise ShapeMiss")
+            return "None"
+        if t in _PRIMITIVES:
+            self.lines.append(f"{indent}if type({src}) is not {t.__name__}: raise ShapeMiss")
+            return src
+        if t is dict and all(type(k) is str for k in value):
+            self.lines.append(f"{indent}if type({src}) is not dict or len({src}) != {len(value)}: raise ShapeMiss")
+            items = []
+            for key, sub in value.items():
+                v = self.var()
+                self.lines.append(f"{indent}{v} = {src}[{key!r}]")
+                items.append(f"{key!r}: {self.node(sub, v, indent)}")
+            return "{" + ", ".join(items) + "}"
+        if t in (list, tuple) and value:
+            elem_types = {type(e) for e in value}
+            if len(elem_types) == 1:
+                et = elem_types.pop()
+                if et in _PRIMITIVES:
+                    self.lines.append(f"{indent}if type({src}) is not {t.__name__}: raise ShapeMiss")
+                    self.lines.append(f"{indent}for _e in {src}:")
+                    self.lines.append(f"{indent}    if type(_e) is not {et.__name__}: raise ShapeMiss")
+                    return f"list({src})"
+                if et is dict:
+                    helper = self.element_helper(value)
+                    if helper:
+                        self.lines.append(f"{indent}if type({src}) is not {t.__name__}: raise ShapeMiss")
+                        return f"[{helper}(_e) for _e in {src}]"
+        # Anything irregular (empty lists, mixed lists, odd keys, foreign
+        # types) keeps the generic walk for that subtree only.
+        return f"sanitize({src})"
+
+    def element_helper(self, elements: list) -> Optional[str]:
+        """Compile a helper for a list of same-shaped dicts, or None if they differ."""
+        shape = shape_key(elements[0])
+        if any(shape_key(e) != shape for e in elements[1:]):
+            return None
+        sub = _Emitter()
+        sub._n = self._n
+        body = sub.node(elements[0], "e", "    ")
+        self._n = sub._n
+        name = f"_elem{len(self.helpers)}_{self._n}"
+        self.helpers.extend(sub.helpers)
+        self.helpers.append("\n".join([f"def {name}(e):", *sub.lines, f"    return {body}"]))
+        return name
+
+
+def shape_key(value) -> Hashable:
+    """Structural signature: dict keys and exact leaf types, not values."""
+    t = type(value)
+    if t is dict:
+        return ("d", tuple((k, shape_key(v)) for k, v in value.items()))
+    if t in (list, tuple):
+        return (t.__name__, tuple(shape_key(e) for e in value))
+    return t.__name__
+
+
+def compile_sanitizer(sample: Any) -> Callable[[Any], Any]:
+    """Build a sanitizer specialized to the shape of `sample`."""
+    em = _Emitter()
+    body = em.node(sample, "v0", "    ")
+    source = "\n".join([
+        *em.helpers,
+        "def _compiled(v0):",
+        *em.lines,
+        f"    return {body}",
+    ])
+    namespace = {"ShapeMiss": ShapeMiss, "sanitize": sanitize}
+    exec(compile(source, "<compiled-sanitizer>", "exec"), namespace)
+    fn = namespace["_compiled"]
+    fn.source = source
+    return fn
+
+
+class PayloadSanitizer:
+    """
+    Per-writer cache of compiled sanitizers. `sanitize(key, data)` returns
+    the same result as the generic walk, just faster once the shape is known.
+    """
+
+    def __init__(self, max_shapes: int = MAX_SHAPES_PER_KEY):
+        self.max_shapes = max_shapes
+        self._compiled: Dict[Hashable, List[Callable]] = {}
+        self._by_shape: Dict[Hashable, Callable] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def sanitize(self, key: Hashable, data: Any):
+        compiled = self._compiled.get(key)
+        if compiled:
+            for i, fn in enumerate(compiled):
+                try:
+                    result = fn(data)
+                except (ShapeMiss, KeyError):
+                    continue
+                if i:
+                    # Most recent shape first
+                    compiled.insert(0, compiled.pop(i))
+                self.hits += 1
+                return result
+
+        # Slow path: generic walk, then learn this shape for next time
+        self.misses += 1
+        result = sanitize(data)
+        try:
+            shape = shape_key(data)
+            fn = self._by_shape.get(shape)
+            if fn is None:
+                fn = compile_sanitizer(data)
+                if len(self._by_shape) >= MAX_SHARED_SHAPES:
+                    del self._by_shape[next(iter(self._by_shape))]
+                self._by_shape[shape] = fn
+        except Exception as e:  # never let the optimizer break a write
+            logger.warning(f"Could not compile sanitizer for {key}: {e}")
+            return result
+        compiled = self._compiled.setdefault(key, [])
+        compiled.insert(0, fn)
+        del compiled[self.max_shapes:]
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "writers": len(self._compiled),
+            "shapes": sum(len(c) for c in self._compiled.values()),
+            "compiled": len(self._by_shape),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,316 @@
+"""
+RailGuard 5000 — Shared-Memory Blackboard
+Lets several uvicorn worker processes serve one simulation.
+
+A single engine process owns the agents and the real Blackboard, and a
+SharedBlackboardPublisher copies the board into a named
+`multiprocessing.shared_memory` segment whenever it changes. API workers
+attach a SharedBlackboardReader, which offers the read side of the
+Blackboard API (`read`, `get_status`, `get_all_health`, ...) from that
+segment, so HTTP/WS serving scales across cores without duplicating agents.
+
+Segment layout (seqlock):
+
+    [0:8)   u64 sequence — odd while the publisher is writing
+    [8:12)  u32 length of the JSON document
+    [12:16) u32 generation — random per publisher, 0 once it has closed
+    [16:)   JSON document {"version", "time", "layers", "status", "health", "agents"}
+
+The publisher bumps the sequence to odd, writes, then bumps it to even.
+A reader copies the document and keeps it only if the sequence was the same
+even number before and after the copy; otherwise it backs off briefly and
+retries, and serves its last good copy if the publisher keeps it out.
+
+A restarted engine unlinks the old segment and creates a new one under the
+same name, while readers still map the old one. A reader re-opens the name
+when its segment's generation reads 0 (clean shutdown), or when the
+sequence has not moved for `stale_after` seconds and the segment now under
+the name carries another generation (the engine died).
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from multiprocessing import shared_memory, resource_tracker
+from struct import Struct
+from types import MappingProxyType, SimpleNamespace
+from typing import Optional, Dict, Any, List
+
+import numpy as np
+
+logger = logging.getLogger("SharedBlackboard")
+
+DEFAULT_NAME = "railguard_blackboard"
+DEFAULT_SIZE = 4 * 1024 * 1024
+DEFAULT_PUBLISH_INTERVAL = 0.1
+
+_SEQ = Struct("<Q")
+_LEN = Struct("<I")
+_GEN = Struct("<I")
+_DATA_OFFSET = 16
+_READ_RETRIES = 20
+_RETRY_SLEEP = 0.0001   # s between retries once yielding alone did not help
+
+
+class SharedBlackboardPublisher:
+    """Engine side: mirrors a Blackboard (and agent statuses) into shared memory."""
+
+    def __init__(self, blackboard, orchestrator=None, name: str = DEFAULT_NAME,
+                 size: int = DEFAULT_SIZE, interval: float = DEFAULT_PUBLISH_INTERVAL):
+        self.blackboard = blackboard
+        self.orchestrator = orchestrator
+        self.name = name
+        self.interval = interval
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left over from an engine that did not shut down cleanly
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self._buf = self._shm.buf
+        _SEQ.pack_into(self._buf, 0, 0)
+        _LEN.pack_into(self._buf, 8, 0)
+        self.generation = int.from_bytes(os.urandom(4), "little") or 1
+        _GEN.pack_into(self._buf, 12, self.generation)
+        self._seq = 0
+        self._last_key = None
+        self._task: Optional[asyncio.Task] = None
+        self.publishes = 0
+
+    def publish(self, force: bool = False) -> bool:
+        """Write the current board if it changed since the last publish."""
+        bb = self.blackboard
+        agents = self.orchestrator.agents if self.orchestrator is not None else []
+        statuses = [[a.agent_id, a.status] for a in agents]
+        key = (bb.get_version(), tuple(map(tuple, statuses)))
+        if not force and key == self._last_key:
+            return False
+        doc = {
+            "version": bb.get_version(),
+            "time": time.time(),
+            "layers": {str(l): dict(bb.read_nowait(l)) for l in bb.LAYER_NAMES},
+            "status": bb.get_status(),
+            "health": bb.get_all_health(),
+            "agents": statuses,
+        }
+        data = json.dumps(doc, separators=(",", ":")).encode("utf-8")
+        if _DATA_OFFSET + len(data) > self._shm.size:
+            logger.error(f"Board snapshot ({len(data)} B) exceeds shared segment "
+                         f"({self._shm.size} B); raise RAILGUARD_SHM_SIZE")
+            return False
+        buf = self._buf
+        _SEQ.pack_into(buf, 0, self._seq + 1)           # odd: write in progress
+        buf[_DATA_OFFSET:_DATA_OFFSET + len(data)] = data
+        _LEN.pack_into(buf, 8, len(data))
+        self._seq += 2
+        _SEQ.pack_into(buf, 0, self._seq)                # even: stable
+        self._last_key = key
+        self.publishes += 1
+        return True
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._publish_forever())
+
+    async def _publish_forever(self):
+        while True:
+            try:
+                self.publish()
+            except Exception as e:
+                logger.error(f"Shared blackboard publish failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        _GEN.pack_into(self._buf, 12, 0)   # tells attached readers to re-open
+        self._buf = None
+        self._shm.close()
+        self._shm.unlink()
+
+
+class SharedBlackboardReader:
+    """
+    Worker side: read-only Blackboard look-alike backed by the shared segment.
+    Attaches lazily, so workers may start before the engine, and re-attaches
+    when the engine restarts. The document is parsed once per published
+    change and shared by every caller in the worker.
+    """
+
+    LAYER_NAMES = {
+        1: "RAW_SENSOR",
+        2: "ENHANCED_DATA",
+        3: "COMPONENT_HEALTH",
+        4: "PREDICTIONS",
+        5: "DECISIONS",
+        6: "NETWORK_STATE",
+    }
+
+    def __init__(self, name: str = DEFAULT_NAME,
+                 stale_after: float = 5 * DEFAULT_PUBLISH_INTERVAL):
+        self.name = name
+        # Seconds without a new sequence before checking the name for a new segment
+        self.stale_after = stale_after
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._generation = 0
+        self._seq = -1
+        self._seq_at = 0.0      # monotonic time the sequence last moved (or was checked)
+        self.fallbacks = 0      # reads served from the last good copy
+        self._doc: Dict[str, Any] = {"version": 0, "layers": {}, "status": {},
+                                     "health": {}, "agents": []}
+        self._json: Dict[str, str] = {}
+        self.journal = None
+
+    def _open(self) -> Optional[shared_memory.SharedMemory]:
+        try:
+            shm = shared_memory.SharedMemory(name=self.name)
+        except FileNotFoundError:
+            return None
+        # Attaching registers the segment with this process's resource
+        # tracker, which would unlink it when the worker exits
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+    def _attach(self) -> bool:
+        if self._shm is not None:
+            return True
+        shm = self._open()
+        if shm is None:
+            return False
+        self._use(shm)
+        return True
+
+    def _reattach(self) -> bool:
+        """Swap to the segment now under our name if it belongs to another publisher."""
+        self._seq_at = time.monotonic()
+        shm = self._open()
+        if shm is None:
+            return False   # engine not back yet: keep serving the old copy
+        if _GEN.unpack_from(shm.buf, 12)[0] in (0, self._generation):
+            shm.close()    # still ours (just quiet), or its publisher is gone too
+            return False
+        logger.info(f"Shared blackboard {self.name} was recreated; re-attaching")
+        self._shm.close()
+        self._use(shm)
+        return True
+
+    def _use(self, shm: shared_memory.SharedMemory):
+        self._shm = shm
+        self._generation = _GEN.unpack_from(shm.buf, 12)[0]
+        self._seq = -1   # a new segment restarts its sequence
+        self._seq_at = time.monotonic()
+
+    def _refresh(self) -> Dict[str, Any]:
+        if not self._attach():
+            return self._doc
+        buf = self._shm.buf
+        for attempt in range(_READ_RETRIES):
+            if attempt:
+                # Let the publisher finish its write
+                time.sleep(0 if attempt < 4 else _RETRY_SLEEP)
+            seq = _SEQ.unpack_from(buf, 0)[0]
+            if seq & 1:
+                continue
+            if seq == self._seq:
+                # Unchanged: closed (look on every read until the new segment
+                # appears), or quiet long enough that the engine may have died
+                if (not _GEN.unpack_from(buf, 12)[0]
+                        or time.monotonic() - self._seq_at >= self.stale_after):
+                    if self._reattach():
+                        return self._refresh()
+                return self._doc
+            length = _LEN.unpack_from(buf, 8)[0]
+            data = bytes(buf[_DATA_OFFSET:_DATA_OFFSET + length])
+            if _SEQ.unpack_from(buf, 0)[0] != seq:
+                continue   # torn: the publisher wrote during the copy
+            self._seq = seq
+            self._seq_at = time.monotonic()
+            if not length:
+                return self._doc
+            self._doc = json.loads(data)
+            self._json = {}
+            return self._doc
+        # The publisher kept us out: serve the last good copy
+        self.fallbacks += 1
+        return self._doc
+
+    # ── Blackboard read API ─────────────────────────────────────
+
+    async def read(self, layer: int, agent_id: Optional[str] = None):
+        return self.read_nowait(layer, agent_id)
+
+    def read_nowait(self, layer: int, agent_id: Optional[str] = None):
+        entries = self._refresh()["layers"].get(str(layer))
+        if entries is None:
+            return {}
+        if agent_id:
+            return entries.get(agent_id)
+        return MappingProxyType(entries)
+
+    def get_version(self, layer: Optional[int] = None, agent_id: Optional[str] = None) -> int:
+        doc = self._refresh()
+        if layer is None:
+            return doc["version"]
+        entries = doc["layers"].get(str(layer), {})
+        if agent_id:
+            return entries.get(agent_id, {}).get("version", 0)
+        return max((e.get("version", 0) for e in entries.values()), default=0)
+
+    def get_status(self) -> dict:
+        return self._refresh()["status"]
+
+    def get_all_health(self) -> dict:
+        return self._refresh()["health"]
+
+    def _cached_json(self, key: str) -> str:
+        doc = self._refresh()
+        text = self._json.get(key)
+        if text is None:
+            text = self._json[key] = json.dumps(doc[key])
+        return text
+
+    def get_status_json(self) -> str:
+        return self._cached_json("status")
+
+    def get_all_health_json(self) -> str:
+        return self._cached_json("health")
+
+    def history(self, layer: int, agent_id: str, field: str, window=None, since=None):
+        """History stays in the engine process; workers only see the latest state."""
+        empty = np.empty(0)
+        empty.flags.writeable = False
+        return empty, empty
+
+    def history_fields(self, layer: int, agent_id: str) -> List[str]:
+        return []
+
+    @property
+    def agents(self) -> List[SimpleNamespace]:
+        return [SimpleNamespace(agent_id=aid, status=status)
+                for aid, status in self._refresh()["agents"]]
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
+
+class SharedOrchestratorView:
+    """Stands in for the Orchestrator in API workers: agent statuses, no agents."""
+
+    def __init__(self, reader: SharedBlackboardReader):
+        self.reader = reader
+
+    @property
+    def agents(self) -> List[SimpleNamespace]:
+        return self.reader.agents
+
+    async def start_all(self):
+        logger.info("Reader worker: agents run in the engine process")
@@ -0,0 +1,293 @@
+"""
+RailGuard 5000 — Thermal Imaging
+Frame analysis for the bogie IR cameras read by A2 (Thermal Imaging).
+Every frame time brings one (cameras, rows, cols) stack of temperatures
+(°C), analysed as a whole:
+
+  * Region maxima — each camera sees the bogie through the same
+    rectangular regions of interest (wheels, axle-box bearing, brake
+    disc); a region's temperature is its hottest pixel, one reduction
+    per region across all cameras.
+  * Hotspots — pixels hotter than ambient by more than their region's
+    limit, grouped into 4-connected components. Labelling works on runs,
+    not pixels: runs come from one diff of the padded mask, runs that
+    overlap the run above are found with two searchsorted calls, and
+    components are merged by min-label propagation over those edges.
+    Each component's area, centroid and peak come from bincount and
+    reduceat over its runs.
+  * Tracking — hotspots are matched to the previous frame's tracks by
+    nearest centroid on the same camera (greedy, within TRACK_GATE_PX).
+    A track seen for TRACK_CONFIRM frames is a hotspot; its warming rate
+    comes from its peak since it first appeared.
+
+ThermalAnalyzer allocates its masks and work frames once for a fixed
+camera count and frame shape; per frame, only arrays sized by the number
+of runs and hotspots are created. Python loops per region and per
+hotspot, never per pixel.
+
+ThermalSimulator stands in for the camera driver: per-region heat blobs
+over ambient, windows of a shared noise bank, and growing hotspots during
+overheating episodes.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+FRAME_SHAPE = (120, 160)       # rows, cols (160 x 120 microbolometer)
+FRAME_RATE = 30.0              # frames per second per camera
+MIN_HOTSPOT_PX = 4             # smaller components are pixel noise
+TRACK_GATE_PX = 8.0            # furthest a hotspot moves between frames
+TRACK_MAX_MISSES = 5           # frames a track survives without a detection
+TRACK_CONFIRM = 3              # frames a track needs before it counts as a hotspot
+
+HOTSPOT_FIELDS = ("camera", "region", "row", "col", "area_px", "max_c")
+
+
+class Region:
+    """A rectangular region of interest and how far above ambient it may run (°C)."""
+
+    def __init__(self, name: str, rows: Tuple[int, int], cols: Tuple[int, int], limit_c: float):
+        self.name = name
+        self.rows = rows
+        self.cols = cols
+        self.limit_c = limit_c
+
+    @property
+    def window(self) -> Tuple[slice, slice]:
+        return slice(*self.rows), slice(*self.cols)
+
+
+# Side view of one bogie; regions must not overlap
+BOGIE_REGIONS = (
+    Region("wheel_bogie_1", (40, 116), (4, 50), 60.0),
+    Region("wheel_bogie_2", (40, 116), (110, 156), 60.0),
+    Region("bearing_assembly", (8, 36), (4, 50), 50.0),
+    Region("brake_disc", (40, 116), (58, 102), 120.0),
+)
+
+
+class ThermalAnalyzer:
+    """Region maxima and connected-component hotspots over (cameras, rows, cols) frames."""
+
+    def __init__(self, cameras: int, shape: Tuple[int, int] = FRAME_SHAPE,
+                 regions: Tuple[Region, ...] = BOGIE_REGIONS):
+        self.cameras = cameras
+        self.shape = tuple(shape)
+        self.regions = regions
+        rows, cols = self.shape
+        # Per pixel: allowed rise over ambient (inf outside every region) and region index
+        self._limit = np.full(self.shape, np.inf, dtype=np.float32)
+        self._region = np.full(self.shape, -1, dtype=np.int8)
+        for k, region in enumerate(regions):
+            self._limit[region.window] = region.limit_c
+            self._region[region.window] = k
+        self._excess = np.empty((cameras,) + self.shape, dtype=np.float32)
+        # Hot-pixel mask with a cold column either side of every row, so runs never wrap
+        self._mask = np.zeros((cameras, rows, cols + 2), dtype=bool)
+        self._maxima = np.empty((cameras, len(regions)), dtype=np.float32)
+
+    def region_max(self, frames: np.ndarray) -> np.ndarray:
+        """(cameras, regions) hottest pixel per region; reused by the next call."""
+        for k, region in enumerate(self.regions):
+            np.max(frames[(slice(None),) + region.window], axis=(1, 2), out=self._maxima[:, k])
+        return self._maxima
+
+    def hotspots(self, frames: np.ndarray, ambient_c) -> Dict[str, np.ndarray]:
+        """
+        Components of pixels above ambient + their region's limit with at
+        least MIN_HOTSPOT_PX pixels, as columns (HOTSPOT_FIELDS). `ambient_c`
+        is a scalar or one value per camera.
+        """
+        cameras, rows, cols = frames.shape
+        width = cols + 2
+        ambient = np.asarray(ambient_c, dtype=np.float32).reshape(-1, 1, 1)
+        np.subtract(frames, ambient, out=self._excess)
+        np.greater(self._excess, self._limit, out=self._mask[:, :, 1:-1])
+
+        # Runs: alternate rising and falling edges of the flattened, padded mask
+        edges = np.flatnonzero(np.diff(self._mask.reshape(-1).view(np.int8))) + 1
+        if not len(edges):
+            return {name: np.empty(0, dtype=np.int64 if name in ("camera", "region", "area_px") else float)
+                    for name in HOTSPOT_FIELDS}
+        starts, ends = edges[0::2], edges[1::2]
+        line = starts // width                  # camera * rows + row
+        first_col = starts - line * width - 1
+        last_col = ends - line * width - 1      # exclusive
+        n = len(starts)
+
+        # Edges: run j touches the runs of the line above whose columns overlap its own
+        lo = np.searchsorted(ends, starts - width, side="right")
+        hi = np.searchsorted(starts, ends - width, side="left")
+        hi[line % rows == 0] = lo[line % rows == 0]     # first row of a camera: nothing above
+        counts = np.maximum(hi - lo, 0)
+        below = np.repeat(np.arange(n), counts)
+        above = np.repeat(lo, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        # Components: propagate the smallest run index along edges until stable
+        label = np.arange(n)
+        while len(below):
+            previous = label.copy()
+            np.minimum.at(label, below, label[above])
+            np.minimum.at(label, above, label[below])
+            label = label[label]
+            if np.array_equal(label, previous):
+                break
+        _, first, component = np.unique(label, return_index=True, return_inverse=True)
+
+        # Per run: pixel count, peak (reduceat over [start, end) of each run), centre
+        length = last_col - first_col
+        pixel = line * cols + first_col
+        bounds = np.empty(2 * n, dtype=np.int64)
+        bounds[0::2] = pixel
+        bounds[1::2] = pixel + length
+        values = frames.reshape(-1) if frames.flags.c_contiguous else np.ascontiguousarray(frames).reshape(-1)
+        if bounds[-1] == len(values):
+            bounds = bounds[:-1]
+        run_max = np.maximum.reduceat(values, bounds)[0::2]
+        row = line % rows
+        area = np.bincount(component, weights=length)
+        peak = np.full(len(first), -np.inf)
+        np.maximum.at(peak, component, run_max)
+        centre_row = np.bincount(component, weights=length * row) / area
+        centre_col = np.bincount(component, weights=length * (first_col + last_col - 1) / 2) / area
+
+        keep = area >= MIN_HOTSPOT_PX
+        head = first[keep]
+        return {
+            "camera": (line[head] // rows).astype(np.int64),
+            "region": self._region[row[head], first_col[head]].astype(np.int64),
+            "row": centre_row[keep],
+            "col": centre_col[keep],
+            "area_px": area[keep].astype(np.int64),
+            "max_c": peak[keep],
+        }
+
+
+class HotspotTracker:
+    """Persistent ids for hotspots across frames, by nearest centroid on the same camera."""
+
+    def __init__(self, gate: float = TRACK_GATE_PX, max_misses: int = TRACK_MAX_MISSES,
+                 confirm: int = TRACK_CONFIRM):
+        self.gate = gate
+        self.max_misses = max_misses
+        self.confirm = confirm
+        self.tracks: Dict[int, dict] = {}
+        self._next_id = 1
+
+    def update(self, spots: Dict[str, np.ndarray], t: float):
+        """Match one frame's hotspots (ThermalAnalyzer.hotspots) taken at time `t` (s)."""
+        ids = list(self.tracks)
+        count = len(spots["camera"])
+        matched: Dict[int, int] = {}
+        if ids and count:
+            tracks = [self.tracks[i] for i in ids]
+            where = np.array([(track["row"], track["col"]) for track in tracks])
+            camera = np.array([track["camera"] for track in tracks])
+            distance = np.hypot(where[:, 0, None] - spots["row"], where[:, 1, None] - spots["col"])
+            distance[camera[:, None] != spots["camera"]] = np.inf
+            taken = set()
+            for flat in np.argsort(distance, axis=None).tolist():
+                i, j = divmod(flat, count)
+                if distance[i, j] > self.gate:
+                    break
+                if ids[i] in matched or j in taken:
+                    continue
+                matched[ids[i]] = j
+                taken.add(j)
+        for track_id in ids:
+            track = self.tracks[track_id]
+            j = matched.get(track_id)
+            if j is None:
+                track["misses"] += 1
+                if track["misses"] > self.max_misses:
+                    del self.tracks[track_id]
+                continue
+            track.update(row=float(spots["row"][j]), col=float(spots["col"][j]),
+                         area_px=int(spots["area_px"][j]), max_c=float(spots["max_c"][j]),
+                         region=int(spots["region"][j]), last_t=t, misses=0)
+            track["frames"] += 1
+        for j in sorted(set(range(count)) - set(matched.values())):
+            self.tracks[self._next_id] = {
+                "camera": int(spots["camera"][j]), "region": int(spots["region"][j]),
+                "row": float(spots["row"][j]), "col": float(spots["col"][j]),
+                "area_px": int(spots["area_px"][j]), "max_c": float(spots["max_c"][j]),
+                "first_t": t, "first_c": float(spots["max_c"][j]), "last_t": t,
+                "frames": 1, "misses": 0,
+            }
+            self._next_id += 1
+
+    def confirmed(self) -> List[Tuple[int, dict]]:
+        """(id, track) for tracks seen in at least `confirm` frames, hottest first."""
+        found = [(i, track) for i, track in self.tracks.items() if track["frames"] >= self.confirm]
+        return sorted(found, key=lambda item: -item[1]["max_c"])
+
+
+def warming_rate(track: dict) -> float:
+    """°C per minute the track's peak has risen since it first appeared."""
+    elapsed = track["last_t"] - track["first_t"]
+    return (track["max_c"] - track["first_c"]) / elapsed * 60 if elapsed > 0 else 0.0
+
+
+class ThermalSimulator:
+    """Synthetic IR frame stacks: region heat over ambient, shared noise, growing hotspots."""
+
+    NOISE_C = 0.4              # temporal noise per pixel
+    NOISE_BANK = 1 << 20       # pre-generated noise values, shared
+    SPOT_SIGMA_PX = 2.5        # hotspot spread
+    SPOT_HALF_PX = 8           # hotspot patch half-width
+
+    def __init__(self, cameras: int, shape: Tuple[int, int] = FRAME_SHAPE,
+                 regions: Tuple[Region, ...] = BOGIE_REGIONS, rng: Optional[np.random.Generator] = None):
+        self.cameras = cameras
+        self.shape = tuple(shape)
+        self.regions = regions
+        self.rng = rng if rng is not None else np.random.default_rng()
+        pixels = self.shape[0] * self.shape[1]
+        # One smooth blob per region, peak 1 at its centre: frame = ambient + heat @ blobs
+        r, c = np.mgrid[0:self.shape[0], 0:self.shape[1]]
+        self._blobs = np.empty((len(regions), pixels), dtype=np.float32)
+        for k, region in enumerate(regions):
+            (r0, r1), (c0, c1) = region.rows, region.cols
+            blob = np.exp(-(((r - (r0 + r1) / 2) / ((r1 - r0) / 3)) ** 2
+                            + ((c - (c0 + c1) / 2) / ((c1 - c0) / 3)) ** 2))
+            self._blobs[k] = blob.reshape(-1)
+        half = self.SPOT_HALF_PX
+        y, x = np.mgrid[-half:half + 1, -half:half + 1]
+        self._spot = np.exp(-(x ** 2 + y ** 2) / (2 * self.SPOT_SIGMA_PX ** 2)).astype(np.float32)
+        self._noise = self._noise_bank(self.NOISE_C)
+        self._out = np.empty((cameras,) + self.shape, dtype=np.float32)
+
+    _banks: Dict[float, np.ndarray] = {}
+
+    @classmethod
+    def _noise_bank(cls, sigma: float) -> np.ndarray:
+        """Pixel noise every simulator draws windows from (fixed seed: same on every run)."""
+        bank = cls._banks.get(sigma)
+        if bank is None:
+            bank = np.random.default_rng(0).standard_normal(cls.NOISE_BANK, dtype=np.float32)
+            bank *= sigma
+            cls._banks[sigma] = bank
+        return bank
+
+    def next_frame(self, ambient_c: float, heat: np.ndarray,
+                   spots: List[Tuple[int, float, float, float]] = ()) -> np.ndarray:
+        """
+        One (cameras, rows, cols) stack: `heat` is (cameras, regions) °C over
+        ambient at each region's centre, `spots` (camera, row, col, °C)
+        hotspots on top. The returned array is reused by the next call.
+        """
+        pixels = self._blobs.shape[1]
+        flat = self._out.reshape(self.cameras, pixels)
+        np.dot(heat.astype(np.float32), self._blobs, out=flat)
+        for camera in range(self.cameras):
+            start = int(self.rng.integers(0, self.NOISE_BANK - pixels))
+            flat[camera] += self._noise[start:start + pixels]
+        flat += ambient_c
+        half = self.SPOT_HALF_PX
+        rows, cols = self.shape
+        for camera, row, col, excess in spots:
+            r, c = int(round(row)), int(round(col))
+            r0, r1, c0, c1 = max(r - half, 0), min(r + half + 1, rows), max(c - half, 0), min(c + half + 1, cols)
+            patch = self._spot[r0 - (r - half):r1 - (r - half), c0 - (c - half):c1 - (c - half)]
+            self._out[camera, r0:r1, c0:c1] += excess * patch
+        return self._out
@@ -0,0 +1,425 @@
+"""
+RailGuard 5000 — Columnar Time-Series Store (Layer 1 RAW_SENSOR)
+Dedicated storage for the highest-rate streams (A7 every 50 ms, A1/A4 every
+100 ms).
+
+Each agent's stream is a list of time chunks. A chunk holds one typed NumPy
+array per field (float32 for floats, int32 for ints, uint8 for flags) plus a
+float64 timestamp column, so a sample costs a few dozen bytes instead of a
+dict. A value that does not fit its column (an int beyond int32, a float
+beyond float32 range, a flag that turns into a number) starts a new chunk
+whose column is widened to int64/float64, so nothing is wrapped or
+truncated and `append()` never fails halfway through a row. Range scans ("speed_kmh over the last 10 minutes") binary-search the
+chunk list and the timestamp column and return slices.
+
+A chunk is sealed when it spans `chunk_seconds`, reaches `MAX_CHUNK_ROWS`, or
+the payload's field set or a field's type changes. With a `directory`, sealed chunks are saved
+by a background thread in a compact single-file format that `load_chunk()`
+memory-maps back:
+
+    b"RGTS" <u32 header_len> <json header> <pad to 64> column blocks (64-aligned)
+
+Float32 keeps ~7 significant digits: ~0.5 m on a latitude, far below GPS error.
+"""
+import bisect
+import glob
+import itertools
+import json
+import logging
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Optional, Any
+
+import numpy as np
+
+logger = logging.getLogger("TimeSeries")
+
+MAGIC = b"RGTS"
+_HEADER_LEN = struct.Struct("<I")
+_ALIGN = 64
+
+DEFAULT_CHUNK_SECONDS = 60.0
+DEFAULT_RETENTION_SECONDS = 3600.0
+MAX_CHUNK_ROWS = 16384
+_INITIAL_ROWS = 256
+
+
+def _leaves(data: dict, prefix: str = ""):
+    """Yield (dotted_path, value) for every numeric or bool leaf."""
+    for key, value in data.items():
+        if isinstance(value, (bool, int, float)):
+            yield prefix + key, value
+        elif isinstance(value, dict):
+            yield from _leaves(value, prefix + key + ".")
+
+
+_INT32 = np.iinfo(np.int32)
+_INT64 = np.iinfo(np.int64)
+_FLOAT32_MAX = float(np.finfo(np.float32).max)
+_INF = float("inf")
+
+
+def _dtype_for(value) -> np.dtype:
+    """Narrowest column type that holds `value` exactly."""
+    if isinstance(value, bool):
+        return np.dtype(np.uint8)
+    if isinstance(value, int):
+        if _INT32.min <= value <= _INT32.max:
+            return np.dtype(np.int32)
+        if _INT64.min <= value <= _INT64.max:
+            return np.dtype(np.int64)
+        return np.dtype(np.float64)
+    if _FLOAT32_MAX < abs(value) < _INF:
+        return np.dtype(np.float64)
+    return np.dtype(np.float32)
+
+
+# Per column type: the ints it takes (exactly, except in float64, the
+# widest there is) and the floats it takes (0: none, 4: float32 range,
+# 8: any). Flags take bools only.
+_LIMITS = {
+    np.dtype(np.uint8): (1, 0, 0),
+    np.dtype(np.int32): (int(_INT32.min), int(_INT32.max), 0),
+    np.dtype(np.int64): (int(_INT64.min), int(_INT64.max), 0),
+    np.dtype(np.float32): (-2 ** 24, 2 ** 24, 4),
+    np.dtype(np.float64): (-_INF, _INF, 8),
+}
+
+
+def _fits(limits: Tuple[float, float, int], value) -> bool:
+    """True if `value` can be stored in a column with these `_LIMITS` without wrapping or truncation."""
+    if type(value) is bool:
+        return True
+    low, high, floats = limits
+    if isinstance(value, float):
+        return floats == 8 or (floats == 4 and not _FLOAT32_MAX < abs(value) < _INF)
+    return low <= value <= high
+
+
+def _empty() -> np.ndarray:
+    arr = np.empty(0)
+    arr.flags.writeable = False
+    return arr
+
+
+class Chunk:
+    """A time-bounded block of rows with one typed array per field."""
+
+    def __init__(self, schema: Dict[str, np.dtype], capacity: int = _INITIAL_ROWS):
+        self.schema = schema
+        self.limits = {name: _LIMITS[dt] for name, dt in schema.items()}
+        self.ts = np.empty(capacity, dtype=np.float64)
+        self.cols = {name: np.empty(capacity, dtype=dt) for name, dt in schema.items()}
+        self.n = 0
+        self.sealed = False
+        self.seq = 0                 # store-wide seal order, part of the file name
+        self.path: Optional[str] = None
+
+    @property
+    def t0(self) -> float:
+        return float(self.ts[0])
+
+    @property
+    def t1(self) -> float:
+        return float(self.ts[self.n - 1])
+
+    def nbytes(self) -> int:
+        return self.ts.nbytes + sum(c.nbytes for c in self.cols.values())
+
+    def accepts(self, row: Dict[str, Any]) -> bool:
+        """True if every value of `row` fits its column's type (see `_fits`)."""
+        # _fits() inlined: this runs for every layer-1 write
+        limits = self.limits
+        for name, value in row.items():
+            low, high, floats = limits[name]
+            kind = type(value)
+            if kind is float:
+                if floats == 8 or (floats == 4 and not _FLOAT32_MAX < abs(value) < _INF):
+                    continue
+                return False
+            if kind is bool or (kind is int and low <= value <= high):
+                continue
+            if not _fits(limits[name], value):
+                return False
+        return True
+
+    def append(self, timestamp: float, row: Dict[str, Any]):
+        if self.n == len(self.ts):
+            self._grow()
+        i = self.n
+        self.ts[i] = timestamp
+        for name, value in row.items():
+            self.cols[name][i] = value
+        self.n = i + 1
+
+    def _grow(self):
+        size = min(2 * len(self.ts), MAX_CHUNK_ROWS)
+        self.ts = np.resize(self.ts, size)
+        self.cols = {name: np.resize(col, size) for name, col in self.cols.items()}
+
+    def seal(self):
+        """Trim spare capacity and freeze the arrays."""
+        n = self.n
+        self.ts = self.ts[:n].copy()
+        self.cols = {name: col[:n].copy() for name, col in self.cols.items()}
+        for arr in (self.ts, *self.cols.values()):
+            arr.flags.writeable = False
+        self.sealed = True
+
+    def slice(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        ts = self.ts[:self.n]
+        a = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+        b = self.n if end is None else int(np.searchsorted(ts, end, side="right"))
+        return a, b
+
+    # ── On-disk format ──────────────────────────────────────────
+
+    def save(self, path: str, agent_id: str):
+        columns = [("__ts__", self.ts[:self.n])] + [(k, v[:self.n]) for k, v in self.cols.items()]
+        layout, offset = {}, 0
+        for name, arr in columns:
+            layout[name] = [arr.dtype.str, offset]
+            offset += -(-arr.nbytes // _ALIGN) * _ALIGN
+        header = json.dumps({"agent_id": agent_id, "rows": self.n, "seq": self.seq,
+                             "columns": layout}).encode("utf-8")
+        head_len = len(MAGIC) + _HEADER_LEN.size + len(header)
+        data_start = -(-head_len // _ALIGN) * _ALIGN
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC + _HEADER_LEN.pack(len(header)) + header)
+            f.write(b"\0" * (data_start - head_len))
+            for name, arr in columns:
+                f.write(arr.tobytes())
+                f.write(b"\0" * (-arr.nbytes % _ALIGN))
+        os.replace(tmp, path)
+
+
+def load_chunk(path: str) -> Tuple[str, Chunk]:
+    """Memory-map a saved chunk read-only; no column data is read up front."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a RailGuard time-series chunk")
+        (header_len,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+        header = json.loads(f.read(header_len))
+    head_len = len(MAGIC) + _HEADER_LEN.size + header_len
+    data_start = -(-head_len // _ALIGN) * _ALIGN
+    rows = header["rows"]
+    arrays = {
+        name: np.memmap(path, dtype=np.dtype(dt), mode="r", offset=data_start + off, shape=(rows,))
+        for name, (dt, off) in header["columns"].items()
+    }
+    ts = arrays.pop("__ts__")
+    chunk = Chunk({name: arr.dtype for name, arr in arrays.items()}, capacity=0)
+    chunk.ts, chunk.cols, chunk.n, chunk.sealed = ts, arrays, rows, True
+    chunk.seq, chunk.path = header.get("seq", 0), path
+    return header["agent_id"], chunk
+
+
+class _Stream:
+    """All chunks of one agent, oldest first."""
+
+    def __init__(self):
+        self.chunks: List[Chunk] = []
+        self.ends: List[float] = []   # t1 of each sealed chunk, for bisect
+        self.active: Optional[Chunk] = None
+
+    def all_chunks(self) -> List[Chunk]:
+        return self.chunks + ([self.active] if self.active is not None and self.active.n else [])
+
+
+class ColumnarStore:
+    """Chunked columnar storage for the RAW_SENSOR layer."""
+
+    def __init__(self, directory: Optional[str] = None,
+                 chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+                 retention_seconds: float = DEFAULT_RETENTION_SECONDS):
+        self.directory = directory
+        self.chunk_seconds = chunk_seconds
+        self.retention_seconds = retention_seconds
+        self._streams: Dict[str, _Stream] = {}
+        self._executor = None
+        # Chunks of one agent may share a t0 (re-chunked on a type change,
+        # virtual clock), so file names also carry a sequence number
+        self._seq = itertools.count(1)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="timeseries")
+            self._load_existing()
+
+    # ── Ingest ───────────────────────────────────────────────────
+
+    def append(self, agent_id: str, timestamp: float, data: dict):
+        row = dict(_leaves(data))
+        if not row:
+            return
+        stream = self._streams.get(agent_id)
+        if stream is None:
+            stream = self._streams[agent_id] = _Stream()
+        chunk = stream.active
+        schema = None
+        if chunk is not None:
+            if row.keys() != chunk.schema.keys():
+                self._seal(agent_id, stream)
+                chunk = None
+            elif not chunk.accepts(row):
+                # Keep the widened types for the rest of the stream so a field
+                # that flips between int32 and int64 values does not seal every row
+                schema = {name: chunk.schema[name] if _fits(chunk.limits[name], v)
+                          else np.promote_types(chunk.schema[name], _dtype_for(v))
+                          for name, v in row.items()}
+                self._seal(agent_id, stream)
+                chunk = None
+            elif timestamp - chunk.t0 >= self.chunk_seconds or chunk.n >= MAX_CHUNK_ROWS:
+                schema = chunk.schema
+                self._seal(agent_id, stream)
+                chunk = None
+        if chunk is None:
+            chunk = stream.active = Chunk(schema or {name: _dtype_for(v) for name, v in row.items()})
+        chunk.append(timestamp, row)
+
+    def _seal(self, agent_id: str, stream: _Stream):
+        chunk = stream.active
+        stream.active = None
+        if chunk is None or chunk.n == 0:
+            return
+        chunk.seal()
+        chunk.seq = next(self._seq)
+        stream.chunks.append(chunk)
+        stream.ends.append(chunk.t1)
+        if self._executor is not None:
+            chunk.path = self._path(agent_id, chunk)
+            self._executor.submit(self._save, agent_id, chunk)
+        self._expire(agent_id, stream, chunk.t1)
+
+    def _expire(self, agent_id: str, stream: _Stream, now: float):
+        cutoff = now - self.retention_seconds
+        drop = bisect.bisect_left(stream.ends, cutoff)
+        if not drop:
+            return
+        old = stream.chunks[:drop]
+        del stream.chunks[:drop]
+        del stream.ends[:drop]
+        if self._executor is not None:
+            self._executor.submit(self._remove, [c.path for c in old if c.path])
+
+    # ── Queries ──────────────────────────────────────────────────
+
+    def agents(self) -> List[str]:
+        return list(self._streams)
+
+    def fields(self, agent_id: str) -> List[str]:
+        stream = self._streams.get(agent_id)
+        if stream is None:
+            return []
+        chunks = stream.all_chunks()
+        return list(chunks[-1].schema) if chunks else []
+
+    def scan(self, agent_id: str, field: str,
+             start: Optional[float] = None,
+             end: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (timestamps, values) of one field with start <= t <= end, oldest first.
+        A range inside one chunk is a zero-copy slice; ranges spanning chunks
+        are concatenated. Chunks without the field are skipped.
+        """
+        stream = self._streams.get(agent_id)
+        if stream is None:
+            return _empty(), _empty()
+        first = 0 if start is None else bisect.bisect_left(stream.ends, start)
+        parts_ts, parts_v = [], []
+        for chunk in stream.all_chunks()[first:]:
+            if end is not None and chunk.t0 > end:
+                break
+            col = chunk.cols.get(field)
+            if col is None:
+                continue
+            a, b = chunk.slice(start, end)
+            if a < b:
+                parts_ts.append(chunk.ts[a:b])
+                parts_v.append(col[a:b])
+        if not parts_ts:
+            return _empty(), _empty()
+        if len(parts_ts) == 1:
+            ts, values = parts_ts[0], parts_v[0]
+        else:
+            ts, values = np.concatenate(parts_ts), np.concatenate(parts_v)
+        ts = ts.view()
+        values = values.view()
+        ts.flags.writeable = False
+        values.flags.writeable = False
+        return ts, values
+
+    def last(self, agent_id: str, field: str, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """The newest `n` samples of one field."""
+        stream = self._streams.get(agent_id)
+        if stream is None or n <= 0:
+            return _empty(), _empty()
+        need, start = n, None
+        for chunk in reversed(stream.all_chunks()):
+            if field not in chunk.cols:
+                break
+            if chunk.n >= need:
+                start = float(chunk.ts[chunk.n - need])
+                break
+            need -= chunk.n
+            start = chunk.t0
+        if start is None:
+            return _empty(), _empty()
+        return self.scan(agent_id, field, start=start)
+
+    def nbytes(self) -> int:
+        """Bytes held in NumPy arrays (memory-mapped chunks included)."""
+        return sum(c.nbytes() for s in self._streams.values() for c in s.all_chunks())
+
+    def samples(self) -> int:
+        return sum(c.n for s in self._streams.values() for c in s.all_chunks())
+
+    # ── Persistence ──────────────────────────────────────────────
+
+    def _path(self, agent_id: str, chunk: Chunk) -> str:
+        safe_id = agent_id.replace("/", "_").replace(":", "_")
+        return os.path.join(self.directory, f"{safe_id}-{chunk.t0:.6f}-{chunk.seq:08d}.rgts")
+
+    def _save(self, agent_id: str, chunk: Chunk):
+        try:
+            chunk.save(chunk.path, agent_id)
+        except Exception as e:
+            logger.error(f"Could not save chunk for {agent_id}: {e}")
+
+    @staticmethod
+    def _remove(paths: List[str]):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _load_existing(self):
+        loaded = last_seq = 0
+        for path in sorted(glob.glob(os.path.join(self.directory, "*.rgts"))):
+            try:
+                agent_id, chunk = load_chunk(path)
+            except Exception as e:
+                logger.warning(f"Skipping unreadable chunk {path}: {e}")
+                continue
+            if chunk.n == 0:
+                continue
+            stream = self._streams.setdefault(agent_id, _Stream())
+            stream.chunks.append(chunk)
+            loaded += 1
+            last_seq = max(last_seq, chunk.seq)
+        self._seq = itertools.count(last_seq + 1)
+        for stream in self._streams.values():
+            stream.chunks.sort(key=lambda c: (c.t0, c.seq))
+            stream.ends = [c.t1 for c in stream.chunks]
+        if loaded:
+            logger.info(f"Mapped {loaded} time-series chunks from {self.directory}")
+
+    def close(self):
+        """Seal and save every active chunk."""
+        for agent_id, stream in self._streams.items():
+            self._seal(agent_id, stream)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,172 @@
+"""
+RailGuard 5000 — Hierarchical Timing Wheel
+One structure for thousands of timers, instead of one asyncio timer each.
+
+Time is cut into ticks. Level 0 has `slots` buckets of one tick each; level
+1 has `slots` buckets of `slots` ticks each, and so on. A timer goes into
+the finest level whose span covers its deadline; whenever a level wraps,
+the next bucket of the level above is cascaded down. `advance(now)` walks
+the ticks that have elapsed and returns the items whose bucket came due.
+
+    schedule / cancel   O(1)
+    advance             O(ticks elapsed + items due + items cascaded)
+
+Items are any hashable key; each item holds at most one timer, so
+scheduling an item again moves it. Deadlines are rounded up to the next
+tick, so an item never fires early — at most one tick late. Buckets keep
+insertion order, so items due on the same tick come out in the order they
+were scheduled, independent of the process's hash seed (reproducible runs
+in virtual time, see clock.py).
+"""
+import math
+from typing import Dict, Hashable, List, Optional, Tuple
+
+DEFAULT_TICK = 0.1
+DEFAULT_SLOTS = 256
+DEFAULT_LEVELS = 4
+
+# A bucket: an insertion-ordered set (dict keys)
+Bucket = Dict[Hashable, None]
+
+
+class TimingWheel:
+    """Hashed hierarchical timing wheel over an external clock."""
+
+    def __init__(self, tick: float = DEFAULT_TICK, slots: int = DEFAULT_SLOTS,
+                 levels: int = DEFAULT_LEVELS, start: float = 0.0):
+        if tick <= 0 or slots < 2 or levels < 1:
+            raise ValueError("TimingWheel needs tick > 0, slots >= 2 and levels >= 1")
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self._start = start
+        self._now_tick = 0                     # last tick processed
+        self._wheels: List[List[Bucket]] = [
+            [{} for _ in range(slots)] for _ in range(levels)]
+        self._spans = [slots ** level for level in range(levels + 1)]
+        # Beyond the top level's reach; re-filed when the top level wraps
+        self._overflow: Bucket = {}
+        # Already due when scheduled; handed out by the next advance()
+        self._due: Bucket = {}
+        # item -> (deadline tick, bucket it sits in)
+        self._timers: Dict[Hashable, Tuple[int, Bucket]] = {}
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._timers
+
+    @property
+    def now(self) -> float:
+        """Clock time of the last processed tick."""
+        return self._start + self._now_tick * self.tick
+
+    def _tick_of(self, when: float) -> int:
+        return math.ceil((when - self._start) / self.tick - 1e-9)
+
+    def _file(self, item: Hashable, due_tick: int):
+        delta = due_tick - self._now_tick
+        if delta <= 0:
+            bucket = self._due
+        elif delta >= self._spans[self.levels]:
+            bucket = self._overflow
+        else:
+            level = 0
+            while delta >= self._spans[level + 1]:
+                level += 1
+            bucket = self._wheels[level][(due_tick // self._spans[level]) % self.slots]
+        bucket[item] = None
+        self._timers[item] = (due_tick, bucket)
+
+    def schedule(self, item: Hashable, when: float):
+        """Fire `item` at clock time `when` (replacing any timer it already has)."""
+        timer = self._timers.get(item)
+        if timer is not None:
+            timer[1].pop(item, None)
+        self._file(item, self._tick_of(when))
+
+    def cancel(self, item: Hashable) -> bool:
+        timer = self._timers.pop(item, None)
+        if timer is None:
+            return False
+        timer[1].pop(item, None)
+        return True
+
+    def deadline(self, item: Hashable) -> Optional[float]:
+        """Tick-rounded time `item` will fire at, or None if it has no timer."""
+        timer = self._timers.get(item)
+        return None if timer is None else self._start + timer[0] * self.tick
+
+    def next_deadline(self) -> Optional[float]:
+        """
+        Earliest time anything can fire, for sleeping between advances.
+        Exact for level 0; for coarser levels it is the time of the next
+        cascade, which is never later than the real deadline.
+        """
+        if self._due:
+            return self.now
+        if not self._timers:
+            return None
+        # A coarser level may cascade before the finer levels' first timer
+        # is due, so take the earliest over all of them
+        top = self._spans[self.levels]
+        earliest = (self._now_tick // top + 1) * top if self._overflow else None
+        for level in range(self.levels):
+            span = self._spans[level]
+            base = self._now_tick // span
+            for step in range(1, self.slots + 1):
+                if self._wheels[level][(base + step) % self.slots]:
+                    tick = (base + step) * span
+                    if earliest is None or tick < earliest:
+                        earliest = tick
+                    break
+        return self._start + earliest * self.tick
+
+    def _cascade(self, bucket: Bucket) -> List[Hashable]:
+        items = list(bucket)
+        bucket.clear()
+        fired = []
+        for item in items:
+            due_tick = self._timers[item][0]
+            if due_tick <= self._now_tick:
+                del self._timers[item]
+                fired.append(item)
+            else:
+                self._file(item, due_tick)
+        return fired
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Move the wheel up to clock time `now`; return the items that came due."""
+        fired: List[Hashable] = []
+        if self._due:
+            fired.extend(self._due)
+            for item in self._due:
+                del self._timers[item]
+            self._due.clear()
+        target = math.floor((now - self._start) / self.tick + 1e-9)
+        if not self._timers:
+            self._now_tick = max(self._now_tick, target)
+            return fired
+        slots = self.slots
+        while self._now_tick < target:
+            self._now_tick += 1
+            tick = self._now_tick
+            # Refill finer levels from coarser ones, top down, on wrap-around
+            if tick % self._spans[self.levels] == 0 and self._overflow:
+                fired.extend(self._cascade(self._overflow))
+            for level in range(self.levels - 1, 0, -1):
+                if tick % self._spans[level] == 0:
+                    bucket = self._wheels[level][(tick // self._spans[level]) % slots]
+                    if bucket:
+                        fired.extend(self._cascade(bucket))
+            bucket = self._wheels[0][tick % slots]
+            if bucket:
+                fired.extend(bucket)
+                for item in bucket:
+                    del self._timers[item]
+                bucket.clear()
+            if not self._timers:
+                self._now_tick = target
+                break
+        return fired
@@ -0,0 +1,263 @@
+"""
+RailGuard 5000 — Vibration Analysis
+Streaming spectrum and bearing-defect analysis for the axle-box
+accelerometers read by A4 (Vibration Spectrum).
+
+  * Welch PSD — Hann-windowed, 50 %-overlapping segments of the newest
+    WELCH_N samples, all segments of all channels in one batched rFFT.
+  * Envelope analysis — the newest ENVELOPE_N samples are band-passed
+    around the bearing resonances and demodulated with the Hilbert
+    transform (analytic signal by FFT); the spectrum of that envelope
+    shows the rate at which rolling elements strike a defect. Only the
+    pass band is inverse-transformed, shifted to baseband, so the
+    envelope comes out decimated (same resolution, a quarter the work).
+  * Defect frequencies — BPFI / BPFO / BSF (and the cage, FTF) follow
+    from the shaft speed, i.e. train speed (A7) and wheel diameter. A
+    defect is flagged when its line (or its 2nd harmonic) in the
+    envelope spectrum stands DEFECT_SNR_DB above the spectrum's median.
+
+SpectrumAnalyzer allocates every work array once, for a fixed channel
+count and window length, and runs each FFT into them (with `out=` on
+NumPy 2, by copy on NumPy 1, whose FFTs don't take it); FFT lengths never
+change, so NumPy's cached FFT plans are reused on every frame. On NumPy 2
+nothing is allocated per frame beyond a few per-channel scalars.
+
+VibrationSimulator stands in for the accelerometer driver: gear mesh,
+broadband noise and, during defect episodes, resonance ringing excited at
+the defect rate, generated block by block into preallocated buffers.
+"""
+import math
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_FS = 25600.0           # Hz per channel (standard 25.6 kHz condition-monitoring rate)
+WELCH_NPERSEG = 1024           # 25 Hz PSD resolution at 25.6 kHz
+WELCH_N = 8192                 # newest samples averaged into the PSD (15 segments)
+ENVELOPE_N = 16384             # 0.64 s: 1.6 Hz envelope resolution at 25.6 kHz
+ENVELOPE_BAND = (2000.0, 8000.0)   # Hz; band-pass around the bearing resonances
+DEFECT_SNR_DB = 15.0           # envelope line above the median floor to raise an alert
+DEFECT_TOLERANCE = 0.01        # relative search window around each defect frequency
+MIN_SHAFT_HZ = 1.0             # ~10 km/h; slower, too few impacts per window to judge
+WHEEL_DIAMETER_M = 0.92        # new-wheel tread diameter
+
+DEFECTS = ("bpfi", "bpfo", "bsf")
+
+# np.fft functions accept `out=` from NumPy 2.0
+FFT_OUT = int(np.__version__.split(".")[0]) >= 2
+
+
+def _fft_into(fft, x: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """fft(x, axis=-1) written into `out`."""
+    if FFT_OUT:
+        return fft(x, axis=-1, out=out)
+    out[...] = fft(x, axis=-1)
+    return out
+
+
+def shaft_hz(speed_kmh: float, wheel_diameter_m: float = WHEEL_DIAMETER_M) -> float:
+    """Axle rotation rate for a train speed (no slip)."""
+    return max(speed_kmh, 0.0) / 3.6 / (math.pi * wheel_diameter_m)
+
+
+class BearingGeometry:
+    """Rolling-element bearing: element count and diameters (mm), contact angle (deg)."""
+
+    def __init__(self, elements: int = 20, element_d: float = 26.0, pitch_d: float = 180.0,
+                 contact_angle: float = 10.0):
+        self.elements = elements
+        self.element_d = element_d
+        self.pitch_d = pitch_d
+        self.contact_angle = contact_angle
+
+    def frequencies(self, shaft: float) -> Dict[str, float]:
+        """Defect frequencies (Hz) at shaft rate `shaft` (Hz), outer ring stationary."""
+        ratio = self.element_d / self.pitch_d * math.cos(math.radians(self.contact_angle))
+        half = self.elements / 2 * shaft
+        return {
+            "bpfi": half * (1 + ratio),
+            "bpfo": half * (1 - ratio),
+            "bsf": self.pitch_d / (2 * self.element_d) * shaft * (1 - ratio ** 2),
+            "ftf": shaft / 2 * (1 - ratio),
+        }
+
+
+# Double-row tapered roller axle-box bearing (one row)
+AXLE_BOX_BEARING = BearingGeometry()
+
+
+class SpectrumAnalyzer:
+    """Welch PSD and envelope spectrum over fixed-size multi-channel windows."""
+
+    def __init__(self, channels: int, fs: float = DEFAULT_FS, nperseg: int = WELCH_NPERSEG,
+                 welch_n: int = WELCH_N, envelope_n: int = ENVELOPE_N,
+                 band: Tuple[float, float] = ENVELOPE_BAND):
+        self.channels = channels
+        self.fs = fs
+        self.nperseg = nperseg
+        self.step = nperseg // 2
+        self.welch_n = welch_n
+        self.envelope_n = envelope_n
+        self.segments = (welch_n - nperseg) // self.step + 1
+
+        # Welch
+        window = np.hanning(nperseg)
+        self._window = window
+        # One-sided density scaling (interior bins doubled)
+        self._psd_scale = 2.0 / (fs * float(window @ window) * self.segments)
+        self.freqs = np.fft.rfftfreq(nperseg, 1 / fs)
+        self._frames = np.empty((channels, self.segments, nperseg))
+        self._frame_spec = np.empty((channels, self.segments, nperseg // 2 + 1), dtype=complex)
+        self._frame_power = np.empty((channels, self.segments, nperseg // 2 + 1))
+        self.psd = np.empty((channels, nperseg // 2 + 1))
+
+        # Envelope: the pass band of the rFFT, moved to baseband, is the
+        # band-limited analytic signal at a decimated rate
+        n = envelope_n
+        resolution = fs / n
+        self._lo = int(math.ceil(band[0] / resolution))
+        self._width = int(band[1] / resolution) + 1 - self._lo
+        m = 1 << (self._width - 1).bit_length()
+        self.envelope_fs = fs * m / n
+        self.envelope_freqs = np.fft.rfftfreq(m, 1 / self.envelope_fs)
+        self._env_window = np.hanning(m)
+        self._centered = np.empty((channels, n))
+        self._spec = np.empty((channels, n // 2 + 1), dtype=complex)
+        self._baseband = np.zeros((channels, m), dtype=complex)
+        self._analytic = np.empty((channels, m), dtype=complex)
+        self._envelope = np.empty((channels, m))
+        self._env_spec = np.empty((channels, m // 2 + 1), dtype=complex)
+        self.envelope_spectrum = np.empty((channels, m // 2 + 1))
+        self._floor = np.empty(channels)
+
+    def welch(self, x: np.ndarray) -> np.ndarray:
+        """(channels, nfreq) PSD (g²/Hz) of the newest `welch_n` samples of `x`."""
+        x = x[:, -self.welch_n:]
+        frames = np.lib.stride_tricks.sliding_window_view(x, self.nperseg, axis=-1)[:, ::self.step]
+        np.multiply(frames[:, :self.segments], self._window, out=self._frames)
+        _fft_into(np.fft.rfft, self._frames, self._frame_spec)
+        np.abs(self._frame_spec, out=self._frame_power)
+        np.square(self._frame_power, out=self._frame_power)
+        np.sum(self._frame_power, axis=1, out=self.psd)
+        self.psd *= self._psd_scale
+        self.psd[:, 0] /= 2
+        if self.nperseg % 2 == 0:
+            self.psd[:, -1] /= 2
+        return self.psd
+
+    def envelope(self, x: np.ndarray) -> np.ndarray:
+        """(channels, nfreq) amplitude spectrum of the band-passed Hilbert envelope of `x`."""
+        x = x[:, -self.envelope_n:]
+        np.subtract(x, x.mean(axis=1, keepdims=True), out=self._centered)
+        _fft_into(np.fft.rfft, self._centered, self._spec)
+        self._baseband[:, :self._width] = self._spec[:, self._lo:self._lo + self._width]
+        _fft_into(np.fft.ifft, self._baseband, self._analytic)
+        np.abs(self._analytic, out=self._envelope)
+        self._envelope -= self._envelope.mean(axis=1, keepdims=True)
+        self._envelope *= self._env_window
+        _fft_into(np.fft.rfft, self._envelope, self._env_spec)
+        np.abs(self._env_spec, out=self.envelope_spectrum)
+        return self.envelope_spectrum
+
+    def defect_snr_db(self, frequencies: Dict[str, float],
+                      tolerance: float = DEFECT_TOLERANCE) -> Dict[str, np.ndarray]:
+        """
+        Per channel, how far (dB) the strongest envelope line within
+        `tolerance` of each defect frequency (the same width around its
+        2nd harmonic) stands above the median of the envelope spectrum up
+        to 3x the highest one. Call after envelope().
+        """
+        spectrum = self.envelope_spectrum
+        resolution = self.envelope_freqs[1]
+        top = min(len(self.envelope_freqs) - 1, int(3 * max(frequencies.values()) / resolution) + 1)
+        np.median(spectrum[:, 1:top + 1], axis=1, out=self._floor)
+        floor = np.maximum(self._floor, 1e-12)
+        levels = {}
+        for name, f in frequencies.items():
+            peak = np.zeros(self.channels)
+            half = max(1.5 * resolution, tolerance * f)
+            for harmonic in (f, 2 * f):
+                lo = max(1, int((harmonic - half) / resolution))
+                hi = min(len(self.envelope_freqs) - 1, int(math.ceil((harmonic + half) / resolution)))
+                if lo <= hi:
+                    np.maximum(peak, spectrum[:, lo:hi + 1].max(axis=1), out=peak)
+            levels[name] = 20 * np.log10(np.maximum(peak, 1e-12) / floor)
+        return levels
+
+
+class VibrationSimulator:
+    """Synthetic axle-box accelerometer blocks, generated into reused buffers."""
+
+    NOISE_G = 0.3              # broadband RMS
+    MESH_G = 0.4               # gear-mesh tone amplitude
+    GEAR_TEETH = 87            # mesh frequency = teeth x shaft rate
+    RESONANCE_HZ = 4200.0      # bearing-housing resonance the impacts excite
+    RING_DECAY_S = 0.0008      # time constant of one impact's ringing
+    IMPACT_G = 4.0             # ringing amplitude of a fully developed defect
+
+    def __init__(self, channels: int, block: int, fs: float = DEFAULT_FS,
+                 rng: Optional[np.random.Generator] = None):
+        self.channels = channels
+        self.block = block
+        self.fs = fs
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self._k = np.arange(block, dtype=float)
+        self._out = np.empty((channels, block))
+        self._phase = np.empty(block)
+        self._tau = np.empty(block)
+        self._ring = np.empty(block)
+        self._mesh_phase = 0.0
+        self._shaft_phase = 0.0
+        # (channel, defect) -> phase of its impact train
+        self._impact_phase: Dict[Tuple[int, str], float] = {}
+
+    def _cycles(self, phase0: float, f: float, out: np.ndarray) -> float:
+        """out = phase (cycles, wrapped to [0, 1)) over the block; returns the next block's start."""
+        step = f / self.fs
+        np.multiply(self._k, step, out=out)
+        out += phase0
+        np.mod(out, 1.0, out=out)
+        return (phase0 + self.block * step) % 1.0
+
+    def next_block(self, shaft: float, defects: Dict[Tuple[int, str], float],
+                   geometry: BearingGeometry = AXLE_BOX_BEARING) -> np.ndarray:
+        """
+        One (channels, block) block at shaft rate `shaft`; `defects` maps
+        (channel, defect name) to severity in [0, 1]. The returned array is
+        reused by the next call.
+        """
+        out, phase, tau, ring = self._out, self._phase, self._tau, self._ring
+        self.rng.standard_normal(out=out)
+        out *= self.NOISE_G
+        self._mesh_phase = self._cycles(self._mesh_phase, self.GEAR_TEETH * shaft, phase)
+        np.multiply(phase, 2 * np.pi, out=phase)
+        np.sin(phase, out=phase)
+        phase *= self.MESH_G
+        out += phase
+        frequencies = geometry.frequencies(shaft)
+        shaft_start = self._shaft_phase
+        self._shaft_phase = (shaft_start + self.block * shaft / self.fs) % 1.0
+        for (channel, name), severity in defects.items():
+            f = frequencies[name]
+            if severity <= 0 or f <= 0:
+                continue
+            key = (channel, name)
+            self._impact_phase[key] = self._cycles(self._impact_phase.get(key, 0.0), f, tau)
+            # Time since the last impact (s), then the decaying resonance it excites
+            tau /= f
+            np.multiply(tau, 2 * np.pi * self.RESONANCE_HZ, out=ring)
+            np.sin(ring, out=ring)
+            np.multiply(tau, -1 / self.RING_DECAY_S, out=tau)
+            np.exp(tau, out=tau)
+            ring *= tau
+            ring *= self.IMPACT_G * severity
+            if name == "bpfi":
+                # The inner ring turns with the shaft: impacts swing in and out of the load zone
+                self._cycles(shaft_start, shaft, tau)
+                np.multiply(tau, 2 * np.pi, out=tau)
+                np.cos(tau, out=tau)
+                tau += 1.0
+                tau *= 0.5
+                ring *= tau
+            out[channel] += ring
+        return out
@@ -0,0 +1,215 @@
+"""
+RailGuard 5000 — Event-Loop Watchdog
+Says which agent froze the server when the dashboard stutters.
+
+  * Loop lag — a heartbeat coroutine sleeps `interval` and records how
+    late it wakes up; any blocking callback shows up here.
+  * Per-agent accounting — the Orchestrator brackets every step it runs
+    on the loop with begin()/end(): wall time and loop-thread CPU time.
+  * Blocking stacks — a monitor thread watches the running step (and the
+    heartbeat). Once one has held the loop longer than `threshold`, it
+    captures the loop thread's stack right then, while the culprit is
+    still on it. Blocks outside a dispatched step (a run()-only agent, a
+    request handler) are attributed from the stack when an agent's method
+    is on it.
+
+Costs two clock reads per step and one wakeup per `interval`.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger("Watchdog")
+
+DEFAULT_THRESHOLD = 0.1      # s a step may hold the loop before it is flagged
+DEFAULT_INTERVAL = 0.05      # heartbeat period (s)
+MAX_EVENTS = 100             # blocking events kept
+LAG_WINDOW = 1200            # heartbeat samples kept for percentiles (~1 min)
+STACK_DEPTH = 16             # innermost frames kept per captured stack
+
+Token = Tuple[int, str, float, float]   # seq, agent_id, wall start, cpu start
+
+
+def _agent_in(frame) -> Optional[str]:
+    """agent_id of the innermost agent method on a stack, if any."""
+    while frame is not None:
+        owner = frame.f_locals.get("self")
+        agent_id = getattr(owner, "agent_id", None)
+        if isinstance(agent_id, str) and hasattr(owner, "interval"):
+            return agent_id
+        frame = frame.f_back
+    return None
+
+
+class LoopWatchdog:
+    """Loop-lag monitor with per-agent wall/CPU accounting and blocking stacks."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, interval: float = DEFAULT_INTERVAL):
+        self.threshold = threshold
+        self.interval = interval
+        self._lags: deque = deque(maxlen=LAG_WINDOW)
+        self._lag = 0.0
+        self._max_lag = 0.0
+        self._agents: Dict[str, Dict[str, float]] = {}
+        self._events: deque = deque(maxlen=MAX_EVENTS)
+        self._seq = 0
+        # Written on the loop, read by the monitor thread (single assignments)
+        self._current: Optional[Token] = None
+        self._beat_at = time.monotonic()
+        self._step_end = 0.0
+        # Set by the monitor: the step / heartbeat it has already captured
+        self._captured_seq = -1
+        self._captured_beat = 0.0
+        self._open: Optional[Tuple[str, Any, dict]] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    async def start(self):
+        """Start the heartbeat and the monitor thread; call from the loop to watch."""
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat_at = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._beat_forever())
+        self._thread = threading.Thread(target=self._monitor, name="railguard-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"Watching the event loop (blocking threshold {self.threshold * 1000:.0f} ms)")
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    # ── Steps ────────────────────────────────────────────────────
+
+    def begin(self, agent_id: str) -> Token:
+        self._seq += 1
+        token = (self._seq, agent_id, time.perf_counter(), time.thread_time())
+        self._current = token
+        return token
+
+    def end(self, token: Token):
+        wall = time.perf_counter() - token[2]
+        cpu = time.thread_time() - token[3]
+        self._current = None
+        self._step_end = time.monotonic()
+        stats = self._agents.get(token[1])
+        if stats is None:
+            stats = self._agents[token[1]] = {
+                "steps": 0, "wall_s": 0.0, "cpu_s": 0.0, "max_wall_s": 0.0, "blocks": 0}
+        stats["steps"] += 1
+        stats["wall_s"] += wall
+        stats["cpu_s"] += cpu
+        if wall > stats["max_wall_s"]:
+            stats["max_wall_s"] = wall
+        if wall > self.threshold:
+            stats["blocks"] += 1
+            event = self._close("step", token[0])
+            if event is not None:
+                event["blocked_ms"] = round(wall * 1000, 1)
+                event["cpu_ms"] = round(cpu * 1000, 1)
+            else:
+                # Too short for the monitor to catch in the act: flag it without a stack
+                self._events.append({"agent_id": token[1], "at": time.time(), "source": "step",
+                                     "blocked_ms": round(wall * 1000, 1),
+                                     "cpu_ms": round(cpu * 1000, 1), "stack": None})
+
+    # ── Heartbeat & monitor ──────────────────────────────────────
+
+    async def _beat_forever(self):
+        loop = asyncio.get_running_loop()
+        interval = self.interval
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - start - interval)
+            self._beat_at = time.monotonic()
+            self._lag = lag
+            self._lags.append(lag)
+            if lag > self._max_lag:
+                self._max_lag = lag
+            event = self._close("loop", start)
+            if event is not None:
+                event["blocked_ms"] = round(lag * 1000, 1)
+
+    def _monitor(self):
+        poll = min(self.threshold, self.interval) / 4
+        while not self._stopping.wait(poll):
+            current = self._current
+            if current is not None:
+                running = time.perf_counter() - current[2]
+                if running > self.threshold and current[0] != self._captured_seq:
+                    self._captured_seq = current[0]
+                    self._capture("step", current[0], current[1], running)
+            else:
+                beat_at = self._beat_at
+                # A step that just ended (and was judged on its own) delays the beat too
+                stalled = time.monotonic() - max(beat_at + self.interval, self._step_end)
+                if stalled > self.threshold and beat_at != self._captured_beat:
+                    self._captured_beat = beat_at
+                    self._capture("loop", None, None, stalled)
+
+    def _capture(self, source: str, key, agent_id: Optional[str], blocked: float):
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+        if agent_id is None:
+            agent_id = _agent_in(frame)
+        stack = [line.rstrip() for line in traceback.format_stack(frame)[-STACK_DEPTH:]]
+        event = {"agent_id": agent_id, "at": time.time(), "source": source,
+                 "blocked_ms": round(blocked * 1000, 1), "stack": stack}
+        self._open = (source, key, event)
+        self._events.append(event)
+        logger.warning(f"Event loop blocked {blocked * 1000:.0f} ms"
+                       f"{f' by agent {agent_id}' if agent_id else ''}")
+
+    def _close(self, source: str, key) -> Optional[dict]:
+        """The event captured for this step / heartbeat, if the monitor caught one."""
+        opened = self._open
+        if opened is None or opened[0] != source:
+            return None
+        if source == "step" and opened[1] != key:
+            return None
+        self._open = None
+        return opened[2]
+
+    # ── Report ───────────────────────────────────────────────────
+
+    def report(self) -> dict:
+        """JSON-safe lag percentiles, per-agent time, and recent blocking events."""
+        lags = sorted(self._lags)
+
+        def pct(q: float) -> float:
+            return round(lags[min(len(lags) - 1, int(len(lags) * q))] * 1000, 2) if lags else 0.0
+
+        agents = {
+            agent_id: {
+                "steps": stats["steps"],
+                "wall_ms": round(stats["wall_s"] * 1000, 2),
+                "cpu_ms": round(stats["cpu_s"] * 1000, 2),
+                "mean_wall_ms": round(stats["wall_s"] * 1000 / stats["steps"], 3),
+                "max_wall_ms": round(stats["max_wall_s"] * 1000, 2),
+                "blocks": stats["blocks"],
+            }
+            for agent_id, stats in self._agents.items()
+        }
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "lag_ms": {"current": round(self._lag * 1000, 2), "p50": pct(0.5),
+                       "p99": pct(0.99), "max": round(self._max_lag * 1000, 2)},
+            "agents": agents,
+            "top_cpu": sorted(agents, key=lambda a: agents[a]["cpu_ms"], reverse=True)[:10],
+            "events": list(self._events)[::-1],
+        }
@@ -0,0 +1,8 @@
+"""
+Backend modules import each other by bare name (they are run from
+backend/, see .agent/workflows/run-system.md), so the tests do the same.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from acoustic import (AESimulator, HIT_FIELDS, HitDetector, Locator, THRESHOLD_DB, WAVE_SPEED,
+                      crack_cluster, crack_locations, db_ae)
+from ingest import SampleRing
+
+CHUNK = 50_000
+SENSOR_M = list(AESimulator.sensor_layout().values())
+
+
+def _run(crack_at=None, rub_rate=AESimulator.RUB_RATE, chunks=20, seed=7):
+    simulator = AESimulator(SENSOR_M, CHUNK, rng=np.random.default_rng(seed))
+    simulator.RUB_RATE = rub_rate
+    ring = SampleRing(len(SENSOR_M), 2 * CHUNK, dtype=np.float32)
+    detector = HitDetector(len(SENSOR_M))
+    locator = Locator(SENSOR_M)
+    hits, cracks = [], []
+    for _ in range(chunks):
+        ring.write(simulator.next_block(crack_at))
+        found = detector.process(ring)
+        cracks.extend(crack_locations(found, locator.events(found)))
+        hits.append(found)
+    return {name: np.concatenate([h[name] for h in hits]) for name in HIT_FIELDS}, cracks
+
+
+def test_db_ae():
+    assert db_ae(1e-6) == pytest.approx(0.0)
+    assert db_ae(1e-3) == pytest.approx(60.0)
+
+
+def test_no_hits_on_sensor_noise():
+    hits, cracks = _run(rub_rate=0.0)
+    assert len(hits["arrival_s"]) == 0
+    assert cracks == []
+
+
+def test_rubbing_is_not_a_crack():
+    hits, cracks = _run()
+    assert len(hits["arrival_s"]) > 0
+    assert (hits["amplitude_db"] >= THRESHOLD_DB).all()
+    assert crack_cluster(cracks) is None
+
+
+def test_crack_is_located():
+    hits, cracks = _run(crack_at=0.62)
+    assert len(cracks) >= 20
+    assert crack_cluster(cracks) == pytest.approx(0.62, abs=0.01)
+
+
+def test_hits_come_out_in_arrival_order():
+    simulator = AESimulator(SENSOR_M, CHUNK, rng=np.random.default_rng(1))
+    ring = SampleRing(len(SENSOR_M), 2 * CHUNK, dtype=np.float32)
+    detector = HitDetector(len(SENSOR_M))
+    ring.write(simulator.next_block(0.3))
+    hits = detector.process(ring)
+    assert len(hits["arrival_s"]) > 1
+    assert (np.diff(hits["arrival_s"]) >= 0).all()
+    assert hits["channel"].dtype == np.int64
+
+
+def test_burst_split_across_blocks_is_one_hit():
+    fs = 1_000_000.0
+    detector = HitDetector(1, fs)
+    ring = SampleRing(1, 20_000, dtype=np.float32)
+    t = np.arange(400) / fs
+    burst = (1e-2 * np.sin(2 * np.pi * 150e3 * t)).astype(np.float32)
+    first = np.zeros((1, 5_000), dtype=np.float32)
+    first[0, -200:] = burst[:200]
+    second = np.zeros((1, 5_000), dtype=np.float32)
+    second[0, :200] = burst[200:]
+    ring.write(first)
+    assert len(detector.process(ring)["arrival_s"]) == 0
+    ring.write(second)
+    hits = detector.process(ring)
+    assert len(hits["arrival_s"]) == 1
+    assert hits["arrival_s"][0] == pytest.approx(4_800 / fs, abs=5e-6)
+    assert hits["duration_us"][0] == pytest.approx(400, abs=10)
+
+
+def test_locator_recovers_source_position():
+    locator = Locator(SENSOR_M)
+    x = 1.37
+    arrival = np.abs(np.asarray(SENSOR_M) - x) / WAVE_SPEED
+    order = np.argsort(arrival)
+    hits = {"arrival_s": arrival[order], "channel": np.arange(len(SENSOR_M))[order]}
+    (members, located), = locator.events(hits)
+    assert len(members) == len(SENSOR_M)
+    assert located == pytest.approx(x, abs=0.002)
+
+
+def test_crack_cluster_needs_repeats_at_one_place():
+    assert crack_cluster([0.6] * 4) is None
+    assert crack_cluster([0.1, 0.5, 0.9, 1.3, 1.7, 1.9]) is None
+    assert crack_cluster([0.61, 0.62, 0.62, 0.63, 0.62, 1.8]) == pytest.approx(0.62)
@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+from blackboard import Blackboard
+
+
+def _written(bb, layer, agent_id):
+    return bb.read_nowait(layer, agent_id)["timestamp"]
+
+
+def test_per_agent_ttl_overrides_layer_default():
+    async def run():
+        bb = Blackboard()
+        bb.set_ttl(3, 5.0)
+        bb.set_ttl(3, None, "A19")          # never expires
+        bb.set_ttl(3, 1.0, "A20", evict=True)
+        for agent_id in ("A19", "A20", "A21"):
+            await bb.write(3, agent_id, {"health_pct": 90})
+        return bb
+
+    bb = asyncio.run(run())
+    assert bb.get_ttl(3, "A19") is None
+    assert bb.get_ttl(3, "A20") == (1.0, True)
+    assert bb.get_ttl(3, "A21") == (5.0, False)
+    now = _written(bb, 3, "A21")
+    assert bb.expire(now + 2) == 1
+    assert bb.read_nowait(3, "A20") is None
+    assert bb.expire(now + 60) == 1
+    assert bb.stale_entries(3) == [(3, "A21")]
+    assert not bb.is_stale(3, "A19")
+
+
+def test_switching_ttl_off_applies_from_next_write():
+    async def run():
+        bb = Blackboard()
+        bb.set_ttl(3, 5.0)
+        await bb.write(3, "A19", {"health_pct": 90})
+        bb.set_ttl(3, None, "A19")
+        await bb.write(3, "A19", {"health_pct": 89})
+        return bb
+
+    bb = asyncio.run(run())
+    assert bb.expire(_written(bb, 3, "A19") + 60) == 0
+    bb.clear_ttl(3, "A19")
+    assert bb.get_ttl(3, "A19") == (5.0, False)
+
+
+def test_ingest_many_matches_write_many_for_json_safe_payloads():
+    records = [(1, "T001/A7", {"speed_kmh": 80.5, "flags": [True, None]}),
+               (3, "T001/A19", {"health_pct": 71, "status": "WARNING"}),
+               (9, "T001/A99", {"ignored": 1})]
+
+    async def run(method):
+        bb = Blackboard()
+        await getattr(bb, method)(records)
+        return bb
+
+    written, ingested = asyncio.run(run("write_many")), asyncio.run(run("ingest_many"))
+    for layer, agent_id, data in records[:2]:
+        assert ingested.read_nowait(layer, agent_id)["data"] == written.read_nowait(layer, agent_id)["data"] == data
+    assert ingested.get_version() == written.get_version() == 2
+    assert [c["agent_id"] for c in ingested.changes_since(0)] == ["T001/A7", "T001/A19"]
+
+
+# ── Change notification ─────────────────────────────────────────
+
+def test_wait_for_change_times_out_unchanged_and_drops_its_waiter():
+    async def run():
+        bb = Blackboard()
+        await bb.write(3, "A19", {"health_pct": 90})
+        version = await bb.wait_for_change(3, "A19", timeout=0.01)
+        return bb, version
+
+    bb, version = asyncio.run(run())
+    assert version == bb.get_version(3, "A19") == 1
+    assert not bb._waiters
+
+
+def test_wait_for_change_returns_at_once_if_already_past():
+    async def run():
+        bb = Blackboard()
+        await bb.write(3, "A19", {"health_pct": 90})
+        await bb.write(3, "A19", {"health_pct": 89})
+        return await bb.wait_for_change(3, "A19", since_version=1, timeout=0)
+
+    assert asyncio.run(run()) == 2
+
+
+def test_wait_for_change_filters_by_entry_and_layer():
+    async def run():
+        bb = Blackboard()
+        entry = asyncio.ensure_future(bb.wait_for_change(3, "A19", timeout=1.0))
+        layer = asyncio.ensure_future(bb.wait_for_change(3, timeout=1.0))
+        board = asyncio.ensure_future(bb.wait_for_change(None, timeout=1.0))
+        await asyncio.sleep(0.005)
+        await bb.write(2, "A11", {"psnr_db": 31.0})     # board only
+        await asyncio.sleep(0.005)
+        woken = [entry.done(), layer.done(), board.done()]
+        await bb.write(3, "A20", {"health_pct": 80})    # layer 3, not A19
+        await asyncio.sleep(0.005)
+        woken += [entry.done(), layer.done()]
+        await bb.write(3, "A19", {"health_pct": 70})
+        return woken, await entry, await layer, await board
+
+    woken, entry, layer, board = asyncio.run(run())
+    assert woken == [False, False, True, False, True]
+    assert (entry, layer, board) == (3, 2, 1)
+
+
+def test_identical_payload_wakes_nobody():
+    async def run():
+        bb = Blackboard()
+        await bb.write(3, "A19", {"health_pct": 90})
+        waiter = asyncio.ensure_future(bb.wait_for_change(3, "A19", timeout=0.05))
+        await asyncio.sleep(0)
+        await bb.write(3, "A19", {"health_pct": 90})
+        return await waiter
+
+    assert asyncio.run(run()) == 1
+
+
+def test_subscribe_coalesces_a_burst_into_one_wakeup():
+    async def run():
+        bb = Blackboard()
+        seen = []
+
+        async def consume():
+            async for version in bb.subscribe(3, "A19"):
+                seen.append(version)
+
+        task = asyncio.ensure_future(consume())
+        await asyncio.sleep(0)
+        for pct in (90, 80, 70):                        # no yield in between
+            await bb.write(3, "A19", {"health_pct": pct})
+        await bb.write(3, "A20", {"health_pct": 50})    # other entry: filtered out
+        await asyncio.sleep(0.01)
+        await bb.write(3, "A19", {"health_pct": 60})
+        await asyncio.sleep(0.01)
+        task.cancel()
+        return seen
+
+    assert asyncio.run(run()) == [3, 5]
+
+
+def test_wait_for_change_rejects_unknown_layer():
+    with pytest.raises(ValueError):
+        asyncio.run(Blackboard().wait_for_change(9))
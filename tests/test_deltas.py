@@ -0,0 +1,120 @@
+import asyncio
+import random
+
+import pytest
+
+from blackboard import Blackboard
+from deltas import ChangeLog, apply_delta, diff
+
+
+def _random_payload(rng, depth=0):
+    payload = {}
+    for key in rng.sample("abcdefgh", rng.randint(0, 6)):
+        kind = rng.random()
+        if kind < 0.3 and depth < 2:
+            payload[key] = _random_payload(rng, depth + 1)
+        elif kind < 0.5:
+            payload[key] = [rng.randint(0, 3) for _ in range(rng.randint(0, 3))]
+        elif kind < 0.6:
+            payload[key] = None
+        else:
+            payload[key] = rng.choice((rng.randint(0, 5), rng.random(), "OK", "WARNING", True))
+    return payload
+
+
+def _delta(old, new):
+    changed, unset = diff(old, new)
+    return {"set": changed, "unset": unset, "full": False}
+
+
+def test_diff_is_minimal():
+    old = {"speed": 80, "temps": {"disc": 90, "pad": 40}, "tags": [1, 2], "gone": 1}
+    new = {"speed": 80, "temps": {"disc": 95, "pad": 40}, "tags": [1, 2, 3]}
+    changed, unset = diff(old, new)
+    assert changed == {"temps": {"disc": 95}, "tags": [1, 2, 3]}
+    assert unset == [["gone"]]
+    assert diff(new, new) == ({}, [])
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_apply_delta_round_trip(seed):
+    rng = random.Random(seed)
+    old, new = _random_payload(rng), _random_payload(rng)
+    assert apply_delta(old, _delta(old, new)) == new
+    # The consumer's copy is not mutated
+    before = repr(old)
+    apply_delta(old, _delta(old, new))
+    assert repr(old) == before
+
+
+def test_full_and_evicted_deltas():
+    assert apply_delta({"a": 1}, {"set": {"b": 2}, "unset": [], "full": True}) == {"b": 2}
+    assert apply_delta(None, {"set": {"b": 2}, "unset": [], "full": False}) == {"b": 2}
+    assert apply_delta({"a": 1}, {"set": {}, "unset": [], "full": False, "evicted": True}) is None
+
+
+def test_changelog_since_and_overflow():
+    log = ChangeLog(max_changes=3)
+    for version in range(1, 6):
+        log.record(version, 3, "A19", float(version), {"v": version - 1} if version > 1 else None,
+                   {"v": version})
+    assert [c["version"] for c in log.since(3)] == [4, 5]
+    assert log.since(5) == []
+    assert log.oldest_version() == 3
+    # Older than what the log still holds: the caller must resync
+    assert log.since(1) is None
+
+
+def _replay(changes, board=None):
+    board = dict(board or {})
+    for change in changes:
+        key = (change["layer"], change["agent_id"])
+        payload = apply_delta(board.get(key), change)
+        if payload is None:
+            board.pop(key, None)
+        else:
+            board[key] = payload
+    return board
+
+
+def _snapshot(bb):
+    return {(layer, agent_id): entry["data"]
+            for layer in range(1, 7) for agent_id, entry in bb.read_nowait(layer).items()}
+
+
+@pytest.mark.parametrize("log_size", [10000, 4])
+def test_changes_since_converges(log_size):
+    async def scenario():
+        bb = Blackboard()
+        bb._changes = ChangeLog(max_changes=log_size)
+        await bb.write(3, "A19", {"health_pct": 90, "temps": {"inner": 40}})
+        await bb.write(3, "A20", {"health_pct": 80})
+        await bb.write(4, "A32", {"status": "OK"})
+        seen, version = _snapshot(bb), bb.get_version()
+        await bb.write(3, "A19", {"health_pct": 85, "temps": {"inner": 42}})
+        await bb.write(3, "A19", {"health_pct": 84, "temps": {"inner": 42}})
+        bb.evict(3, "A20")
+        bb.mark_stale(4, "A32")
+        await bb.write(5, "A39", {"urgency": "HIGH"})
+        await bb.write(3, "A21", {"health_pct": 70})
+        bb.evict(3, "A21")
+        return bb, _replay(bb.changes_since(version), seen)
+
+    bb, replayed = asyncio.run(scenario())
+    assert replayed == _snapshot(bb)
+    assert (3, "A20") not in replayed and (3, "A21") not in replayed
+
+
+def test_rewrite_clears_tombstone():
+    async def scenario():
+        bb = Blackboard()
+        bb._changes = ChangeLog(max_changes=1)
+        await bb.write(3, "A19", {"health_pct": 90})
+        bb.evict(3, "A19")
+        await bb.write(3, "A19", {"health_pct": 88})
+        await bb.write(3, "A20", {"health_pct": 70})
+        return bb, list(bb.changes_since(0))
+
+    bb, changes = asyncio.run(scenario())
+    assert not any(c.get("evicted") for c in changes)
+    assert _replay(changes) == _snapshot(bb)
@@ -0,0 +1,83 @@
+import asyncio
+import random
+
+import pytest
+
+from blackboard import Blackboard
+from indexes import EqualityIndex, SortedIndex
+
+
+def test_equality_index_keeps_flags_and_counts_apart():
+    index = EqualityIndex("ok")
+    index.update((3, "A"), {"ok": True})
+    index.update((3, "B"), {"ok": 1})
+    index.update((3, "C"), {"ok": [1]})      # unhashable: not indexed
+    assert index.lookup(True) == {(3, "A")}
+    assert index.lookup(1) == {(3, "B")}
+    assert len(index) == 2
+
+
+def test_index_follows_updates_and_removal():
+    index = EqualityIndex("temps.status")
+    index.update((3, "A"), {"temps": {"status": "OK"}})
+    index.update((3, "A"), {"temps": {"status": "WARNING"}})
+    assert index.lookup("OK") == set()
+    assert index.lookup("WARNING") == {(3, "A")}
+    index.update((3, "A"), {"temps": 5})
+    assert index.lookup("WARNING") == set()
+    index.update((3, "A"), {"temps": {"status": "OK"}})
+    index.remove((3, "A"))
+    assert len(index) == 0 and index.values() == {}
+
+
+def test_sorted_index_range():
+    index = SortedIndex("health_pct")
+    values = {f"A{i}": v for i, v in enumerate([70, 55.5, 70, 90, float("nan"), True, 12])}
+    for agent_id, value in values.items():
+        index.update((3, agent_id), {"health_pct": value})
+    # NaN and flags are not indexed
+    assert len(index) == 5
+    assert [v for v, _ in index.range(high=70)] == [12, 55.5, 70, 70]
+    assert [v for v, _ in index.range(low=55.5, high=70)] == [55.5, 70, 70]
+    assert [v for v, _ in index.range(descending=True, limit=2)] == [90, 70]
+    assert [v for v, _ in index.range(limit=1)] == [12]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_board_queries_match_scans(seed):
+    rng = random.Random(seed)
+    statuses = ("OK", "WARNING", "CRITICAL")
+
+    async def scenario():
+        bb = Blackboard()
+        bb.create_index("temps.brake_disc", "sorted", layers=[2])
+        for _ in range(500):
+            agent_id = f"T{rng.randrange(40):03d}/A{rng.randrange(20, 25)}"
+            layer = rng.choice((2, 3))
+            if rng.random() < 0.1:
+                bb.evict(layer, agent_id)
+                continue
+            await bb.write(layer, agent_id, {
+                "status": rng.choice(statuses),
+                "health_pct": rng.choice((rng.randint(0, 100), rng.random() * 100)),
+                "temps": {"brake_disc": rng.uniform(20, 300)},
+            })
+        return bb
+
+    bb = asyncio.run(scenario())
+    entries = [entry for layer in range(1, 7) for entry in bb.read_nowait(layer).values()]
+    for status in statuses:
+        scanned = sorted(e["agent_id"] for e in entries if e["data"]["status"] == status)
+        assert sorted(e["agent_id"] for e in bb.find("status", status)) == scanned
+    scanned = sorted(e["data"]["health_pct"] for e in entries if e["data"]["health_pct"] <= 70)
+    assert [e["data"]["health_pct"] for e in bb.find_range("health_pct", high=70)] == scanned
+    layer2 = [e for e in bb.read_nowait(2).values() if e["data"]["temps"]["brake_disc"] >= 150]
+    assert len(bb.find_range("temps.brake_disc", low=150)) == len(layer2) > 0
+
+
+def test_undeclared_index_is_an_error():
+    bb = Blackboard()
+    with pytest.raises(ValueError):
+        bb.find("speed_kmh", 0)
+    with pytest.raises(ValueError):
+        bb.create_index("speed_kmh", "hash")
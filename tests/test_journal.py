@@ -0,0 +1,104 @@
+import asyncio
+import os
+
+import pytest
+
+from blackboard import Blackboard
+from journal import EVICTED, MAGIC, Journal, encode_record, read_segment
+
+
+def _segment(path, *records):
+    with open(path, "wb") as f:
+        f.write(MAGIC + b"".join(encode_record(*record) for record in records))
+
+
+def test_read_segment_keeps_latest_record(tmp_path):
+    path = str(tmp_path / "journal-00000001.log")
+    _segment(path, (3, "A19", 1.0, {"h": 90}), (3, "A20", 1.5, {"h": 80}), (3, "A19", 2.0, {"h": 85}))
+    assert read_segment(path) == {(3, "A19"): (2.0, {"h": 85}), (3, "A20"): (1.5, {"h": 80})}
+
+
+def test_read_segment_stops_at_torn_tail(tmp_path):
+    path = str(tmp_path / "journal-00000001.log")
+    _segment(path, (3, "A19", 1.0, {"h": 90}), (3, "A20", 1.5, {"h": 80}))
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 3)
+    assert read_segment(path) == {(3, "A19"): (1.0, {"h": 90})}
+    with open(path, "r+b") as f:
+        f.seek(-5, os.SEEK_END)
+        f.write(b"xxxxx")
+    assert read_segment(path) == {(3, "A19"): (1.0, {"h": 90})}
+
+
+def test_bad_magic_is_skipped(tmp_path):
+    path = str(tmp_path / "journal-00000001.log")
+    with open(path, "wb") as f:
+        f.write(b"NOPE" + encode_record(3, "A19", 1.0, {"h": 90}))
+    assert read_segment(path) == {}
+
+
+def test_tombstones(tmp_path):
+    path = str(tmp_path / "journal-00000001.log")
+    _segment(path, (3, "A19", 1.0, {"h": 90}), (3, "A20", 1.5, {"h": 80}),
+             (3, "A19", 2.0, EVICTED), (3, "A20", 2.5, EVICTED), (3, "A20", 3.0, {"h": 75}))
+    assert read_segment(path) == {(3, "A20"): (3.0, {"h": 75})}
+
+
+def test_rotation_compacts_and_newest_segment_restores_everything(tmp_path):
+    async def run():
+        journal = Journal(str(tmp_path), segment_bytes=2048, keep_segments=2)
+        for i in range(500):
+            journal.append(3, f"A{19 + i % 7}", float(i), {"h": i})
+            if i % 50 == 49:
+                await journal.flush()
+        await journal.close()
+        return journal
+
+    journal = asyncio.run(run())
+    segments = journal.segments()
+    assert len(segments) == 2
+    assert int(os.path.basename(segments[-1])[8:-4]) > 2
+    latest = {(3, f"A{19 + i % 7}"): (float(i), {"h": i}) for i in range(500)}
+    assert read_segment(segments[-1]) == latest
+    restored = Journal(str(tmp_path)).replay()
+    assert {(layer, agent_id): (ts, data) for layer, agent_id, ts, data in restored} == latest
+
+
+@pytest.mark.parametrize("segment_bytes", [60, 1 << 20])
+def test_eviction_survives_restart(tmp_path, segment_bytes):
+    async def run():
+        journal = Journal(str(tmp_path), segment_bytes=segment_bytes)
+        bb = Blackboard()
+        bb.attach_journal(journal)
+        await bb.write(3, "A19", {"h": 1})
+        await journal.flush()
+        await bb.write(3, "A19", {"h": 2})
+        await journal.flush()
+        bb.evict(3, "A19")
+        await journal.close()
+
+        restored = Blackboard()
+        count = restored.attach_journal(Journal(str(tmp_path)))
+        return count, restored.read_nowait(3, "A19")
+
+    assert asyncio.run(run()) == (0, None)
+
+
+def test_blackboard_restores_from_journal(tmp_path):
+    async def run():
+        journal = Journal(str(tmp_path))
+        bb = Blackboard()
+        bb.attach_journal(journal)
+        await bb.write(3, "A19", {"health_pct": 61, "status": "WARNING"})
+        await bb.write(5, "A39", {"urgency": "HIGH"})
+        await bb.write(3, "A19", {"health_pct": 60, "status": "WARNING"})
+        await journal.close()
+
+        restored = Blackboard()
+        assert restored.attach_journal(Journal(str(tmp_path))) == 2
+        return restored
+
+    restored = asyncio.run(run())
+    assert restored.read_nowait(3, "A19")["data"] == {"health_pct": 60, "status": "WARNING"}
+    assert [e["agent_id"] for e in restored.find("status", "WARNING")] == ["A19"]
+    assert [e["agent_id"] for e in restored.find_range("health_pct", high=60)] == ["A19"]
@@ -0,0 +1,178 @@
+import asyncio
+import heapq
+
+import pytest
+
+from blackboard import Blackboard
+from orchestrator import OVERLOAD_LAG, Orchestrator
+
+
+class Agent:
+    layer = 1
+    interval = 1.0
+    deadline = None
+    inputs = ()
+
+    def __init__(self, agent_id, priority="normal", deadline=None):
+        self.agent_id = agent_id
+        self.priority = priority
+        self.deadline = deadline
+
+    async def step(self, bb):
+        pass
+
+
+class Stage:
+    """Writes a counter on every step; triggered by its inputs, never by its (long) interval."""
+    interval = 1000.0
+    debounce = 0.02
+    priority = "normal"
+
+    def __init__(self, agent_id, layer, inputs=(), log=None):
+        self.agent_id = agent_id
+        self.layer = layer
+        self.inputs = inputs
+        self.log = log if log is not None else []
+        self.steps = 0
+
+    async def step(self, bb):
+        self.steps += 1
+        self.log.append(self.agent_id)
+        await bb.write(self.layer, self.agent_id, {"steps": self.steps})
+
+
+class Runner:
+    """run()-only agent: loops by itself, has no step()."""
+    layer = 1
+
+    def __init__(self, agent_id, inputs=()):
+        self.agent_id = agent_id
+        self.inputs = inputs
+
+    async def run(self, bb):
+        await asyncio.sleep(3600)
+
+
+def test_lag_decays_on_the_tick_path_without_dispatch():
+    orch = Orchestrator(Blackboard())
+    orch._sample_lag(0.0, 0.2)
+    assert orch.overloaded
+    # Nothing dispatched since; quiet wake-ups alone bring it back down
+    orch._sample_lag(1.0, 0.0)
+    assert not orch.overloaded
+    assert orch._lag == pytest.approx(0.2 / 16)   # four half-lives
+
+
+def test_backlog_counts_only_while_steps_are_queued():
+    orch = Orchestrator(Blackboard())
+    orch._behind = 0.3
+    orch._sample_lag(0.0, 0.0)
+    assert orch._lag == 0.0
+    orch._ready.append(object())
+    orch._sample_lag(0.0, 0.0)
+    assert orch._lag == 0.3
+
+
+def test_critical_first_then_earliest_deadline():
+    async def order():
+        orch = Orchestrator(Blackboard())
+        orch._wakeup = asyncio.Event()
+        for agent in (Agent("high-slow", "high", 5.0), Agent("normal-fast", "normal", 0.05),
+                      Agent("crit", "critical", 2.0), Agent("low-fast", "low", 0.05)):
+            orch._by_id[agent.agent_id] = agent
+            orch.release(agent, 0.0)
+        return [heapq.heappop(orch._ready)[-1].agent_id for _ in range(4)]
+
+    # Equal deadlines are broken by class
+    assert asyncio.run(order()) == ["crit", "normal-fast", "low-fast", "high-slow"]
+
+
+def test_low_steps_are_shed_while_overloaded():
+    async def queued():
+        orch = Orchestrator(Blackboard())
+        orch._wakeup = asyncio.Event()
+        orch._lag = 2 * OVERLOAD_LAG
+        for agent in (Agent("low", "low"), Agent("normal")):
+            orch.release(agent, 0.0)
+        return [item[-1].agent_id for item in orch._ready], orch._stats["low"]["shed"]
+
+    assert asyncio.run(queued()) == (["normal"], 1)
+
+
+# ── Trigger graph ───────────────────────────────────────────────
+
+def test_build_graph_orders_producers_first():
+    orch = Orchestrator(Blackboard())
+    for agent in (Stage("C", 5, [(4, "B")]), Stage("B", 4, [(3, "A")]), Stage("A", 3)):
+        orch.register_agent(agent)
+    assert [agent.agent_id for agent in orch.build_graph()] == ["A", "B", "C"]
+    assert orch.describe_graph() == {"3:A": ["B"], "4:B": ["C"]}
+
+
+def test_cycle_is_rejected_and_add_agents_rolls_back():
+    orch = Orchestrator(Blackboard())
+    orch.register_agent(Stage("A", 3, [(5, "C")]))    # C not registered yet: only a warning
+    orch.register_agent(Stage("B", 4, [(3, "A")]))
+    orch.build_graph()
+    with pytest.raises(ValueError, match="cycle through A, B, C"):
+        orch.add_agents([Stage("D", 6), Stage("C", 5, [(4, "B")])])
+    # None of the batch was added, and the graph is the one from before
+    assert [agent.agent_id for agent in orch.agents] == ["A", "B"]
+    assert orch.describe_graph() == {"3:A": ["B"], "5:C": ["A"]}
+
+
+def test_self_loop_is_a_cycle():
+    orch = Orchestrator(Blackboard())
+    orch.register_agent(Stage("A", 3, [(3, "A")]))
+    with pytest.raises(ValueError, match="cycle"):
+        orch.build_graph()
+
+
+def test_inputs_on_a_run_only_agent_are_rejected():
+    orch = Orchestrator(Blackboard())
+    orch.register_agent(Stage("A", 3))
+    orch.register_agent(Runner("R", [(3, "A")]))
+    with pytest.raises(ValueError, match="no step"):
+        orch.build_graph()
+
+
+def test_burst_of_input_changes_is_debounced_into_one_step():
+    async def run():
+        bb = Blackboard()
+        orch = Orchestrator(bb)
+        consumer = Stage("B", 4, [(3, "A")])
+        orch.register_agent(consumer)
+        await orch.start_all()
+        await asyncio.sleep(0.01)
+        for i in range(5):
+            await bb.write(3, "A", {"i": i})
+            await asyncio.sleep(0.002)          # well inside the 20 ms debounce
+        await asyncio.sleep(0.1)
+        burst = consumer.steps
+        await bb.write(3, "A", {"i": 99})
+        await asyncio.sleep(0.1)
+        await orch.close()
+        return burst, consumer.steps, orch.schedule_stats()["agents"]["B"]["runs"]
+
+    assert asyncio.run(run()) == (1, 2, 2)
+
+
+def test_cascade_runs_in_dependency_order():
+    async def run():
+        bb = Blackboard()
+        orch = Orchestrator(bb)
+        log = []
+        # Registered out of order on purpose
+        for agent in (Stage("C", 5, [(4, "B")], log), Stage("B", 4, [(3, "A")], log),
+                      Stage("D", 6, [(5, "C"), (3, "A")], log)):
+            orch.register_agent(agent)
+        await orch.start_all()
+        await asyncio.sleep(0.01)
+        await bb.write(3, "A", {"health_pct": 70})
+        await asyncio.sleep(0.3)
+        await orch.close()
+        return log
+
+    log = asyncio.run(run())
+    # D hears A directly first, then again once C has caught up
+    assert log == ["B", "D", "C", "D"]
@@ -0,0 +1,84 @@
+import math
+
+import numpy as np
+import pytest
+
+from serializers import MAX_SHAPES_PER_KEY, PayloadSanitizer, compile_sanitizer, sanitize
+
+
+def _same(a, b):
+    # repr tells int from float and list from tuple, and nan equals nan
+    return repr(a) == repr(b)
+
+
+def _check(payloads, key="T001/A4"):
+    sanitizer = PayloadSanitizer()
+    for payload in payloads:
+        for _ in range(2):   # learned on the first write, compiled on the second
+            assert _same(sanitizer.sanitize(key, payload), sanitize(payload))
+    return sanitizer
+
+
+PAYLOADS = {
+    "flat": {"speed_kmh": 80.5, "count": 3, "ok": True, "status": "OK", "note": None},
+    "nested": {"temperatures": {"brake_disc": 61.2, "axle": {"left": 40.1, "right": 39.8}},
+               "positions": ["bearing_left", "axle_box"]},
+    "list_of_dicts": {"hotspots": [{"id": 1, "max_c": 88.0}, {"id": 2, "max_c": 91.5}]},
+    "irregular": {"mixed": [1, "a", None], "empty": [], "ragged": [{"a": 1}, {"b": 2}],
+                  "tuple": (1, 2), "keys": {1: "int key"}},
+    "non_finite": {"snr": float("nan"), "peak": float("inf"), "floor": -float("inf")},
+    "numpy": {"rms_g": np.float64(0.41), "hits": np.int64(7), "alert": np.bool_(True),
+              "shape": np.array([1.0, 2.0])},
+}
+
+
+@pytest.mark.parametrize("name", sorted(PAYLOADS))
+def test_compiled_matches_generic(name):
+    sanitizer = _check([PAYLOADS[name]])
+    assert sanitizer.hits == 1 and sanitizer.misses == 1
+
+
+def test_non_finite_floats_pass_through_unchanged():
+    out = _check([PAYLOADS["non_finite"]]).sanitize("T001/A4", PAYLOADS["non_finite"])
+    assert math.isnan(out["snr"]) and out["peak"] == math.inf and out["floor"] == -math.inf
+
+
+def test_leaf_type_change_falls_back_and_learns_the_new_shape():
+    sanitizer = _check([{"count": 3}, {"count": 3.5}, {"count": np.int64(3)}, {"count": None}])
+    # A foreign leaf type compiles to an unguarded generic walk of that
+    # leaf, which then takes the None as well
+    assert sanitizer.misses == 3
+    assert sanitizer.stats()["shapes"] == 3
+
+
+def test_same_key_count_with_other_keys_misses():
+    _check([{"a": 1, "b": 2}, {"a": 1, "c": 2}])
+
+
+def test_shapes_past_the_limit_drop_the_oldest():
+    shapes = [{f"field_{i}": 1.0} for i in range(MAX_SHAPES_PER_KEY + 2)]
+    sanitizer = _check(shapes)
+    assert sanitizer.stats()["shapes"] == MAX_SHAPES_PER_KEY
+    # The dropped shape is learned again, still correct
+    misses = sanitizer.misses
+    assert _same(sanitizer.sanitize("T001/A4", shapes[0]), sanitize(shapes[0]))
+    assert sanitizer.misses == misses + 1
+
+
+def test_writers_with_one_shape_share_the_compiled_function():
+    sanitizer = PayloadSanitizer()
+    for train in range(5):
+        sanitizer.sanitize(f"T{train:03d}/A4", {"rms_g": 0.4, "positions": ["axle_box"]})
+    stats = sanitizer.stats()
+    assert stats["writers"] == 5 and stats["compiled"] == 1
+    fns = {id(fns[0]) for fns in sanitizer._compiled.values()}
+    assert len(fns) == 1
+
+
+def test_compiled_output_is_a_copy():
+    payload = {"temperatures": {"brake_disc": 61.2}, "positions": ["a", "b"]}
+    fn = compile_sanitizer(payload)
+    out = fn(payload)
+    assert out == payload
+    assert out["temperatures"] is not payload["temperatures"]
+    assert out["positions"] is not payload["positions"]
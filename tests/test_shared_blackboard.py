@@ -0,0 +1,117 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+import shared_blackboard
+from blackboard import Blackboard
+from shared_blackboard import _SEQ, SharedBlackboardPublisher, SharedBlackboardReader
+
+
+@pytest.fixture
+def name(monkeypatch):
+    # Publisher and readers share this process: a reader dropping the
+    # segment from the resource tracker would drop the publisher's entry
+    monkeypatch.setattr(shared_blackboard, "resource_tracker", SimpleNamespace(unregister=lambda *args: None))
+    return f"rg_test_{uuid.uuid4().hex[:12]}"
+
+
+def publisher(name, value):
+    bb = Blackboard()
+    asyncio.run(bb.write(1, "A7", {"speed_kmh": value}))
+    pub = SharedBlackboardPublisher(bb, name=name, size=1 << 16)
+    pub.publish()
+    return pub
+
+
+def speed(reader):
+    return reader.read_nowait(1, "A7")["data"]["speed_kmh"]
+
+
+def test_reader_follows_a_clean_publisher_restart(name):
+    pub = publisher(name, 80.0)
+    reader = SharedBlackboardReader(name)
+    try:
+        assert speed(reader) == 80.0
+        pub.close()
+        assert speed(reader) == 80.0      # engine down: last copy
+        pub = publisher(name, 120.0)
+        assert speed(reader) == 120.0
+    finally:
+        reader.close()
+        pub.close()
+
+
+def test_reader_follows_a_crashed_publisher_after_going_quiet(name):
+    old = publisher(name, 80.0)
+    reader = SharedBlackboardReader(name, stale_after=0.0)
+    try:
+        assert speed(reader) == 80.0
+        # The old engine died without closing; the new one replaces the segment
+        new = publisher(name, 120.0)
+        assert speed(reader) == 120.0
+    finally:
+        reader.close()
+        old._shm.close()
+        new.close()
+
+
+def test_quiet_segment_is_kept(name):
+    pub = publisher(name, 80.0)
+    reader = SharedBlackboardReader(name, stale_after=0.0)
+    try:
+        assert speed(reader) == 80.0
+        shm = reader._shm
+        assert speed(reader) == 80.0
+        assert reader._shm is shm
+    finally:
+        reader.close()
+        pub.close()
+
+
+def test_write_in_progress_serves_the_last_good_copy(name, monkeypatch):
+    monkeypatch.setattr(shared_blackboard, "_RETRY_SLEEP", 0.0)
+    pub = publisher(name, 80.0)
+    reader = SharedBlackboardReader(name)
+    try:
+        assert speed(reader) == 80.0
+        asyncio.run(pub.blackboard.write(1, "A7", {"speed_kmh": 90.0}))
+        pub.publish()
+        seq = _SEQ.unpack_from(pub._buf, 0)[0]
+        _SEQ.pack_into(pub._buf, 0, seq + 1)   # held odd: writer mid-update
+        assert speed(reader) == 80.0
+        assert reader.fallbacks == 1
+        _SEQ.pack_into(pub._buf, 0, seq)
+        assert speed(reader) == 90.0
+    finally:
+        reader.close()
+        pub.close()
+
+
+def test_torn_copy_is_retried(name, monkeypatch):
+    pub = publisher(name, 80.0)
+    reader = SharedBlackboardReader(name)
+    real_len = shared_blackboard._LEN
+
+    class Tearing:
+        """Publishes once more while the reader is between its two sequence reads."""
+        torn = 0
+
+        def unpack_from(self, buf, offset):
+            if not self.torn:
+                self.torn += 1
+                asyncio.run(pub.blackboard.write(1, "A7", {"speed_kmh": 95.0}))
+                pub.publish()
+            return real_len.unpack_from(buf, offset)
+
+        def pack_into(self, buf, offset, value):
+            real_len.pack_into(buf, offset, value)
+
+    monkeypatch.setattr(shared_blackboard, "_LEN", Tearing())
+    try:
+        assert speed(reader) == 95.0
+        assert reader.fallbacks == 0
+    finally:
+        reader.close()
+        pub.close()
@@ -0,0 +1,101 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from thermal import (BOGIE_REGIONS, FRAME_SHAPE, MIN_HOTSPOT_PX, TRACK_CONFIRM, HotspotTracker, Region,
+                     ThermalAnalyzer, ThermalSimulator, warming_rate)
+
+AMBIENT = 20.0
+WHOLE_FRAME = (Region("all", (0, FRAME_SHAPE[0]), (0, FRAME_SHAPE[1]), 10.0),)
+
+
+def _flood_fill(mask):
+    """4-connected components of a (cameras, rows, cols) mask, one pixel at a time."""
+    seen = np.zeros_like(mask)
+    components = []
+    for start in zip(*np.nonzero(mask)):
+        if seen[start]:
+            continue
+        seen[start] = True
+        pixels, queue = [], deque([start])
+        while queue:
+            c, r, k = queue.popleft()
+            pixels.append((c, r, k))
+            for dr, dk in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                p = (c, r + dr, k + dk)
+                if 0 <= p[1] < mask.shape[1] and 0 <= p[2] < mask.shape[2] and mask[p] and not seen[p]:
+                    seen[p] = True
+                    queue.append(p)
+        components.append(pixels)
+    return components
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_labelling_matches_flood_fill(seed):
+    rng = np.random.default_rng(seed)
+    cameras = int(rng.integers(1, 4))
+    mask = rng.random((cameras,) + FRAME_SHAPE) < rng.uniform(0.05, 0.6)
+    frames = np.where(mask, AMBIENT + 15.0 + rng.random(mask.shape) * 30, AMBIENT).astype(np.float32)
+    spots = ThermalAnalyzer(cameras, regions=WHOLE_FRAME).hotspots(frames, AMBIENT)
+
+    expected = []
+    for pixels in _flood_fill(mask):
+        if len(pixels) < MIN_HOTSPOT_PX:
+            continue
+        c, r, k = np.array(pixels).T
+        expected.append((c[0], len(pixels), r.mean(), k.mean(), frames[c, r, k].max()))
+    found = list(zip(spots["camera"], spots["area_px"], spots["row"], spots["col"], spots["max_c"]))
+    assert len(found) == len(expected)
+    for got, want in zip(sorted(found), sorted(expected)):
+        assert got[:2] == want[:2]
+        assert got[2:] == pytest.approx(want[2:])
+
+
+def test_hotspot_region_and_limits():
+    analyzer = ThermalAnalyzer(1)
+    frames = np.full((1,) + FRAME_SHAPE, AMBIENT, dtype=np.float32)
+    bearing, disc = BOGIE_REGIONS[2], BOGIE_REGIONS[3]
+    assert disc.limit_c > bearing.limit_c + 5
+    # Above the bearing's limit, but below the brake disc's
+    frames[0, 20:23, 20:23] = AMBIENT + bearing.limit_c + 5
+    frames[0, 70:73, 70:73] = AMBIENT + bearing.limit_c + 5
+    spots = analyzer.hotspots(frames, AMBIENT)
+    assert spots["region"].tolist() == [2]
+    assert spots["area_px"].tolist() == [9]
+    assert spots["row"][0] == pytest.approx(21.0)
+
+
+def test_region_max():
+    analyzer = ThermalAnalyzer(2)
+    frames = np.full((2,) + FRAME_SHAPE, AMBIENT, dtype=np.float32)
+    frames[1, 50, 80] = 95.0
+    maxima = analyzer.region_max(frames)
+    assert maxima.shape == (2, len(BOGIE_REGIONS))
+    assert maxima[1, 3] == 95.0
+    assert maxima[0].max() == AMBIENT
+
+
+def test_no_false_hotspots_without_episodes():
+    simulator = ThermalSimulator(2, rng=np.random.default_rng(1))
+    analyzer = ThermalAnalyzer(2)
+    heat = np.array([[20.0, 20.0, 25.0, 50.0]] * 2)
+    for _ in range(200):
+        frames = simulator.next_frame(AMBIENT, heat)
+        assert len(analyzer.hotspots(frames, AMBIENT)["camera"]) == 0
+
+
+def test_growing_hotspot_is_tracked_and_warms():
+    simulator = ThermalSimulator(2, rng=np.random.default_rng(2))
+    analyzer = ThermalAnalyzer(2)
+    tracker = HotspotTracker()
+    heat = np.array([[20.0, 20.0, 25.0, 50.0]] * 2)
+    for i in range(10):
+        frames = simulator.next_frame(AMBIENT, heat, [(1, 80.0, 25.0, 80.0 + 2 * i)])
+        tracker.update(analyzer.hotspots(frames, AMBIENT), i / 30)
+        if i < TRACK_CONFIRM - 1:
+            assert tracker.confirmed() == []
+    (track_id, track), = tracker.confirmed()
+    assert track["camera"] == 1
+    assert track["frames"] == 10
+    assert warming_rate(track) > 0
@@ -0,0 +1,88 @@
+import asyncio
+
+import numpy as np
+
+from blackboard import Blackboard
+from timeseries import ColumnarStore, load_chunk
+
+
+def test_scan_across_chunks():
+    store = ColumnarStore(chunk_seconds=10.0)
+    for i in range(100):
+        store.append("A7", float(i), {"speed_kmh": 80.0 + i, "moving": True})
+    ts, values = store.scan("A7", "speed_kmh", start=5.0, end=34.0)
+    assert ts.tolist() == [float(i) for i in range(5, 35)]
+    assert values.tolist() == [80.0 + i for i in range(5, 35)]
+    assert not values.flags.writeable
+    assert store.last("A7", "speed_kmh", 3)[1].tolist() == [177.0, 178.0, 179.0]
+
+
+def test_values_that_do_not_fit_widen_the_column():
+    store = ColumnarStore()
+    rows = [
+        {"count": 1, "level": 1.5, "flag": True},
+        {"count": 2 ** 40, "level": 2, "flag": True},      # beyond int32
+        {"count": 3, "level": 1e300, "flag": True},        # beyond float32
+        {"count": 4, "level": 2.5, "flag": 7},             # a flag turned count
+        {"count": 5.5, "level": 2.5, "flag": 7},           # an int field turned float
+    ]
+    for i, row in enumerate(rows):
+        store.append("A1", float(i), row)
+    for field in ("count", "level", "flag"):
+        assert store.scan("A1", field)[1].tolist() == [row[field] for row in rows]
+
+
+def test_widened_schema_is_kept_on_rollover():
+    store = ColumnarStore(chunk_seconds=1.0)
+    store.append("A1", 0.0, {"count": 2 ** 40})
+    store.append("A1", 5.0, {"count": 1})
+    chunks = store._streams["A1"].all_chunks()
+    assert [c.schema["count"] for c in chunks] == [np.dtype(np.int64)] * 2
+
+
+def test_blackboard_layer1_big_int():
+    async def run():
+        bb = Blackboard()
+        await bb.write(1, "A1", {"odometer_m": 1})
+        await bb.write(1, "A1", {"odometer_m": 3_000_000_000})
+        return bb
+
+    bb = asyncio.run(run())
+    assert bb.read_nowait(1, "A1")["data"] == {"odometer_m": 3_000_000_000}
+    assert bb.series.scan("A1", "odometer_m")[1].tolist() == [1, 3_000_000_000]
+
+
+def test_saved_chunk_maps_back(tmp_path):
+    store = ColumnarStore(str(tmp_path), chunk_seconds=1.0)
+    store.append("A4", 0.0, {"rms_g": 0.25, "alerts": 2 ** 33})
+    store.append("A4", 2.0, {"rms_g": 0.5, "alerts": 1})
+    store.close()
+    first, second = sorted(tmp_path.glob("*.rgts"))
+    agent_id, chunk = load_chunk(str(first))
+    assert agent_id == "A4"
+    assert chunk.cols["alerts"].dtype == np.int64
+    assert chunk.cols["alerts"].tolist() == [2 ** 33]
+    assert load_chunk(str(second))[1].cols["alerts"].tolist() == [1]
+
+
+def test_chunks_with_equal_t0_get_their_own_files(tmp_path):
+    store = ColumnarStore(str(tmp_path))
+    store.append("A1", 5.0, {"count": 1})
+    store.append("A1", 5.0, {"count": 2 ** 40})      # re-chunked at the same t0
+    store.close()
+    assert len(list(tmp_path.glob("*.rgts"))) == 2
+
+    reopened = ColumnarStore(str(tmp_path))
+    assert reopened.scan("A1", "count")[1].tolist() == [1, 2 ** 40]
+    reopened.append("A1", 5.0, {"count": 3})
+    reopened.close()
+    assert len(list(tmp_path.glob("*.rgts"))) == 3
+
+
+def test_expired_chunks_are_removed_from_disk(tmp_path):
+    store = ColumnarStore(str(tmp_path), chunk_seconds=1.0, retention_seconds=3.0)
+    for t in range(10):
+        store.append("A7", float(t), {"speed_kmh": 80.0})
+    store.close()
+    left = sorted(load_chunk(str(p))[1].t0 for p in tmp_path.glob("*.rgts"))
+    assert left == [float(t) for t in range(6, 10)]
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from timing_wheel import TimingWheel
+
+TICK = 0.01
+
+
+def test_fires_on_time_never_early():
+    wheel = TimingWheel(tick=TICK, slots=8, levels=2)
+    wheel.schedule("a", 0.034)
+    assert wheel.deadline("a") == pytest.approx(0.04)
+    assert wheel.advance(0.039) == []
+    assert wheel.advance(0.04) == ["a"]
+    assert "a" not in wheel and len(wheel) == 0
+
+
+def test_reschedule_moves_and_cancel_removes():
+    wheel = TimingWheel(tick=TICK)
+    wheel.schedule("a", 0.05)
+    wheel.schedule("a", 0.2)
+    wheel.schedule("b", 0.05)
+    assert wheel.cancel("b") is True
+    assert wheel.cancel("b") is False
+    assert wheel.advance(0.1) == []
+    assert wheel.advance(0.2) == ["a"]
+
+
+def test_past_deadline_fires_on_next_advance():
+    wheel = TimingWheel(tick=TICK, start=5.0)
+    wheel.advance(6.0)
+    wheel.schedule("late", 5.5)
+    assert wheel.next_deadline() == wheel.now
+    assert wheel.advance(6.0) == ["late"]
+
+
+def test_same_tick_keeps_insertion_order():
+    wheel = TimingWheel(tick=TICK)
+    items = [f"A{i}" for i in range(50)]
+    for i, item in enumerate(reversed(items)):
+        wheel.schedule(item, 1.001 + i * TICK / 100)
+    assert wheel.advance(1.1) == list(reversed(items))
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        TimingWheel(tick=0)
+    with pytest.raises(ValueError):
+        TimingWheel(slots=1)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_reference_across_levels_and_overflow(seed):
+    rng = random.Random(seed)
+    # 4 x 4 x 4 ticks of span: most deadlines cascade, some overflow the top level
+    wheel = TimingWheel(tick=TICK, slots=4, levels=3)
+    due = {}
+    now = 0.0
+    for step in range(400):
+        for _ in range(rng.randint(0, 3)):
+            item = rng.randrange(60)
+            when = now + rng.choice((rng.uniform(0, 0.05), rng.uniform(0, 0.7), rng.uniform(0, 3.0)))
+            wheel.schedule(item, when)
+            due[item] = wheel.deadline(item)
+        if rng.random() < 0.1 and due:
+            item = rng.choice(sorted(due))
+            assert wheel.cancel(item)
+            del due[item]
+        deadline = wheel.next_deadline()
+        if due:
+            # Never later than the earliest real deadline, so sleeping until it is safe
+            assert deadline <= min(due.values()) + 1e-9
+        now += rng.uniform(0, 0.08)
+        fired = wheel.advance(now)
+        expected = {item for item, when in due.items() if when <= now + 1e-9}
+        assert set(fired) == expected
+        assert len(fired) == len(expected)
+        for item in fired:
+            del due[item]
+    assert len(wheel) == len(due)
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+import vibration
+from vibration import (AXLE_BOX_BEARING, DEFECT_SNR_DB, DEFECTS, ENVELOPE_N, SpectrumAnalyzer,
+                       VibrationSimulator, shaft_hz)
+
+SHAFT = shaft_hz(100.0)
+FREQUENCIES = {name: f for name, f in AXLE_BOX_BEARING.frequencies(SHAFT).items() if name in DEFECTS}
+
+
+def _block(defects, seed=3, channels=3):
+    simulator = VibrationSimulator(channels, ENVELOPE_N, rng=np.random.default_rng(seed))
+    return simulator.next_block(SHAFT, defects).copy()
+
+
+def _reference_welch(x, analyzer):
+    """Welch PSD the textbook way: one rFFT per Hann-windowed segment."""
+    n, step = analyzer.nperseg, analyzer.step
+    x = x[:, -analyzer.welch_n:]
+    window = np.hanning(n)
+    psd = np.zeros((x.shape[0], n // 2 + 1))
+    for k in range(analyzer.segments):
+        psd += np.abs(np.fft.rfft(x[:, k * step:k * step + n] * window)) ** 2
+    psd *= 2.0 / (analyzer.fs * (window @ window) * analyzer.segments)
+    psd[:, 0] /= 2
+    psd[:, -1] /= 2
+    return psd
+
+
+def test_defect_frequencies_follow_shaft_speed():
+    slow, fast = AXLE_BOX_BEARING.frequencies(5.0), AXLE_BOX_BEARING.frequencies(10.0)
+    for name in slow:
+        assert fast[name] == pytest.approx(2 * slow[name])
+    assert slow["bpfi"] > slow["bpfo"] > slow["ftf"]
+    assert shaft_hz(-20.0) == 0.0
+
+
+def test_welch_matches_reference():
+    x = _block({})
+    analyzer = SpectrumAnalyzer(3)
+    np.testing.assert_allclose(analyzer.welch(x), _reference_welch(x, analyzer), rtol=1e-10)
+
+
+def test_white_noise_psd_level():
+    x = np.random.default_rng(0).standard_normal((2, ENVELOPE_N))
+    analyzer = SpectrumAnalyzer(2)
+    psd = analyzer.welch(x)
+    # Unit variance spread over fs / 2
+    assert np.median(psd[:, 1:-1]) == pytest.approx(2 / analyzer.fs, rel=0.15)
+
+
+def test_copy_fallback_matches_out(monkeypatch):
+    x = _block({(0, "bpfo"): 0.5})
+    native = SpectrumAnalyzer(3)
+    psd, envelope = native.welch(x).copy(), native.envelope(x).copy()
+    monkeypatch.setattr(vibration, "FFT_OUT", False)
+    copied = SpectrumAnalyzer(3)
+    np.testing.assert_array_equal(copied.welch(x), psd)
+    np.testing.assert_array_equal(copied.envelope(x), envelope)
+
+
+@pytest.mark.parametrize("channel, defect", [(0, "bpfi"), (1, "bpfo"), (2, "bsf")])
+def test_seeded_defect_is_flagged_on_its_channel(channel, defect):
+    analyzer = SpectrumAnalyzer(3)
+    analyzer.envelope(_block({(channel, defect): 0.5}))
+    snr = analyzer.defect_snr_db(FREQUENCIES)
+    assert snr[defect][channel] > DEFECT_SNR_DB
+    healthy = [c for c in range(3) if c != channel]
+    assert (snr[defect][healthy] < DEFECT_SNR_DB).all()
+
+
+def test_no_alerts_on_healthy_bearings():
+    analyzer = SpectrumAnalyzer(3)
+    for seed in range(20):
+        analyzer.envelope(_block({}, seed=seed))
+        for levels in analyzer.defect_snr_db(FREQUENCIES).values():
+            assert (levels < DEFECT_SNR_DB).all()